@@ -1,4 +1,5 @@
-from pyxedit.xelib import DLL_PATH, Xelib, XelibError
-from pyxedit.xedit import XEdit, XEditError
+from pyxedit.xelib import AsyncXelib, DLL_PATH, Xelib, XelibError
+from pyxedit.xedit import AsyncXEdit, XEdit, XEditError
 
-__all__ = ['DLL_PATH', 'Xelib', 'XelibError', 'XEdit', 'XEditError']
+__all__ = ['AsyncXelib', 'DLL_PATH', 'Xelib', 'XelibError', 'AsyncXEdit',
+           'XEdit', 'XEditError']
@@ -0,0 +1,5 @@
+from pyxedit.tes4.format import GroupTypes, RecordFlags, TES4Error
+from pyxedit.tes4.plugin import TES4Group, TES4Plugin, TES4Record
+
+__all__ = ['GroupTypes', 'RecordFlags', 'TES4Error', 'TES4Group',
+           'TES4Plugin', 'TES4Record']
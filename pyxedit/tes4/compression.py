@@ -0,0 +1,118 @@
+from collections import OrderedDict
+import zlib
+
+from pyxedit.tes4.format import DECOMPRESSED_SIZE
+
+
+def decompress(compressed):
+    '''
+    Decompresses the stored data of a compressed record: the decompressed
+    size, followed by a zlib stream.
+    '''
+    return zlib.decompress(compressed[DECOMPRESSED_SIZE.size:])
+
+
+class DecompressionCache:
+    '''
+    A size-bounded LRU cache of the decompressed data of compressed records,
+    so that the subrecords of a record can be read one after the other
+    without decompressing it each time, while bulk reads over many records
+    only keep the most recently used ones around.
+
+    The cache counts its hits, misses and evictions. Decompressed data
+    larger than the whole cache is handed out without being cached.
+    '''
+    # the default bound on the decompressed bytes kept
+    DEFAULT_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, max_size=DEFAULT_SIZE):
+        '''
+        Args:
+            max_size (``int``):
+                the most decompressed bytes to keep
+        '''
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.payloads = OrderedDict()
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def __contains__(self, key):
+        return key in self.payloads
+
+    def get(self, key):
+        '''
+        Returns the decompressed data cached under the given key, or None if
+        it is not cached (for the caller to ``add`` it).
+        '''
+        payload = self.payloads.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.payloads.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def add(self, key, compressed):
+        '''
+        Decompresses the stored data of a record and caches it under the
+        given key, evicting the least recently used data to make room.
+
+        Args:
+            key:
+                what the record is cached by, e.g. its offset in its plugin
+            compressed (``bytes``):
+                the stored data of the record
+
+        Returns:
+            (``bytes``) the decompressed data
+        '''
+        payload = decompress(compressed)
+        if len(payload) <= self.max_size:
+            payloads = self.payloads
+            payloads[key] = payload
+            self.size += len(payload)
+            while self.size > self.max_size:
+                _, evicted = payloads.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return payload
+
+    def clear(self):
+        self.payloads.clear()
+        self.size = 0
+
+
+class StreamDecompressor:
+    '''
+    Decompresses the stored data of a compressed record only as far as it is
+    read, for finding subrecords near the start of a record (like its
+    EditorID) without decompressing all of it.
+    '''
+    # the least to decompress at a time
+    CHUNK_SIZE = 256
+
+    def __init__(self, compressed):
+        '''
+        Args:
+            compressed (``bytes``):
+                the stored data of the record
+        '''
+        self.size = DECOMPRESSED_SIZE.unpack_from(compressed)[0]
+        self.data = bytearray()
+        self.decompressor = zlib.decompressobj()
+        self.tail = compressed[DECOMPRESSED_SIZE.size:]
+
+    def fill(self, size):
+        '''
+        Decompresses the data up to the given size, or as far as it goes.
+        '''
+        data, decompressor = self.data, self.decompressor
+        while len(data) < size and self.tail:
+            data += decompressor.decompress(
+                        self.tail, max(size - len(data), self.CHUNK_SIZE))
+            self.tail = decompressor.unconsumed_tail
@@ -0,0 +1,144 @@
+'''
+The binary layout of TES4-style plugin files (``.esm``, ``.esp`` and
+``.esl``), as used by Skyrim, Skyrim Special Edition and the Fallout games.
+
+A plugin is a ``TES4`` header record followed by top-level groups. Records
+and groups both start with a 24-byte header: a record's header is followed
+by its data (a run of subrecords, zlib-compressed when the record's
+``Compressed`` flag is set), while a group's header is followed by its
+records and child groups. A subrecord is a 4-character signature, a 16-bit
+size and its data; data larger than 64KiB is given the size announced by a
+preceding ``XXXX`` subrecord.
+'''
+from enum import Enum, unique
+import struct
+
+# signature, data size, flags, FormID, version control info, form version,
+# and a second version control field
+RECORD_HEADER = struct.Struct('<4sIIIIHH')
+
+# 'GRUP', size of the group (header included), label, group type, and
+# version control info
+GROUP_HEADER = struct.Struct('<4sI4siII')
+
+# signature, data size
+SUBRECORD_HEADER = struct.Struct('<4sH')
+
+# both headers are the same size
+HEADER_SIZE = RECORD_HEADER.size
+
+# the decompressed size that starts the data of compressed records
+DECOMPRESSED_SIZE = struct.Struct('<I')
+
+# the subrecord giving the size of the next one, when that one is too large
+# for its 16-bit size field
+XXXX = b'XXXX'
+XXXX_SIZE = struct.Struct('<I')
+
+# version, number of records and groups, and next object ID
+HEDR = struct.Struct('<fiI')
+
+GRUP = b'GRUP'
+TES4 = b'TES4'
+
+# the encoding of the strings of a plugin
+ENCODING = 'cp1252'
+
+
+class TES4Error(Exception):
+    '''
+    Raised when a file cannot be read as a plugin.
+    '''
+    pass
+
+
+@unique
+class RecordFlags(Enum):
+    '''
+    The record flags the reader makes use of, as bit masks. Most flags mean
+    something different for each record signature; these mean the same for
+    all of them (or, for ``ESM``, ``Localized`` and ``ESL``, are flags of the
+    ``TES4`` header record).
+    '''
+    ESM = 0x1
+    Deleted = 0x20
+    Localized = 0x80
+    ESL = 0x200
+    Compressed = 0x40000
+
+
+@unique
+class GroupTypes(Enum):
+    '''
+    The types of groups, which tell what the label of a group is.
+
+    .. list-table::
+        :widths: 20 80
+        :header-rows: 0
+        :align: left
+
+        * - ``GroupTypes.Top``
+          - a top-level group; labelled with the signature of its records
+        * - ``GroupTypes.WorldChildren``
+          - the cells of a worldspace; labelled with its FormID
+        * - ``GroupTypes.InteriorCellBlock``
+          - labelled with the block number
+        * - ``GroupTypes.InteriorCellSubBlock``
+          - labelled with the sub-block number
+        * - ``GroupTypes.ExteriorCellBlock``
+          - labelled with the block's grid Y and X
+        * - ``GroupTypes.ExteriorCellSubBlock``
+          - labelled with the sub-block's grid Y and X
+        * - ``GroupTypes.CellChildren``
+          - the references of a cell; labelled with its FormID
+        * - ``GroupTypes.TopicChildren``
+          - the infos of a dialog topic; labelled with its FormID
+        * - ``GroupTypes.CellPersistentChildren``
+          - labelled with the cell's FormID
+        * - ``GroupTypes.CellTemporaryChildren``
+          - labelled with the cell's FormID
+    '''
+    Top = 0
+    WorldChildren = 1
+    InteriorCellBlock = 2
+    InteriorCellSubBlock = 3
+    ExteriorCellBlock = 4
+    ExteriorCellSubBlock = 5
+    CellChildren = 6
+    TopicChildren = 7
+    CellPersistentChildren = 8
+    CellTemporaryChildren = 9
+
+
+# the group types labelled with the FormID of the record owning the group
+FORM_ID_LABELLED = frozenset({GroupTypes.WorldChildren,
+                              GroupTypes.CellChildren,
+                              GroupTypes.TopicChildren,
+                              GroupTypes.CellPersistentChildren,
+                              GroupTypes.CellTemporaryChildren})
+
+# the signatures of the records that may be in the child groups of cells
+CELL_CHILD_SIGNATURES = ('REFR', 'ACHR', 'ACRE', 'NAVM', 'LAND', 'PGRE',
+                         'PHZD', 'PMIS', 'PARW', 'PBAR', 'PBEA', 'PCON',
+                         'PFLA')
+
+# top-level groups that hold records of other signatures in the child groups
+# of their records (e.g. the REFRs and NAVMs of a CELL), and the signatures
+# of those records
+CHILD_SIGNATURES = {'CELL': CELL_CHILD_SIGNATURES,
+                    'WRLD': ('CELL',) + CELL_CHILD_SIGNATURES,
+                    'DIAL': ('INFO',)}
+
+# the signatures of the records that groups other than top-level groups may
+# hold, at any depth
+GROUP_SIGNATURES = {
+    GroupTypes.WorldChildren: CHILD_SIGNATURES['WRLD'],
+    GroupTypes.InteriorCellBlock: CHILD_SIGNATURES['WRLD'],
+    GroupTypes.InteriorCellSubBlock: CHILD_SIGNATURES['WRLD'],
+    GroupTypes.ExteriorCellBlock: CHILD_SIGNATURES['WRLD'],
+    GroupTypes.ExteriorCellSubBlock: CHILD_SIGNATURES['WRLD'],
+    GroupTypes.CellChildren: CELL_CHILD_SIGNATURES,
+    GroupTypes.TopicChildren: CHILD_SIGNATURES['DIAL'],
+    GroupTypes.CellPersistentChildren: CELL_CHILD_SIGNATURES,
+    GroupTypes.CellTemporaryChildren: CELL_CHILD_SIGNATURES,
+}
@@ -0,0 +1,599 @@
+from collections import namedtuple
+from pathlib import Path
+import mmap
+import zlib
+
+from pyxedit.tes4.compression import DecompressionCache, StreamDecompressor
+from pyxedit.tes4.format import (CHILD_SIGNATURES,
+                                 ENCODING,
+                                 FORM_ID_LABELLED,
+                                 GROUP_HEADER,
+                                 GROUP_SIGNATURES,
+                                 GRUP,
+                                 GroupTypes,
+                                 HEADER_SIZE,
+                                 HEDR,
+                                 RECORD_HEADER,
+                                 RecordFlags,
+                                 SUBRECORD_HEADER,
+                                 TES4,
+                                 TES4Error,
+                                 XXXX,
+                                 XXXX_SIZE)
+from pyxedit.tes4.subrecords import resolve
+
+# a subrecord of a record: its signature and its data (a ``memoryview``)
+Subrecord = namedtuple('Subrecord', ['signature', 'data'])
+
+COMPRESSED = RecordFlags.Compressed.value
+DELETED = RecordFlags.Deleted.value
+
+
+def iter_subrecords(buffer, start, end, fill=None):
+    '''
+    Produces the (signature, data offset, data size) of each subrecord in the
+    given range of a buffer, giving subrecords announced by an ``XXXX``
+    subrecord their announced size. If given, ``fill(size)`` is called to
+    have the buffer hold (at least) the given size before reading up to it.
+    '''
+    offset = start
+    size_override = None
+    while offset < end:
+        header_end = offset + SUBRECORD_HEADER.size
+        if fill:
+            fill(header_end)
+        if header_end > end or header_end > len(buffer):
+            raise TES4Error(f'Truncated subrecord header at offset {offset}')
+        signature, size = SUBRECORD_HEADER.unpack_from(buffer, offset)
+        if size_override is not None and signature != XXXX:
+            size, size_override = size_override, None
+
+        offset = header_end
+        data_end = offset + size
+        if fill:
+            fill(data_end)
+        if data_end > end or data_end > len(buffer):
+            raise TES4Error(f'Subrecord {signature!r} at offset {offset} '
+                            f'runs past the end of its record')
+        if signature == XXXX:
+            size_override = XXXX_SIZE.unpack_from(buffer, offset)[0]
+        else:
+            yield signature, offset, size
+        offset = data_end
+
+
+def decode_string(data):
+    '''
+    Decodes the data of a zero-terminated string subrecord.
+    '''
+    return bytes(data).split(b'\0', 1)[0].decode(ENCODING)
+
+
+def signature_set(signature):
+    '''
+    Returns the set of signatures given as a signature, a comma-separated
+    string of signatures or a list of them, or None for all signatures.
+    '''
+    if isinstance(signature, str):
+        signature = signature.split(',')
+    return set(signature) if signature else None
+
+
+def iter_records(entries, signatures, include_overrides):
+    '''
+    Produces the records among the given records and groups, and within the
+    groups, skipping groups that cannot hold any of the given signatures.
+    '''
+    for entry in entries:
+        if isinstance(entry, TES4Group):
+            if (signatures is None or
+                    not signatures.isdisjoint(entry.signatures)):
+                yield from iter_records(entry.children(),
+                                        signatures,
+                                        include_overrides)
+        elif ((signatures is None or entry.signature in signatures) and
+                (include_overrides or not entry.is_override)):
+            yield entry
+
+
+class TES4Plugin:
+    '''
+    Reads a plugin file (``.esm``, ``.esp`` or ``.esl``) directly, without
+    ``XEditLib.dll``, for read-only analysis on any platform. See example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        with TES4Plugin('Data/Skyrim.esm') as plugin:
+            editor_ids = {record.form_id: record.editor_id
+                          for record in plugin.records('ARMO')}
+
+    The file is memory-mapped, and its groups and records are read on demand
+    from their headers; nothing is decompressed or decoded until asked for.
+    The data of records and subrecords is handed out as ``memoryview``
+    slices over the file (or over the decompressed data), copying nothing
+    until values are decoded from it; see ``TES4Record.get_value``.
+    Compressed records are decompressed on first access to their subrecords,
+    through a ``DecompressionCache`` of the plugin's own, except to read
+    their EditorIDs, which only takes decompressing the start of them.
+    Records are shaped like xedit records (``signature``, ``form_id``,
+    ``editor_id``, ``is_override``, ...), and the plugin like an xedit plugin
+    (``master_names``, ``records``, ``header``, ...), but values are those
+    stored in the file: there is no load order, so FormIDs are the file's own
+    FormIDs, whose top byte indexes into its masters.
+
+    Only the 24-byte record headers of Skyrim and the Fallout games are
+    supported; Oblivion plugins are not.
+    '''
+    def __init__(self, path, cache_size=DecompressionCache.DEFAULT_SIZE):
+        '''
+        Args:
+            path (``str``):
+                the path of the plugin file
+            cache_size (``int``):
+                the most bytes of decompressed record data to keep cached
+        '''
+        self.path = Path(path)
+        self.name = self.path.name
+        self.decompression_cache = DecompressionCache(cache_size)
+        self.closed = False
+        with open(self.path, 'rb') as f:
+            try:
+                self._data = mmap.mmap(f.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+            except ValueError:
+                raise TES4Error(f'{self.name} is empty')
+        self._view = memoryview(self._data)
+        try:
+            self.header = self.read_header()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} {self.name}>'
+
+    def close(self):
+        '''
+        Unmaps the file, and drops the decompressed data cached. The plugin
+        and its records cannot be read from once closed: their data raises a
+        ``TES4Error``. Data handed out before (e.g. by ``subrecord``) that
+        still points into the file keeps the file mapped, and readable
+        through that data, until the last of it is dropped.
+        '''
+        if self.closed:
+            return
+        self.closed = True
+        self.decompression_cache.clear()
+        self._view.release()
+        try:
+            self._data.close()
+        except BufferError:
+            # data handed out still points into the file; the map is closed
+            # once that is dropped, as it holds the last reference to it
+            pass
+        self._data = self._view = None
+
+    @property
+    def data(self):
+        '''
+        The file, memory-mapped.
+        '''
+        if self.closed:
+            raise TES4Error(f'{self.name} is closed')
+        return self._data
+
+    @property
+    def view(self):
+        '''
+        A ``memoryview`` over the whole file, for slicing the data of records
+        and subrecords out of it.
+        '''
+        if self.closed:
+            raise TES4Error(f'{self.name} is closed')
+        return self._view
+
+    def read_header(self):
+        data = self.data
+        if len(data) < HEADER_SIZE or data[:4] != TES4:
+            raise TES4Error(f'{self.name} is not a plugin file')
+        if data[20:24] == b'HEDR':
+            raise TES4Error(f'{self.name} has 20-byte record headers '
+                            f'(Oblivion), which are not supported')
+        header = TES4Record(self, 0, None)
+
+        # the master names are needed to tell overrides apart, and with them
+        # come the rest of the fields of the header
+        self.master_names = []
+        self.author = ''
+        self.description = ''
+        self.version = None
+        self.next_object_id = None
+        for signature, value in header.subrecords():
+            if signature == 'HEDR':
+                self.version, _, self.next_object_id = HEDR.unpack_from(value)
+            elif signature == 'CNAM':
+                self.author = decode_string(value)
+            elif signature == 'SNAM':
+                self.description = decode_string(value)
+            elif signature == 'MAST':
+                self.master_names.append(decode_string(value))
+        return header
+
+    @property
+    def masters(self):
+        '''
+        The names of the masters of the plugin, in order (the same as
+        ``master_names``; a plugin read on its own has no loaded masters to
+        give).
+        '''
+        return self.master_names
+
+    @property
+    def is_esm(self):
+        return bool(self.header.flags & RecordFlags.ESM.value)
+
+    @property
+    def is_esl(self):
+        return bool(self.header.flags & RecordFlags.ESL.value)
+
+    @property
+    def is_localized(self):
+        return bool(self.header.flags & RecordFlags.Localized.value)
+
+    def read_entries(self, start, end, parent):
+        '''
+        Produces the records and groups laid out one after the other between
+        the given offsets.
+        '''
+        data = self.data
+        if end > len(data):
+            raise TES4Error(f'{self.name} is truncated: {parent!r} ends at '
+                            f'offset {end}, past the end of the file')
+        offset = start
+        while offset < end:
+            if offset + HEADER_SIZE > end:
+                raise TES4Error(f'{self.name} is truncated: the header at '
+                                f'offset {offset} runs past its group')
+            if data[offset:offset + 4] == GRUP:
+                entry = TES4Group(self, offset, parent)
+                size = entry.size
+                if size < HEADER_SIZE:
+                    raise TES4Error(f'{self.name} has a group of invalid '
+                                    f'size {size} at offset {offset}')
+            else:
+                entry = TES4Record(self, offset, parent)
+                size = HEADER_SIZE + entry.data_size
+            if offset + size > end:
+                raise TES4Error(f'{self.name} is truncated: {entry!r} at '
+                                f'offset {offset} runs past its group')
+            yield entry
+            offset += size
+
+    @property
+    def groups(self):
+        '''
+        The top-level groups of the plugin.
+        '''
+        start = HEADER_SIZE + self.header.data_size
+        return list(self.read_entries(start, len(self.data), None))
+
+    def get_group(self, signature):
+        '''
+        Returns the top-level group of the records of the given signature, or
+        None if the plugin has none.
+        '''
+        for group in self.groups:
+            if group.label_signature == signature:
+                return group
+
+    def records(self, signature=None, include_overrides=False):
+        '''
+        Produces the records of the plugin, in file order, records nested in
+        the child groups of other records included.
+
+        Args:
+            signature (``str`` or ``List[str]``):
+                a signature, a comma-separated string of signatures or a list
+                of signatures to only produce the records of
+            include_overrides (``bool``):
+                whether to include records that override records of the
+                plugin's masters
+
+        Returns:
+            (``Iterable[TES4Record]``) the records
+        '''
+        return iter_records(self.groups,
+                            signature_set(signature),
+                            include_overrides)
+
+
+class TES4Group:
+    '''
+    A group of a plugin file, as read from its header.
+    '''
+    __slots__ = ('plugin', 'offset', 'parent', 'size', 'label', 'group_type')
+
+    signature = 'GRUP'
+
+    def __init__(self, plugin, offset, parent):
+        self.plugin = plugin
+        self.offset = offset
+        self.parent = parent
+        _, self.size, self.label, group_type, _, _ = \
+            GROUP_HEADER.unpack_from(plugin.data, offset)
+        try:
+            self.group_type = GroupTypes(group_type)
+        except ValueError:
+            raise TES4Error(f'{plugin.name} has a group of unknown type '
+                            f'{group_type} at offset {offset}')
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} {self.group_type.name} '
+                f'{self.label_signature or self.label.hex().upper()}>')
+
+    @property
+    def label_signature(self):
+        '''
+        The signature of the records of a top-level group, or None for other
+        groups.
+        '''
+        if self.group_type == GroupTypes.Top:
+            return self.label.decode(ENCODING)
+
+    @property
+    def signatures(self):
+        '''
+        The signatures of the records the group may hold, at any depth.
+        '''
+        if self.group_type == GroupTypes.Top:
+            signature = self.label_signature
+            return (signature,) + CHILD_SIGNATURES.get(signature, ())
+        return GROUP_SIGNATURES[self.group_type]
+
+    @property
+    def label_form_id(self):
+        '''
+        The FormID of the record a child group belongs to, or None for other
+        groups.
+        '''
+        if self.group_type in FORM_ID_LABELLED:
+            return int.from_bytes(self.label, 'little')
+
+    def children(self):
+        '''
+        Produces the records and groups directly within the group.
+        '''
+        return self.plugin.read_entries(self.offset + HEADER_SIZE,
+                                        self.offset + self.size,
+                                        self)
+
+    def records(self, signature=None, include_overrides=False):
+        '''
+        Produces the records within the group, at any depth; see
+        ``TES4Plugin.records``.
+        '''
+        return iter_records(self.children(),
+                            signature_set(signature),
+                            include_overrides)
+
+
+class TES4Record:
+    '''
+    A record of a plugin file, as read from its header; its subrecords are
+    only read (and decompressed) when asked for.
+    '''
+    __slots__ = ('plugin', 'offset', 'parent', 'signature', 'data_size',
+                 'flags', 'form_id', 'form_version')
+
+    def __init__(self, plugin, offset, parent):
+        self.plugin = plugin
+        self.offset = offset
+        self.parent = parent
+        signature, self.data_size, self.flags, self.form_id, _, \
+            self.form_version, _ = RECORD_HEADER.unpack_from(plugin.data,
+                                                             offset)
+        self.signature = signature.decode(ENCODING)
+
+    def __repr__(self):
+        # only the header goes in, so that nothing gets decompressed
+        return (f'<{self.__class__.__name__} {self.signature} '
+                f'{self.form_id_str}>')
+
+    @property
+    def form_id_str(self):
+        return f'{self.form_id:0>8X}'
+
+    @property
+    def local_form_id(self):
+        '''
+        The FormID without its top byte (the index of the plugin it comes
+        from among the masters).
+        '''
+        return self.form_id & 0xFFFFFF
+
+    @property
+    def local_form_id_str(self):
+        return f'{self.local_form_id:0>8X}'
+
+    @property
+    def owner_name(self):
+        '''
+        The name of the plugin the record comes from: one of the masters for
+        an override, or this plugin.
+        '''
+        masters = self.plugin.master_names
+        index = self.form_id >> 24
+        return masters[index] if index < len(masters) else self.plugin.name
+
+    @property
+    def is_override(self):
+        return (self.form_id >> 24) < len(self.plugin.master_names)
+
+    @property
+    def is_master(self):
+        return not self.is_override
+
+    @property
+    def is_compressed(self):
+        return bool(self.flags & COMPRESSED)
+
+    @property
+    def is_deleted(self):
+        return bool(self.flags & DELETED)
+
+    @property
+    def stored_data(self):
+        '''
+        The data of the record as stored in the file, i.e. compressed if the
+        record is, as a ``memoryview`` over the file.
+        '''
+        start = self.offset + HEADER_SIZE
+        return self.plugin.view[start:start + self.data_size]
+
+    @property
+    def data(self):
+        '''
+        The (decompressed) data of the record, i.e. its subrecords, as a
+        ``memoryview``. Compressed records are decompressed on first access,
+        and then kept in the plugin's ``decompression_cache`` for as long as
+        it has room.
+        '''
+        if not self.flags & COMPRESSED:
+            return self.stored_data
+        cache = self.plugin.decompression_cache
+        data = cache.get(self.offset)
+        if data is None:
+            try:
+                data = cache.add(self.offset, self.stored_data)
+            except zlib.error as e:
+                raise TES4Error(f'Failed to decompress {self!r} in '
+                                f'{self.plugin.name}: {e}')
+        return memoryview(data)
+
+    def subrecords(self):
+        '''
+        Produces the subrecords of the record, in order.
+
+        Returns:
+            (``Iterable[Subrecord]``) (signature, data) pairs, the data a
+            ``memoryview`` slice of the record's
+        '''
+        data = self.data
+        for signature, offset, size in iter_subrecords(data, 0, len(data)):
+            yield Subrecord(signature.decode(ENCODING),
+                            data[offset:offset + size])
+
+    def subrecord(self, signature):
+        '''
+        Returns the data of the first subrecord of the given signature, as a
+        ``memoryview`` slice of the record's, or None if the record has none.
+        Subrecords of uncompressed records are found without reading the rest
+        of the record.
+        '''
+        signature = signature.encode(ENCODING)
+        if self.flags & COMPRESSED:
+            data, start = self.data, 0
+            end = len(data)
+        else:
+            data, start = self.plugin.view, self.offset + HEADER_SIZE
+            end = start + self.data_size
+        for found, offset, size in iter_subrecords(data, start, end):
+            if found == signature:
+                return data[offset:offset + size]
+
+    def peek(self, signature):
+        '''
+        Like ``subrecord``, but for a compressed record that is not cached,
+        only decompresses as far as the subrecord, and leaves the cache be;
+        for reading subrecords at the start of records (like ``EDID``) over
+        many records. The data of such a subrecord is a copy (``bytes``).
+        '''
+        if (not self.flags & COMPRESSED or
+                self.offset in self.plugin.decompression_cache):
+            return self.subrecord(signature)
+        signature = signature.encode(ENCODING)
+        stream = StreamDecompressor(self.stored_data)
+        try:
+            for found, offset, size in iter_subrecords(stream.data,
+                                                       0,
+                                                       stream.size,
+                                                       stream.fill):
+                if found == signature:
+                    return bytes(stream.data[offset:offset + size])
+        except zlib.error as e:
+            raise TES4Error(f'Failed to decompress {self!r} in '
+                            f'{self.plugin.name}: {e}')
+
+    def get_value(self, name):
+        '''
+        Decodes a value of the record straight from the subrecord holding
+        it, unpacking that value alone. Values are named after the
+        ``XEditAttribute``s of the record's xedit object class (e.g.
+        ``armor_rating`` for ``ARMO`` records, or ``position_x`` for
+        ``REFR`` records), or given as paths (``DNAM``,
+        ``DATA\\Position\\X``); see ``pyxedit.tes4.subrecords`` for the
+        subrecords that can be decoded.
+
+        Args:
+            name (``str``):
+                an attribute name, or a path
+
+        Returns:
+            the value; a dict of the values of its fields for a whole
+            subrecord of several fields; or None if the record does not have
+            the subrecord
+        '''
+        signature, layout, field = resolve(self.signature, name)
+        data = self.subrecord(signature)
+        if data is None:
+            return None
+        if field is None:
+            return layout.decode(data)
+        return layout.decode_field(data, field)
+
+    def get_values(self, names, as_tuple=False):
+        '''
+        Decodes several values of the record; see ``get_value``.
+
+        Args:
+            names (``Iterable[str]``):
+                the attribute names or paths of the values
+            as_tuple (``bool``):
+                whether to return the values as a tuple, in the order of the
+                names, rather than as a dict keyed by name
+
+        Returns:
+            (``dict`` or ``tuple``) the values
+        '''
+        names = list(names)
+        values = [self.get_value(name) for name in names]
+        return tuple(values) if as_tuple else dict(zip(names, values))
+
+    @property
+    def editor_id(self):
+        data = self.peek('EDID')
+        if data is not None:
+            return decode_string(data)
+
+    @property
+    def child_group(self):
+        '''
+        The group of the records belonging to this one (e.g. the references
+        of a cell), which follows the record, or None if it has none.
+        '''
+        offset = self.offset + HEADER_SIZE + self.data_size
+        end = (self.parent.offset + self.parent.size if self.parent
+               else len(self.plugin.data))
+        data = self.plugin.data
+        if offset + HEADER_SIZE > end or data[offset:offset + 4] != GRUP:
+            return None
+        group = TES4Group(self.plugin, offset, self.parent)
+        if group.label_form_id == self.form_id:
+            return group
@@ -0,0 +1,200 @@
+'''
+The layouts of the fixed-size subrecords that the xedit object classes
+expose as attributes, for decoding their values straight from the data of
+a ``TES4Record``.
+
+Layouts are keyed by record signature and then by subrecord signature,
+using the same signatures as ``pyxedit.xedit.object_classes``, so that a
+value can be asked for by the name of an ``XEditAttribute`` of the record's
+object class (``armor_rating``, ``position_x``, ``base_stats``, ...) as well
+as by path (``DNAM``, ``DATA\\Position\\X``, ``ACBS\\Level``). Field names
+are those xEdit gives the fields.
+'''
+from inspect import getattr_static
+import struct
+
+
+class SubrecordLayout:
+    '''
+    The layout of a fixed-size subrecord: its fields, in order, each a
+    ``struct`` format code (little-endian, unpadded), and optionally a
+    divisor that xEdit scales the stored value down by.
+
+    The structs are compiled once, for the whole subrecord and for each field
+    at its offset, and unpack values in place from the data they are given,
+    so that decoding a field of a subrecord (a ``memoryview`` over the
+    plugin file) copies nothing but the value itself.
+    '''
+    def __init__(self, *fields):
+        '''
+        Args:
+            fields (``Tuple[str, str]`` or ``Tuple[str, str, int]``):
+                the name, format code and (optional) divisor of each field;
+                a subrecord holding a single value has a single field named
+                ``''``, and decodes to the value itself
+        '''
+        self.names = tuple(field[0] for field in fields)
+        self.divisors = tuple(field[2] if len(field) > 2 else None
+                              for field in fields)
+        self.struct = struct.Struct('<' + ''.join(field[1]
+                                                  for field in fields))
+        self.size = self.struct.size
+
+        # the struct, offset and divisor of each field
+        self.fields = {}
+        offset = 0
+        for (name, code, *_), divisor in zip(fields, self.divisors):
+            field_struct = struct.Struct('<' + code)
+            self.fields[name] = (field_struct, offset, divisor)
+            offset += field_struct.size
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} '
+                f'{", ".join(name or "value" for name in self.names)}>')
+
+    def decode(self, data):
+        '''
+        Decodes the whole subrecord. Fields past the end of shorter data
+        (as stored by older form versions) are left out.
+
+        Returns:
+            (``dict``) the value of each field, by field name; or the value
+            itself for a single-value subrecord
+        '''
+        if len(data) >= self.size:
+            values = self.struct.unpack_from(data)
+            decoded = {name: value / divisor if divisor else value
+                       for name, value, divisor in zip(self.names,
+                                                       values,
+                                                       self.divisors)}
+        else:
+            decoded = {}
+            for name in self.names:
+                value = self.decode_field(data, name)
+                if value is None:
+                    break
+                decoded[name] = value
+        if self.names == ('',):
+            return decoded.get('')
+        return decoded
+
+    def decode_field(self, data, name):
+        '''
+        Decodes a single field of the subrecord, or returns None if the data
+        ends before the field.
+        '''
+        try:
+            field_struct, offset, divisor = self.fields[name]
+        except KeyError:
+            raise ValueError(f'{self!r} has no field {name!r}')
+        if offset + field_struct.size > len(data):
+            return None
+        value = field_struct.unpack_from(data, offset)[0]
+        return value / divisor if divisor else value
+
+
+# a single value
+FLOAT = SubrecordLayout(('', 'f'))
+FORM_ID = SubrecordLayout(('', 'I'))
+UINT16 = SubrecordLayout(('', 'H'))
+
+OBND = SubrecordLayout(('X1', 'h'), ('Y1', 'h'), ('Z1', 'h'),
+                       ('X2', 'h'), ('Y2', 'h'), ('Z2', 'h'))
+
+# the DATA of placed objects
+PLACEMENT = SubrecordLayout(('Position\\X', 'f'),
+                            ('Position\\Y', 'f'),
+                            ('Position\\Z', 'f'),
+                            ('Rotation\\X', 'f'),
+                            ('Rotation\\Y', 'f'),
+                            ('Rotation\\Z', 'f'))
+
+ACBS = SubrecordLayout(('Flags', 'I'),
+                       ('Magicka Offset', 'h'),
+                       ('Stamina Offset', 'h'),
+                       ('Level', 'H'),
+                       ('Calc min level', 'H'),
+                       ('Calc max level', 'H'),
+                       ('Speed Multiplier', 'H'),
+                       ('Disposition Base (unused)', 'h'),
+                       ('Template Flags', 'H'),
+                       ('Health Offset', 'h'),
+                       ('Bleedout Override', 'H'))
+
+LAYOUTS = {
+    'ACHR': {'DATA': PLACEMENT,
+             'NAME': FORM_ID,
+             'XSCL': FLOAT},
+    'ARMO': {'OBND': OBND,
+             'EITM': FORM_ID,
+             'EAMT': UINT16,
+             'DATA': SubrecordLayout(('Value', 'i'), ('Weight', 'f')),
+             # stored in hundredths
+             'DNAM': SubrecordLayout(('', 'i', 100)),
+             'RNAM': FORM_ID,
+             'TNAM': FORM_ID},
+    'CELL': {'XCLW': FLOAT,
+             'XLCN': FORM_ID},
+    'GLOB': {'FLTV': FLOAT},
+    'NPC_': {'OBND': OBND,
+             'ACBS': ACBS,
+             'RNAM': FORM_ID,
+             'CNAM': FORM_ID,
+             'NAM6': FLOAT,
+             'NAM7': FLOAT},
+    'REFR': {'DATA': PLACEMENT,
+             'NAME': FORM_ID,
+             'XSCL': FLOAT},
+    'TXST': {'OBND': OBND},
+}
+
+
+def resolve(record_signature, name):
+    '''
+    Finds where a value of records of the given signature is stored.
+
+    Args:
+        record_signature (``str``):
+            the signature of the record
+        name (``str``):
+            the name of an ``XEditAttribute`` of the record's object class,
+            or a path: a subrecord signature, optionally followed by a field
+
+    Returns:
+        (``Tuple[str, SubrecordLayout, str]``) the subrecord signature, its
+        layout, and the field (None for the whole subrecord)
+    '''
+    from pyxedit.xedit.attribute import XEditAttribute
+    path = name
+    object_class = object_classes().get(record_signature)
+    if object_class is not None:
+        attribute = getattr_static(object_class, name, None)
+        if isinstance(attribute, XEditAttribute):
+            path = attribute.path
+
+    signature, _, field = path.partition('\\')
+    layout = LAYOUTS.get(record_signature, {}).get(signature)
+    if layout is None:
+        raise ValueError(f'No known layout for {name!r} of '
+                         f'{record_signature} records')
+    if field and field not in layout.fields:
+        raise ValueError(f'{signature} of {record_signature} records has no '
+                         f'field {field!r}')
+    return signature, layout, field or None
+
+
+def object_classes():
+    '''
+    Returns the xedit object classes, by signature. They are only imported
+    (which is what registers them by signature) the first time they are
+    asked for, so that reading plugins does not take the xedit layer.
+    '''
+    from pyxedit.xedit.base import XEditBase
+    global object_classes_imported
+    if not object_classes_imported:
+        XEditBase.import_all_object_classes()
+        object_classes_imported = True
+    return XEditBase.object_classes
+
+
+object_classes_imported = False
@@ -1,4 +1,5 @@
 from pyxedit.xedit.base import XEditError
 from pyxedit.xedit.xedit import XEdit
+from pyxedit.xedit.async_xedit import AsyncXEdit
 
-__all__ = ['XEdit', 'XEditError']
+__all__ = ['AsyncXEdit', 'XEdit', 'XEditError']
@@ -6,14 +6,16 @@ class XEditArray(XEditGenericObject):
     '''
     The array class for use by array types.
     '''
+    __slots__ = ()
+
     def __len__(self):
         '''
         Implements length calculation (`len(obj)`)
 
-        Length calculation for an array class is the same as the num_children
-        property.
+        Length calculation for an array class is the number of child elements;
+        arrays never have child groups, so there is no need to look for one.
         '''
-        return self.num_children
+        return self.num_child_elements
 
     def __getitem__(self, index):
         '''
@@ -25,8 +27,20 @@ class XEditArray(XEditGenericObject):
         object. Otherwise, it will operate on the array item object itself.
 
         The implementation is built on top of the implementation of the
-        get_object_at_index method in this same class.
+        get_object_at_index method in this same class. Slices are also
+        supported (`arr[10:50]`), and produce a list; these are built from a
+        single fetch of all item handles, same as iteration.
         '''
+        if isinstance(index, slice):
+            handles = self.item_handles
+            selected = handles[index]
+
+            # release the handles of the items we are not going to produce
+            for handle in set(handles).difference(selected):
+                self.release_item_handle(handle)
+
+            return list(self.iter_items(selected))
+
         obj = self.get_object_at_index(index)
 
         if obj.type in (obj.Types.Value, obj.Types.Ref):
@@ -45,11 +59,87 @@ class XEditArray(XEditGenericObject):
         item object if the array item object is a <Types.Value> or <Types.Ref>
         object. Otherwise, it will operate on the array item object itself.
 
-        The implementation is a simple for loop iterating over the index range,
-        yielding __getitem__-produced values
+        The implementation fetches the handles of all items in one go, and
+        produces values from them via `iter_items`.
+        '''
+        return self.iter_items(self.item_handles)
+
+    @property
+    def item_handles(self):
+        '''
+        Returns a list of handles to all of the items in the array, fetched
+        in a single call.
+        '''
+        return self.xelib_run('get_elements', ex=False)
+
+    def iter_items(self, handles):
+        '''
+        Produces the value (or the object, for non-value items) of each of the
+        array items with the given handles.
+
+        Since array items all share the same definition, only the first item
+        is fully objectified to find out what kind of item the array holds.
+        For value and reference arrays (e.g. `KWDA`), the values of the
+        remaining items are then read straight from their handles, which are
+        released as soon as their value has been read; only reference targets
+        get objectified. Handles not yet reached when the iteration is
+        abandoned are released as well.
+
+        @param handles: a list of handles to items of this array
+        '''
+        read = None
+        position = 0
+        try:
+            while position < len(handles):
+                handle = handles[position]
+                position += 1
+
+                if position == 1:
+                    first = self.objectify(handle)
+                    read = self.value_reader_for(first)
+                    yield first.value if read else first
+                elif read:
+                    value = read(handle)
+                    self.release_item_handle(handle)
+                    yield value
+                else:
+                    yield self.objectify(handle)
+        finally:
+            for handle in handles[position:]:
+                self.release_item_handle(handle)
+
+    def value_reader_for(self, item):
+        '''
+        Returns a function that reads the value of an array item straight from
+        its handle, for items of the same kind as the given item object; or
+        None if items of that kind are not values.
+
+        @param item: an array item object
+        '''
+        xelib = self.xelib
+        if item.type == item.Types.Ref:
+            def read(handle):
+                referenced = xelib.get_links_to(handle, ex=False)
+                return self.objectify(referenced) if referenced else None
+            return read
+        elif item.type == item.Types.Value:
+            if item.def_type in (item.DefTypes.String, item.DefTypes.LString):
+                return xelib.get_value
+            elif item.def_type == item.DefTypes.Integer:
+                return xelib.get_int_value
+            elif item.def_type == item.DefTypes.Float:
+                return xelib.get_float_value
+            else:
+                # let the object work out (or fail to work out) the value
+                return lambda handle: self.objectify(handle).value
+
+    def release_item_handle(self, handle):
+        '''
+        Releases the handle of an array item that we are done with, unless an
+        object has taken it over.
         '''
-        for index in range(len(self)):
-            yield self[index]
+        if not self.xelib.is_handle_watched(handle):
+            self.xelib.defer_release_handle(handle)
 
     def get_object_at_index(self, index):
         '''
@@ -60,7 +150,7 @@ class XEditArray(XEditGenericObject):
         values)
 
         Should support negative indexing, and raise IndexError just like a
-        normal __getitem__ would. Probably no need to implement slicing syntax.
+        normal __getitem__ would. Slicing is handled by __getitem__ itself.
         '''
         len_ = len(self)
 
@@ -83,8 +173,16 @@ class XEditArray(XEditGenericObject):
         __iter__ that strictly works with array item objects (instead of
         possibly their values)
         '''
-        for index in range(len(self)):
-            yield self.get_object_at_index(index)
+        handles = self.item_handles
+        position = 0
+        try:
+            while position < len(handles):
+                handle = handles[position]
+                position += 1
+                yield self.objectify(handle)
+        finally:
+            for handle in handles[position:]:
+                self.release_item_handle(handle)
 
     def index(self, item, obj=False):
         '''
@@ -176,4 +274,5 @@ class XEditArray(XEditGenericObject):
             raise XEditError(f'Attempted to move array item {sub_object} '
                                 f'within array {self} of which it does not '
                                 f'belong in')
+        sub_object.forget_identity()
         return self.xelib.move_array_item(sub_object.handle, to_index)
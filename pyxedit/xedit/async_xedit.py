@@ -0,0 +1,181 @@
+from contextlib import asynccontextmanager
+from inspect import getattr_static, isfunction
+import operator
+import types
+
+from pyxedit.xedit.base import XEditBase
+from pyxedit.xedit.xedit import XEdit
+from pyxedit.xelib.async_xelib import AsyncXelib, DllThread
+
+
+def call_and_collect(function, *args, **kwargs):
+    '''
+    Calls the function, running the generator it returns (if any) to
+    completion; this way generators of xedit objects (e.g. `descendants`)
+    are iterated on the DLL thread, rather than wherever they are consumed.
+    '''
+    result = function(*args, **kwargs)
+    if isinstance(result, types.GeneratorType):
+        result = list(result)
+    return result
+
+
+class AsyncProxy:
+    '''
+    Stands in for an xedit object on an event loop, running everything done
+    with the object on the ``DllThread`` of its session:
+        - methods become coroutine methods of the same name and arguments
+        - any other attribute (properties, xedit attributes) becomes an
+          awaitable of its value
+        - indexing becomes an awaitable of the indexed object
+        - iterating is done with the `collect` coroutine method
+        - attributes are set with the `set` coroutine method
+
+    See example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        armor = await plugin['ARMO\\\\[0]']
+        rating = await armor.armor_rating
+        await armor.set('armor_rating', rating + 10)
+        keywords = await (await armor.keywords).collect()
+
+    Results that are xedit objects come back proxied, and so do lists of
+    them; generators are run to completion on the DLL thread and come back as
+    lists. Anything else (e.g. using one of the object's context managers) can
+    be done with `run`.
+    '''
+    __slots__ = ('_dll_thread', '_target')
+
+    def __init__(self, dll_thread, target):
+        '''
+        @param dll_thread: the thread owning the session of the object
+        @param target: the xedit object to stand in for; it must only ever be
+                       used from the DLL thread
+        '''
+        self._dll_thread = dll_thread
+        self._target = target
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} of '
+                f'{self._target.__class__.__name__} {self._target.handle}>')
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attribute = getattr_static(self._target, name)
+        if isfunction(attribute) or isinstance(attribute, (classmethod,
+                                                           staticmethod)):
+            method = getattr(self._target, name)
+
+            async def call(*args, **kwargs):
+                return await self._submit(method, *args, **kwargs)
+
+            call.__name__ = name
+            call.__doc__ = method.__doc__
+            return call
+        return self._submit(getattr, self._target, name)
+
+    def __getitem__(self, path):
+        return self._submit(operator.getitem, self._target, path)
+
+    def __iter__(self):
+        # without this, iteration would fall back on __getitem__
+        raise TypeError(f'{self.__class__.__name__} objects cannot be '
+                        f'iterated over; use `await proxy.collect()`')
+
+    async def collect(self):
+        '''
+        Iterates over the object on the DLL thread.
+
+        @return: the list of items of the object, proxied
+        '''
+        return await self._submit(list, self._target)
+
+    async def set(self, name, value):
+        '''
+        Sets an attribute of the object.
+        '''
+        await self._dll_thread.submit(setattr, self._target, name, value)
+
+    async def run(self, function, *args, **kwargs):
+        '''
+        Runs ``function(obj, *args, **kwargs)`` with the xedit object as a
+        single call on the DLL thread.
+
+        @return: the result of the function, proxied like other results
+        '''
+        return await self._submit(function, self._target, *args, **kwargs)
+
+    async def _submit(self, function, *args, **kwargs):
+        result = await self._dll_thread.submit(call_and_collect,
+                                               function,
+                                               *args,
+                                               **kwargs)
+        return self._proxy(result)
+
+    def _proxy(self, result):
+        if isinstance(result, XEditBase):
+            return AsyncProxy(self._dll_thread, result)
+        if isinstance(result, (list, tuple)):
+            return [self._proxy(item) for item in result]
+        return result
+
+
+class AsyncXEdit(AsyncProxy):
+    '''
+    An asyncio facade over an xedit session, for serving concurrent requests
+    over a single loaded session. It stands in for the ``XEdit`` object the
+    way ``AsyncProxy`` does for any xedit object, and `xelib` gives the
+    ``AsyncXelib`` of the session. See example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        async with AsyncXEdit(plugins=['GOT.esp']).session() as xedit:
+            plugin = (await xedit.plugins)[-1]
+            jon = await plugin['NPC_\\\\JonSnow']
+            name = await jon.name
+    '''
+    __slots__ = ('xelib',)
+
+    def __init__(self,
+                 xedit=None,
+                 batch_size=DllThread.DEFAULT_BATCH_SIZE,
+                 max_latency=DllThread.DEFAULT_MAX_LATENCY,
+                 **kwargs):
+        '''
+        @param xedit: the ``XEdit`` session to run; by default, a new
+                      ``XEdit`` is created from the remaining keyword
+                      arguments
+        @param batch_size: the most queued calls to run as a single batch;
+                           see ``DllThread``
+        @param max_latency: the most seconds a batch holds on to the outcomes
+                            of its calls; see ``DllThread``
+        '''
+        xedit = xedit if xedit is not None else XEdit(**kwargs)
+        self.xelib = AsyncXelib(xedit.xelib,
+                                batch_size=batch_size,
+                                max_latency=max_latency)
+        super().__init__(self.xelib.dll_thread, xedit)
+
+    async def start_session(self, load_plugins=True, progress=None,
+                            timeout=None):
+        await self.xelib.start_session(load_plugins=load_plugins,
+                                       progress=progress,
+                                       timeout=timeout)
+
+    async def end_session(self):
+        await self.xelib.end_session()
+
+    @asynccontextmanager
+    async def session(self, load_plugins=True, progress=None, timeout=None):
+        '''
+        Asynchronous context manager for an xedit session; see
+        ``XEdit.session``.
+        '''
+        async with self.xelib.session(load_plugins=load_plugins,
+                                      progress=progress,
+                                      timeout=timeout):
+            yield self
@@ -51,7 +51,9 @@ class XEditAttribute:
             if self.object_class:
                 value.auto_release = False
                 value = self.object_class.from_xedit_object(
-                                                value.handle, value)
+                                                value.handle,
+                                                value,
+                                                metadata=value.metadata)
 
         # return the value
         return value
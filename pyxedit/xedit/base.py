@@ -1,20 +1,84 @@
-from cached_property import cached_property
 from contextlib import contextmanager
 from pathlib import Path
 
 from pyxedit.xelib import Xelib
-from pyxedit.xedit.misc import XEditError, XEditTypes
+from pyxedit.xedit.misc import XEditError, XEditTypes, slot_cached_property
 
 
 class XEditBase:
+    # xedit objects can exist in very large numbers (e.g. when walking the
+    # descendants of a worldspace), so they are kept compact with __slots__;
+    # subclasses should declare `__slots__ = ()` unless they need more
+    # attributes. The underscore-prefixed metadata slots hold the cached
+    # values of the slot_cached_property properties of the same name.
+    __slots__ = ('handle',
+                 '_handle_layer',
+                 '_xelib',
+                 '_finalizer',
+                 '_element_type',
+                 '_def_type',
+                 '_smash_type',
+                 '_value_type',
+                 '_type',
+                 '_is_ref',
+                 '_is_flags',
+                 '_signature',
+                 '_signature_name',
+                 '_identity',
+                 '__weakref__')
+
     SIGNATURE = None
     Types = XEditTypes
     ElementTypes = Xelib.ElementTypes
     DefTypes = Xelib.DefTypes
     SmashTypes = Xelib.SmashTypes
     ValueTypes = Xelib.ValueTypes
+    Extractors = Xelib.Extractors
     GameModes = Xelib.GameModes
 
+    # registry of object classes, keyed by the signature they describe; see
+    # `register_object_class`
+    object_classes = {}
+    _core_object_classes = None
+
+    # the cached properties describing the element a handle points to; these
+    # can be carried over when a handle gets re-wrapped by another class
+    # (each is cached in the slot of the same name with a leading underscore)
+    METADATA_FIELDS = ('element_type',
+                       'def_type',
+                       'smash_type',
+                       'value_type',
+                       'type',
+                       'is_ref',
+                       'is_flags',
+                       'signature',
+                       'signature_name',
+                       'identity')
+
+    def __init_subclass__(cls, **kwargs):
+        '''
+        Registers every subclass that has a signature as the object class for
+        that signature.
+        '''
+        super().__init_subclass__(**kwargs)
+        if cls.SIGNATURE:
+            cls.register_object_class(cls)
+
+    @staticmethod
+    def register_object_class(object_class, signature=None):
+        '''
+        Registers the given class as the object class to use for elements of
+        the given signature (defaults to the class's SIGNATURE). A later
+        registration for the same signature replaces an earlier one, so
+        subclassing an object class is enough to have the subclass used in
+        its place.
+
+        @param object_class: the XEditBase-derived class to register
+        @param signature: the signature to register the class under
+        '''
+        XEditBase.object_classes[signature or object_class.SIGNATURE] = (
+            object_class)
+
     # initializer
     def __init__(self, xelib, handle, handle_layer, auto_release=True):
         '''
@@ -34,6 +98,9 @@ class XEditBase:
         # gateway to the xelib API that lets us do just about everything.
         self._xelib = xelib
 
+        # the finalizer that releases the handle, see `auto_release`
+        self._finalizer = None
+
         # if this is set to True (and it should be set to True most of the
         # time), then it enables the handle to be automatically released
         # whenever this object goes out of scope.
@@ -47,14 +114,28 @@ class XEditBase:
         self.auto_release = auto_release
 
     # finalizer
-    def __del__(self):
+    @property
+    def auto_release(self):
         '''
-        Finalizer. It should release the handle and remove the handle from
-        any tracked handle groups (this is what Xelib.release_handle does).
-        Respects an auto-release switch that can be used to disable it.
+        Whether the handle will be automatically released when this object
+        gets garbage collected.
+
+        The release is done by a weakref-based finalizer (see
+        ``Xelib.watch_handle``), which hands the handle over to
+        ``Xelib.defer_release_handle``. The handle is then immediately
+        considered released by the handle management stack, but the actual
+        release call into xedit-lib is batched together with other released
+        handles. The finalizer does not run at interpreter shutdown, by which
+        point the session is gone anyway.
         '''
-        if self.auto_release:
-            self._xelib.release_handle(self.handle)
+        return self._finalizer is not None and self._finalizer.alive
+
+    @auto_release.setter
+    def auto_release(self, value):
+        if value and not self.auto_release:
+            self._finalizer = self._xelib.watch_handle(self, self.handle)
+        elif not value and self._finalizer is not None:
+            self._finalizer.detach()
 
     # xelib-related methods
     @property
@@ -93,23 +174,32 @@ class XEditBase:
         '''
         Implements hashing behavior.
 
-        The uniqueness of an xedit object is based on its path, which should
-        be composed of at least the plugin file it comes from, the record it
-        belongs to, and the subpath within the record. This seems to be
-        sufficient to uniquely identify any xedit object.
+        The uniqueness of an xedit object is based on its identity key (see
+        the `identity` property), which is computed once and then cached on
+        the object, so hashing the same object again costs no DLL calls.
 
         Having xedit objects being both hashable and with __eq__ defined,
         should allow it to be used as keys of dictionaries and added to sets.
         '''
-        return hash(self.path)
+        return hash(self.identity)
 
     def __eq__(self, other):
         '''
         Implements equality behavior (`==` operator)
 
-        Two xedit objects are equal if xelib.element_equals on the two handles
-        return true.
-        '''
+        Two xedit objects are equal if they point to the same element. Objects
+        wrapping the same handle are trivially equal; otherwise the identity
+        keys of the two objects are compared, falling back to
+        xelib.element_equals on the two handles for elements without a usable
+        identity key.
+        '''
+        if not isinstance(other, XEditBase):
+            return NotImplemented
+        if self.handle == other.handle:
+            return True
+        identity, other_identity = self.identity, other.identity
+        if identity and other_identity:
+            return identity == other_identity
         return self.xelib_run('element_equals', other.handle)
 
     def __getitem__(self, path):
@@ -130,7 +220,7 @@ class XEditBase:
         will be released on exiting the context.
 
         NOTE: usage of this is now deprecated since the handle management
-              based on __del__ seems to be working very well
+              based on finalizers seems to be working very well
         '''
         with self.xelib.manage_handles():
             yield self
@@ -148,28 +238,28 @@ class XEditBase:
 
     # basic type properties, these should be safely accessible and return
     # a falsey value if inapplicable
-    @cached_property
+    @slot_cached_property
     def element_type(self):
         '''
         Returns the element type
         '''
         return self.xelib_run('element_type', ex=False)
 
-    @cached_property
+    @slot_cached_property
     def def_type(self):
         '''
         Returns the def type
         '''
         return self.xelib_run('def_type', ex=False)
 
-    @cached_property
+    @slot_cached_property
     def smash_type(self):
         '''
         Returns the smash type
         '''
         return self.xelib_run('smash_type', ex=False)
 
-    @cached_property
+    @slot_cached_property
     def value_type(self):
         '''
         Returns the value type. A value type is invalid for File, Group, and
@@ -181,7 +271,7 @@ class XEditBase:
                 self.ElementTypes.MainRecord):
             return self.xelib_run('value_type')
 
-    @cached_property
+    @slot_cached_property
     def type(self):
         '''
         Resolve an XEditType value for this element based on the various
@@ -204,7 +294,7 @@ class XEditBase:
         else:
             return self.Types.Container
 
-    @cached_property
+    @slot_cached_property
     def is_ref(self):
         '''
         Returns whether element is a reference type
@@ -242,78 +332,180 @@ class XEditBase:
         '''
         return self.xelib_run('is_sorted')
 
-    @cached_property
+    @slot_cached_property
     def is_flags(self):
         '''
         Returns whether element is a flag element containing flags
         '''
         return self.value_type == self.ValueTypes.Flags
 
-    def objectify(self, handle):
+    @slot_cached_property
+    def identity(self):
+        '''
+        Returns a key that identifies the element this object points to,
+        independently of the handle used to get to it. This is the element's
+        short path: the file name and load order FormID for records (e.g.
+        `Skyrim.esm\\00012E46`), and the path from the record down for
+        subelements (e.g. `Skyrim.esm\\00012E46\\KWDA\\[1]`).
+
+        The key is computed once and cached, since this is what hashing and
+        equality are based on. Operations through this object that change
+        the path of an element (e.g. moving array items, renaming plugins)
+        discard the cached key; see `forget_identity`.
+        '''
+        return self.xelib_run('path', ex=False)
+
+    def forget_identity(self):
+        '''
+        Discards the cached identity key, so that it gets computed anew on
+        next access; this is needed after the element's path changes.
+        '''
+        try:
+            del self._identity
+        except AttributeError:
+            pass
+
+    @property
+    def metadata(self):
+        '''
+        Returns a dictionary of whichever of the METADATA_FIELDS properties
+        have already been computed (and cached) on this object. These only
+        depend on the element the handle points to, so they can be handed
+        over to another object wrapping the same handle.
+        '''
+        metadata = {}
+        for name in self.METADATA_FIELDS:
+            try:
+                metadata[name] = getattr(self, f'_{name}')
+            except AttributeError:
+                pass
+        return metadata
+
+    def objectify(self, handle, metadata=None):
         '''
         Given a handle, create an appropriate object to wrap around the handle.
 
         During initialization, we run a staticmethod stored on the class to
-        explicitly import all possible object classes. We then choose the
-        object class to use depending on the def type, the value type, and
-        the signature of the handle. Any xedit object will be able to call
-        this method to create objects of any appropriate xedit subclass to
-        match for a given handle.
+        explicitly import all possible object classes, each of which registers
+        itself under its signature. We then choose the object class to use
+        depending on the element type, the value type, and the signature of
+        the handle (see ``object_class_for``). Any xedit object will be able
+        to call this method to create objects of any appropriate xedit
+        subclass to match for a given handle.
 
         @param handle: a xelib handle
+        @param metadata: any element metadata already known for the handle
+                         (see ``object_class_for``)
         @return: an object of some class derived from this base class, that
                  wraps around the handle
         '''
-        # import the following at runtime; they are only needed at method
-        # runtime, and putting these imports at the top of this module would
-        # result in circular imports
-        from pyxedit.xedit.array import XEditArray
-        from pyxedit.xedit.flags import XEditFlags
-        from pyxedit.xedit.generic import XEditGenericObject
-        from pyxedit.xedit.plugin import XEditPlugin
-
-        # first create a generic object out of it so we can easily inspect it;
-        # this object may not be the final produced object, so make sure it does
-        # not enable auto-release until we're sure it is the final produced
-        # object
-        generic_obj = XEditGenericObject.from_xedit_object(
-                                              handle, self, auto_release=False)
-
-        # if object is flags, use the XEditFlags class
-        if generic_obj.is_flags:
-            return XEditFlags.from_xedit_object(handle, self)
-
-        # if object is a plugin, use the XEditPlugin class
-        if generic_obj.element_type == self.ElementTypes.File:
-            return XEditPlugin.from_xedit_object(handle, self)
-
-        # if object is a top-level group, use the generic class as-is, since
-        # it's going to have a signature that is same as the records in the
-        # group, but won't have anything of substance
-        if generic_obj.element_type == self.ElementTypes.GroupRecord:
-            generic_obj.auto_release = True
-            return generic_obj
-
-        # if object is an array or subrecord array, use the collection class
-        if generic_obj.element_type in (self.ElementTypes.Array,
-                                        self.ElementTypes.SubRecordArray):
-            return XEditArray.from_xedit_object(handle, self)
-
-        # if object is a subrecord with array value type, use collection class
-        if (generic_obj.element_type == self.ElementTypes.SubRecord and
-                generic_obj.value_type == self.ValueTypes.Array):
-            return XEditArray.from_xedit_object(handle, self)
-
-        # otherwise, see if we can find a subclass of XEditBase
-        # corresponding to the signature; if so, use the subclass to make
-        # the object, otherwise just use the generic object
-        if generic_obj.signature:
-            for subclass in XEditBase.get_imported_subclasses():
-                if subclass.SIGNATURE == generic_obj.signature:
-                    return subclass.from_xedit_object(handle, self)
-
-        generic_obj.auto_release = True
-        return generic_obj
+        object_class, metadata = self.object_class_for(self.xelib,
+                                                       handle,
+                                                       metadata=metadata)
+        return object_class.from_xedit_object(handle, self, metadata=metadata)
+
+    @classmethod
+    def object_class_for(cls, xelib, handle, metadata=None):
+        '''
+        Decides which xedit class should be used to wrap around the given
+        handle.
+
+        The element type is fetched first, since it alone decides the class
+        for plugins and groups. The signature is then only fetched for
+        elements that can map to a registered object class, and the value
+        type only for elements that can be flags or arrays; no element ever
+        needs both. Anything already present in the given metadata is not
+        fetched again.
+
+        The metadata fetched along the way is returned together with the
+        class, so that the object created to wrap the handle does not have to
+        fetch it again.
+
+        @param xelib: the xelib session the handle belongs to
+        @param handle: a xelib handle
+        @param metadata: a dictionary of any element metadata already known
+                         for the handle
+        @return: a tuple of the XEditBase-derived class to wrap the handle
+                 with, and a dictionary of the element metadata known
+        '''
+        (XEditArray,
+         XEditFlags,
+         XEditGenericObject,
+         XEditPlugin) = cls.core_object_classes()
+        ElementTypes = cls.ElementTypes
+        metadata = dict(metadata) if metadata else {}
+
+        def fetch(field):
+            if field not in metadata:
+                metadata[field] = getattr(xelib, field)(handle, ex=False)
+            return metadata[field]
+
+        element_type = fetch('element_type')
+
+        # plugins use the XEditPlugin class; a top-level group uses the
+        # generic class as-is, since it's going to have a signature that is
+        # same as the records in the group, but won't have anything of
+        # substance. Neither of these, nor records, have a value type
+        if element_type == ElementTypes.File:
+            metadata['value_type'] = None
+            return XEditPlugin, metadata
+        if element_type == ElementTypes.GroupRecord:
+            metadata['value_type'] = None
+            return XEditGenericObject, metadata
+
+        # records use the object class registered for their signature if any
+        if element_type == ElementTypes.MainRecord:
+            metadata['value_type'] = None
+            return (cls.object_classes.get(fetch('signature'),
+                                           XEditGenericObject),
+                    metadata)
+
+        # flags use the XEditFlags class
+        value_type = fetch('value_type')
+        if value_type == cls.ValueTypes.Flags:
+            return XEditFlags, metadata
+
+        # arrays, subrecord arrays, and subrecords with array value type use
+        # the collection class
+        if (element_type in (ElementTypes.Array,
+                             ElementTypes.SubRecordArray) or
+                (element_type == ElementTypes.SubRecord and
+                 value_type == cls.ValueTypes.Array)):
+            return XEditArray, metadata
+
+        # other subrecords may also have an object class registered for their
+        # signature (e.g. OBND)
+        if element_type in (ElementTypes.SubRecord,
+                            ElementTypes.SubRecordStruct,
+                            ElementTypes.SubRecordUnion):
+            return (cls.object_classes.get(fetch('signature'),
+                                           XEditGenericObject),
+                    metadata)
+
+        return XEditGenericObject, metadata
+
+    @staticmethod
+    def core_object_classes():
+        '''
+        Returns the core xedit classes that ``object_class_for`` chooses
+        between, as a tuple of (XEditArray, XEditFlags, XEditGenericObject,
+        XEditPlugin).
+
+        These are imported at runtime; putting these imports at the top of
+        this module would result in circular imports. The result is cached on
+        the class after the first call, since this is on the hot path of
+        every objectify.
+        '''
+        if XEditBase._core_object_classes is None:
+            from pyxedit.xedit.array import XEditArray
+            from pyxedit.xedit.flags import XEditFlags
+            from pyxedit.xedit.generic import XEditGenericObject
+            from pyxedit.xedit.plugin import XEditPlugin
+            XEditBase._core_object_classes = (XEditArray,
+                                              XEditFlags,
+                                              XEditGenericObject,
+                                              XEditPlugin)
+        return XEditBase._core_object_classes
 
     def get(self, path, default=None, ex=False, absolute=False):
         '''
@@ -437,7 +629,7 @@ class XEditBase:
         '''
         return self.xelib_run('local_path', ex=False)
 
-    @cached_property
+    @slot_cached_property
     def signature(self):
         '''
         Returns the element signature
@@ -455,7 +647,7 @@ class XEditBase:
         else:
             return None
 
-    @cached_property
+    @slot_cached_property
     def signature_name(self):
         '''
         Returns any known human-readable name for the element's signature
@@ -524,15 +716,75 @@ class XEditBase:
         '''
         Produces objects underneath this element
         '''
-        if self.num_child_elements:
-            for child in self.child_elements:
-                yield child
-                yield from child.descendants(iter_groups=iter_groups)
-
-        if iter_groups and self.has_child_group:
-            child = self.child_group
-            yield child
-            yield from child.descendants(iter_groups=iter_groups)
+        return iter(self.walk(iter_groups=iter_groups))
+
+    def walk(self,
+             iter_groups=False,
+             max_depth=None,
+             prune_signatures=None,
+             prune_element_types=None,
+             prune=None,
+             raw=False,
+             with_metadata=False):
+        '''
+        Walks the elements underneath this element depth-first, yielding
+        objects (or raw handles) for each of them; see ``XEditWalker``.
+
+        @param iter_groups: whether to also walk into the child groups of
+                            records (e.g. the contents of a CELL or WRLD)
+        @param max_depth: if given, how many levels below this element to walk
+        @param prune_signatures: signatures of elements to skip together with
+                                 their subtrees
+        @param prune_element_types: element types of elements to skip together
+                                    with their subtrees
+        @param prune: a callable taking a handle and a dictionary of its
+                      metadata, returning True to skip the element together
+                      with its subtree
+        @param raw: if True, yield handles instead of objects; each handle is
+                    released once its subtree has been walked, unless it has
+                    been wrapped with `objectify` by then
+        @param with_metadata: in raw mode, if True, yield (handle, metadata)
+                              pairs, the metadata holding at least the
+                              `element_type` of the element
+        @return: an iterable over the elements underneath this element
+        '''
+        from pyxedit.xedit.walker import XEditWalker
+        return XEditWalker(self,
+                           iter_groups=iter_groups,
+                           max_depth=max_depth,
+                           prune_signatures=prune_signatures,
+                           prune_element_types=prune_element_types,
+                           prune=prune,
+                           raw=raw,
+                           with_metadata=with_metadata)
+
+    def reference_elements(self, iter_groups=False):
+        '''
+        Produces a tuple of (handle, metadata) for each descendant element
+        that has a reference value type, without objectifying anything. The
+        handles are only valid until the next item is produced, unless
+        wrapped with `objectify`, which the metadata can be handed to.
+        '''
+        xelib = self.xelib
+        ElementTypes = self.ElementTypes
+        for handle, metadata in self.walk(iter_groups=iter_groups,
+                                          raw=True,
+                                          with_metadata=True):
+            # a reference is an integer value with a reference value type;
+            # files, groups and records have no value type
+            element_type = metadata['element_type']
+            if element_type in (ElementTypes.File,
+                                ElementTypes.GroupRecord,
+                                ElementTypes.MainRecord):
+                continue
+            def_type = xelib.def_type(handle, ex=False)
+            if def_type != self.DefTypes.Integer:
+                continue
+            value_type = xelib.value_type(handle, ex=False)
+            if value_type == self.ValueTypes.Reference:
+                yield handle, {'element_type': element_type,
+                               'def_type': def_type,
+                               'value_type': value_type}
 
     @property
     def parent(self):
@@ -553,10 +805,10 @@ class XEditBase:
         Produces all descendent elements of the current element that have
         reference value types.
         '''
-        for descendant in self.descendants():
-            if (descendant.is_ref and not
-                    descendant.long_path.endswith('Record Header\\FormID')):
-                yield descendant
+        for handle, metadata in self.reference_elements():
+            if not self.xelib.long_path(handle, ex=False).endswith(
+                    'Record Header\\FormID'):
+                yield self.objectify(handle, metadata=metadata)
 
     @property
     def ls(self):
@@ -580,7 +832,11 @@ class XEditBase:
             yield subclass
 
     @classmethod
-    def from_xedit_object(cls, handle, xedit_obj, auto_release=True):
+    def from_xedit_object(cls,
+                          handle,
+                          xedit_obj,
+                          auto_release=True,
+                          metadata=None):
         '''
         Create an object of this class from another xedit object. This is the
         primary method in which new xedit objects are instantiated, which means
@@ -597,16 +853,23 @@ class XEditBase:
         @param xedit_obj: the xedit object to create the new object "off" of;
                           a handle to the xelib context can be "inherited" from
                           it.
+        @param metadata: any already known metadata of the element the handle
+                         points to (see the `metadata` property), which the
+                         new object will then not have to query again
         '''
-        if not handle or handle not in xedit_obj._xelib._current_handles:
+        if not handle or handle not in xedit_obj._xelib.current_handles:
             raise XEditError(f'Attempting to create XEdit object from invalid '
                              f'handle {handle} with respect to source object '
                              f'{xedit_obj}; handle not managed by the current '
                              f'manage_handles context of the object')
-        return cls(xedit_obj.xelib,
-                   handle,
-                   xedit_obj._xelib._current_handles,
-                   auto_release=auto_release)
+        obj = cls(xedit_obj.xelib,
+                  handle,
+                  xedit_obj._xelib.current_handles,
+                  auto_release=auto_release)
+        if metadata:
+            for name, value in metadata.items():
+                setattr(obj, f'_{name}', value)
+        return obj
 
     @staticmethod
     def import_all_object_classes():
@@ -614,7 +877,8 @@ class XEditBase:
         A staticmethod that simply imports all object classes into the python
         namespace. When xelib handles are objectified into xedit objects,
         one of the below object classes might be used, and thus must be
-        imported onto the namespace prior.
+        imported onto the namespace prior; importing an object class is what
+        registers it under its signature.
         '''
         from pyxedit.xedit.object_classes.ACHR import XEditActor  # NOQA
         from pyxedit.xedit.object_classes.ARMA import XEditArmature  # NOQA
@@ -5,6 +5,8 @@ class XEditFlags(XEditGenericObject):
     '''
     Used for flag types
     '''
+    __slots__ = ()
+
     # dictionary-like functionality
     def __getitem__(self, key):
         return self.get_flag(key)
@@ -1,9 +1,14 @@
+from collections.abc import Mapping
+from inspect import getattr_static
+
 from pyxedit.xedit.attribute import XEditAttribute
 from pyxedit.xedit.base import XEditBase
 from pyxedit.xedit.misc import XEditError
 
 
 class XEditGenericObject(XEditBase):
+    __slots__ = ()
+
     def __repr__(self):
         return (f'<{self.__class__.__name__} '
                 f'{self.signature or "----"} '
@@ -230,15 +235,76 @@ class XEditGenericObject(XEditBase):
                                              target_plugin.handle,
                                              as_new=as_new))
 
+    def get_values(self, fields, as_tuple=False, ex=False):
+        '''
+        Reads several values from under the current object in one go, with
+        a single `xelib.get_values` call, instead of a DLL round trip (and
+        an object) per field. See example:
+
+            armor.get_values({'name': 'full_name',
+                              'rating': ('DNAM', armor.Extractors.Float),
+                              'first_keyword': ('KWDA\\[0]',
+                                                armor.Extractors.FormID)})
+
+        Besides subpaths, fields can be named after the `XEditAttribute`s of
+        the object's class, in which case the attribute's path is read, and
+        its enum, if it has one, is applied to the value read.
+
+        @param fields: a dict of field specs, or an iterable of field specs,
+                       where a field spec is either a subpath/attribute name
+                       (read as a string), or a (subpath/attribute name,
+                       Extractors) pair
+        @param as_tuple: if set to True, the values are returned as a tuple
+                         in the order of the fields
+        @param ex: if set to True, failure to read any of the fields will
+                   raise an exception; otherwise such fields are read as None
+        @return: a dict of the values read, keyed by the keys of `fields`
+                 if given as a dict, or by field otherwise; or a tuple
+        '''
+        if isinstance(fields, Mapping):
+            keys, fields = zip(*fields.items()) if fields else ((), ())
+        else:
+            fields = list(fields)
+            keys = [field if isinstance(field, str) else field[0]
+                    for field in fields]
+
+        # attribute names are swapped for the paths they stand for; fields
+        # are passed on keyed by position, so that the same path can be
+        # asked for more than once
+        object_class = type(self)
+        specs = {}
+        enums = {}
+        for index, field in enumerate(fields):
+            if isinstance(field, str):
+                field = (field, self.Extractors.String)
+            path, extractor = field
+            attribute = getattr_static(object_class, path, None)
+            if isinstance(attribute, XEditAttribute):
+                path = attribute.path
+                if attribute.enum:
+                    enums[index] = attribute.enum
+            specs[index] = (path, extractor)
+
+        values = self.xelib_run('get_values', specs, as_tuple=True, ex=ex)
+        values = tuple(enums[index](value)
+                       if index in enums and value is not None else value
+                       for index, value in enumerate(values))
+        return values if as_tuple else dict(zip(keys, values))
+
     def find_text_values(self, iter_groups=False):
         '''
         Iterate over all descendants of the current node and yields any
         non-empty text values found.
         '''
-        for descendant in self.descendants(iter_groups=iter_groups):
-            if descendant.def_type in (descendant.DefTypes.String,
-                                       descendant.DefTypes.LString):
-                value = descendant.value
+        xelib = self.xelib
+        for handle, metadata in self.walk(iter_groups=iter_groups,
+                                          raw=True,
+                                          with_metadata=True):
+            # only text elements are worth objectifying
+            def_type = xelib.def_type(handle, ex=False)
+            if def_type in (self.DefTypes.String, self.DefTypes.LString):
+                metadata['def_type'] = def_type
+                value = self.objectify(handle, metadata=metadata).value
                 if value:
                     yield value
 
@@ -261,31 +327,34 @@ class XEditGenericObject(XEditBase):
         signatures = signatures or []
 
         # start by finding related objects for `self`; we may add to this
-        # list if recurse is set to True
+        # list if recurse is set to True. Records already visited are kept
+        # track of in a set of their identity keys, so that checking for them
+        # costs no DLL calls
         to_visit = [self]
+        visited = {self.identity}
 
-        for item in to_visit:
-            # iterate over item's descendants
-            for descendant in item.descendants(iter_groups=iter_groups):
+        # the plugin only needs to be looked up once
+        plugin = self.plugin if same_plugin else None
 
-                # if descendant element is not a reference, ignore
-                if descendant.type != descendant.Types.Ref:
-                    continue
+        for item in to_visit:
+            # iterate over item's reference elements
+            for handle, metadata in item.reference_elements(
+                    iter_groups=iter_groups):
 
-                # if the descendent element is the 'FormID' element, ignore
+                # if the reference element is the 'FormID' element, ignore
                 # (since all records have a 'FormID' element that just points
                 #  to itself)
-                if descendant.name == 'FormID':
+                if self.xelib.name(handle, ex=False) == 'FormID':
                     continue
 
                 # attempt to retrieve the reference target, if there's nothing
                 # there, ignore
-                ref_target = descendant.value
+                ref_target = self.objectify(handle, metadata=metadata).value
                 if not ref_target:
                     continue
 
                 # if we have already walked over this record, ignore
-                if ref_target in to_visit:
+                if ref_target.identity in visited:
                     continue
 
                 # if we specified a list of signatures, and the ref target is
@@ -295,13 +364,14 @@ class XEditGenericObject(XEditBase):
 
                 # if we specified same_plugin, and the ref target does not
                 # belong to the same plugin, ignore
-                if same_plugin and ref_target.plugin != self.plugin:
+                if same_plugin and ref_target.plugin != plugin:
                     continue
 
                 # okay, by this point the reference is a valid one we care
                 # about; if we are recursing, add it back to the visit list
                 if recurse:
                     to_visit.append(ref_target)
+                    visited.add(ref_target.identity)
 
                 # and finally, yield it to the caller
                 yield ref_target
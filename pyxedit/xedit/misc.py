@@ -12,3 +12,34 @@ class XEditError(Exception):
     Exception class to raise for xedit-related errors
     '''
     pass
+
+
+class slot_cached_property:
+    '''
+    A counterpart to `cached_property` for classes that use `__slots__` and
+    therefore have no instance `__dict__` to cache values in.
+
+    The value computed on first access is cached in the slot named after the
+    property with a leading underscore (e.g. the `element_type` property
+    caches into the `_element_type` slot), which the class must declare.
+    Deleting the slot (or never filling it) makes the property compute the
+    value again on next access.
+    '''
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+        self.slot_name = f'_{func.__name__}'
+        self.slot = None
+
+    def __set_name__(self, owner, name):
+        self.slot = getattr(owner, self.slot_name)
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return self.slot.__get__(obj, owner)
+        except AttributeError:
+            value = self.func(obj)
+            self.slot.__set__(obj, value)
+            return value
@@ -3,12 +3,14 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditActor(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'ACHR'
 
     data = XEditAttribute('DATA')
 
     position_x = XEditAttribute('DATA\\Position\\X')
-    position_y = XEditAttribute('DATA\\Position\\X')
+    position_y = XEditAttribute('DATA\\Position\\Y')
     position_z = XEditAttribute('DATA\\Position\\Z')
     rotation_x = XEditAttribute('DATA\\Rotation\\X')
     rotation_y = XEditAttribute('DATA\\Rotation\\Y')
@@ -8,7 +8,7 @@ def create_model_class(signature):
 
     # create a class
     class XEditArmatureModel(XEditGenericObject):
-        pass
+        __slots__ = ()
 
     # set up property for `MOD[n]` on the class
     attr_model = f'mod{n}'
@@ -33,6 +33,8 @@ def create_model_class(signature):
 
 
 class XEditArmature(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'ARMA'
 
     bodt = body_template_12byte = XEditAttribute('BODT')
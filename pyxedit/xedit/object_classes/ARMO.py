@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditArmor(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'ARMO'
 
     vmad = script_info = XEditAttribute('VMAD')
@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditCell(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'CELL'
 
     xclw = water_height = XEditAttribute('XCLW')
@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditFormList(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'FLST'
 
     lnam = items = XEditAttribute('LNAM')
@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditGlobalVariable(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'GLOB'
 
     fnam = type = XEditAttribute('FNAM')
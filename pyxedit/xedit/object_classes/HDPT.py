@@ -15,6 +15,8 @@ class HeadPartTypes(Enum):
 
 
 class XEditHeadPart(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'HDPT'
     HeadPartTypes = HeadPartTypes
 
@@ -2,4 +2,6 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditKeyword(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'KYWD'
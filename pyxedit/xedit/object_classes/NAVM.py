@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditNavMesh(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'NAVM'
 
     nvnm = geometry = XEditAttribute('NVNM')
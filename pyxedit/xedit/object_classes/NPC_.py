@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditNPC(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'NPC_'
 
     vmad = script_info = virtual_machine_adapter = XEditAttribute('VMAD')
@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditObjectBounds(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'OBND'
 
     x1 = XEditAttribute('X1')
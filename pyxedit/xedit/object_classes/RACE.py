@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditRace(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'RACE'
 
     wnam = skin = XEditAttribute('WNAM')
@@ -3,13 +3,15 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditReference(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'REFR'
 
     data = XEditAttribute('DATA')
     base = XEditAttribute('NAME')
 
     position_x = XEditAttribute('DATA\\Position\\X')
-    position_y = XEditAttribute('DATA\\Position\\X')
+    position_y = XEditAttribute('DATA\\Position\\Y')
     position_z = XEditAttribute('DATA\\Position\\Z')
     rotation_x = XEditAttribute('DATA\\Rotation\\X')
     rotation_y = XEditAttribute('DATA\\Rotation\\Y')
@@ -3,6 +3,8 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditTextureSet(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'TXST'
 
     obnd = XEditAttribute('OBND')
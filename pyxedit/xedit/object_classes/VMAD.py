@@ -2,4 +2,6 @@ from pyxedit.xedit.generic import XEditGenericObject
 
 
 class XEditVirtualMachineAdapter(XEditGenericObject):
+    __slots__ = ()
+
     SIGNATURE = 'VMAD'
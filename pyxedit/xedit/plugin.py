@@ -1,7 +1,10 @@
 from pyxedit.xedit.base import XEditBase
+from pyxedit.xedit.records import XEditRecordStream
 
 
 class XEditPlugin(XEditBase):
+    __slots__ = ()
+
     def __repr__(self):
         return (f'<{self.__class__.__name__} {self.name} {self.handle}>')
 
@@ -61,6 +64,21 @@ class XEditPlugin(XEditBase):
     def header(self):
         return self.objectify(self.xelib_run('get_file_header'))
 
+    def records(self, signature=None, include_overrides=False):
+        '''
+        Streams the records of the plugin, fetching their handles a group at a
+        time; see `XEditRecordStream`.
+
+        @param signature: a signature, or a list of signatures, to only stream
+                          the records of
+        @param include_overrides: whether to include records that override
+                                  records of master plugins
+        @return: an iterable over the records of the plugin
+        '''
+        return XEditRecordStream(self,
+                                 signature=signature,
+                                 include_overrides=include_overrides)
+
     @property
     def masters(self):
         for handle in self.xelib_run('get_masters'):
@@ -91,6 +109,7 @@ class XEditPlugin(XEditBase):
         return self.xelib_run('clean_masters')
 
     def rename(self, new_file_name):
+        self.forget_identity()
         return self.xelib_run('rename_file', new_file_name)
 
     def nuke(self):
@@ -0,0 +1,225 @@
+from pyxedit.tes4.format import CHILD_SIGNATURES
+from pyxedit.xelib import Xelib
+
+
+class XEditRecordStream:
+    '''
+    Streams the records of a plugin, or of every plugin in the load order,
+    as xedit objects.
+
+    Rather than fetching the handles of all records in one go, which for a
+    master like `Skyrim.esm` means hundreds of thousands of handles held at
+    once, handles are fetched a chunk at a time: one top-level group per
+    `get_records` call, except for the groups holding records in child
+    groups, which are split further (see `SPLIT_DEPTHS`): the interior cells
+    of `CELL` by block, the exterior cells of `WRLD` by sub-block, and `DIAL`
+    by topic. Those groups are only searched when the records streamed may be
+    in them. Records are only objectified as they are yielded, with the yielded
+    objects owning their handles from then on, so that the handles of
+    consumed records get released as soon as the caller drops them. Handles
+    of a chunk that were never yielded (e.g. on a `break`) are released when
+    the stream is abandoned.
+    '''
+    # top-level groups that hold records of other signatures in the child
+    # groups of their records, and the signatures of those records
+    CHILD_SIGNATURES = CHILD_SIGNATURES
+
+    # how many levels down the groups holding records in child groups are
+    # split, the child group of a record counting as a level: CELL into
+    # blocks; WRLD into worldspaces, then blocks, then sub-blocks; DIAL into
+    # topics
+    SPLIT_DEPTHS = {'CELL': 1, 'WRLD': 3, 'DIAL': 1}
+
+    def __init__(self, source, signature=None, include_overrides=False):
+        '''
+        @param source: the xedit plugin to stream the records of, or the root
+                       xedit object to stream the records of every plugin
+        @param signature: a signature, a comma-separated string of signatures
+                          or a list of signatures to stream the records of;
+                          by default, records of any signature are streamed
+        @param include_overrides: whether to include records that override
+                                  records of master plugins
+        '''
+        self.source = source
+        self.xelib = source.xelib
+        if isinstance(signature, str):
+            signature = signature.split(',') if signature else None
+        self.signatures = set(signature) if signature else None
+        self.include_overrides = include_overrides
+
+    def __iter__(self):
+        source = self.source
+        element_type = Xelib.ElementTypes.MainRecord
+        for handles in self.chunks():
+            consumed = 0
+            try:
+                for handle in handles:
+                    obj = source.objectify(
+                              handle, metadata={'element_type': element_type})
+                    consumed += 1
+                    yield obj
+            finally:
+                # a stream abandoned halfway through a chunk leaves the rest
+                # of the chunk unyielded
+                for handle in handles[consumed:]:
+                    self.release(handle)
+
+    def chunks(self):
+        '''
+        Produces the handles of the streamed records, a list per chunk.
+        '''
+        xelib = self.xelib
+        search = ','.join(sorted(self.signatures)) if self.signatures else ''
+        for group in self.groups():
+            if isinstance(group, list):
+                # records gathered while splitting a group
+                yield group
+                continue
+            try:
+                yield xelib.get_records(group,
+                                        search,
+                                        self.include_overrides,
+                                        ex=False)
+            finally:
+                self.release(group)
+
+    def groups(self):
+        '''
+        Produces handles to the groups to fetch records from, or lists of the
+        handles of records already gathered, one per chunk.
+        '''
+        for plugin in self.plugins():
+            try:
+                yield from self.plugin_groups(plugin)
+            finally:
+                if plugin != self.source.handle:
+                    self.release(plugin)
+
+    def plugins(self):
+        '''
+        Produces the handles of the plugins whose records are streamed.
+        '''
+        if self.source.handle:
+            yield self.source.handle
+            return
+
+        xelib = self.xelib
+        for index in range(int(xelib.get_global('FileCount'))):
+            yield xelib.file_by_index(index)
+
+    def plugin_groups(self, plugin):
+        '''
+        Produces handles to the groups of the given plugin to fetch records
+        from, or lists of the handles of records; see `groups`.
+        '''
+        pending = self.xelib.get_elements(plugin, ex=False)
+        try:
+            while pending:
+                handle = pending.pop(0)
+                signature = self.group_signature(handle)
+                if not self.is_searched(signature):
+                    self.release(handle)
+                elif signature in self.SPLIT_DEPTHS:
+                    yield from self.split_group(
+                        handle,
+                        self.SPLIT_DEPTHS[signature],
+                        self.are_children_searched(signature))
+                else:
+                    yield handle
+        finally:
+            for handle in pending:
+                self.release(handle)
+
+    def split_group(self, group, depth, children_searched):
+        '''
+        Produces the chunks of a group split the given number of levels down,
+        in file order: the groups that deep, to fetch records from, and lists
+        of the streamed records met on the way (e.g. the worldspaces in the
+        `WRLD` group). The child groups of records are only split when
+        `children_searched` is set, and are otherwise skipped.
+        '''
+        if depth == 0:
+            yield group
+            return
+        xelib = self.xelib
+        try:
+            pending = xelib.get_elements(group, ex=False)
+        finally:
+            self.release(group)
+
+        records = []
+        try:
+            while pending:
+                handle = pending.pop(0)
+                if (xelib.element_type(handle, ex=False) ==
+                        Xelib.ElementTypes.GroupRecord):
+                    child_group = handle
+                else:
+                    child_group = (xelib.get_element(handle, 'Child Group',
+                                                     ex=False)
+                                   if children_searched else 0)
+                    if self.is_streamed(handle):
+                        records.append(handle)
+                    else:
+                        self.release(handle)
+                if child_group:
+                    if records:
+                        chunk, records = records, []
+                        yield chunk
+                    yield from self.split_group(child_group, depth - 1,
+                                                children_searched)
+            if records:
+                chunk, records = records, []
+                yield chunk
+        finally:
+            for handle in pending + records:
+                self.release(handle)
+
+    def group_signature(self, handle):
+        '''
+        Returns the signature of the records of the given top-level group, or
+        None if the handle is not a group (i.e. is the file header).
+        '''
+        xelib = self.xelib
+        if (xelib.element_type(handle, ex=False) !=
+                Xelib.ElementTypes.GroupRecord):
+            return None
+        return xelib.signature(handle, ex=False)
+
+    def is_searched(self, signature):
+        '''
+        Returns whether the top-level group of the given signature may hold
+        any of the records streamed.
+        '''
+        return signature is not None and (
+            self.signatures is None or
+            signature in self.signatures or
+            self.are_children_searched(signature))
+
+    def are_children_searched(self, signature):
+        '''
+        Returns whether the child groups of the records of the top-level
+        group of the given signature may hold any of the records streamed.
+        '''
+        return (self.signatures is None or
+                not self.signatures.isdisjoint(
+                    self.CHILD_SIGNATURES.get(signature, ())))
+
+    def is_streamed(self, handle):
+        '''
+        Returns whether the record of the given handle, met while splitting a
+        group, is one of the records streamed.
+        '''
+        xelib = self.xelib
+        if (self.signatures is not None and
+                xelib.signature(handle, ex=False) not in self.signatures):
+            return False
+        return self.include_overrides or xelib.is_master(handle, ex=False)
+
+    def release(self, handle):
+        '''
+        Releases a handle the stream is done with, unless an xedit object has
+        taken it over.
+        '''
+        if handle and not self.xelib.is_handle_watched(handle):
+            self.xelib.defer_release_handle(handle)
@@ -0,0 +1,160 @@
+from pyxedit.xelib import Xelib
+
+
+class XEditWalker:
+    '''
+    Walks the tree of elements underneath an xedit object, depth-first and in
+    the same order as a recursive walk would, but using an explicit stack of
+    handles rather than nested generators.
+
+    Each element's element type (and, when pruning by signature, its
+    signature) is fetched straight from its handle, so that subtrees can be
+    pruned before anything is objectified; the metadata fetched is then
+    handed over to ``objectify`` so it is not fetched twice.
+
+    Handles are released as soon as they are no longer needed: pruned
+    elements right away, and in raw mode, each yielded handle once its whole
+    subtree has been walked. A raw handle that the caller has wrapped with
+    ``objectify`` in the meantime belongs to the resulting object, and is
+    left alone. Handles still on the stack when the walk is abandoned (e.g.
+    on a `break`) are released as well.
+    '''
+    # element types that can have a signature worth pruning on
+    SIGNED_ELEMENT_TYPES = (Xelib.ElementTypes.MainRecord,
+                            Xelib.ElementTypes.GroupRecord,
+                            Xelib.ElementTypes.SubRecord,
+                            Xelib.ElementTypes.SubRecordStruct,
+                            Xelib.ElementTypes.SubRecordArray,
+                            Xelib.ElementTypes.SubRecordUnion)
+
+    def __init__(self,
+                 root,
+                 iter_groups=False,
+                 max_depth=None,
+                 prune_signatures=None,
+                 prune_element_types=None,
+                 prune=None,
+                 raw=False,
+                 with_metadata=False):
+        '''
+        @param root: the xedit object to walk underneath of
+        @param iter_groups: whether to also walk into the child groups of
+                            records (e.g. the contents of a CELL or WRLD)
+        @param max_depth: if given, how many levels below `root` to walk;
+                          1 only visits the children of `root`
+        @param prune_signatures: signatures of elements to skip together with
+                                 their subtrees
+        @param prune_element_types: element types of elements to skip together
+                                    with their subtrees
+        @param prune: a callable taking a handle and a dictionary of its
+                      metadata (`element_type`, and `signature` where it has
+                      one), which returns True if the element should be
+                      skipped together with its subtree
+        @param raw: if True, handles are yielded instead of xedit objects
+        @param with_metadata: in raw mode, if True, (handle, metadata) pairs
+                              are yielded, with the metadata fetched for
+                              pruning, so it does not have to be fetched
+                              again
+        '''
+        self.root = root
+        self.xelib = root.xelib
+        self.iter_groups = iter_groups
+        self.max_depth = max_depth
+        self.prune_signatures = set(prune_signatures or ())
+        self.prune_element_types = set(prune_element_types or ())
+        self.prune = prune
+        self.raw = raw
+        self.with_metadata = with_metadata
+
+    def __iter__(self):
+        root = self.root
+        max_depth = self.max_depth
+
+        # each stack frame is [parent handle to release once the frame is
+        # exhausted, child handles, index of the next child, depth]
+        stack = [[None,
+                  self.child_handles(root.handle, root.element_type),
+                  0,
+                  1]]
+        try:
+            while stack:
+                frame = stack[-1]
+                parent, handles, index, depth = frame
+                if index == len(handles):
+                    stack.pop()
+                    self.release(parent)
+                    continue
+                frame[2] = index + 1
+
+                handle = handles[index]
+                metadata = self.metadata_for(handle)
+                if self.is_pruned(handle, metadata):
+                    self.release(handle)
+                    continue
+
+                # children are fetched before yielding, since once yielded
+                # the handle is the caller's to dispose of in object mode
+                if max_depth is None or depth < max_depth:
+                    children = self.child_handles(handle,
+                                                  metadata['element_type'])
+                else:
+                    children = []
+                stack.append([handle if self.raw else None,
+                              children,
+                              0,
+                              depth + 1])
+
+                if self.raw:
+                    yield (handle, metadata) if self.with_metadata else handle
+                else:
+                    yield root.objectify(handle, metadata=metadata)
+        finally:
+            for parent, handles, index, _ in reversed(stack):
+                for handle in handles[index:]:
+                    self.release(handle)
+                self.release(parent)
+
+    def child_handles(self, handle, element_type):
+        '''
+        Returns a list of handles to the children of the given element,
+        including its child group when walking groups.
+        '''
+        xelib = self.xelib
+        handles = xelib.get_elements(handle, ex=False)
+
+        # only records have child groups
+        if self.iter_groups and element_type == Xelib.ElementTypes.MainRecord:
+            child_group = xelib.get_element(handle, 'Child Group', ex=False)
+            if child_group:
+                handles.append(child_group)
+        return handles
+
+    def metadata_for(self, handle):
+        '''
+        Fetches the metadata needed to decide whether to prune the element of
+        the given handle.
+        '''
+        xelib = self.xelib
+        element_type = xelib.element_type(handle, ex=False)
+        metadata = {'element_type': element_type}
+        if ((self.prune_signatures or self.prune) and
+                element_type in self.SIGNED_ELEMENT_TYPES):
+            metadata['signature'] = xelib.signature(handle, ex=False)
+        return metadata
+
+    def is_pruned(self, handle, metadata):
+        '''
+        Returns whether the element of the given handle should be skipped
+        together with its subtree.
+        '''
+        return (metadata['element_type'] in self.prune_element_types or
+                metadata.get('signature') in self.prune_signatures or
+                bool(self.prune and self.prune(handle, metadata)))
+
+    def release(self, handle):
+        '''
+        Releases a handle the walker is done with, unless an xedit object has
+        taken it over.
+        '''
+        if handle and not self.xelib.is_handle_watched(handle):
+            self.xelib.defer_release_handle(handle)
@@ -1,6 +1,7 @@
 from contextlib import contextmanager
 
 from pyxedit.xedit.base import XEditBase
+from pyxedit.xedit.records import XEditRecordStream
 from pyxedit.xelib import Xelib
 
 
@@ -9,14 +10,18 @@ class XEdit(XEditBase):
                  game_mode=XEditBase.GameModes.SSE,
                  game_path=None,
                  plugins=None,
-                 xeditlib_path=None):
+                 xeditlib_path=None,
+                 backend=None,
+                 index_cache=None):
         self.import_all_object_classes()
         self._xelib = Xelib(game_mode=game_mode,
                             game_path=game_path,
                             plugins=plugins,
-                            xeditlib_path=xeditlib_path)
+                            xeditlib_path=xeditlib_path,
+                            backend=backend,
+                            index_cache=index_cache)
         self.handle = 0
-        self.auto_release = False
+        self._finalizer = None
 
     @property
     def game_mode(self):
@@ -48,9 +53,75 @@ class XEdit(XEditBase):
     def plugin_names(self):
         return self.xelib.get_loaded_file_names()
 
+    def records(self, signature=None, include_overrides=False):
+        '''
+        Streams the records of every plugin in the load order, a plugin at a
+        time; see `XEditRecordStream`.
+
+        @param signature: a signature, or a list of signatures, to only stream
+                          the records of
+        @param include_overrides: whether to also stream override records;
+                                  otherwise each record is streamed once, from
+                                  the plugin that introduces it
+        @return: an iterable over the records of the load order
+        '''
+        return XEditRecordStream(self,
+                                 signature=signature,
+                                 include_overrides=include_overrides)
+
+    def by_editor_id(self, editor_id, plugin=None, default=None):
+        '''
+        Looks up a record by EditorID in the session's record index (see
+        `Xelib.record_index`), which is built on first use.
+
+        @param editor_id: the EditorID of the record, matched
+                          case-insensitively
+        @param plugin: the name of a plugin to get the record's version in;
+                       by default, the winning override is returned
+        @param default: what to return if there is no such record
+        @return: the record as an xedit object, or the default
+        '''
+        location = self.xelib.record_index.locate_editor_id(editor_id)
+        if location is None:
+            return default
+        return self.by_form_id(location.form_id,
+                               plugin=plugin,
+                               default=default)
+
+    def by_form_id(self, form_id, plugin=None, default=None):
+        '''
+        Looks up a record by (load order) FormID in the session's record
+        index (see `Xelib.record_index`), which is built on first use.
+
+        @param form_id: the FormID of the record, as an int or a hex string
+        @param plugin: the name of a plugin to get the record's version in;
+                       by default, the winning override is returned
+        @param default: what to return if there is no such record
+        @return: the record as an xedit object, or the default
+        '''
+        if isinstance(form_id, str):
+            form_id = int(form_id, 16)
+        handle = self.xelib.record_index.get_record(form_id, plugin)
+        if not handle:
+            return default
+        return self.objectify(
+                   handle,
+                   metadata={'element_type': self.ElementTypes.MainRecord})
+
     @contextmanager
-    def session(self, load_plugins=True):
-        with self.xelib.session():
+    def session(self, load_plugins=True, progress=None, timeout=None):
+        '''
+        Context manager for an xedit session; see ``Xelib.session``.
+
+        @param load_plugins: whether to load the plugins on session start
+        @param progress: called with each message logged while loading
+                         plugins (see ``LoaderEvent``), e.g. to report
+                         progress
+        @param timeout: seconds after which to give up on loading plugins
+        '''
+        with self.xelib.session(load_plugins=load_plugins,
+                                progress=progress,
+                                timeout=timeout):
             yield self
 
     def add_file(self, file_name):
@@ -1,3 +1,4 @@
 from pyxedit.xelib.xelib import DLL_PATH, Xelib, XelibError
+from pyxedit.xelib.async_xelib import AsyncXelib
 
-__all__ = ['DLL_PATH', 'Xelib', 'XelibError']
+__all__ = ['AsyncXelib', 'DLL_PATH', 'Xelib', 'XelibError']
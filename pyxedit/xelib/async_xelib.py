@@ -0,0 +1,441 @@
+from contextlib import asynccontextmanager
+from functools import partial, wraps
+from inspect import getattr_static
+import asyncio
+import queue
+import threading
+import time
+
+from pyxedit.xelib.loader import PluginLoad
+from pyxedit.xelib.wrapper_methods.helpers import XelibError
+from pyxedit.xelib.xelib import Xelib
+
+# queued up in place of a call to have the DLL thread stop
+STOP = object()
+
+
+class DllRequest:
+    '''
+    A call queued up for a ``DllThread``, along with the event loop and the
+    future to hand its outcome back to; calls nobody waits on have neither.
+    '''
+    __slots__ = ('function', 'args', 'kwargs', 'loop', 'future')
+
+    def __init__(self, function, args, kwargs, loop=None, future=None):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.loop = loop
+        self.future = future
+
+
+class DllThread:
+    '''
+    The thread owning a ``Xelib`` session, on which every call into
+    ``XEditLib.dll`` is made.
+
+    ``XEditLib.dll`` is single-threaded and stateful (results of variable
+    length are picked up from a single global result slot, for one), so
+    calls from several threads, or from several interleaved coroutines, must
+    not be let anywhere near each other. Instead, calls are submitted to this
+    thread, which runs them one after the other.
+
+    Calls queued up while the thread is busy are taken off the queue
+    together, up to `batch_size` of them, and run as a batch; their outcomes
+    are handed back to the event loop they came from with a single callback
+    per batch, rather than one wake-up of the event loop per call. A batch
+    hands back the outcomes it has so far whenever it has been running for
+    more than `max_latency` seconds, so that a long call (such as
+    ``build_references``) does not hold up the outcomes of the calls run
+    before it.
+    '''
+    DEFAULT_BATCH_SIZE = 64
+    DEFAULT_MAX_LATENCY = 0.005
+
+    def __init__(self,
+                 batch_size=DEFAULT_BATCH_SIZE,
+                 max_latency=DEFAULT_MAX_LATENCY,
+                 name='pyxedit-dll'):
+        '''
+        Args:
+            batch_size (``int``):
+                the most queued calls to run as a single batch
+            max_latency (``float``):
+                the most seconds a batch holds on to the outcomes of its calls
+            name (``str``):
+                the name of the thread
+        '''
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.name = name
+
+        # the number of calls and batches run, for telling how well calls
+        # get coalesced
+        self.calls = 0
+        self.batches = 0
+
+        self._requests = None
+        self._thread = None
+
+    def __repr__(self):
+        state = 'running' if self.running else 'stopped'
+        return (f'<{self.__class__.__name__} {state}, {self.calls} calls in '
+                f'{self.batches} batches>')
+
+    @property
+    def running(self):
+        '''
+        (``bool``) Whether the thread takes calls
+        '''
+        return self._thread is not None
+
+    def is_owner(self):
+        '''
+        Returns whether the current thread is the DLL thread.
+        '''
+        return threading.current_thread() is self._thread
+
+    def start(self):
+        '''
+        Starts the thread, unless it is already running.
+        '''
+        if self.running:
+            return
+        self._requests = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run,
+                                        args=(self._requests,),
+                                        name=self.name,
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''
+        Stops the thread once it has run the calls queued up so far; calls
+        submitted from then on fail, until the thread is started again.
+
+        Returns:
+            (``threading.Thread``) the stopping thread, which can be joined;
+            None if the thread was not running
+        '''
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._requests.put(STOP)
+        return thread
+
+    def submit(self, function, *args, **kwargs):
+        '''
+        Queues up a call to be run on the DLL thread. Must be called from a
+        running event loop.
+
+        Returns:
+            (``asyncio.Future``) a future of the result of the call, bound to
+            the running event loop
+        '''
+        if not self.running:
+            raise XelibError('The DLL thread is not running; calls can only '
+                             'be made within a session')
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._requests.put(DllRequest(function, args, kwargs, loop, future))
+        return future
+
+    def submit_nowait(self, function, *args, **kwargs):
+        '''
+        Queues up a call to be run on the DLL thread, which nobody waits on;
+        this can be called from any thread. The outcome of the call is
+        dropped, including any exception it raises.
+
+        Returns:
+            (``bool``) whether the call was queued up; calls are dropped when
+            the thread is not running
+        '''
+        if not self.running:
+            return False
+        self._requests.put(DllRequest(function, args, kwargs))
+        return True
+
+    def attach(self, xelib):
+        '''
+        Routes the release of the handles of garbage collected xedit objects
+        (see ``Xelib.watch_handle``) of the given session onto the DLL thread;
+        without this, objects collected on an event loop would release their
+        handles from there.
+        '''
+        release = xelib.defer_release_handle
+
+        def release_on_dll_thread(handle):
+            if self.is_owner():
+                release(handle)
+            else:
+                self.submit_nowait(release, handle)
+
+        xelib._finalizers.release = release_on_dll_thread
+
+    def _run(self, requests):
+        stopping = False
+        batch = []
+        outcomes = {}
+        try:
+            while not stopping:
+                batch = [requests.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(requests.get_nowait())
+                    except queue.Empty:
+                        break
+                self.batches += 1
+
+                outcomes = {}
+                started = time.perf_counter()
+                while batch:
+                    request = batch.pop(0)
+                    if request is STOP:
+                        stopping = True
+                        continue
+                    self._call(request, outcomes)
+                    if outcomes and time.perf_counter() - started > \
+                            self.max_latency:
+                        self._hand_back(outcomes)
+                        outcomes = {}
+                        started = time.perf_counter()
+                self._hand_back(outcomes)
+        except BaseException as e:
+            # a call raised something that is not an Exception (e.g.
+            # KeyboardInterrupt), which takes the thread down: the calls run
+            # are handed back, and those still queued fail, rather than leave
+            # anyone waiting on them forever
+            if self.is_owner():
+                self._thread = None
+            error = XelibError(f'The DLL thread stopped: {e!r}')
+            while True:
+                try:
+                    batch.append(requests.get_nowait())
+                except queue.Empty:
+                    break
+            for request in batch:
+                if request is not STOP and request.future is not None:
+                    outcomes.setdefault(request.loop, []).append(
+                        (request.future, error, None))
+            self._hand_back(outcomes)
+            raise
+
+    def _call(self, request, outcomes):
+        future = request.future
+        if future is not None and future.cancelled():
+            return
+        self.calls += 1
+        try:
+            result = request.function(*request.args, **request.kwargs)
+        except BaseException as e:
+            if future is not None:
+                outcomes.setdefault(request.loop, []).append((future, e, None))
+            if not isinstance(e, Exception):
+                raise
+        else:
+            if future is not None:
+                outcomes.setdefault(request.loop, []).append(
+                    (future, None, result))
+
+    @staticmethod
+    def _hand_back(outcomes):
+        for loop, loop_outcomes in outcomes.items():
+            try:
+                loop.call_soon_threadsafe(resolve_outcomes, loop_outcomes)
+            except RuntimeError:
+                # the event loop has been closed; nobody is waiting anymore
+                pass
+
+
+def resolve_outcomes(outcomes):
+    '''
+    Hands the outcomes of a batch of calls over to their futures; this runs
+    on the event loop the futures are bound to.
+    '''
+    for future, exception, result in outcomes:
+        if future.done():
+            continue
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+
+class AsyncXelib:
+    '''
+    An asyncio facade over a ``Xelib`` session, for serving concurrent
+    requests over a single loaded session.
+
+    Every ``Xelib`` method is available as a coroutine method of the same
+    name and arguments, which runs the method on the ``DllThread`` of the
+    session. See example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        async with AsyncXelib(plugins=['GOT.esp']).session() as xelib:
+            handle = await xelib.get_element(0, 'GOT.esp\\\\NPC_\\\\JonSnow')
+            name = await xelib.name(handle)
+
+    Each awaited method is a call of its own on the DLL thread, and calls
+    from concurrent coroutines may run in between any two of them. Work that
+    needs several calls to go together (e.g. within a ``manage_handles``
+    context) can be run as a single call with ``run``.
+    '''
+    # Xelib methods which do not make sense as a single call on the DLL
+    # thread; the session is managed with AsyncXelib's own methods, and the
+    # context managers can be used from within ``run``
+    NOT_FORWARDED = {'session', 'manage_handles', 'profile', 'trace'}
+
+    def __init__(self,
+                 xelib=None,
+                 batch_size=DllThread.DEFAULT_BATCH_SIZE,
+                 max_latency=DllThread.DEFAULT_MAX_LATENCY,
+                 **kwargs):
+        '''
+        Args:
+            xelib (``Xelib``):
+                the session to run; by default, a new ``Xelib`` is created
+                from the remaining keyword arguments
+            batch_size (``int``):
+                the most queued calls to run as a single batch; see
+                ``DllThread``
+            max_latency (``float``):
+                the most seconds a batch holds on to the outcomes of its
+                calls; see ``DllThread``
+        '''
+        self.xelib = xelib if xelib is not None else Xelib(**kwargs)
+        self.dll_thread = DllThread(batch_size=batch_size,
+                                    max_latency=max_latency)
+        self.dll_thread.attach(self.xelib)
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name in ('xelib', 'dll_thread'):
+            raise AttributeError(name)
+        method = getattr_static(type(self.xelib), name, None)
+        if not callable(method) or name in self.NOT_FORWARDED:
+            raise AttributeError(f'{self.__class__.__name__!r} object has '
+                                 f'no attribute {name!r}')
+        bound_method = getattr(self.xelib, name)
+
+        @wraps(bound_method)
+        async def call(*args, **kwargs):
+            return await self.dll_thread.submit(bound_method, *args, **kwargs)
+
+        # keep the coroutine method around, so this is only done once
+        setattr(self, name, call)
+        return call
+
+    @property
+    def loaded(self):
+        '''
+        (``bool``) Whether ``XEditLib.dll`` is loaded; see ``Xelib.loaded``
+        '''
+        return self.xelib.loaded
+
+    async def run(self, function, *args, **kwargs):
+        '''
+        Runs ``function(xelib, *args, **kwargs)`` as a single call on the DLL
+        thread, with no other calls in between. See example:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            def count_keywords(xelib, path):
+                with xelib.manage_handles():
+                    return len(xelib.get_elements(0, f'{path}\\\\KWDA'))
+
+            count = await async_xelib.run(count_keywords, armor_path)
+
+        Returns:
+            the result of the function
+        '''
+        return await self.dll_thread.submit(function,
+                                            self.xelib,
+                                            *args,
+                                            **kwargs)
+
+    async def start_session(self, load_plugins=True, progress=None,
+                            timeout=None):
+        '''
+        Starts the DLL thread and the session on it; see
+        ``Xelib.start_session``.
+        '''
+        self.dll_thread.start()
+        await self.dll_thread.submit(self.xelib.start_session,
+                                     load_plugins=False)
+        if load_plugins:
+            await self.load_plugins_async(progress=progress, timeout=timeout)
+
+    async def load_plugins_async(self, plugins=None, progress=None,
+                                 timeout=None):
+        '''
+        Loads plugins; see ``Xelib.load_plugins_async``. Unlike on
+        ``Xelib``, this waits for the load to finish. The loader is polled
+        through the DLL thread, which keeps serving other calls in between
+        polls, and the `progress` callback is called on the event loop.
+
+        Returns:
+            (``Xelib.LoaderStates``) the final loader status
+        '''
+        if progress is not None:
+            progress = partial(asyncio.get_running_loop().call_soon_threadsafe,
+                               progress)
+        load = await self.dll_thread.submit(self.xelib.load_plugins_async,
+                                            plugins,
+                                            progress=progress,
+                                            timeout=timeout)
+        while not await self.dll_thread.submit(load.poll):
+            await asyncio.sleep(load.next_interval())
+        return load.status
+
+    async def check_for_errors_and_wait(self, id_, timeout=None):
+        '''
+        Checks for errors in the given element (see
+        ``Xelib.check_for_errors``), and waits for the check to finish, polling
+        for it like ``PluginLoad`` polls the loader.
+
+        Args:
+            id\\_ (``int``):
+                handle to the element to check for errors within
+            timeout (``float``):
+                seconds after which to give up on the check, raising a
+                ``XelibError``
+
+        Returns:
+            (``List[dict]``) the errors found
+        '''
+        await self.check_for_errors(id_)
+        started = time.perf_counter()
+        interval = PluginLoad.INITIAL_INTERVAL
+        while not await self.get_error_thread_done():
+            if timeout is not None and time.perf_counter() - started > timeout:
+                raise XelibError(f'Timed out after {timeout}s waiting for the '
+                                 f'error check')
+            await asyncio.sleep(interval)
+            interval = min(interval * PluginLoad.BACKOFF,
+                           PluginLoad.MAX_INTERVAL)
+        return await self.get_errors()
+
+    async def end_session(self):
+        '''
+        Ends the session, and then stops the DLL thread; see
+        ``Xelib.end_session``.
+        '''
+        try:
+            await self.dll_thread.submit(self.xelib.end_session)
+        finally:
+            self.dll_thread.stop()
+
+    @asynccontextmanager
+    async def session(self, load_plugins=True, progress=None, timeout=None):
+        '''
+        Asynchronous context manager for the session, started and ended on
+        the DLL thread; see ``Xelib.session``.
+        '''
+        try:
+            await self.start_session(load_plugins=load_plugins,
+                                     progress=progress,
+                                     timeout=timeout)
+            yield self
+        finally:
+            await self.end_session()
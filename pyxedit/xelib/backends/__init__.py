@@ -0,0 +1,7 @@
+from pyxedit.xelib.backends.base import XEditLibBackend
+from pyxedit.xelib.backends.dll import DllBackend
+from pyxedit.xelib.backends.simulated import SimulatedBackend
+from pyxedit.xelib.backends.synthetic import SyntheticLoadOrder
+
+__all__ = ['DllBackend', 'SimulatedBackend', 'SyntheticLoadOrder',
+           'XEditLibBackend']
@@ -0,0 +1,22 @@
+class XEditLibBackend:
+    '''
+    The interface of the backends ``Xelib`` can run its sessions on.
+
+    A backend provides the raw API object: something with the functions of
+    ``XEditLib.dll`` (see ``XEditLibSignatures``), called with the same
+    arguments and behaving the same way. ``Xelib`` loads a fresh raw API
+    object from its backend when a session starts, and unloads it when the
+    session ends.
+    '''
+    def load(self):
+        '''
+        Loads the library, and returns its raw API object.
+        '''
+        raise NotImplementedError
+
+    def unload(self, raw_api):
+        '''
+        Unloads a raw API object returned by `load`, after its session has
+        been closed.
+        '''
+        pass
@@ -0,0 +1,61 @@
+import ctypes
+
+from pyxedit.xelib.backends.base import XEditLibBackend
+from pyxedit.xelib.definitions import DelphiTypes, XEditLibSignatures
+
+
+class DllBackend(XEditLibBackend):
+    '''
+    The backend running on the actual ``XEditLib.dll``, through ctypes. This
+    is what ``Xelib`` uses unless told otherwise, and it only works on
+    Windows.
+    '''
+    def __init__(self, dll_path):
+        '''
+        Args:
+            dll_path (``str``):
+                Path to the ``XEditLib.dll`` file
+        '''
+        self.dll_path = dll_path
+
+    def load(self):
+        return self.load_lib(self.dll_path)
+
+    def unload(self, raw_api):
+        # ctypes never unloads the libraries it loads, so free it ourselves
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.FreeLibrary.argtypes = [wintypes.HMODULE]
+        kernel32.FreeLibrary(raw_api._handle)
+
+    @staticmethod
+    def load_lib(dll_path):
+        '''
+        Loads ``XEditLib.dll`` into python and wrap it with ctypes definitions
+        based on known calling signatures of the DLL functions.
+
+        Args:
+            dll_path (``str``):
+                Path to the ``XEditLib.dll`` file
+        Returns:
+            ``ctypes.CDLL``: handle to the loaded library
+        '''
+        # load XEditLib.dll
+        lib = ctypes.CDLL(str(dll_path))
+
+        # define type signatures for XEditLib.dll methods; functions sharing
+        # a signature are aliases of one another in the enum, so go through
+        # its members by name in order not to skip the aliases
+        for method_name, signature in XEditLibSignatures.__members__.items():
+            params, return_type = signature.value
+            try:
+                method = getattr(lib, method_name)
+                method.argtypes = [DelphiTypes[type_].value
+                                   for _, type_ in params.items()]
+                if return_type:
+                    method.restype = DelphiTypes[return_type].value
+            except AttributeError:
+                print(f'WARNING: missing function {method_name}')
+
+        # return a handle to the loaded library
+        return lib
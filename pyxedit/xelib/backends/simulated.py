@@ -0,0 +1,1663 @@
+'''
+A pure-python stand-in for ``XEditLib.dll``, serving a synthetic load order
+(see ``synthetic.py``) through the same functions, with the same calling
+conventions, as the DLL.
+
+Like the DLL, the simulated library hands out a new handle every time an
+element is resolved, reports results of variable length (strings, arrays)
+through ``GetResultString``/``GetResultArray``, writes other results into
+the by-reference arguments it is given, and signals failures by returning
+False and setting an exception message. It implements the functions needed
+for loading plugins, navigating and editing element trees, records and their
+overrides, values, flags, arrays and error checks; the remaining functions of
+``XEditLibSignatures`` fail with an exception message saying so.
+'''
+from functools import wraps
+import hashlib
+import json
+import re
+import time
+import zlib
+
+from pyxedit.xelib.definitions import XEditLibSignatures
+from pyxedit.xelib.backends.base import XEditLibBackend
+from pyxedit.xelib.backends.synthetic import (Kinds,
+                                              SIGNATURE_NAMES,
+                                              SimulatedFile,
+                                              SimulatedGroup,
+                                              SimulatedRecord,
+                                              SyntheticLoadOrder,
+                                              copy_record,
+                                              new_record,
+                                              record_def,
+                                              set_subrecord)
+from pyxedit.xelib.wrapper_methods.elements import ElementTypes
+from pyxedit.xelib.wrapper_methods.setup import LoaderStates
+
+FORM_ID_PATTERN = re.compile(r'^[0-9A-Fa-f]{8}$')
+INDEX_PATTERN = re.compile(r'^\[(\d+)\]$')
+REFERENCE_PATTERN = re.compile(r'\[(\w{4}):([0-9A-Fa-f]{8})\]')
+
+SIGNATURES_BY_NAME = {name: signature
+                      for signature, name in SIGNATURE_NAMES.items()}
+
+
+class SimulatedXEditLibError(Exception):
+    '''
+    Raised within the simulated library when a call fails; turned into a
+    False return value and an exception message, as the DLL would.
+    '''
+    pass
+
+
+def api_function(function):
+    '''
+    Decorator for simulated DLL functions that return a success boolean:
+    a ``SimulatedXEditLibError`` raised by the function is turned into a
+    False return value and stored as the exception message.
+    '''
+    @wraps(function)
+    def wrapper(self, *args):
+        try:
+            return function(self, *args)
+        except SimulatedXEditLibError as e:
+            self.exception_message = str(e)
+            return False
+    return wrapper
+
+
+def set_out(ref, value):
+    '''
+    Writes a value into a by-reference argument (``ctypes.byref`` or a
+    ``ctypes`` pointer).
+    '''
+    try:
+        ref._obj.value = value
+    except AttributeError:
+        ref.contents.value = value
+
+
+def int_arg(value):
+    '''
+    Returns the value of an argument that may be given as a ``ctypes``
+    integer or as a plain int.
+    '''
+    return getattr(value, 'value', value)
+
+
+class SimulatedXEditLib:
+    '''
+    The raw API object of the simulated backend; see the module docstring.
+
+    Loading plugins runs on a simulated background loader: the plugins are
+    built up front, but each one only shows up as loaded once `load_delay`
+    seconds per plugin have passed, as observed through ``GetLoaderStatus``
+    (which also logs a loading message per plugin, like the DLL does).
+    '''
+    def __init__(self, load_order, load_delay=0.0):
+        '''
+        Args:
+            load_order (``SyntheticLoadOrder``):
+                the plugins available for loading
+            load_delay (``float``):
+                the simulated loading time of each plugin, in seconds
+        '''
+        self.load_order = load_order
+        self.load_delay = load_delay
+
+        # the interface store, mapping handles to elements
+        self.handles = {}
+        self.next_handle = 1
+
+        # the results waiting to be picked up by the GetResult* functions
+        self.result_string = ''
+        self.result_array = []
+        self.result_bytes = b''
+
+        self.messages = []
+        self.message_text = ''
+        self.exception_message = ''
+
+        self.game_mode = None
+        self.game_path = 'C:\\Games\\Simulated\\'
+        self.language = 'English'
+
+        # loaded files in load order, and the master records by FormID
+        self.files = []
+        self.records = {}
+        self.referenced_by = None
+        self.modified = set()
+
+        self.loader_status = LoaderStates.Inactive
+        self.pending_files = []
+        self.loader_started = 0.0
+        self.loader_loaded = 0
+
+    def __getattr__(self, name):
+        # functions of XEditLib.dll the simulated library does not implement
+        # fail like DLL functions do, rather than with an AttributeError
+        if name not in XEditLibSignatures.__members__:
+            raise AttributeError(name)
+
+        def unsupported(*args):
+            self.exception_message = (f'{name} is not supported by the '
+                                      f'simulated XEditLib')
+            return False
+        return unsupported
+
+    # handles and results
+    def open(self, element):
+        '''
+        Returns a new handle to the given element.
+        '''
+        handle = self.next_handle
+        self.next_handle += 1
+        self.handles[handle] = element
+        return handle
+
+    def element(self, handle):
+        '''
+        Returns the element of the given handle; handle 0 stands for the
+        root of the load order, for which None is returned.
+        '''
+        handle = int_arg(handle)
+        if handle == 0:
+            return None
+        try:
+            return self.handles[handle]
+        except KeyError:
+            raise SimulatedXEditLibError(f'Failed to resolve handle {handle}')
+
+    def string_result(self, len_, value):
+        self.result_string = value
+        set_out(len_, len(value))
+        return True
+
+    def array_result(self, len_, elements):
+        self.result_array = [self.open(element) for element in elements]
+        set_out(len_, len(self.result_array))
+        return True
+
+    def handle_result(self, res, element):
+        set_out(res, self.open(element))
+        return True
+
+    def GetResultString(self, buffer, max_len):
+        buffer.value = self.result_string[:int_arg(max_len)]
+        return True
+
+    def GetResultArray(self, buffer, max_len):
+        items = self.result_array[:int_arg(max_len)]
+        buffer[:len(items)] = items
+        return True
+
+    def GetResultBytes(self, buffer, max_len):
+        items = self.result_bytes[:int_arg(max_len)]
+        buffer[:len(items)] = items
+        return True
+
+    # meta functions
+    def InitXEdit(self):
+        self.messages.append('XEditLib (simulated) initialized')
+
+    def CloseXEdit(self):
+        self.handles.clear()
+        self.files = []
+        self.records = {}
+
+    def globals(self):
+        return {'ProgramPath': 'C:\\Simulated\\',
+                'Version': '0.0.0',
+                'GameName': 'Skyrim',
+                'AppName': 'TES5',
+                'LongGameName': 'Skyrim Special Edition',
+                'DataPath': f'{self.game_path}Data\\',
+                'AppDataPath': 'C:\\Simulated\\AppData\\',
+                'MyGamesPath': 'C:\\Simulated\\My Games\\',
+                'GameIniPath': 'C:\\Simulated\\My Games\\Skyrim.ini',
+                'FileCount': str(len(self.files))}
+
+    @api_function
+    def GetGlobal(self, key, len_):
+        try:
+            return self.string_result(len_, self.globals()[key])
+        except KeyError:
+            raise SimulatedXEditLibError(f'Global variable {key} not found')
+
+    @api_function
+    def GetGlobals(self, len_):
+        return self.string_result(len_, '\r\n'.join(
+            f'{key}={value}' for key, value in self.globals().items()))
+
+    def SetSortMode(self, sort_by, reverse):
+        return True
+
+    @api_function
+    def Release(self, id_):
+        if self.handles.pop(int_arg(id_), None) is None:
+            raise SimulatedXEditLibError(f'Failed to release interface '
+                                         f'#{int_arg(id_)}')
+        return True
+
+    def ReleaseNodes(self, id_):
+        return True
+
+    @api_function
+    def GetDuplicateHandles(self, id_, len_):
+        element = self.element(id_)
+        handles = [handle for handle, other in self.handles.items()
+                   if other is element and handle != int_arg(id_)]
+        self.result_array = handles
+        set_out(len_, len(handles))
+        return True
+
+    def CleanStore(self):
+        return True
+
+    def ResetStore(self):
+        self.handles.clear()
+        return True
+
+    # message functions
+    def GetMessagesLength(self, len_=None):
+        self.advance_loader()
+        self.message_text = '\n'.join(self.messages)
+        self.messages = []
+        if len_ is not None:
+            set_out(len_, len(self.message_text))
+        return len(self.message_text)
+
+    def GetMessages(self, buffer, max_len):
+        buffer.value = self.message_text[:int_arg(max_len)]
+        return True
+
+    def ClearMessages(self):
+        self.messages = []
+        self.message_text = ''
+
+    def GetExceptionMessageLength(self, len_=None):
+        if len_ is not None:
+            set_out(len_, len(self.exception_message))
+        return len(self.exception_message)
+
+    def GetExceptionMessage(self, buffer, max_len):
+        buffer.value = self.exception_message[:int_arg(max_len)]
+        self.exception_message = ''
+        return True
+
+    def GetExceptionStackLength(self, len_=None):
+        if len_ is not None:
+            set_out(len_, 0)
+        return 0
+
+    def GetExceptionStack(self, buffer, max_len):
+        buffer.value = ''
+        return True
+
+    # setup functions
+    @api_function
+    def GetGamePath(self, mode, len_):
+        return self.string_result(len_, self.game_path)
+
+    def SetGamePath(self, path):
+        self.game_path = path
+        return True
+
+    @api_function
+    def GetGameLanguage(self, mode, len_):
+        return self.string_result(len_, self.language)
+
+    def SetLanguage(self, language):
+        self.language = language
+        return True
+
+    def SetBackupPath(self, path):
+        return True
+
+    @api_function
+    def SetGameMode(self, mode):
+        if self.files or self.pending_files:
+            raise SimulatedXEditLibError('Cannot set game mode after '
+                                         'plugins are loaded')
+        self.game_mode = int_arg(mode)
+        return True
+
+    @api_function
+    def GetLoadOrder(self, len_):
+        return self.string_result(len_,
+                                  '\r\n'.join(self.load_order.plugin_names))
+
+    @api_function
+    def GetActivePlugins(self, len_):
+        return self.string_result(len_,
+                                  '\r\n'.join(self.load_order.plugin_names))
+
+    @api_function
+    def LoadPlugins(self, load_order, smart_load, use_dummies):
+        if self.files or self.pending_files:
+            raise SimulatedXEditLibError('Plugins are already loaded')
+        names = [name.strip() for name in load_order.splitlines()
+                 if name.strip()]
+        self.start_loader(self.plugins_to_load(names, smart_load))
+        return True
+
+    @api_function
+    def LoadPlugin(self, filename):
+        if self.loader_status == LoaderStates.Active:
+            raise SimulatedXEditLibError('The loader is already active')
+        self.start_loader(self.plugins_to_load([filename], False))
+        return True
+
+    def plugins_to_load(self, names, smart_load):
+        '''
+        Returns the names of the plugins to load, in load order, for the
+        given requested names, checking that their masters are available.
+        '''
+        available = self.load_order.plugin_names
+        loaded = {file_.name for file_ in self.files}
+        wanted = set()
+        for name in names:
+            if name not in available:
+                raise SimulatedXEditLibError(f'Failed to load {name}: the '
+                                             f'plugin does not exist')
+            wanted.add(name)
+            for master in self.load_order.masters_of(name):
+                if master in loaded or master in wanted:
+                    continue
+                if not smart_load:
+                    raise SimulatedXEditLibError(f'Failed to load {name}: '
+                                                 f'missing master {master}')
+                wanted.add(master)
+        return [name for name in available
+                if name in wanted and name not in loaded]
+
+    def start_loader(self, names):
+        '''
+        Builds the given plugins, and hands them over to the simulated
+        background loader.
+        '''
+        files = list(self.files)
+        for name in names:
+            files.append(self.load_order.build_file(name, len(files),
+                                                    list(files)))
+        self.pending_files = files[len(self.files):]
+        self.loader_started = time.perf_counter()
+        self.loader_loaded = 0
+        self.loader_status = LoaderStates.Active
+        self.log('Background Loader: starting...')
+
+    def advance_loader(self):
+        '''
+        Moves the plugins whose simulated loading time has passed into the
+        loaded files.
+        '''
+        if self.loader_status != LoaderStates.Active:
+            return
+        if self.load_delay:
+            elapsed = time.perf_counter() - self.loader_started
+            due = int(elapsed / self.load_delay) - self.loader_loaded
+        else:
+            due = len(self.pending_files)
+        for file_ in self.pending_files[:max(due, 0)]:
+            self.log(f'Loading {file_.name}')
+            self.add_loaded_file(file_)
+        del self.pending_files[:max(due, 0)]
+        if not self.pending_files:
+            self.loader_status = LoaderStates.Done
+            self.log('Background Loader: finished')
+
+    def add_loaded_file(self, file_):
+        self.files.append(file_)
+        self.loader_loaded += 1
+        for form_id, record in file_.records.items():
+            if record.master is None:
+                self.records[form_id] = record
+
+    def log(self, message):
+        elapsed = int(time.perf_counter() - self.loader_started)
+        self.messages.append(f'[{elapsed // 60:02d}:{elapsed % 60:02d}] '
+                             f'{message}')
+
+    def GetLoaderStatus(self, status):
+        self.advance_loader()
+        set_out(status, self.loader_status.value)
+        return True
+
+    @api_function
+    def UnloadPlugin(self, id_):
+        file_ = self.file_element(id_)
+        if not self.files or self.files[-1] is not file_:
+            raise SimulatedXEditLibError(f'Cannot unload {file_.name}: only '
+                                         f'the last plugin can be unloaded')
+        self.files.pop()
+        for form_id, record in file_.records.items():
+            if record.master is None:
+                self.records.pop(form_id, None)
+            else:
+                record.master.overrides.remove(record)
+        return True
+
+    @api_function
+    def BuildReferences(self, id_, synchronous):
+        referenced_by = {}
+        for file_ in self.files:
+            for record in file_.records.values():
+                for element in self.iter_elements(record):
+                    if (element.kind == Kinds.REFERENCE and element.value and
+                            element.name != 'FormID'):
+                        referenced_by.setdefault(element.value, []).append(
+                            record)
+        self.referenced_by = referenced_by
+        return True
+
+    # error functions; the synthetic records are well-formed, so checking
+    # them never finds any errors
+    @api_function
+    def CheckForErrors(self, id_):
+        self.element(id_)
+        return True
+
+    def GetErrorThreadDone(self):
+        return True
+
+    def GetErrors(self, len_):
+        return self.string_result(len_, json.dumps({'errors': []}))
+
+    # file functions
+    def file_element(self, id_):
+        element = self.element(id_)
+        if not isinstance(element, SimulatedFile):
+            raise SimulatedXEditLibError(f'Interface #{int_arg(id_)} is not '
+                                         f'a file')
+        return element
+
+    def file_by_name(self, name):
+        for file_ in self.files:
+            if file_.name.lower() == name.lower():
+                return file_
+        return None
+
+    def add_file(self, filename, ignore_exists=False):
+        existing = self.file_by_name(filename)
+        if existing is not None:
+            if not ignore_exists:
+                raise SimulatedXEditLibError(f'File with name {filename} '
+                                             f'already exists')
+            return existing
+        file_ = SimulatedFile(filename, len(self.files))
+        header = new_record(file_, 'TES4', 0)
+        file_.children.append(header)
+        set_subrecord(header, 'HEDR').children[2].value = 0x800
+        set_subrecord(header, 'Master Files')
+        self.files.append(file_)
+        self.modified.add(file_)
+        return file_
+
+    @api_function
+    def AddFile(self, filename, ignore_exists, res):
+        return self.handle_result(res, self.add_file(filename,
+                                                     int_arg(ignore_exists)))
+
+    def file_by_index(self, index):
+        try:
+            return self.files[int_arg(index)]
+        except IndexError:
+            raise SimulatedXEditLibError(f'Failed to find file at index '
+                                         f'{int_arg(index)}')
+
+    @api_function
+    def FileByIndex(self, index, res):
+        return self.handle_result(res, self.file_by_index(index))
+
+    @api_function
+    def FileByLoadOrder(self, load_order, res):
+        return self.handle_result(res, self.file_by_index(load_order))
+
+    @api_function
+    def FileByName(self, name, res):
+        file_ = self.file_by_name(name)
+        if file_ is None:
+            raise SimulatedXEditLibError(f'Failed to find file {name}')
+        return self.handle_result(res, file_)
+
+    @api_function
+    def FileByAuthor(self, author, res):
+        for file_ in self.files:
+            if file_.header.subrecord_value('CNAM') == author:
+                return self.handle_result(res, file_)
+        raise SimulatedXEditLibError(f'Failed to find file with author '
+                                     f'{author}')
+
+    @api_function
+    def RenameFile(self, id_, filename):
+        self.file_element(id_).name = filename
+        return True
+
+    @api_function
+    def SaveFile(self, id_, file_path):
+        # there is nothing to save to; the file is just no longer modified
+        self.modified.discard(self.file_element(id_))
+        return True
+
+    @api_function
+    def GetRecordCount(self, id_, count):
+        set_out(count, len(self.file_element(id_).records))
+        return True
+
+    @api_function
+    def GetOverrideRecordCount(self, id_, count):
+        set_out(count, sum(record.master is not None for record in
+                           self.file_element(id_).records.values()))
+        return True
+
+    def file_digest(self, file_, hasher):
+        '''
+        Feeds a canonical dump of the given file into a hash function.
+        '''
+        for element in self.iter_elements(file_):
+            hasher(f'{element.path_key}={element.value}\n'.encode('utf-8'))
+
+    @api_function
+    def MD5Hash(self, id_, len_):
+        md5 = hashlib.md5()
+        self.file_digest(self.file_element(id_), md5.update)
+        return self.string_result(len_, md5.hexdigest().upper())
+
+    @api_function
+    def CRCHash(self, id_, len_):
+        crc = 0
+
+        def update(data):
+            nonlocal crc
+            crc = zlib.crc32(data, crc)
+        self.file_digest(self.file_element(id_), update)
+        return self.string_result(len_, f'{crc:08X}')
+
+    @api_function
+    def GetFileLoadOrder(self, id_, load_order):
+        set_out(load_order, self.file_element(id_).load_order)
+        return True
+
+    def SortEditorIDs(self, id_, sig):
+        return True
+
+    def SortNames(self, id_, sig):
+        return True
+
+    # master functions
+    def CleanMasters(self, id_):
+        return True
+
+    def SortMasters(self, id_):
+        return True
+
+    def add_master(self, file_, master):
+        if master is file_ or master in file_.masters:
+            return
+        file_.masters.append(master)
+        file_.masters.sort(key=lambda master: master.load_order)
+        master_files = file_.header.subrecord('Master Files')
+        master_files.children = [
+            master_files.definition.members[0].create(master_files, name)
+            for name in [master.name for master in file_.masters]]
+        self.modified.add(file_)
+
+    def add_master_by_name(self, file_, master_name):
+        master = self.file_by_name(master_name)
+        if master is None:
+            raise SimulatedXEditLibError(f'Master {master_name} is not '
+                                         f'loaded')
+        self.add_master(file_, master)
+
+    @api_function
+    def AddMaster(self, id_, master_name):
+        self.add_master_by_name(self.file_element(id_), master_name)
+        return True
+
+    @api_function
+    def AddMasters(self, id_, masters):
+        file_ = self.file_element(id_)
+        for name in re.split(r'[,\r\n]+', masters):
+            if name:
+                self.add_master_by_name(file_, name)
+        return True
+
+    @api_function
+    def AddRequiredMasters(self, id_, id2, as_new):
+        file_ = self.file_element(id2)
+        record = self.element(id_).record
+        if record is not None:
+            if not int_arg(as_new):
+                owner = record.master_record.file
+                self.add_master(file_, owner)
+            for element in self.iter_elements(record):
+                if element.kind == Kinds.REFERENCE and element.value:
+                    target = self.records.get(element.value)
+                    if target is not None:
+                        self.add_master(file_, target.file)
+        return True
+
+    @api_function
+    def GetMasters(self, id_, len_):
+        return self.array_result(len_, self.file_element(id_).masters)
+
+    @api_function
+    def GetRequiredBy(self, id_, len_):
+        file_ = self.file_element(id_)
+        return self.array_result(len_, [other for other in self.files
+                                         if file_ in other.masters])
+
+    @api_function
+    def GetMasterNames(self, id_, len_):
+        return self.string_result(len_, '\r\n'.join(
+            master.name for master in self.file_element(id_).masters))
+
+    # navigation
+    def children(self, element):
+        '''
+        Returns the child elements of the given element (or of the root,
+        for None).
+        '''
+        if element is None:
+            return self.files
+        if element.kind == Kinds.FLAGS:
+            return []
+        return element.children
+
+    def child(self, element, key):
+        '''
+        Returns the child of the given element (or of the root, for None)
+        that the given path segment refers to, or None.
+        '''
+        match = INDEX_PATTERN.match(key)
+        if match:
+            children = self.children(element)
+            index = int(match.group(1))
+            return children[index] if index < len(children) else None
+
+        if element is None:
+            if FORM_ID_PATTERN.match(key):
+                return self.records.get(int(key, 16))
+            return self.file_by_name(key)
+
+        if isinstance(element, SimulatedFile):
+            if key == 'File Header':
+                return element.header
+            if FORM_ID_PATTERN.match(key):
+                return element.records.get(int(key, 16))
+            signature = SIGNATURES_BY_NAME.get(key, key)
+            for group in element.children[1:]:
+                if group.signature == signature:
+                    return group
+            return None
+
+        if isinstance(element, SimulatedGroup):
+            if FORM_ID_PATTERN.match(key):
+                record = element.file.records.get(int(key, 16))
+                if record is not None and self.contains(element, record):
+                    return record
+                return None
+            for child in element.children:
+                if isinstance(child, SimulatedGroup):
+                    if child.name == key:
+                        return child
+                elif child.editor_id == key:
+                    return child
+            return None
+
+        if isinstance(element, SimulatedRecord) and key == 'Child Group':
+            return element.child_group
+
+        for child in element.children:
+            if child.definition is not None and child.definition.matches(key):
+                return child
+        return None
+
+    @staticmethod
+    def contains(ancestor, element):
+        while element is not None:
+            if element is ancestor:
+                return True
+            element = element.parent
+        return False
+
+    def resolve(self, id_, path):
+        '''
+        Returns the element at the given path from the element of the given
+        handle.
+        '''
+        return self.resolve_from(self.element(id_), path)
+
+    def resolve_from(self, element, path):
+        '''
+        Returns the element at the given path from the given element (or from
+        the root, for None).
+        '''
+        for key in path.split('\\') if path else ():
+            if not key:
+                continue
+            child = self.child(element, key)
+            if child is None:
+                raise SimulatedXEditLibError(f'Failed to resolve element at '
+                                             f'path: {path}')
+            element = child
+        return element
+
+    def resolve_element(self, id_, path):
+        '''
+        Like ``resolve``, but the path must lead to an actual element rather
+        than the root.
+        '''
+        element = self.resolve(id_, path)
+        if element is None:
+            raise SimulatedXEditLibError('The root is not an element')
+        return element
+
+    @staticmethod
+    def iter_elements(element):
+        '''
+        Yields the given element and all of its descendants, including the
+        contents of child groups.
+        '''
+        stack = [element]
+        while stack:
+            element = stack.pop()
+            yield element
+            children = element.children
+            if isinstance(element, SimulatedRecord) and element.child_group:
+                children = children + [element.child_group]
+            stack.extend(reversed(children))
+
+    # element functions
+    @api_function
+    def HasElement(self, id_, path, res):
+        try:
+            found = self.resolve(id_, path) is not None
+        except SimulatedXEditLibError:
+            found = False
+        set_out(res, found)
+        return True
+
+    @api_function
+    def GetElement(self, id_, path, res):
+        return self.handle_result(res, self.resolve_element(id_, path))
+
+    @api_function
+    def GetElements(self, id_, path, sort, filter_, sparse, len_):
+        return self.array_result(len_,
+                                 self.children(self.resolve(id_, path)))
+
+    def add_element(self, element, path):
+        '''
+        Resolves the given path from the given element, adding the elements
+        along it that do not exist yet; a `.` segment always adds a new
+        element.
+        '''
+        for key in path.split('\\') if path else ():
+            if key:
+                child = None if key == '.' else self.child(element, key)
+                element = child or self.add_child(element, key)
+        if element is None:
+            raise SimulatedXEditLibError('Failed to add element at the root')
+        self.mark_modified(element)
+        return element
+
+    @api_function
+    def AddElement(self, id_, path, res):
+        return self.handle_result(res,
+                                  self.add_element(self.element(id_), path))
+
+    def add_child(self, element, key):
+        '''
+        Adds a child element for the given path segment, which `child`
+        could not resolve.
+        '''
+        if element is None:
+            return self.add_file(key)
+        if isinstance(element, SimulatedFile):
+            signature = SIGNATURES_BY_NAME.get(key, key)
+            if signature not in SIGNATURE_NAMES:
+                raise SimulatedXEditLibError(f'Cannot add group {key}')
+            return element.group(signature)
+        if isinstance(element, SimulatedGroup):
+            if element.parent is not element.file or key not in (
+                    '.', element.signature):
+                raise SimulatedXEditLibError(f'Cannot add {key} to group '
+                                             f'{element.name}')
+            return self.new_record(element)
+        if isinstance(element, SimulatedRecord):
+            if record_def(element.signature, key) is None:
+                raise SimulatedXEditLibError(f'Cannot add {key} to '
+                                             f'{element.signature} record')
+            return set_subrecord(element, record_def(element.signature,
+                                                     key).signature or key)
+        if element.kind == Kinds.ARRAY and key in ('.', ''):
+            item = element.definition.members[0].create(element)
+            element.children.append(item)
+            return item
+        raise SimulatedXEditLibError(f'Cannot add {key} to {element.name}')
+
+    def new_record(self, group):
+        '''
+        Creates a new record in the given top-level group, with the next
+        object id of its file.
+        '''
+        file_ = group.file
+        next_object_id = file_.header.subrecord('HEDR').children[2]
+        form_id = (file_.load_order << 24) | next_object_id.value
+        next_object_id.value += 1
+        record = new_record(group, group.signature, form_id)
+        group.children.append(record)
+        file_.records[form_id] = record
+        self.records[form_id] = record
+        if group.signature in ('ARMO', 'NPC_', 'KYWD', 'GLOB', 'CELL',
+                               'REFR'):
+            set_subrecord(record, 'EDID')
+        return record
+
+    def mark_modified(self, element):
+        if element is not None and not isinstance(element, SimulatedFile):
+            self.modified.add(element.record or element)
+        self.modified.add(element.file)
+
+    @api_function
+    def AddElementValue(self, id_, path, value, res):
+        element = self.add_element(self.element(id_), path)
+        self.set_value(element, value)
+        return self.handle_result(res, element)
+
+    @api_function
+    def RemoveElement(self, id_, path):
+        element = self.resolve_element(id_, path)
+        self.remove(element)
+        return True
+
+    def remove(self, element):
+        parent = element.parent
+        if not self.is_removable(element):
+            raise SimulatedXEditLibError(f'Element {element.name} cannot be '
+                                         f'removed')
+        self.mark_modified(parent)
+        parent.children.remove(element)
+        if isinstance(element, SimulatedRecord):
+            file_ = element.file if parent is None else parent.file
+            file_.records.pop(element.form_id, None)
+            if element.master is not None:
+                element.master.overrides.remove(element)
+            elif self.records.get(element.form_id) is element:
+                del self.records[element.form_id]
+
+    @staticmethod
+    def is_removable(element):
+        parent = element.parent
+        if parent is None or isinstance(element, SimulatedFile):
+            return False
+        if isinstance(element, (SimulatedRecord, SimulatedGroup)):
+            return not (isinstance(element, SimulatedRecord) and
+                        element.signature == 'TES4')
+        return (parent.kind == Kinds.ARRAY or
+                isinstance(parent, SimulatedRecord) and
+                element.name != 'Record Header')
+
+    @api_function
+    def GetLinksTo(self, id_, path, res):
+        element = self.resolve_element(id_, path)
+        if element.kind != Kinds.REFERENCE:
+            raise SimulatedXEditLibError(f'{element.name} is not a reference')
+        record = self.visible_record(element.value, element.file)
+        if record is None:
+            raise SimulatedXEditLibError(f'{element.name} does not link to '
+                                         f'a record')
+        return self.handle_result(res, record)
+
+    def visible_record(self, form_id, file_):
+        '''
+        Returns the version of the record of the given FormID that the given
+        file sees: the latest one in the file itself or its masters.
+        '''
+        master = self.records.get(form_id)
+        if master is None:
+            return None
+        for override in reversed(master.overrides):
+            if override.file is file_ or override.file in file_.masters:
+                return override
+        return master
+
+    @api_function
+    def SetLinksTo(self, id_, path, id2):
+        element = self.resolve_element(id_, path)
+        record = self.element(id2)
+        if element.kind != Kinds.REFERENCE or not isinstance(
+                record, SimulatedRecord):
+            raise SimulatedXEditLibError('Can only link references to '
+                                         'records')
+        element.value = record.form_id
+        self.mark_modified(element)
+        return True
+
+    @api_function
+    def GetElementIndex(self, id_, index):
+        element = self.resolve_element(id_, '')
+        siblings = (self.files if isinstance(element, SimulatedFile) else
+                    element.parent.children)
+        set_out(index, siblings.index(element))
+        return True
+
+    @api_function
+    def GetContainer(self, id_, res):
+        element = self.resolve_element(id_, '')
+        if element.parent is None:
+            raise SimulatedXEditLibError(f'{element.name} has no container')
+        return self.handle_result(res, element.parent)
+
+    @api_function
+    def GetElementFile(self, id_, res):
+        return self.handle_result(res, self.resolve_element(id_, '').file)
+
+    @api_function
+    def GetElementGroup(self, id_, res):
+        element = self.resolve_element(id_, '').parent
+        while element is not None and not isinstance(element, SimulatedGroup):
+            element = element.parent
+        if element is None:
+            raise SimulatedXEditLibError('Element is not in a group')
+        return self.handle_result(res, element)
+
+    @api_function
+    def GetElementRecord(self, id_, res):
+        record = self.resolve_element(id_, '').record
+        if record is None:
+            raise SimulatedXEditLibError('Element is not in a record')
+        return self.handle_result(res, record)
+
+    @api_function
+    def ElementCount(self, id_, count):
+        set_out(count, len(self.children(self.element(id_))))
+        return True
+
+    @api_function
+    def ElementEquals(self, id_, id2, res):
+        set_out(res, self.element(id_) is self.element(id2))
+        return True
+
+    @api_function
+    def ElementMatches(self, id_, path, value, res):
+        set_out(res, self.value_matches(self.resolve_element(id_, path),
+                                        value))
+        return True
+
+    def value_matches(self, element, value):
+        '''
+        Returns whether the element's value matches the given string, which
+        for references may also be a FormID or an Editor ID.
+        '''
+        if self.format_value(element) == value:
+            return True
+        if element.kind == Kinds.REFERENCE:
+            record = self.records.get(element.value)
+            return record is not None and (
+                value == f'{element.value:08X}' or value == record.editor_id)
+        return False
+
+    def array_item(self, id_, path, subpath, value):
+        array_ = self.resolve_element(id_, path)
+        if array_.kind != Kinds.ARRAY:
+            raise SimulatedXEditLibError(f'{array_.name} is not an array')
+        for item in array_.children:
+            try:
+                target = self.resolve_from(item, subpath)
+            except SimulatedXEditLibError:
+                continue
+            if self.value_matches(target, value):
+                return array_, item
+        return array_, None
+
+    @api_function
+    def HasArrayItem(self, id_, path, subpath, value, res):
+        set_out(res, self.array_item(id_, path, subpath, value)[1]
+                is not None)
+        return True
+
+    @api_function
+    def GetArrayItem(self, id_, path, subpath, value, res):
+        item = self.array_item(id_, path, subpath, value)[1]
+        if item is None:
+            raise SimulatedXEditLibError(f'Failed to find array item with '
+                                         f'value {value}')
+        return self.handle_result(res, item)
+
+    @api_function
+    def AddArrayItem(self, id_, path, subpath, value, res):
+        array_ = self.resolve_element(id_, path)
+        if array_.kind != Kinds.ARRAY:
+            raise SimulatedXEditLibError(f'{array_.name} is not an array')
+        item = self.add_child(array_, '.')
+        if value:
+            self.set_value(self.resolve_from(item, subpath), value)
+        self.mark_modified(array_)
+        return self.handle_result(res, item)
+
+    @api_function
+    def RemoveArrayItem(self, id_, path, subpath, value):
+        array_, item = self.array_item(id_, path, subpath, value)
+        if item is not None:
+            self.remove(item)
+        return True
+
+    @api_function
+    def MoveArrayItem(self, id_, index):
+        item = self.resolve_element(id_, '')
+        siblings = item.parent.children
+        siblings.remove(item)
+        siblings.insert(int_arg(index), item)
+        self.mark_modified(item)
+        return True
+
+    @api_function
+    def CopyElement(self, id_, id2, as_new, res):
+        element = self.resolve_element(id_, '')
+        target = self.resolve_element(id2, '')
+        if isinstance(element, SimulatedRecord):
+            if not isinstance(target, SimulatedFile):
+                raise SimulatedXEditLibError('Records can only be copied '
+                                             'into files')
+            form_id = None
+            if int_arg(as_new):
+                next_object_id = target.header.subrecord('HEDR').children[2]
+                form_id = (target.load_order << 24) | next_object_id.value
+                next_object_id.value += 1
+            elif element.master_record.file is target:
+                raise SimulatedXEditLibError('Cannot override a record in '
+                                             'its own file')
+            else:
+                existing = target.records.get(element.form_id)
+                if existing is not None:
+                    return self.handle_result(res, existing)
+            copy = copy_record(element, target, form_id)
+            if form_id:
+                self.records[form_id] = copy
+            self.mark_modified(copy)
+            return self.handle_result(res, copy)
+
+        if not isinstance(target, SimulatedRecord):
+            raise SimulatedXEditLibError('Elements can only be copied into '
+                                         'records')
+        existing = self.child(target, element.path_key)
+        copy = element.copy(target)
+        if existing is not None:
+            target.children[target.children.index(existing)] = copy
+        else:
+            target.children.append(copy)
+        self.mark_modified(copy)
+        return self.handle_result(res, copy)
+
+    @api_function
+    def GetIsModified(self, id_, res):
+        element = self.resolve_element(id_, '')
+        set_out(res, (element.record or element) in self.modified)
+        return True
+
+    def GetIsEditable(self, id_, res):
+        set_out(res, True)
+        return True
+
+    def SetIsEditable(self, id_, editable):
+        return True
+
+    @api_function
+    def GetIsRemoveable(self, id_, res):
+        set_out(res, self.is_removable(self.resolve_element(id_, '')))
+        return True
+
+    @api_function
+    def GetCanAdd(self, id_, res):
+        element = self.resolve_element(id_, '')
+        set_out(res, isinstance(element, (SimulatedFile, SimulatedGroup,
+                                          SimulatedRecord)) or
+                element.kind == Kinds.ARRAY)
+        return True
+
+    @api_function
+    def ElementType(self, id_, res):
+        set_out(res, self.resolve_element(id_, '').element_type.value)
+        return True
+
+    @api_function
+    def DefType(self, id_, res):
+        set_out(res, self.resolve_element(id_, '').types[0].value)
+        return True
+
+    @api_function
+    def ValueType(self, id_, res):
+        set_out(res, self.resolve_element(id_, '').types[1].value)
+        return True
+
+    @api_function
+    def SmashType(self, id_, res):
+        set_out(res, self.resolve_element(id_, '').types[2].value)
+        return True
+
+    def IsSorted(self, id_, res):
+        set_out(res, False)
+        return True
+
+    def IsFixed(self, id_, res):
+        set_out(res, False)
+        return True
+
+    # element value functions
+    def element_name(self, element):
+        if isinstance(element, SimulatedRecord):
+            return element.display_name
+        if isinstance(element, SimulatedGroup):
+            if isinstance(element.parent, SimulatedFile):
+                return SIGNATURE_NAMES.get(element.signature,
+                                           element.signature)
+        return element.name
+
+    @api_function
+    def Name(self, id_, len_):
+        return self.string_result(
+            len_, self.element_name(self.resolve_element(id_, '')))
+
+    def record_long_name(self, record):
+        editor_id = record.editor_id
+        full = record.subrecord_value('FULL')
+        parts = [editor_id] if editor_id else []
+        if full:
+            parts.append(f'"{full}"')
+        parts.append(f'[{record.signature}:{record.form_id:08X}]')
+        return ' '.join(parts)
+
+    @api_function
+    def LongName(self, id_, len_):
+        element = self.resolve_element(id_, '')
+        if isinstance(element, SimulatedRecord):
+            return self.string_result(len_, self.record_long_name(element))
+        return self.string_result(len_, self.element_name(element))
+
+    @api_function
+    def DisplayName(self, id_, len_):
+        element = self.resolve_element(id_, '')
+        if isinstance(element, SimulatedFile):
+            return self.string_result(
+                len_, f'[{element.load_order:02X}] {element.name}')
+        if isinstance(element, SimulatedRecord):
+            return self.string_result(len_, self.record_long_name(element))
+        return self.string_result(len_, self.element_name(element))
+
+    def element_path(self, element, short, local):
+        '''
+        Builds the path of an element: the long path goes through every
+        group, the short path goes from the file straight to the closest
+        record, and the local path starts from within the record.
+        '''
+        keys = []
+        while element is not None:
+            if isinstance(element, SimulatedRecord):
+                if local:
+                    break
+                keys.append(element.path_key)
+                if short:
+                    keys.append(element.file.name)
+                    break
+            else:
+                keys.append(element.path_key)
+            element = element.parent
+        return '\\'.join(reversed(keys))
+
+    @api_function
+    def Path(self, id_, short, local, sort, len_):
+        element = self.resolve_element(id_, '')
+        return self.string_result(len_, self.element_path(
+            element, int_arg(short), int_arg(local)))
+
+    @api_function
+    def PathName(self, id_, sort, len_):
+        element = self.resolve_element(id_, '')
+        return self.string_result(len_, self.element_path(element, False,
+                                                          False))
+
+    @api_function
+    def Signature(self, id_, len_):
+        element = self.resolve_element(id_, '')
+        signature = element.signature
+        if element.element_type == ElementTypes.SubRecordArray:
+            # arrays of subrecords go by the signature of their items
+            signature = signature or element.definition.members[0].signature
+        if isinstance(element, SimulatedFile) or not signature:
+            raise SimulatedXEditLibError(f'{element.name} does not have a '
+                                         f'signature')
+        return self.string_result(len_, signature)
+
+    @api_function
+    def SortKey(self, id_, len_):
+        element = self.resolve_element(id_, '')
+        return self.string_result(len_, self.element_path(element, True,
+                                                          False))
+
+    def format_value(self, element):
+        '''
+        Returns the value of an element as the DLL would display it.
+        '''
+        kind = element.kind
+        value = element.value
+        if kind in (Kinds.STRING, Kinds.LSTRING):
+            return value
+        if kind == Kinds.INTEGER:
+            return str(value)
+        if kind == Kinds.FLOAT:
+            return f'{value:.6f}'
+        if kind == Kinds.REFERENCE:
+            if not value:
+                return 'NULL - Null Reference [00000000]'
+            record = self.records.get(value)
+            if record is None:
+                return f'[{value:08X}] < Error: Could not be resolved >'
+            editor_id = record.editor_id
+            reference = f'[{record.signature}:{value:08X}]'
+            return f'{editor_id} {reference}' if editor_id else reference
+        if kind == Kinds.FLAGS:
+            return ''.join('1' if value & (1 << index) else '0'
+                           for index in range(len(element.definition.options)))
+        if kind == Kinds.ENUM:
+            options = element.definition.options
+            return options[value] if 0 <= value < len(options) else str(value)
+        return ''
+
+    def parse_value(self, element, value):
+        '''
+        Parses a value given as a string into the native value of an element.
+        '''
+        kind = element.kind
+        try:
+            if kind in (Kinds.STRING, Kinds.LSTRING):
+                return value
+            if kind == Kinds.INTEGER:
+                return int(value, 0)
+            if kind == Kinds.FLOAT:
+                return float(value)
+            if kind == Kinds.REFERENCE:
+                match = REFERENCE_PATTERN.search(value)
+                if match:
+                    return int(match.group(2), 16)
+                if FORM_ID_PATTERN.match(value):
+                    return int(value, 16)
+                for form_id, record in self.records.items():
+                    if record.editor_id == value:
+                        return form_id
+                raise ValueError(value)
+            if kind == Kinds.FLAGS:
+                return sum(1 << index for index, bit in enumerate(value)
+                           if bit == '1')
+            if kind == Kinds.ENUM:
+                options = element.definition.options
+                return (options.index(value) if value in options else
+                        int(value))
+        except ValueError:
+            raise SimulatedXEditLibError(f'Invalid value {value!r} for '
+                                         f'{element.name}')
+        raise SimulatedXEditLibError(f'Cannot set the value of '
+                                     f'{element.name}')
+
+    def set_value(self, element, value):
+        element.value = self.parse_value(element, value)
+        self.mark_modified(element)
+
+    @api_function
+    def GetValue(self, id_, path, len_):
+        return self.string_result(
+            len_, self.format_value(self.resolve_element(id_, path)))
+
+    @api_function
+    def GetRefValue(self, id_, path, len_):
+        element = self.resolve_element(id_, path)
+        if element.kind != Kinds.REFERENCE:
+            raise SimulatedXEditLibError(f'{element.name} is not a reference')
+        return self.string_result(len_, f'{element.value:08X}')
+
+    @api_function
+    def SetValue(self, id_, path, value):
+        self.set_value(self.resolve_element(id_, path), value)
+        return True
+
+    def numeric_value(self, id_, path, kinds):
+        element = self.resolve_element(id_, path)
+        if element.kind in kinds:
+            return element.value
+        if element.kind in (Kinds.STRING, Kinds.LSTRING, Kinds.FLOAT,
+                            Kinds.INTEGER):
+            try:
+                return float(element.value)
+            except ValueError:
+                pass
+        raise SimulatedXEditLibError(f'{element.name} does not have a '
+                                     f'numeric value')
+
+    def set_numeric_value(self, id_, path, value, kinds):
+        element = self.resolve_element(id_, path)
+        if element.kind in kinds:
+            element.value = value
+        elif element.kind in (Kinds.STRING, Kinds.LSTRING):
+            element.value = str(value)
+        else:
+            raise SimulatedXEditLibError(f'Cannot set a numeric value on '
+                                         f'{element.name}')
+        self.mark_modified(element)
+        return True
+
+    INTEGER_KINDS = (Kinds.INTEGER, Kinds.REFERENCE, Kinds.FLAGS, Kinds.ENUM)
+    FLOAT_KINDS = INTEGER_KINDS + (Kinds.FLOAT,)
+
+    @api_function
+    def GetIntValue(self, id_, path, res):
+        set_out(res, int(self.numeric_value(id_, path, self.INTEGER_KINDS)))
+        return True
+
+    @api_function
+    def SetIntValue(self, id_, path, value):
+        return self.set_numeric_value(id_, path, int_arg(value),
+                                      self.INTEGER_KINDS)
+
+    @api_function
+    def GetUIntValue(self, id_, path, res):
+        set_out(res, int(self.numeric_value(id_, path, self.INTEGER_KINDS)) &
+                0xFFFFFFFF)
+        return True
+
+    @api_function
+    def SetUIntValue(self, id_, path, value):
+        return self.set_numeric_value(id_, path, int_arg(value),
+                                      self.INTEGER_KINDS)
+
+    @api_function
+    def GetFloatValue(self, id_, path, res):
+        set_out(res, float(self.numeric_value(id_, path, self.FLOAT_KINDS)))
+        return True
+
+    @api_function
+    def SetFloatValue(self, id_, path, value):
+        element = self.resolve_element(id_, path)
+        value = float(int_arg(value))
+        if element.kind == Kinds.INTEGER:
+            value = int(value)
+        return self.set_numeric_value(id_, path, value, self.FLOAT_KINDS)
+
+    def flags_element(self, id_, path):
+        element = self.resolve_element(id_, path)
+        if element.kind != Kinds.FLAGS:
+            raise SimulatedXEditLibError(f'{element.name} is not a flags '
+                                         f'element')
+        return element, element.definition.options
+
+    def flag_bit(self, options, name):
+        try:
+            return 1 << options.index(name)
+        except ValueError:
+            raise SimulatedXEditLibError(f'Flag {name} not found')
+
+    @api_function
+    def GetFlag(self, id_, path, name, res):
+        element, options = self.flags_element(id_, path)
+        set_out(res, bool(element.value & self.flag_bit(options, name)))
+        return True
+
+    @api_function
+    def SetFlag(self, id_, path, name, enabled):
+        element, options = self.flags_element(id_, path)
+        bit = self.flag_bit(options, name)
+        element.value = (element.value | bit if int_arg(enabled) else
+                         element.value & ~bit)
+        self.mark_modified(element)
+        return True
+
+    @api_function
+    def GetAllFlags(self, id_, path, len_):
+        element, options = self.flags_element(id_, path)
+        return self.string_result(len_, ','.join(options))
+
+    @api_function
+    def GetEnabledFlags(self, id_, path, len_):
+        element, options = self.flags_element(id_, path)
+        return self.string_result(len_, ','.join(
+            name for index, name in enumerate(options)
+            if element.value & (1 << index)))
+
+    @api_function
+    def SetEnabledFlags(self, id_, path, flags):
+        element, options = self.flags_element(id_, path)
+        element.value = sum(self.flag_bit(options, name)
+                            for name in flags.split(',') if name)
+        self.mark_modified(element)
+        return True
+
+    @api_function
+    def GetEnumOptions(self, id_, path, len_):
+        element = self.resolve_element(id_, path)
+        if element.kind != Kinds.ENUM:
+            raise SimulatedXEditLibError(f'{element.name} is not an enum')
+        return self.string_result(len_, ','.join(element.definition.options))
+
+    @api_function
+    def SignatureFromName(self, name, len_):
+        try:
+            return self.string_result(len_, SIGNATURES_BY_NAME[name])
+        except KeyError:
+            raise SimulatedXEditLibError(f'Unknown record name {name}')
+
+    @api_function
+    def NameFromSignature(self, sig, len_):
+        try:
+            return self.string_result(len_, SIGNATURE_NAMES[sig])
+        except KeyError:
+            raise SimulatedXEditLibError(f'Unknown signature {sig}')
+
+    @api_function
+    def GetSignatureNameMap(self, len_):
+        return self.string_result(len_, '\r\n'.join(
+            f'{signature}={name}'
+            for signature, name in SIGNATURE_NAMES.items()))
+
+    # record functions
+    def record_element(self, id_):
+        element = self.resolve_element(id_, '')
+        if not isinstance(element, SimulatedRecord):
+            raise SimulatedXEditLibError(f'{element.name} is not a record')
+        return element
+
+    @api_function
+    def GetFormID(self, id_, form_id, native):
+        record = self.record_element(id_)
+        set_out(form_id, record.file.native_form_id(record.form_id)
+                if int_arg(native) else record.form_id)
+        return True
+
+    @api_function
+    def SetFormID(self, id_, form_id, native, fix_references):
+        record = self.record_element(id_)
+        file_ = record.file
+        form_id = int_arg(form_id)
+        if int_arg(native):
+            form_id = file_.load_order_form_id(form_id)
+        old_form_id = record.form_id
+        file_.records.pop(old_form_id)
+        if self.records.get(old_form_id) is record:
+            del self.records[old_form_id]
+            self.records[form_id] = record
+        record.form_id = form_id
+        record.children[0].children[3].value = form_id
+        file_.records[form_id] = record
+        if int_arg(fix_references):
+            self.exchange_references(None, old_form_id, form_id)
+        self.mark_modified(record)
+        return True
+
+    def exchange_references(self, scope, old_form_id, new_form_id):
+        files = self.files if scope is None else [scope]
+        for file_ in files:
+            for element in self.iter_elements(file_):
+                if (element.kind == Kinds.REFERENCE and
+                        element.value == old_form_id):
+                    element.value = new_form_id
+
+    @api_function
+    def ExchangeReferences(self, id_, old_form_id, new_form_id):
+        self.exchange_references(self.resolve_element(id_, ''),
+                                 int_arg(old_form_id), int_arg(new_form_id))
+        return True
+
+    @api_function
+    def GetRecord(self, id_, form_id, search_masters, res):
+        form_id = int_arg(form_id)
+        element = self.element(id_)
+        if element is None:
+            record = self.records.get(form_id)
+        else:
+            file_ = element.file
+            form_id = file_.load_order_form_id(form_id)
+            record = file_.records.get(form_id)
+            if record is None and int_arg(search_masters):
+                record = self.visible_record(form_id, file_)
+        if record is None:
+            raise SimulatedXEditLibError(f'Failed to find record '
+                                         f'{form_id:08X}')
+        return self.handle_result(res, record)
+
+    def signature_filter(self, search):
+        '''
+        Returns the set of signatures a comma-separated search string of
+        signatures and/or record names refers to, or None for all.
+        '''
+        if not search:
+            return None
+        return {SIGNATURES_BY_NAME.get(key.strip(), key.strip())
+                for key in search.split(',')}
+
+    def iter_records(self, element):
+        '''
+        Yields the records in or under the given element (or the root, for
+        None), in tree order.
+        '''
+        roots = self.files if element is None else [element]
+        for root in roots:
+            for descendant in self.iter_elements(root):
+                if isinstance(descendant, SimulatedRecord):
+                    yield descendant
+
+    @api_function
+    def GetRecords(self, id_, search, include_overrides, len_):
+        signatures = self.signature_filter(search)
+        include_overrides = int_arg(include_overrides)
+        return self.array_result(len_, [
+            record for record in self.iter_records(self.element(id_))
+            if (signatures is None or record.signature in signatures) and
+            record.signature != 'TES4' and
+            (include_overrides or record.master is None)])
+
+    @api_function
+    def GetREFRs(self, id_, search, flags, len_):
+        signatures = self.signature_filter(search)
+        references = []
+        for record in self.iter_records(self.element(id_)):
+            if record.signature != 'REFR':
+                continue
+            base = self.records.get(record.subrecord_value('NAME', 0))
+            if signatures is None or (base is not None and
+                                      base.signature in signatures):
+                references.append(record)
+        return self.array_result(len_, references)
+
+    @api_function
+    def GetOverrides(self, id_, count):
+        return self.array_result(count,
+                                 self.record_element(id_).master_record
+                                 .overrides)
+
+    @api_function
+    def GetMasterRecord(self, id_, res):
+        return self.handle_result(res,
+                                  self.record_element(id_).master_record)
+
+    @api_function
+    def GetPreviousOverride(self, id_, id2, res):
+        record = self.record_element(id_)
+        file_ = self.file_element(id2)
+        master = record.master_record
+        previous = None
+        for version in [master] + master.overrides:
+            if version.file in file_.masters:
+                previous = version
+        if previous is None:
+            raise SimulatedXEditLibError('No previous override found')
+        return self.handle_result(res, previous)
+
+    @api_function
+    def GetWinningOverride(self, id_, res):
+        return self.handle_result(res,
+                                  self.record_element(id_).winning_override)
+
+    @api_function
+    def GetReferencedBy(self, id_, len_):
+        record = self.record_element(id_)
+        if self.referenced_by is None:
+            raise SimulatedXEditLibError('References have not been built')
+        return self.array_result(len_,
+                                 self.referenced_by.get(record.form_id, []))
+
+    def record_bool(self, id_, res, predicate):
+        set_out(res, predicate(self.record_element(id_)))
+        return True
+
+    @api_function
+    def IsMaster(self, id_, res):
+        return self.record_bool(id_, res, lambda record: record.master is None)
+
+    @api_function
+    def IsInjected(self, id_, res):
+        return self.record_bool(id_, res, lambda record: False)
+
+    @api_function
+    def IsOverride(self, id_, res):
+        return self.record_bool(id_, res,
+                                lambda record: record.master is not None)
+
+    @api_function
+    def IsWinningOverride(self, id_, res):
+        return self.record_bool(
+            id_, res, lambda record: record is record.winning_override)
+
+
+class SimulatedBackend(XEditLibBackend):
+    '''
+    A backend serving a synthetic load order through ``SimulatedXEditLib``,
+    a pure-python stand-in for ``XEditLib.dll``. It needs neither Windows nor
+    the DLL, so the whole ``Xelib``/``XEdit`` stack can be run, tested and
+    benchmarked anywhere. See example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        load_order = SyntheticLoadOrder(plugin_count=5,
+                                        records_per_signature=1000)
+        backend = SimulatedBackend(load_order)
+        with XEdit(plugins=load_order.plugin_names,
+                   backend=backend).session() as xedit:
+            ...
+
+    Every session gets freshly built plugins, so changes made in one session
+    do not carry over to the next.
+    '''
+    def __init__(self, load_order=None, load_delay=0.0):
+        '''
+        Args:
+            load_order (``SyntheticLoadOrder``):
+                the plugins available for loading; defaults to a small
+                synthetic load order
+            load_delay (``float``):
+                the simulated loading time of each plugin, in seconds
+        '''
+        self.load_order = load_order or SyntheticLoadOrder()
+        self.load_delay = load_delay
+
+    def load(self):
+        return SimulatedXEditLib(self.load_order, load_delay=self.load_delay)
@@ -0,0 +1,864 @@
+'''
+The element trees served by the simulated backend (see ``simulated.py``), and
+the generator of the synthetic load orders they are built from.
+
+The trees mimic the layout xEdit gives a plugin: a file holds its file header
+and one top-level group per record signature, groups hold records (or, for
+cells, blocks and sub-blocks of records), and records hold subrecords, which
+may in turn be structs, arrays, flags, references or plain values. Cells,
+worldspaces and dialog topics have child groups, holding the references of a
+cell, the cells of a worldspace and the infos of a topic.
+'''
+import random
+
+from pyxedit.xelib.wrapper_methods.elements import (DefTypes,
+                                                    ElementTypes,
+                                                    SmashTypes,
+                                                    ValueTypes)
+
+
+class Kinds:
+    '''
+    The kinds of values an element definition can describe.
+    '''
+    STRING = 'string'
+    LSTRING = 'lstring'
+    INTEGER = 'integer'
+    FLOAT = 'float'
+    REFERENCE = 'reference'
+    FLAGS = 'flags'
+    ENUM = 'enum'
+    STRUCT = 'struct'
+    ARRAY = 'array'
+
+    SCALARS = (STRING, LSTRING, INTEGER, FLOAT, REFERENCE, FLAGS, ENUM)
+
+    # (def type, value type, smash type) of each kind of element
+    TYPES = {
+        STRING: (DefTypes.String, ValueTypes.String, SmashTypes.String),
+        LSTRING: (DefTypes.LString, ValueTypes.String, SmashTypes.String),
+        INTEGER: (DefTypes.Integer, ValueTypes.Number, SmashTypes.Integer),
+        FLOAT: (DefTypes.Float, ValueTypes.Number, SmashTypes.Float),
+        REFERENCE: (DefTypes.Integer, ValueTypes.Reference,
+                    SmashTypes.Integer),
+        FLAGS: (DefTypes.Integer, ValueTypes.Flags, SmashTypes.Flag),
+        ENUM: (DefTypes.Integer, ValueTypes.Enum, SmashTypes.Integer),
+        STRUCT: (DefTypes.Struct, ValueTypes.Struct, SmashTypes.Struct),
+        ARRAY: (DefTypes.Array, ValueTypes.Array, SmashTypes.UnsortedArray),
+    }
+
+    # the value new elements of each kind start out with
+    DEFAULTS = {STRING: '', LSTRING: '', INTEGER: 0, FLOAT: 0.0,
+                REFERENCE: 0, FLAGS: 0, ENUM: 0}
+
+
+class ElementDef:
+    '''
+    The definition of an element: what it is called, what kind of value it
+    holds, and for structs and arrays, the definitions of its members.
+    '''
+    __slots__ = ('signature', 'name', 'kind', 'members', 'options')
+
+    def __init__(self, signature, name, kind, members=(), options=()):
+        '''
+        Args:
+            signature (``str``):
+                the signature of the subrecord, or '' for elements within
+                subrecords
+            name (``str``):
+                the name of the element
+            kind (``str``):
+                one of ``Kinds``
+            members (``List[ElementDef]``):
+                the members of a struct, or the single item definition of an
+                array
+            options (``List[str]``):
+                the flag names of flags, or the option names of enums
+        '''
+        self.signature = signature
+        self.name = name
+        self.kind = kind
+        self.members = list(members)
+        self.options = list(options)
+
+    @property
+    def full_name(self):
+        if self.signature:
+            return f'{self.signature} - {self.name}'
+        return self.name
+
+    def matches(self, key):
+        '''
+        Returns whether the given path segment refers to this definition.
+        '''
+        return key in (self.signature, self.name, self.full_name)
+
+    def member(self, key):
+        '''
+        Returns the definition of the member the given path segment refers
+        to, or None.
+        '''
+        for member in self.members:
+            if member.matches(key):
+                return member
+        return None
+
+    def create(self, parent, value=None):
+        '''
+        Creates a new element of this definition under the given parent,
+        with the given value (or the default value of its kind). Struct
+        members are created along with the struct; arrays start out empty.
+        '''
+        if self.kind == Kinds.ARRAY and self.members[0].signature:
+            element_type = ElementTypes.SubRecordArray
+        elif self.signature:
+            element_type = ElementTypes.SubRecord
+        elif self.kind == Kinds.STRUCT:
+            element_type = ElementTypes.Struct
+        elif self.kind == Kinds.ARRAY:
+            element_type = ElementTypes.Array
+        else:
+            element_type = ElementTypes.Value
+
+        element = SimulatedElement(element_type, self, parent)
+        if self.kind == Kinds.STRUCT:
+            element.children = [member.create(element)
+                                for member in self.members]
+        elif self.kind != Kinds.ARRAY:
+            element.value = (Kinds.DEFAULTS[self.kind]
+                             if value is None else value)
+        return element
+
+
+class SimulatedElement:
+    '''
+    An element of the simulated element tree.
+    '''
+    __slots__ = ('element_type', 'definition', 'parent', 'children', 'value',
+                 'name', 'signature')
+
+    def __init__(self, element_type, definition=None, parent=None,
+                 name=None, signature=None):
+        self.element_type = element_type
+        self.definition = definition
+        self.parent = parent
+        self.children = []
+        self.value = None
+        self.name = definition.full_name if name is None else name
+        self.signature = (definition.signature
+                          if signature is None else signature)
+
+    @property
+    def kind(self):
+        return self.definition.kind if self.definition else None
+
+    @property
+    def types(self):
+        '''
+        (``Tuple[DefTypes, ValueTypes, SmashTypes]``) the types of the element
+        '''
+        if self.definition:
+            return Kinds.TYPES[self.definition.kind]
+        return (DefTypes.Empty, ValueTypes.Unknown, SmashTypes.Unknown)
+
+    @property
+    def record(self):
+        '''
+        (``SimulatedRecord``) the record containing this element, if any
+        '''
+        element = self
+        while element is not None:
+            if isinstance(element, SimulatedRecord):
+                return element
+            element = element.parent
+        return None
+
+    @property
+    def file(self):
+        '''
+        (``SimulatedFile``) the file containing this element
+        '''
+        element = self
+        while not isinstance(element, SimulatedFile):
+            element = element.parent
+        return element
+
+    @property
+    def path_key(self):
+        '''
+        (``str``) the segment of a path leading to this element from its
+        parent
+        '''
+        parent = self.parent
+        if parent is not None and parent.kind == Kinds.ARRAY:
+            return f'[{parent.children.index(self)}]'
+        return self.signature or self.name
+
+    def copy(self, parent):
+        '''
+        Returns a deep copy of this element, placed under the given parent.
+        '''
+        element = SimulatedElement(self.element_type, self.definition, parent,
+                                   self.name, self.signature)
+        element.value = self.value
+        element.children = [child.copy(element) for child in self.children]
+        return element
+
+
+class SimulatedGroup(SimulatedElement):
+    '''
+    A group record of the simulated element tree; top-level groups have the
+    signature of their records, other groups have the `GRUP` signature.
+    '''
+    __slots__ = ()
+
+    def __init__(self, parent, name, signature='GRUP'):
+        super().__init__(ElementTypes.GroupRecord, None, parent, name,
+                         signature)
+
+    @property
+    def types(self):
+        return (DefTypes.Empty, ValueTypes.Unknown, SmashTypes.Unknown)
+
+    @property
+    def path_key(self):
+        parent = self.parent
+        if isinstance(parent, SimulatedRecord):
+            return 'Child Group'
+        if isinstance(parent, SimulatedFile):
+            return self.signature
+        return self.name
+
+    def group(self, name):
+        '''
+        Returns the subgroup of the given name, creating it if needed.
+        '''
+        for child in self.children:
+            if isinstance(child, SimulatedGroup) and child.name == name:
+                return child
+        group = SimulatedGroup(self, name)
+        self.children.append(group)
+        return group
+
+
+class SimulatedRecord(SimulatedElement):
+    '''
+    A main record of the simulated element tree. Besides its subrecords, a
+    record knows its load order FormID, the file it is defined in, the
+    master record it overrides (if any), its own overrides (if it is a
+    master record), and its child group (for cells).
+    '''
+    __slots__ = ('form_id', 'master', 'overrides', 'child_group')
+
+    def __init__(self, parent, signature, form_id, master=None):
+        super().__init__(ElementTypes.MainRecord, None, parent, '', signature)
+        self.form_id = form_id
+        self.master = master
+        self.overrides = []
+        self.child_group = None
+
+    @property
+    def types(self):
+        return (DefTypes.Record, ValueTypes.Unknown, SmashTypes.Record)
+
+    @property
+    def path_key(self):
+        return f'{self.form_id:08X}'
+
+    @property
+    def master_record(self):
+        return self.master or self
+
+    @property
+    def winning_override(self):
+        master = self.master_record
+        return master.overrides[-1] if master.overrides else master
+
+    def subrecord(self, signature):
+        for child in self.children:
+            if child.signature == signature:
+                return child
+        return None
+
+    def subrecord_value(self, signature, default=''):
+        subrecord = self.subrecord(signature)
+        return default if subrecord is None else subrecord.value
+
+    @property
+    def editor_id(self):
+        return self.subrecord_value('EDID')
+
+    @property
+    def display_name(self):
+        '''
+        (``str``) the name xEdit shows for the record: its FULL name if it has
+        one, otherwise its Editor ID
+        '''
+        return self.subrecord_value('FULL') or self.editor_id
+
+
+class SimulatedFile(SimulatedElement):
+    '''
+    A plugin file of the simulated element tree.
+    '''
+    __slots__ = ('load_order', 'masters', 'records')
+
+    def __init__(self, name, load_order, masters=()):
+        super().__init__(ElementTypes.File, None, None, name, '')
+        self.load_order = load_order
+        self.masters = list(masters)
+        self.records = {}
+
+    @property
+    def types(self):
+        return (DefTypes.Empty, ValueTypes.Unknown, SmashTypes.Unknown)
+
+    @property
+    def path_key(self):
+        return self.name
+
+    @property
+    def header(self):
+        return self.children[0]
+
+    def group(self, signature):
+        '''
+        Returns the top-level group of the given signature, creating it if
+        needed.
+        '''
+        for child in self.children[1:]:
+            if child.signature == signature:
+                return child
+        group = SimulatedGroup(self, SIGNATURE_NAMES.get(signature, signature),
+                               signature)
+
+        # keep the top-level groups in the order xEdit gives them
+        order = list(SIGNATURE_NAMES)
+        rank = order.index(signature) if signature in order else len(order)
+        index = len(self.children)
+        for position, child in enumerate(self.children[1:], 1):
+            if (child.signature in order and
+                    order.index(child.signature) > rank):
+                index = position
+                break
+        self.children.insert(index, group)
+        return group
+
+    def native_form_id(self, form_id):
+        '''
+        Converts a load order FormID to this file's native FormID, whose top
+        byte is an index into the file's masters (or the number of masters,
+        for records new to the file).
+        '''
+        load_order = form_id >> 24
+        for index, master in enumerate(self.masters):
+            if master.load_order == load_order:
+                return (index << 24) | (form_id & 0xFFFFFF)
+        return (len(self.masters) << 24) | (form_id & 0xFFFFFF)
+
+    def load_order_form_id(self, native_form_id):
+        '''
+        Converts a native FormID of this file to a load order FormID.
+        '''
+        index = native_form_id >> 24
+        owner = self.masters[index] if index < len(self.masters) else self
+        return (owner.load_order << 24) | (native_form_id & 0xFFFFFF)
+
+
+def struct(signature, name, *members):
+    return ElementDef(signature, name, Kinds.STRUCT, members=members)
+
+
+def value(name, kind, signature='', options=()):
+    return ElementDef(signature, name, kind, options=options)
+
+
+def array(signature, name, item):
+    return ElementDef(signature, name, Kinds.ARRAY, members=[item])
+
+
+SIGNATURE_NAMES = {'TES4': 'Main File Header',
+                   'KYWD': 'Keyword',
+                   'GLOB': 'Global',
+                   'ARMO': 'Armor',
+                   'NPC_': 'Non-Player Character (Actor)',
+                   'CELL': 'Cell',
+                   'WRLD': 'Worldspace',
+                   'DIAL': 'Dialog Topic',
+                   'INFO': 'Dialog response',
+                   'REFR': 'Placed Object'}
+
+RECORD_FLAGS = ['ESM', 'Unknown 2', 'Unknown 3', 'Unknown 4', 'Deleted',
+                'Constant', 'Localized', 'Must Update Anims',
+                'Persistent', 'Initially Disabled', 'Ignored']
+
+RECORD_HEADER = struct('', 'Record Header',
+                       value('Signature', Kinds.STRING),
+                       value('Data Size', Kinds.INTEGER),
+                       value('Record Flags', Kinds.FLAGS,
+                             options=RECORD_FLAGS),
+                       value('FormID', Kinds.REFERENCE),
+                       value('Version Control Info 1', Kinds.INTEGER),
+                       value('Form Version', Kinds.INTEGER),
+                       value('Version Control Info 2', Kinds.INTEGER))
+
+EDID = value('Editor ID', Kinds.STRING, 'EDID')
+FULL = value('Name', Kinds.LSTRING, 'FULL')
+OBND = struct('OBND', 'Object Bounds',
+              *[value(name, Kinds.INTEGER)
+                for name in ('X1', 'Y1', 'Z1', 'X2', 'Y2', 'Z2')])
+KSIZ = value('Keyword Count', Kinds.INTEGER, 'KSIZ')
+KWDA = array('KWDA', 'Keywords', value('Keyword', Kinds.REFERENCE))
+VECTOR = ('X', 'Y', 'Z')
+
+# the subrecords of each record signature, in order
+RECORD_DEFS = {
+    'TES4': [
+        struct('HEDR', 'Header',
+               value('Version', Kinds.FLOAT),
+               value('Number of Records', Kinds.INTEGER),
+               value('Next Object ID', Kinds.INTEGER)),
+        value('Author', Kinds.STRING, 'CNAM'),
+        value('Description', Kinds.STRING, 'SNAM'),
+        array('', 'Master Files', value('Filename', Kinds.STRING, 'MAST')),
+    ],
+    'KYWD': [
+        EDID,
+        struct('CNAM', 'Color',
+               *[value(name, Kinds.INTEGER)
+                 for name in ('Red', 'Green', 'Blue', 'Unused')]),
+    ],
+    'GLOB': [
+        EDID,
+        value('Type', Kinds.ENUM, 'FNAM', options=['Short', 'Long', 'Float']),
+        value('Value', Kinds.FLOAT, 'FLTV'),
+    ],
+    'ARMO': [
+        EDID,
+        OBND,
+        FULL,
+        KSIZ,
+        KWDA,
+        struct('DATA', 'Data',
+               value('Value', Kinds.INTEGER),
+               value('Weight', Kinds.FLOAT)),
+        value('Armor Rating', Kinds.FLOAT, 'DNAM'),
+    ],
+    'NPC_': [
+        EDID,
+        OBND,
+        struct('ACBS', 'Configuration',
+               value('Flags', Kinds.FLAGS,
+                     options=['Female', 'Essential', 'Is CharGen Face Preset',
+                              'Respawn', 'Auto-calc stats', 'Unique',
+                              'Doesn\'t affect stealth meter',
+                              'PC Level Mult', 'Protected']),
+               value('Magicka Offset', Kinds.INTEGER),
+               value('Stamina Offset', Kinds.INTEGER),
+               value('Level', Kinds.INTEGER),
+               value('Calc min level', Kinds.INTEGER),
+               value('Calc max level', Kinds.INTEGER),
+               value('Speed Multiplier', Kinds.INTEGER),
+               value('Disposition Base', Kinds.INTEGER),
+               value('Health Offset', Kinds.INTEGER),
+               value('Bleedout Override', Kinds.INTEGER)),
+        FULL,
+        KSIZ,
+        KWDA,
+    ],
+    'CELL': [
+        EDID,
+        FULL,
+        value('Flags', Kinds.FLAGS, 'DATA',
+              options=['Is Interior Cell', 'Has Water', 'Can Travel From Here',
+                       'No LOD Water', 'Unknown 5', 'Public Area',
+                       'Hand Changed', 'Show Sky', 'Use Sky Lighting']),
+    ],
+    'WRLD': [
+        EDID,
+        FULL,
+    ],
+    'DIAL': [
+        EDID,
+        FULL,
+    ],
+    'INFO': [
+        EDID,
+    ],
+    'REFR': [
+        EDID,
+        value('Base', Kinds.REFERENCE, 'NAME'),
+        struct('DATA', 'Position/Rotation',
+               struct('', 'Position',
+                      *[value(name, Kinds.FLOAT) for name in VECTOR]),
+               struct('', 'Rotation',
+                      *[value(name, Kinds.FLOAT) for name in VECTOR])),
+    ],
+}
+
+
+def record_def(signature, key):
+    '''
+    Returns the definition of the subrecord of the given record signature
+    that the given path segment refers to, or None.
+    '''
+    for definition in RECORD_DEFS.get(signature, ()):
+        if definition.matches(key):
+            return definition
+    return None
+
+
+def new_record(parent, signature, form_id, master=None):
+    '''
+    Creates an empty record (with just its record header) under the given
+    parent.
+    '''
+    record = SimulatedRecord(parent, signature, form_id, master=master)
+    header = RECORD_HEADER.create(record)
+    header.children[0].value = signature
+    header.children[3].value = form_id
+    record.children.append(header)
+    return record
+
+
+def set_subrecord(record, signature, value=None):
+    '''
+    Adds the subrecord of the given signature to a record, in definition
+    order, and returns it.
+    '''
+    existing = record.subrecord(signature)
+    if existing is not None:
+        return existing
+    definitions = RECORD_DEFS[record.signature]
+    definition = record_def(record.signature, signature)
+    subrecord = definition.create(record, value)
+    order = definitions.index(definition)
+    index = len(record.children)
+    for position, child in enumerate(record.children[1:], 1):
+        if (child.definition in definitions and
+                definitions.index(child.definition) > order):
+            index = position
+            break
+    record.children.insert(index, subrecord)
+    return subrecord
+
+
+def set_members(element, *values):
+    '''
+    Sets the values of the members of a struct element, in order.
+    '''
+    for member, value in zip(element.children, values):
+        member.value = value
+    return element
+
+
+class SyntheticLoadOrder:
+    '''
+    A configurable, deterministic load order of synthetic plugins for the
+    simulated backend to serve.
+
+    The first plugin is a master file; every plugin after it has all the
+    plugins before it as masters. Each plugin defines `records_per_signature`
+    new records of each signature in `signatures` (cells get
+    `references_per_cell` placed references in their child groups), and
+    overrides a `override_ratio` share of the records of its masters. Records
+    reference keywords (KWDA), and placed references reference armors and
+    NPCs as their base objects, so that the references can be followed.
+
+    Worldspaces and dialog topics are only generated when asked for in
+    `signatures`: each worldspace gets a persistent cell and exterior cells
+    in blocks and sub-blocks (with references, like other cells), and each
+    topic gets `INFOS_PER_TOPIC` infos.
+
+    The same configuration and `seed` always produce the same load order.
+    '''
+    SIGNATURES = ('KYWD', 'GLOB', 'ARMO', 'NPC_', 'CELL')
+
+    # the signatures only generated when asked for
+    EXTRA_SIGNATURES = ('WRLD', 'DIAL')
+
+    # the exterior blocks of each worldspace, and the sub-blocks of each
+    # block, each holding an exterior cell
+    WORLD_BLOCKS = 2
+    WORLD_SUB_BLOCKS = 2
+
+    INFOS_PER_TOPIC = 3
+
+    # the signatures whose records are overridden by later plugins
+    OVERRIDABLE_SIGNATURES = ('KYWD', 'GLOB', 'ARMO', 'NPC_')
+
+    def __init__(self,
+                 plugin_names=None,
+                 plugin_count=3,
+                 records_per_signature=100,
+                 signatures=SIGNATURES,
+                 override_ratio=0.1,
+                 keywords_per_record=3,
+                 references_per_cell=10,
+                 seed=0):
+        '''
+        Args:
+            plugin_names (``List[str]``):
+                the names of the plugins; defaults to `plugin_count` generated
+                names
+            plugin_count (``int``):
+                the number of plugins, if no names are given
+            records_per_signature (``int``):
+                the number of new records of each signature per plugin
+            signatures (``List[str]``):
+                the record signatures to generate, out of ``SIGNATURES`` and
+                ``EXTRA_SIGNATURES``
+            override_ratio (``float``):
+                the share of its masters' records each plugin overrides
+            keywords_per_record (``int``):
+                the number of keywords of armors and NPCs
+            references_per_cell (``int``):
+                the number of placed references in each cell
+            seed (``int``):
+                the seed of the random values
+        '''
+        self.plugin_names = list(plugin_names or (
+            ['Synthetic.esm'] +
+            [f'Synthetic{index}.esp' for index in range(1, plugin_count)]))
+        self.records_per_signature = records_per_signature
+        self.signatures = [signature for signature in
+                           self.SIGNATURES + self.EXTRA_SIGNATURES
+                           if signature in signatures]
+        self.override_ratio = override_ratio
+        self.keywords_per_record = keywords_per_record
+        self.references_per_cell = references_per_cell
+        self.seed = seed
+
+    def masters_of(self, name):
+        '''
+        Returns the names of the masters of the given plugin.
+        '''
+        return self.plugin_names[:self.plugin_names.index(name)]
+
+    def build(self, names=None):
+        '''
+        Builds the element trees of the given plugins (by default, all of
+        them), which must be a prefix of the load order, since each plugin
+        needs its masters.
+
+        Returns:
+            (``List[SimulatedFile]``) the built files, in load order
+        '''
+        names = self.plugin_names if names is None else names
+        files = []
+        for load_order, name in enumerate(names):
+            files.append(self.build_file(name, load_order, files))
+        return files
+
+    def build_file(self, name, load_order, masters):
+        '''
+        Builds the element tree of a single plugin, on top of its already
+        built masters.
+        '''
+        rng = random.Random(f'{self.seed}:{name}')
+        file_ = SimulatedFile(name, load_order, masters)
+
+        header = new_record(file_, 'TES4', 0)
+        file_.children.append(header)
+        set_members(set_subrecord(header, 'HEDR'), 1.7, 0, 0x800)
+        set_subrecord(header, 'CNAM', 'pyxedit')
+        master_files = set_subrecord(header, 'Master Files')
+        for master in masters:
+            master_files.children.append(
+                master_files.definition.members[0].create(master_files,
+                                                          master.name))
+        if load_order == 0:
+            header.children[0].children[2].value = 1
+
+        # overrides of master records come first, then new records
+        if masters:
+            self.build_overrides(file_, masters, rng)
+        keywords = [record.form_id for master in [*masters, file_]
+                    for record in master.records.values()
+                    if record.signature == 'KYWD']
+        next_id = 0x800
+        bases = []
+        for signature in self.signatures:
+            for index in range(self.records_per_signature):
+                form_id = (load_order << 24) | next_id
+                next_id += 1
+                record = self.build_record(file_, signature, form_id, index,
+                                           rng, keywords, bases)
+                if signature == 'KYWD':
+                    keywords.append(form_id)
+                elif signature in ('ARMO', 'NPC_'):
+                    bases.append(form_id)
+                elif signature == 'CELL':
+                    next_id = self.build_references(file_, record, next_id,
+                                                    rng, bases)
+                elif signature == 'WRLD':
+                    next_id = self.build_world_children(file_, record,
+                                                        next_id, rng, bases)
+                elif signature == 'DIAL':
+                    next_id = self.build_topic_children(file_, record,
+                                                        next_id)
+        set_members(header.subrecord('HEDR'), 1.7, len(file_.records),
+                    next_id)
+        return file_
+
+    def build_record(self, file_, signature, form_id, index, rng, keywords,
+                     bases):
+        '''
+        Builds a new record of the given signature with random values.
+        '''
+        if signature == 'CELL':
+            block = file_.group('CELL').group(f'Block {index % 10}')
+            parent = block.group(f'Sub-Block {index // 10 % 10}')
+        else:
+            parent = file_.group(signature)
+        record = new_record(parent, signature, form_id)
+        parent.children.append(record)
+        file_.records[form_id] = record
+
+        label = SIGNATURE_NAMES[signature].split(' ')[0]
+        editor_id = f'Synth{label}{file_.load_order:02d}x{index:05d}'
+        set_subrecord(record, 'EDID', editor_id)
+        if signature == 'KYWD':
+            set_members(set_subrecord(record, 'CNAM'),
+                        rng.randrange(256), rng.randrange(256),
+                        rng.randrange(256), 0)
+        elif signature == 'GLOB':
+            set_subrecord(record, 'FNAM', 2)
+            set_subrecord(record, 'FLTV', round(rng.uniform(0, 100), 2))
+        elif signature in ('ARMO', 'NPC_'):
+            bound = rng.randrange(1, 64)
+            set_members(set_subrecord(record, 'OBND'),
+                        -bound, -bound, 0, bound, bound, bound * 2)
+            set_subrecord(record, 'FULL', f'Synthetic {label} {index}')
+            self.set_keywords(record, rng.sample(
+                keywords, min(self.keywords_per_record, len(keywords))))
+            if signature == 'ARMO':
+                set_members(set_subrecord(record, 'DATA'),
+                            rng.randrange(1, 1000),
+                            round(rng.uniform(0.5, 50), 1))
+                set_subrecord(record, 'DNAM', float(rng.randrange(1, 50)))
+            else:
+                configuration = set_subrecord(record, 'ACBS')
+                set_members(configuration, rng.choice((0, 1, 8, 32)),
+                            0, 0, rng.randrange(1, 81))
+        elif signature == 'CELL':
+            set_subrecord(record, 'FULL', f'Synthetic Cell {index}')
+            set_subrecord(record, 'DATA', 1)
+        elif signature in ('WRLD', 'DIAL'):
+            set_subrecord(record, 'FULL', f'Synthetic {label} {index}')
+        return record
+
+    def build_child_record(self, file_, parent, signature, next_id,
+                           editor_id):
+        '''
+        Builds a new record with just an EditorID in the given child group
+        (or group within it).
+        '''
+        form_id = (file_.load_order << 24) | next_id
+        record = new_record(parent, signature, form_id)
+        parent.children.append(record)
+        file_.records[form_id] = record
+        set_subrecord(record, 'EDID', editor_id)
+        return record
+
+    def build_world_children(self, file_, world, next_id, rng, bases):
+        '''
+        Builds the child group of a worldspace: a persistent cell, followed
+        by exterior cells in blocks and sub-blocks, each cell with its
+        references. Returns the next free object id.
+        '''
+        child_group = SimulatedGroup(world, f'Children of {world.form_id:08X}')
+        world.child_group = child_group
+        for index in range(1 + self.WORLD_BLOCKS * self.WORLD_SUB_BLOCKS):
+            parent = child_group
+            if index:
+                block, sub_block = divmod(index - 1, self.WORLD_SUB_BLOCKS)
+                parent = child_group.group(f'Block {block}').group(
+                    f'Sub-Block {sub_block}')
+            cell = self.build_child_record(file_, parent, 'CELL', next_id,
+                                           f'{world.editor_id}Cell{index}')
+            set_subrecord(cell, 'DATA', 0)
+            next_id = self.build_references(file_, cell, next_id + 1, rng,
+                                            bases)
+        return next_id
+
+    def build_topic_children(self, file_, topic, next_id):
+        '''
+        Builds the child group of a dialog topic, holding its infos, and
+        returns the next free object id.
+        '''
+        child_group = SimulatedGroup(topic, f'Children of {topic.form_id:08X}')
+        topic.child_group = child_group
+        for index in range(self.INFOS_PER_TOPIC):
+            self.build_child_record(file_, child_group, 'INFO', next_id,
+                                    f'{topic.editor_id}Info{index}')
+            next_id += 1
+        return next_id
+
+    def build_references(self, file_, cell, next_id, rng, bases):
+        '''
+        Builds the placed references in the child group of a cell, and
+        returns the next free object id.
+        '''
+        if not bases or not self.references_per_cell:
+            return next_id
+        child_group = SimulatedGroup(cell, f'Children of {cell.form_id:08X}')
+        cell.child_group = child_group
+        temporary = child_group.group('Temporary')
+        for _ in range(self.references_per_cell):
+            form_id = (file_.load_order << 24) | next_id
+            next_id += 1
+            reference = new_record(temporary, 'REFR', form_id)
+            temporary.children.append(reference)
+            file_.records[form_id] = reference
+            set_subrecord(reference, 'NAME', rng.choice(bases))
+            data = set_subrecord(reference, 'DATA')
+            set_members(data.children[0],
+                        *[round(rng.uniform(-4096, 4096), 3)
+                          for _ in VECTOR])
+            set_members(data.children[1],
+                        *[round(rng.uniform(0, 6.283), 4) for _ in VECTOR])
+        return next_id
+
+    def build_overrides(self, file_, masters, rng):
+        '''
+        Overrides a share of the records of the given masters in the file.
+        '''
+        for master in masters:
+            candidates = [record for record in master.records.values()
+                          if record.master is None and
+                          record.signature in self.OVERRIDABLE_SIGNATURES]
+            count = int(len(candidates) * self.override_ratio)
+            for record in rng.sample(candidates, count):
+                override = copy_record(record, file_)
+                full = override.subrecord('FULL')
+                if full is not None:
+                    full.value = f'{full.value} ({file_.name})'
+
+    @staticmethod
+    def set_keywords(record, keywords):
+        set_subrecord(record, 'KSIZ', len(keywords))
+        keyword_array = set_subrecord(record, 'KWDA')
+        item = keyword_array.definition.members[0]
+        keyword_array.children = [item.create(keyword_array, keyword)
+                                  for keyword in keywords]
+
+
+def copy_record(record, file_, form_id=None):
+    '''
+    Copies a record into the given file: as an override of the record's
+    master record, or as a new record if a new FormID is given.
+    '''
+    master = None if form_id else record.master_record
+    parent = file_.group(record.signature)
+    copy = SimulatedRecord(parent, record.signature,
+                           form_id or record.form_id, master=master)
+    copy.children = [child.copy(copy) for child in record.children]
+    copy.children[0].children[3].value = copy.form_id
+    parent.children.append(copy)
+    file_.records[copy.form_id] = copy
+    if master is not None:
+        # keep the overrides in load order
+        master.overrides.append(copy)
+        master.overrides.sort(key=lambda override: override.file.load_order)
+    return copy
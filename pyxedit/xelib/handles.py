@@ -0,0 +1,259 @@
+import sys
+import weakref
+
+
+class HandleRegistry:
+    '''
+    Keeps track of opened xedit-lib handles for the ``Xelib`` handle
+    management contexts.
+
+    The registry is a stack of layers, one per ``manage_handles`` context,
+    where each layer is a set of the handles opened within that context. In
+    addition to the layers, the registry keeps a mapping of each handle to
+    the depth of the layer holding it, so that tracking, releasing and
+    promoting a single handle never needs to scan through the stack.
+
+    The layer sets themselves are handed out to ``XEditBase`` objects so that
+    they can check the validity of their handle with a single set lookup; a
+    layer set is therefore only ever mutated in place, never replaced.
+    '''
+    def __init__(self):
+        self.layers = [set()]
+        self._depths = {}
+
+    def __contains__(self, handle):
+        return handle in self._depths
+
+    def __len__(self):
+        return len(self._depths)
+
+    def __iter__(self):
+        return iter(self._depths)
+
+    @property
+    def current(self):
+        '''
+        (``Set[int]``) The innermost layer, where new handles get tracked
+        '''
+        return self.layers[-1]
+
+    def layer_of(self, handle):
+        '''
+        Returns the layer holding the given handle, or None if the handle is
+        not tracked.
+        '''
+        depth = self._depths.get(handle)
+        return None if depth is None else self.layers[depth]
+
+    def track(self, handle):
+        '''
+        Tracks the given handle in the current layer.
+        '''
+        self.layers[-1].add(handle)
+        self._depths[handle] = len(self.layers) - 1
+
+    def track_many(self, handles):
+        '''
+        Tracks all of the given handles in the current layer.
+        '''
+        depth = len(self.layers) - 1
+        self.layers[-1].update(handles)
+        self._depths.update(dict.fromkeys(handles, depth))
+
+    def untrack(self, handle):
+        '''
+        Stops tracking the given handle. Returns whether the handle was
+        tracked to begin with.
+        '''
+        depth = self._depths.pop(handle, None)
+        if depth is None:
+            return False
+        self.layers[depth].discard(handle)
+        return True
+
+    def promote(self, handle):
+        '''
+        Moves the given handle from its layer to the parent layer. Returns the
+        parent layer, or None if the handle cannot be promoted (because it is
+        not tracked, or is already in the outermost layer).
+        '''
+        depth = self._depths.get(handle)
+        if not depth:
+            return None
+        self.layers[depth].discard(handle)
+        parent_layer = self.layers[depth - 1]
+        parent_layer.add(handle)
+        self._depths[handle] = depth - 1
+        return parent_layer
+
+    def push(self):
+        '''
+        Pushes a new, empty layer onto the stack.
+        '''
+        self.layers.append(set())
+
+    def pop(self):
+        '''
+        Pops the current layer off the stack, and stops tracking all of its
+        handles. The outermost layer is never popped. Returns the list of
+        handles that were in the popped layer.
+        '''
+        if len(self.layers) == 1:
+            raise IndexError('cannot pop the outermost handle layer')
+        return self._drain(self.layers.pop())
+
+    def drain_current(self):
+        '''
+        Stops tracking all handles in the current layer, leaving the layer
+        itself in place. Returns the list of handles that were in the layer.
+        '''
+        return self._drain(self.layers[-1])
+
+    def drain_all(self):
+        '''
+        Stops tracking all handles in every layer, leaving the layers
+        themselves in place. Returns the list of handles that were tracked.
+        '''
+        handles = list(self._depths)
+        self._depths.clear()
+        for layer in self.layers:
+            layer.clear()
+        return handles
+
+    def _drain(self, layer):
+        handles = list(layer)
+        for handle in handles:
+            del self._depths[handle]
+        layer.clear()
+        return handles
+
+
+class ReleaseQueue:
+    '''
+    A queue of handles waiting to be released.
+
+    Releasing a handle through ``XEditLib.dll`` is a call across the DLL
+    boundary; when many short-lived objects release their handles one at a
+    time, this adds up. Instead, handles can be pushed onto this queue, and
+    they will be released together once the queue has grown to ``batch_size``
+    handles, or whenever ``flush`` is called explicitly.
+    '''
+    DEFAULT_BATCH_SIZE = 256
+
+    def __init__(self, release, batch_size=DEFAULT_BATCH_SIZE):
+        '''
+        Args:
+            release (``Callable[[int], Any]``):
+                the function to call to actually release each handle
+            batch_size (``int``):
+                the number of queued handles at which the queue automatically
+                flushes itself
+        '''
+        self._release = release
+        self._pending = []
+        self.batch_size = batch_size
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, handle):
+        '''
+        Queues the given handle for release, flushing the queue if it has
+        reached the batch size.
+        '''
+        self._pending.append(handle)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        '''
+        Releases all queued handles. Returns the number of handles released.
+        '''
+        pending, self._pending = self._pending, []
+        for handle in pending:
+            self._release(handle)
+        return len(pending)
+
+    def discard(self):
+        '''
+        Drops all queued handles without releasing them; this is for when
+        the handles have become meaningless, such as after the session ended.
+        '''
+        self._pending = []
+
+
+class HandleFinalizer(weakref.ref):
+    '''
+    A weak reference to an object wrapping a handle, which has the handle
+    released once the object gets garbage collected.
+
+    This does the same job as a ``weakref.finalize``, at a fraction of its
+    memory cost; this matters since there is one of these for every xedit
+    object. Like ``weakref.finalize`` with ``atexit`` turned off, it does
+    nothing once the interpreter is shutting down.
+
+    Live finalizers are kept alive by the ``HandleFinalizers`` registry they
+    belong to, keyed by their handle. A finalizer that is no longer the one
+    registered for its handle (because it has been detached, or another
+    object has since taken over the handle) does nothing.
+    '''
+    __slots__ = ('handle', 'registry')
+
+    def __new__(cls, obj, handle, registry):
+        return super().__new__(cls, obj, cls._collected)
+
+    def __init__(self, obj, handle, registry):
+        super().__init__(obj, self._collected)
+        self.handle = handle
+        self.registry = registry
+        registry.live[handle] = self
+
+    @property
+    def alive(self):
+        '''
+        (``bool``) Whether the finalizer will still release the handle
+        '''
+        return self.registry.live.get(self.handle) is self
+
+    def detach(self):
+        '''
+        Cancels the finalizer; the handle will not be released once the
+        object gets garbage collected.
+        '''
+        if self.alive:
+            del self.registry.live[self.handle]
+
+    @staticmethod
+    def _collected(finalizer):
+        if finalizer.alive:
+            del finalizer.registry.live[finalizer.handle]
+            if not sys.is_finalizing():
+                finalizer.registry.release(finalizer.handle)
+
+
+class HandleFinalizers:
+    '''
+    A registry of the live ``HandleFinalizer`` objects of a session.
+    '''
+    def __init__(self, release):
+        '''
+        Args:
+            release (``Callable[[int], Any]``):
+                the function to call with the handle of each object that
+                gets garbage collected
+        '''
+        self.release = release
+        self.live = {}
+
+    def __len__(self):
+        return len(self.live)
+
+    def __contains__(self, handle):
+        return handle in self.live
+
+    def watch(self, obj, handle):
+        '''
+        Creates a finalizer that releases ``handle`` once ``obj`` gets
+        garbage collected.
+        '''
+        return HandleFinalizer(obj, handle, self)
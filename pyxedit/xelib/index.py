@@ -0,0 +1,239 @@
+from collections import namedtuple
+
+
+# where a record can be found: the plugin it was read from, and its (load
+# order) FormID
+RecordLocation = namedtuple('RecordLocation', ['plugin', 'form_id'])
+
+# a version of a record, as indexed: its (load order) FormID, its signature
+# and its EditorID (empty if it has none)
+IndexEntry = namedtuple('IndexEntry', ['form_id', 'signature', 'editor_id'])
+
+
+class RecordIndex:
+    '''
+    An index of the records of a session, mapping EditorIDs and FormIDs to
+    where the records are, so that looking a record up does not take a scan,
+    or a path to be parsed by ``XEditLib.dll``.
+
+    The index is built once, by reading the EditorID and FormID of every
+    record (overrides included) of every loaded plugin, in load order; see
+    ``Xelib.record_index``. After that, records added to the session through
+    ``Xelib`` (``add_element``, ``add_element_value`` and ``copy_element``),
+    and EditorIDs set through ``set_value`` or ``add_element_value`` on an
+    ``EDID`` path (or through ``set_value`` on an ``EDID`` element), are
+    indexed as they are made, so the index stays in step
+    with the session without being rebuilt.
+
+    EditorIDs are matched case-insensitively, as they are by the games. An
+    EditorID maps to the latest record version in load order to carry it;
+    records added later (e.g. copied as new records) take over the EditorIDs
+    they carry. A record goes by the EditorID of its latest version, so the
+    EditorID it had before being renamed (or by an earlier version) no
+    longer finds it.
+
+    Given a ``RecordIndexCache``, the entries of each plugin are read from
+    (or written to) the cache rather than read from the session every time.
+    '''
+    def __init__(self, xelib, cache=None):
+        self.xelib = xelib
+        self.cache = cache
+
+        # lowercased EditorID -> RecordLocation
+        self.editor_ids = {}
+
+        # FormID -> the lowercased EditorID the record is indexed by
+        self.editor_id_keys = {}
+
+        # lowercased EditorID -> RecordLocations of the other records that
+        # carry it, taken over by the one in editor_ids; the last one takes
+        # it back should that one be renamed
+        self.shadowed_editor_ids = {}
+
+        # FormID -> names of the plugins holding a version of the record, in
+        # load order (so the master first, and the winning override last)
+        self.plugins_by_form_id = {}
+
+        # FormID -> signature
+        self.signatures = {}
+
+        # plugin name -> position in the load order
+        self.load_order = {}
+
+    def __len__(self):
+        return len(self.plugins_by_form_id)
+
+    def build(self):
+        '''
+        Indexes every record of the loaded plugins.
+        '''
+        xelib = self.xelib
+        with xelib.manage_handles():
+            for index in range(int(xelib.get_global('FileCount'))):
+                plugin = xelib.file_by_index(index)
+                plugin_name = xelib.name(plugin)
+                self.load_order[plugin_name] = index
+                if self.cache:
+                    entries = self.cache.load(xelib,
+                                              plugin,
+                                              plugin_name,
+                                              self.read_entries)
+                else:
+                    entries = self.read_entries(plugin)
+                for entry in entries:
+                    self.add_entry(entry, plugin_name)
+        return self
+
+    def read_entries(self, plugin, native=False):
+        '''
+        Returns the entries of every record of the given plugin, overrides
+        included; with the native FormIDs of the plugin if ``native`` is set,
+        rather than load order FormIDs.
+        '''
+        xelib = self.xelib
+        with xelib.manage_handles():
+            entries = (self.read_entry(record, native)
+                       for record in xelib.get_records(plugin, '', True))
+            return [entry for entry in entries if entry.form_id]
+
+    def read_entry(self, record, native=False):
+        xelib = self.xelib
+        return IndexEntry(xelib.get_form_id(record, native, ex=False),
+                          xelib.signature(record, ex=False) or '',
+                          xelib.editor_id(record, ex=False) or '')
+
+    def add(self, record, plugin_name):
+        '''
+        Indexes the given record, as found in the plugin of the given name.
+        '''
+        entry = self.read_entry(record)
+        if entry.form_id:
+            self.add_entry(entry, plugin_name)
+
+    def add_entry(self, entry, plugin_name):
+        '''
+        Indexes a version of a record, found in the plugin of the given name.
+        '''
+        form_id, signature, editor_id = entry
+        plugins = self.plugins_by_form_id.setdefault(form_id, [])
+        if plugin_name not in plugins:
+            plugins.append(plugin_name)
+            if len(plugins) > 1:
+                plugins.sort(key=self.load_order_of)
+        self.signatures[form_id] = signature
+
+        key = editor_id.lower()
+        order = self.load_order_of(plugin_name)
+        previous_key = self.editor_id_keys.get(form_id)
+        if previous_key is not None and previous_key != key:
+            previous = self.editor_ids.get(previous_key)
+            if (previous is not None and previous.form_id == form_id and
+                    order < self.load_order_of(previous.plugin)):
+                # a later version of the record names it
+                return
+            self.drop_editor_id(previous_key, form_id)
+            del self.editor_id_keys[form_id]
+
+        if key:
+            location = self.editor_ids.get(key)
+            if (location is None or location.form_id != form_id or
+                    order >= self.load_order_of(location.plugin)):
+                if location is not None and location.form_id != form_id:
+                    self.shadowed_editor_ids.setdefault(key, []).append(
+                        location)
+                self.editor_ids[key] = RecordLocation(plugin_name, form_id)
+                self.editor_id_keys[form_id] = key
+
+    def drop_editor_id(self, key, form_id):
+        '''
+        Stops the lowercased EditorID given from finding the record with the
+        given FormID, handing it back to the record it was taken over from,
+        if any.
+        '''
+        shadowed = [location
+                    for location in self.shadowed_editor_ids.pop(key, [])
+                    if location.form_id != form_id]
+        location = self.editor_ids.get(key)
+        if location is not None and location.form_id == form_id:
+            if shadowed:
+                self.editor_ids[key] = shadowed.pop()
+            else:
+                del self.editor_ids[key]
+        if shadowed:
+            self.shadowed_editor_ids[key] = shadowed
+
+    def load_order_of(self, plugin_name):
+        '''
+        Returns the position of the plugin of the given name in the load
+        order; plugins added after the index was built go last.
+        '''
+        return self.load_order.setdefault(plugin_name, len(self.load_order))
+
+    def element_added(self, handle):
+        '''
+        Indexes the element of the given handle, if it is a record.
+        '''
+        xelib = self.xelib
+        if xelib.element_type(handle, ex=False) == \
+                xelib.ElementTypes.MainRecord:
+            self.record_changed(handle)
+
+    def record_changed(self, record):
+        '''
+        Re-indexes the given record, e.g. after its EditorID has been set.
+        '''
+        xelib = self.xelib
+        with xelib.manage_handles():
+            plugin = xelib.get_element_file(record, ex=False)
+            if plugin:
+                self.add(record, xelib.name(plugin))
+
+    def locate_editor_id(self, editor_id):
+        '''
+        Returns the ``RecordLocation`` of the record with the given
+        EditorID, or None if there is none.
+        '''
+        return self.editor_ids.get(editor_id.lower())
+
+    def locate_form_id(self, form_id):
+        '''
+        Returns the names of the plugins holding a version of the record with
+        the given (load order) FormID, in load order, or an empty list if
+        there is no such record.
+        '''
+        return self.plugins_by_form_id.get(form_id, [])
+
+    def signature_of(self, form_id):
+        '''
+        Returns the signature of the record with the given (load order)
+        FormID, or None if there is no such record.
+        '''
+        return self.signatures.get(form_id)
+
+    def get_record(self, form_id, plugin_name=None):
+        '''
+        Returns a handle to the winning override of the record with the given
+        FormID, or to its version in the plugin of the given name; or 0 if
+        there is no such record.
+        '''
+        xelib = self.xelib
+        plugins = self.locate_form_id(form_id)
+        if not plugins or (plugin_name and plugin_name not in plugins):
+            return 0
+        master = xelib.get_record(0, form_id, ex=False)
+        if not master or len(plugins) == 1 or plugin_name == plugins[0]:
+            return master
+        if not plugin_name:
+            winning = xelib.get_winning_override(master, ex=False)
+            xelib.release_handle(master)
+            return winning
+
+        # the overrides of a record come in load order, after its master
+        version = plugins.index(plugin_name)
+        overrides = xelib.get_overrides(master, ex=False)
+        xelib.release_handle(master)
+        record = overrides[version - 1] if version <= len(overrides) else 0
+        for handle in overrides:
+            if handle != record:
+                xelib.release_handle(handle)
+        return record
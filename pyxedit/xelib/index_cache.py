@@ -0,0 +1,246 @@
+from collections import namedtuple
+from pathlib import Path
+import mmap
+import os
+import struct
+
+from pyxedit.xelib.index import IndexEntry
+
+
+# what an index file is valid for: the size and modification time of the
+# plugin file (or -1 when it is not on disk), and the plugin's digest
+Fingerprint = namedtuple('Fingerprint', ['size', 'mtime', 'digest'])
+
+
+class RecordIndexCache:
+    '''
+    A directory of index files, one per plugin, holding the FormIDs,
+    signatures and EditorIDs of the records of the plugin (overrides
+    included), so that the ``RecordIndex`` of a new session can be built
+    without reading every record again. See ``Xelib.record_index``.
+
+    Index files are keyed by a fingerprint of their plugin: its size and
+    modification time, and its ``crc_hash`` (or ``md5_hash``). When the size
+    and modification time of a plugin match those of its index file, the file
+    is used as it is; otherwise the plugin is hashed, and the index file is
+    only rebuilt if the digest changed too. An index file that cannot be read
+    (e.g. truncated) is rebuilt as well. FormIDs are stored as the native
+    FormIDs of the plugin, so index files stay valid when the load order
+    changes; they are mapped to load order FormIDs through the file IDs the
+    plugin's masters have in the session (light plugins included). Plugins
+    modified during the session are never cached.
+
+    An index file is a header, followed by a table of fixed-size record
+    entries and by the EditorIDs the entries point into; it is memory-mapped
+    and unpacked in place when reused.
+    '''
+    MAGIC = b'PXRI'
+    VERSION = 1
+
+    # magic, version, size, mtime, digest, record count
+    HEADER = struct.Struct('<4sHqq32sI')
+
+    # native FormID, signature, EditorID offset, EditorID length
+    ENTRY = struct.Struct('<I4sIH')
+
+    def __init__(self, directory, digest='crc'):
+        '''
+        Args:
+            directory (``str``):
+                the directory to keep index files in; created if missing
+            digest (``str``):
+                the hash fingerprinting plugins, ``'crc'`` or ``'md5'``
+        '''
+        if digest not in ('crc', 'md5'):
+            raise ValueError(f'Unknown digest {digest!r}; expected crc '
+                             f'or md5')
+        self.directory = Path(directory)
+        self.digest = digest
+        self.hits = 0
+        self.misses = 0
+
+    def path_of(self, plugin_name):
+        '''
+        Returns the path of the index file of the plugin of the given name.
+        '''
+        return self.directory / f'{plugin_name.lower()}.{self.digest}.idx'
+
+    def plugin_path(self, xelib, plugin_name):
+        return Path(xelib.get_global('DataPath')) / plugin_name
+
+    def stat(self, xelib, plugin_name):
+        '''
+        Returns the size and modification time (in ns) of the plugin file,
+        or (-1, -1) if it cannot be found.
+        '''
+        try:
+            stat = os.stat(self.plugin_path(xelib, plugin_name))
+        except OSError:
+            return -1, -1
+        return stat.st_size, stat.st_mtime_ns
+
+    def hash(self, xelib, plugin):
+        if self.digest == 'md5':
+            return xelib.md5_hash(plugin)
+        return xelib.crc_hash(plugin)
+
+    def to_load_order(self, xelib, plugin, entries):
+        '''
+        Converts the native FormIDs of the given entries of the plugin to
+        load order FormIDs.
+
+        The file ID that each master byte of the native FormIDs stands for is
+        found by looking up one record of the plugin per master byte: a full
+        plugin keeps the 24 low bits of a FormID under its load order byte,
+        and a light plugin the 12 low bits under ``FE`` and its light slot.
+
+        Raises:
+            ``ValueError``: if a record of the entries is not in the plugin
+        '''
+        samples = {}
+        for form_id, _, _ in entries:
+            samples.setdefault(form_id >> 24, form_id)
+
+        # master byte -> (file ID bits, object ID mask)
+        file_ids = {}
+        with xelib.manage_handles():
+            for master, form_id in samples.items():
+                record = xelib.get_record(plugin, form_id, False, ex=False)
+                if not record:
+                    raise ValueError(f'No record {form_id:08X} in the plugin')
+                load_order_id = xelib.get_form_id(record, ex=False)
+                mask = 0xFFF if load_order_id >> 24 == 0xFE else 0xFFFFFF
+                file_ids[master] = (load_order_id & ~mask, mask)
+
+        return [IndexEntry(file_ids[form_id >> 24][0] |
+                           (form_id & file_ids[form_id >> 24][1]),
+                           signature,
+                           editor_id)
+                for form_id, signature, editor_id in entries]
+
+    def read_header(self, path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read(self.HEADER.size)
+        except OSError:
+            return None
+        if len(data) < self.HEADER.size:
+            return None
+        magic, version, size, mtime, digest, count = \
+            self.HEADER.unpack(data)
+        if magic != self.MAGIC or version != self.VERSION:
+            return None
+        return Fingerprint(size, mtime, digest.rstrip(b'\0').decode('ascii'))
+
+    def lookup(self, xelib, plugin, plugin_name):
+        '''
+        Returns the fingerprint of the given plugin, and whether its index
+        file is up to date with it. The plugin is only hashed if its size or
+        modification time do not match those of its index file.
+        '''
+        path = self.path_of(plugin_name)
+        cached = self.read_header(path)
+        size, mtime = self.stat(xelib, plugin_name)
+        if cached and size >= 0 and (size, mtime) == cached[:2]:
+            return cached, True
+        fingerprint = Fingerprint(size, mtime, self.hash(xelib, plugin))
+        if cached and cached.digest == fingerprint.digest:
+            # the plugin was touched, but not changed
+            self.write_header(path, fingerprint)
+            return fingerprint, True
+        return fingerprint, False
+
+    def load(self, xelib, plugin, plugin_name, read_entries):
+        '''
+        Returns the entries of the records of the given plugin, from its
+        index file if that is up to date, and otherwise from
+        ``read_entries(plugin)``, writing a new index file with them.
+
+        Returns:
+            (``List[IndexEntry]``) the entries, with load order FormIDs
+        '''
+        if xelib.get_is_modified(plugin, ex=False):
+            return read_entries(plugin)
+        path = self.path_of(plugin_name)
+        fingerprint, fresh = self.lookup(xelib, plugin, plugin_name)
+        if fresh:
+            try:
+                entries = self.to_load_order(xelib, plugin, self.read(path))
+            except (OSError, ValueError, struct.error):
+                # a damaged index file is rebuilt
+                pass
+            else:
+                self.hits += 1
+                return entries
+        self.misses += 1
+        entries = read_entries(plugin, native=True)
+        self.write(path, fingerprint, entries)
+        return self.to_load_order(xelib, plugin, entries)
+
+    def read(self, path):
+        '''
+        Reads the entries of an index file, with native FormIDs.
+
+        Raises:
+            ``ValueError`` or ``struct.error``: if the file is damaged
+        '''
+        header_size = self.HEADER.size
+        with open(path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data, \
+                memoryview(data) as view:
+            count = self.HEADER.unpack_from(view)[-1]
+            editor_ids = header_size + count * self.ENTRY.size
+            if count:
+                # the EditorIDs follow the table in the order of the entries,
+                # so the last entry ends with the file
+                _, _, offset, length = self.ENTRY.unpack_from(
+                    view, editor_ids - self.ENTRY.size)
+                if editor_ids + offset + length != len(view):
+                    raise ValueError(f'{path} is truncated')
+            return [IndexEntry(form_id,
+                               signature.decode('ascii'),
+                               str(view[editor_ids + offset:
+                                        editor_ids + offset + length],
+                                   'utf-8'))
+                    for form_id, signature, offset, length in
+                    self.ENTRY.iter_unpack(view[header_size:editor_ids])]
+
+    def write(self, path, fingerprint, entries):
+        '''
+        Writes an index file of entries with native FormIDs. The file is
+        written under a temporary name and then moved into place, so that a
+        reader never sees half of it.
+        '''
+        table = bytearray()
+        editor_ids = bytearray()
+        for form_id, signature, editor_id in entries:
+            encoded = editor_id.encode('utf-8')
+            table += self.ENTRY.pack(
+                form_id,
+                signature.encode('ascii'),
+                len(editor_ids),
+                len(encoded))
+            editor_ids += encoded
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(self.pack_header(fingerprint, len(entries)))
+            f.write(table)
+            f.write(editor_ids)
+        os.replace(temp_path, path)
+
+    def write_header(self, path, fingerprint):
+        with open(path, 'r+b') as f:
+            count = self.HEADER.unpack(f.read(self.HEADER.size))[-1]
+            f.seek(0)
+            f.write(self.pack_header(fingerprint, count))
+
+    def pack_header(self, fingerprint, count):
+        return self.HEADER.pack(self.MAGIC,
+                                self.VERSION,
+                                fingerprint.size,
+                                fingerprint.mtime,
+                                fingerprint.digest.encode('ascii'),
+                                count)
+
@@ -0,0 +1,216 @@
+from collections import namedtuple
+from concurrent.futures import CancelledError, Future
+import asyncio
+import threading
+import time
+
+from pyxedit.xelib.wrapper_methods.helpers import XelibError
+from pyxedit.xelib.wrapper_methods.setup import LoaderStates
+
+# a message logged by the plugin loader, with the seconds elapsed since the
+# load started when it was picked up
+LoaderEvent = namedtuple('LoaderEvent', ['message', 'elapsed'])
+
+
+class PluginLoad:
+    '''
+    Tracks a plugin load started by ``Xelib.load_plugins_async``, which
+    ``XEditLib.dll`` runs in a background thread of its own.
+
+    The load is followed by polling the loader status, adaptively: the first
+    polls come quickly, so that small loads are picked up as done with next
+    to no latency, and the interval then backs off exponentially up to
+    `max_interval`, so that long loads cost few polls. When given a
+    `progress` callback, each poll also streams the messages the loader has
+    logged (e.g. `Loading Skyrim.esm`) to it as ``LoaderEvent`` objects;
+    otherwise the messages are left for ``Xelib.get_messages``.
+
+    A load can be waited on in any of three ways:
+        - blocking, with `wait`
+        - from a coroutine, by awaiting the load itself
+        - through a ``concurrent.futures.Future``, from `future`, which polls
+          from a background thread
+
+    Waiting fails with a ``XelibError`` if the loader errors, or if the load
+    takes longer than `timeout` seconds, and with a ``CancelledError`` once
+    `cancel` has been called. Neither timing out nor cancelling stops the
+    DLL's loader thread; end the session to discard the load.
+
+    Nothing but the polling should use the session until the load is done.
+    '''
+    INITIAL_INTERVAL = 0.001
+    MAX_INTERVAL = 0.1
+    BACKOFF = 2
+
+    def __init__(self,
+                 xelib,
+                 progress=None,
+                 timeout=None,
+                 initial_interval=INITIAL_INTERVAL,
+                 max_interval=MAX_INTERVAL):
+        '''
+        Args:
+            xelib (``Xelib``):
+                the session the load was started in
+            progress (``Callable[[LoaderEvent], None]``):
+                called with each message logged by the loader
+            timeout (``float``):
+                seconds after which to give up on the load; None to wait
+                indefinitely
+            initial_interval (``float``):
+                seconds between the first polls
+            max_interval (``float``):
+                the most seconds to let pass between polls
+        '''
+        self.xelib = xelib
+        self.progress = progress
+        self.timeout = timeout
+        self.max_interval = max_interval
+        self.status = LoaderStates.Active
+        self.polls = 0
+        self._interval = initial_interval
+        self._started = time.perf_counter()
+        self._cancelled = False
+
+    def __repr__(self):
+        return (f'<{self.__class__.__name__} {self.status.name} '
+                f'{self.elapsed:.3f}s>')
+
+    @property
+    def elapsed(self):
+        '''
+        (``float``) seconds elapsed since the load started
+        '''
+        return time.perf_counter() - self._started
+
+    def done(self):
+        '''
+        Returns whether the load has finished (successfully or not), or has
+        been cancelled.
+        '''
+        return self._cancelled or self.status != LoaderStates.Active
+
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        '''
+        Stops waiting on the load; whatever is waiting on it gets a
+        ``CancelledError``. Returns False if the load has already finished.
+        '''
+        if self.status != LoaderStates.Active:
+            return False
+        self._cancelled = True
+        return True
+
+    def poll(self):
+        '''
+        Checks on the loader once, streaming any new messages to the progress
+        callback.
+
+        Returns:
+            (``bool``) whether the load is done
+        '''
+        if self._cancelled:
+            raise CancelledError('Plugin load was cancelled')
+        self.polls += 1
+
+        # the status is read before the messages, so that everything logged
+        # up to the end of the load is streamed
+        status = self.xelib.get_loader_status()
+        if self.progress:
+            self.stream_messages()
+        self.status = status
+
+        if status == LoaderStates.Error:
+            raise XelibError(f'Plugin loader failed after '
+                             f'{self.elapsed:.3f}s: '
+                             f'{self.xelib.get_xelib_error_str()}')
+        if status != LoaderStates.Active:
+            return True
+        if self.timeout is not None and self.elapsed > self.timeout:
+            raise XelibError(f'Timed out after {self.timeout}s waiting for '
+                             f'plugins to load')
+        return False
+
+    def stream_messages(self):
+        messages = self.xelib.get_messages()
+        elapsed = self.elapsed
+        for message in messages.splitlines():
+            if message:
+                self.progress(LoaderEvent(message, elapsed))
+
+    def next_interval(self):
+        '''
+        Returns how long to wait before the next poll, backing off for the
+        polls after it. The wait never goes past the timeout.
+        '''
+        interval = self._interval
+        self._interval = min(interval * self.BACKOFF, self.max_interval)
+        if self.timeout is not None:
+            interval = max(min(interval, self.timeout - self.elapsed), 0)
+        return interval
+
+    def wait(self):
+        '''
+        Blocks until the load is done.
+
+        Returns:
+            (``Xelib.LoaderStates``) the final loader status
+        '''
+        while not self.poll():
+            time.sleep(self.next_interval())
+        return self.status
+
+    async def wait_async(self):
+        '''
+        Waits on the load without blocking the event loop; the load can also
+        simply be awaited.
+
+        Returns:
+            (``Xelib.LoaderStates``) the final loader status
+        '''
+        while not self.poll():
+            await asyncio.sleep(self.next_interval())
+        return self.status
+
+    def __await__(self):
+        return self.wait_async().__await__()
+
+    def future(self):
+        '''
+        Waits on the load from a background thread.
+
+        Returns:
+            (``concurrent.futures.Future``) a future of the final loader
+            status; cancelling the future cancels the load
+        '''
+        future = LoadFuture(self)
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self.wait())
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run,
+                         name='pyxedit-plugin-load',
+                         daemon=True).start()
+        return future
+
+
+class LoadFuture(Future):
+    '''
+    The future returned by ``PluginLoad.future``, which cancels its load when
+    cancelled, even while running.
+    '''
+    def __init__(self, load):
+        super().__init__()
+        self.load = load
+
+    def cancel(self):
+        if super().cancel():
+            return True
+        return self.load.cancel()
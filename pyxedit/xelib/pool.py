@@ -0,0 +1,376 @@
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.util import Finalize
+from threading import BrokenBarrierError
+import multiprocessing
+import os
+import time
+import traceback
+
+from pyxedit.xelib.wrapper_methods.helpers import XelibError
+from pyxedit.xelib.wrapper_methods.setup import SetupMethods
+from pyxedit.xelib.xelib import Xelib
+
+
+# shards of the records of a load order, for SessionPool.map to hand out to
+# its workers; shards are plain data, so that they can be sent over to worker
+# processes and used as keys
+class PluginShard(namedtuple('PluginShard', ['plugin'])):
+    '''
+    The records of a plugin, overrides included.
+    '''
+    __slots__ = ()
+
+    def records(self, xelib):
+        return xelib.get_records(xelib.file_by_name(self.plugin), '', True)
+
+
+class GroupShard(namedtuple('GroupShard', ['plugin', 'signature'])):
+    '''
+    The records of a top-level group of a plugin, overrides included.
+    '''
+    __slots__ = ()
+
+    def records(self, xelib):
+        return xelib.get_records(xelib.file_by_name(self.plugin),
+                                 self.signature,
+                                 True)
+
+
+class FormIDShard(namedtuple('FormIDShard', ['start', 'stop'])):
+    '''
+    The master records of the load order with (load order) FormIDs in the
+    range [start, stop).
+    '''
+    __slots__ = ()
+
+    def records(self, xelib):
+        form_ids = WORKER.form_ids()
+        start = bisect_left(form_ids, self.start)
+        stop = bisect_left(form_ids, self.stop)
+        return [xelib.get_record(0, form_id)
+                for form_id in form_ids[start:stop]]
+
+
+# how a job went, as reported back by a worker
+ShardOutcome = namedtuple('ShardOutcome', ['shard', 'pid', 'result', 'error'])
+
+# a job that failed, with the formatted traceback of its exception
+ShardError = namedtuple('ShardError', ['shard', 'pid', 'type', 'message',
+                                       'traceback'])
+
+# what a worker reports once its session is loaded
+WorkerInfo = namedtuple('WorkerInfo', ['pid', 'load_seconds', 'plugins'])
+
+
+class SessionPoolError(XelibError):
+    '''
+    Raised by ``SessionPool.map`` once all shards have been run, when any of
+    them failed. Carries the errors of the failed shards, and the results of
+    the others.
+    '''
+    def __init__(self, errors, results):
+        self.errors = errors
+        self.results = results
+        summary = '; '.join(f'{error.shard}: {error.type}: {error.message}'
+                            for error in errors[:3])
+        more = f' (and {len(errors) - 3} more)' if len(errors) > 3 else ''
+        super().__init__(f'{len(errors)} of {len(errors) + len(results)} '
+                         f'shards failed: {summary}{more}')
+
+
+class WorkerSession:
+    '''
+    The ``Xelib`` session of a pool worker process, started when the worker
+    starts, and kept for every job the worker runs after that.
+    '''
+    # seconds for a worker to wait for the others during warm-up
+    WARM_UP_TIMEOUT = 60
+
+    def __init__(self):
+        self.xelib = None
+        self.load_seconds = None
+        self.warm_up_barrier = None
+        self._form_ids = None
+
+    def start(self, xelib_kwargs, warm_up_barrier):
+        self.warm_up_barrier = warm_up_barrier
+        started = time.perf_counter()
+        self.xelib = Xelib(**xelib_kwargs)
+        self.xelib.start_session()
+        self.load_seconds = time.perf_counter() - started
+
+        # pool workers exit without running atexit handlers, but they do run
+        # multiprocessing finalizers
+        Finalize(self, self.xelib.end_session, exitpriority=10)
+
+    def form_ids(self):
+        '''
+        Returns the sorted FormIDs of the master records of the load order;
+        worked out once per worker, on first use.
+        '''
+        if self._form_ids is None:
+            xelib = self.xelib
+            with xelib.manage_handles():
+                self._form_ids = sorted(xelib.get_form_id(record)
+                                        for record in xelib.get_records(0))
+        return self._form_ids
+
+
+WORKER = WorkerSession()
+
+
+def start_worker(xelib_kwargs, warm_up_barrier):
+    WORKER.start(xelib_kwargs, warm_up_barrier)
+
+
+def warm_up(xelib):
+    '''
+    Reports on the worker once every worker has loaded its session. Waiting
+    for the others makes sure each worker gets one of these jobs.
+    '''
+    WORKER.warm_up_barrier.wait(WORKER.WARM_UP_TIMEOUT)
+    return WorkerInfo(os.getpid(),
+                      WORKER.load_seconds,
+                      xelib.get_loaded_file_names())
+
+
+def run_in_worker(function, args):
+    xelib = WORKER.xelib
+    with xelib.manage_handles():
+        return function(xelib, *args)
+
+
+def run_shard(function, shard, args):
+    '''
+    Runs a job on a shard in a worker, reporting back its result, or its
+    error, as plain data.
+    '''
+    try:
+        result = run_in_worker(function, (shard,) + args)
+    except Exception as e:
+        error = ShardError(shard, os.getpid(), type(e).__name__, str(e),
+                           traceback.format_exc())
+        return ShardOutcome(shard, os.getpid(), None, error)
+    return ShardOutcome(shard, os.getpid(), result, None)
+
+
+def load_order_form_ids(xelib):
+    return WORKER.form_ids()
+
+
+def top_group_signatures(xelib, plugins):
+    signatures = {}
+    for plugin in plugins:
+        groups = xelib.get_elements(xelib.file_by_name(plugin))
+        signatures[plugin] = [signature for signature
+                              in map(xelib.signature, groups)
+                              if signature != 'TES4']
+    return signatures
+
+
+class SessionPool:
+    '''
+    A pool of worker processes, each with its own ``Xelib`` session on the
+    same plugins, for spreading read-only analysis of a load order over
+    several cores. See example:
+
+    .. highlight:: python
+    .. code-block:: python
+
+        def count_keywords(xelib, shard):
+            return sum(xelib.element_count(record, 'KWDA')
+                       for record in shard.records(xelib))
+
+        with SessionPool(plugins=['GOT.esp'], processes=4) as pool:
+            counts = pool.map(count_keywords, pool.group_shards())
+
+    Work is handed out in shards (see ``plugin_shards``, ``group_shards`` and
+    ``form_id_shards``); a job is a function called with a worker's ``Xelib``
+    and a shard, from which ``shard.records(xelib)`` gives handles to the
+    records of the shard. Jobs run within a ``manage_handles`` context of
+    their own, and must return plain data (e.g. values, dicts, the JSON from
+    ``element_to_json``), since handles mean nothing outside of the worker's
+    session. Job functions must be picklable, i.e. defined at module level.
+
+    Workers load their session once, when the pool starts, and keep it for
+    every job they run; edits made by a job are seen by later jobs run by
+    the same worker only, so jobs should not make any.
+    '''
+    def __init__(self,
+                 game_mode=SetupMethods.GameModes.SSE,
+                 game_path=None,
+                 plugins=None,
+                 xeditlib_path=None,
+                 backend=None,
+                 index_cache=None,
+                 processes=None,
+                 mp_context=None):
+        '''
+        Args:
+            game_mode, game_path, plugins, xeditlib_path, backend, index_cache:
+                the ``Xelib`` arguments of the worker sessions; the backend
+                must be picklable
+            processes (``int``):
+                the number of worker processes; defaults to the number of
+                CPUs
+            mp_context (``multiprocessing.context.BaseContext``):
+                the multiprocessing context to start workers with
+        '''
+        self.xelib_kwargs = {'game_mode': game_mode,
+                             'game_path': game_path,
+                             'plugins': plugins,
+                             'xeditlib_path': xeditlib_path,
+                             'backend': backend,
+                             'index_cache': index_cache}
+        self.processes = processes or os.cpu_count()
+        self.mp_context = mp_context
+        self.workers = {}
+        self.jobs_by_worker = Counter()
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def started(self):
+        return self._executor is not None
+
+    def start(self):
+        '''
+        Starts the worker processes, and waits for each of them to load its
+        session, so that the time spent loading is not charged to the first
+        jobs.
+
+        Returns:
+            (``Dict[int, WorkerInfo]``) the workers started so far, by pid
+        '''
+        if self.started:
+            return self.workers
+        context = self.mp_context or multiprocessing.get_context()
+        self._executor = ProcessPoolExecutor(
+                             max_workers=self.processes,
+                             mp_context=context,
+                             initializer=start_worker,
+                             initargs=(self.xelib_kwargs,
+                                       context.Barrier(self.processes)))
+        futures = [self._executor.submit(run_in_worker, warm_up, ())
+                   for _ in range(self.processes)]
+        wait(futures)
+        try:
+            for future in futures:
+                info = future.result()
+                self.workers[info.pid] = info
+        except (BrokenProcessPool, BrokenBarrierError) as e:
+            self.close()
+            raise XelibError(f'Failed to start the session pool: a worker '
+                             f'failed to load its session ({e!r})') from e
+        return self.workers
+
+    def close(self):
+        '''
+        Ends the worker sessions, and stops the worker processes.
+        '''
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self.workers = {}
+
+    def call(self, function, *args):
+        '''
+        Runs ``function(xelib, *args)`` in one of the workers.
+
+        Returns:
+            the result of the function
+        '''
+        self.start()
+        try:
+            return self._executor.submit(run_in_worker,
+                                         function,
+                                         args).result()
+        except BrokenProcessPool as e:
+            raise XelibError(f'A session pool worker died: {e}') from e
+
+    def map(self, function, shards, *args):
+        '''
+        Runs ``function(xelib, shard, *args)`` on each of the given shards,
+        spread over the workers, and waits for all of them.
+
+        Args:
+            function (``Callable``):
+                the job to run on each shard; see the class docstring
+            shards (``Iterable``):
+                the shards to run the job on
+            args:
+                any further arguments to pass to the job
+
+        Returns:
+            (``List``) the results of the job, in the order of the shards
+
+        Raises:
+            ``SessionPoolError``: once all shards have been run, if the job
+            failed on any of them
+        '''
+        self.start()
+        shards = list(shards)
+        try:
+            futures = [self._executor.submit(run_shard, function, shard, args)
+                       for shard in shards]
+            outcomes = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            raise XelibError(f'A session pool worker died: {e}') from e
+
+        self.jobs_by_worker.update(outcome.pid for outcome in outcomes)
+        errors = [outcome.error for outcome in outcomes if outcome.error]
+        if errors:
+            raise SessionPoolError(errors, {outcome.shard: outcome.result
+                                            for outcome in outcomes
+                                            if not outcome.error})
+        return [outcome.result for outcome in outcomes]
+
+    def plugin_names(self):
+        '''
+        Returns the names of the plugins loaded by the workers.
+        '''
+        return self.call(Xelib.get_loaded_file_names)
+
+    def plugin_shards(self, plugins=None):
+        '''
+        Returns a shard per plugin (by default, per loaded plugin).
+        '''
+        return [PluginShard(plugin)
+                for plugin in plugins or self.plugin_names()]
+
+    def group_shards(self, signatures=None, plugins=None):
+        '''
+        Returns a shard per top-level group of each plugin (by default, each
+        loaded plugin), optionally only for groups of the given signatures.
+        '''
+        plugins = plugins or self.plugin_names()
+        groups = self.call(top_group_signatures, plugins)
+        return [GroupShard(plugin, signature)
+                for plugin in plugins
+                for signature in groups[plugin]
+                if signatures is None or signature in signatures]
+
+    def form_id_shards(self, count=None):
+        '''
+        Splits the master records of the load order into `count` (by default,
+        one per worker) shards of consecutive FormIDs, with about as many
+        records in each.
+        '''
+        count = count or self.processes
+        form_ids = self.call(load_order_form_ids)
+        if not form_ids:
+            return []
+        size = -(-len(form_ids) // count)
+        starts = form_ids[::size]
+        stops = starts[1:] + [form_ids[-1] + 1]
+        return [FormIDShard(start, stop)
+                for start, stop in zip(starts, stops)]
@@ -0,0 +1,278 @@
+from array import array
+from collections import defaultdict
+import ctypes
+from pathlib import Path
+import sys
+import time
+
+
+# sizes of the items copied out by the result getter functions, used for
+# counting the bytes transferred across the DLL boundary
+RESULT_ITEM_SIZES = {'GetResultString': ctypes.sizeof(ctypes.c_wchar),
+                     'GetResultArray': ctypes.sizeof(ctypes.c_uint),
+                     'GetResultBytes': ctypes.sizeof(ctypes.c_ubyte)}
+
+XELIB_DIR = str(Path(__file__).parent)
+XEDIT_DIR = str(Path(__file__).parent.parent / 'xedit')
+
+# xelib modules whose functions are plumbing rather than API methods, and so
+# should not be blamed for DLL calls
+XELIB_PLUMBING = (str(Path(__file__)),
+                  str(Path(XELIB_DIR, 'wrapper_methods', 'helpers.py')))
+
+
+# call durations are counted in logarithmic buckets: 2 ** SUB_BUCKET_BITS
+# buckets per power of two of nanoseconds, which keeps percentiles within
+# about 6% of the exact ones
+SUB_BUCKET_BITS = 3
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# enough buckets for any duration up to 2 ** 63 ns
+BUCKET_COUNT = 64 * SUB_BUCKETS
+
+
+def bucket_of(duration_ns):
+    '''
+    Returns the index of the bucket counting calls of the given duration.
+    Durations below ``SUB_BUCKETS`` ns get a bucket each.
+    '''
+    if duration_ns < SUB_BUCKETS:
+        return max(duration_ns, 0)
+    exponent = duration_ns.bit_length() - 1
+    sub_bucket = (duration_ns >> (exponent - SUB_BUCKET_BITS)) - SUB_BUCKETS
+    return exponent * SUB_BUCKETS + sub_bucket
+
+
+def bucket_value(index):
+    '''
+    Returns the duration (in ns) standing for the calls counted in the
+    bucket of the given index: the middle of the durations it counts.
+    '''
+    if index < SUB_BUCKETS:
+        return index
+    exponent, sub_bucket = divmod(index, SUB_BUCKETS)
+    width = 1 << (exponent - SUB_BUCKET_BITS)
+    return (SUB_BUCKETS + sub_bucket) * width + width // 2
+
+
+class FunctionStats:
+    '''
+    The statistics gathered for a single ``XEditLib.dll`` function.
+
+    The number of calls, their total and their longest duration are kept
+    exactly; the durations themselves are only counted in a fixed-size
+    histogram of logarithmic buckets, which the percentiles are read from,
+    so that the stats stay small however many calls are made.
+    '''
+    __slots__ = ('calls', 'total_ns', 'max_ns', 'buckets', 'bytes')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = array('q', bytes(8 * BUCKET_COUNT))
+        self.bytes = 0
+
+    def add(self, duration_ns):
+        '''
+        Counts a call of the given duration.
+        '''
+        self.calls += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.buckets[bucket_of(duration_ns)] += 1
+
+    def percentile(self, percent):
+        '''
+        Returns the given percentile of the call durations, in seconds.
+        '''
+        if not self.calls:
+            return 0.0
+        rank = int(round(percent / 100 * (self.calls - 1)))
+        if rank >= self.calls - 1:
+            # the longest call is known exactly
+            return self.max_ns / 1e9
+        counted = 0
+        for index, count in enumerate(self.buckets):
+            counted += count
+            if counted > rank:
+                return min(bucket_value(index), self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+    def as_dict(self):
+        return {'calls': self.calls,
+                'total_seconds': self.total_ns / 1e9,
+                'mean_seconds': self.total_ns / 1e9 / self.calls,
+                'p50_seconds': self.percentile(50),
+                'p90_seconds': self.percentile(90),
+                'p99_seconds': self.percentile(99),
+                'max_seconds': self.max_ns / 1e9,
+                'bytes': self.bytes}
+
+
+class XelibProfiler:
+    '''
+    Gathers statistics on the calls made to ``XEditLib.dll`` during a session;
+    see ``Xelib.profile``.
+
+    For each DLL function, this records the number of calls, their durations
+    (cumulative, longest, and bucketed for percentiles), and for the
+    result getter functions, the number of bytes copied out of the DLL.
+
+    With `attribute` turned on, each call is also attributed to the ``Xelib``
+    method that made it, and to the closest caller in the XEdit layer, by
+    looking up the python call stack. This is what makes the profile useful
+    for finding which high-level operations are expensive, but it is also
+    the bulk of the profiler's overhead, so it can be turned off.
+    '''
+    def __init__(self, attribute=True):
+        '''
+        Args:
+            attribute (``bool``):
+                whether to attribute each call to its ``Xelib`` method and
+                XEdit-layer caller
+        '''
+        self.attribute = attribute
+        self.functions = defaultdict(FunctionStats)
+        self.stacks = defaultdict(lambda: [0, 0])
+        self._api = None
+        self._profiled_api = None
+
+    def wrap(self, raw_api):
+        '''
+        Returns a stand-in for the given raw API object, whose functions
+        record their calls into this profiler.
+        '''
+        if raw_api is not self._api:
+            self._api = raw_api
+            self._profiled_api = ProfiledApi(raw_api, self)
+        return self._profiled_api
+
+    def record(self, name, duration_ns, args):
+        '''
+        Records a call to the DLL function of the given name.
+        '''
+        stats = self.functions[name]
+        stats.add(duration_ns)
+
+        item_size = RESULT_ITEM_SIZES.get(name)
+        if item_size:
+            stats.bytes += args[1].value * item_size
+
+        if self.attribute:
+            # skip the frames of `record` itself and of the profiled call
+            stack = self.stacks[self.callers(sys._getframe(2)) + (name,)]
+            stack[0] += 1
+            stack[1] += duration_ns
+
+    @staticmethod
+    def callers(frame):
+        '''
+        Walks up the python call stack from the given frame, and returns a
+        tuple of the names of the XEdit-layer caller and the ``Xelib`` method
+        responsible for the call; either is None if not found.
+        '''
+        xelib_method = None
+        while frame:
+            code = frame.f_code
+            filename = code.co_filename
+            if not code.co_name.startswith('<'):
+                if filename.startswith(XEDIT_DIR):
+                    return (XelibProfiler.qualname(frame), xelib_method)
+                if (xelib_method is None and
+                        filename.startswith(XELIB_DIR) and
+                        filename not in XELIB_PLUMBING):
+                    xelib_method = f'Xelib.{code.co_name}'
+            frame = frame.f_back
+        return (None, xelib_method)
+
+    @staticmethod
+    def qualname(frame):
+        '''
+        Returns the qualified name of the function running in the given frame
+        (e.g. `XEditArray.iter_items`).
+        '''
+        code = frame.f_code
+        try:
+            return code.co_qualname
+        except AttributeError:
+            # before python 3.11, make do with the class of `self` if any
+            self = frame.f_locals.get('self')
+            if self is None:
+                return code.co_name
+            return f'{type(self).__name__}.{code.co_name}'
+
+    def reset(self):
+        '''
+        Discards all statistics gathered so far.
+        '''
+        self.functions.clear()
+        self.stacks.clear()
+
+    def as_dict(self):
+        '''
+        Exports the statistics gathered as a dictionary, with:
+            - `functions`: for each DLL function, its number of calls, total,
+                mean, percentile and max durations, and bytes transferred
+            - `callers`: for each (XEdit-layer caller, Xelib method, DLL
+                function) combination, its number of calls and total duration
+        '''
+        return {
+            'functions': {name: stats.as_dict()
+                          for name, stats in sorted(self.functions.items())},
+            'callers': [{'xedit_caller': stack[0],
+                         'xelib_method': stack[1],
+                         'function': stack[2],
+                         'calls': calls,
+                         'total_seconds': total_ns / 1e9}
+                        for stack, (calls, total_ns) in sorted(
+                            self.stacks.items(),
+                            key=lambda item: -item[1][1])]}
+
+    def folded_stacks(self, weight='time'):
+        '''
+        Exports the attributed calls as folded stacks, one
+        `caller;method;function weight` line per combination, which is the
+        input format of flame graph tools (e.g. `flamegraph.pl`, speedscope).
+
+        Args:
+            weight (``str``):
+                `time` to weigh stacks by their total duration in
+                microseconds, or `calls` to weigh them by their number of
+                calls
+        '''
+        lines = []
+        for stack, (calls, total_ns) in sorted(self.stacks.items(),
+                                               key=lambda item: str(item[0])):
+            frames = ';'.join(frame for frame in stack if frame)
+            value = calls if weight == 'calls' else total_ns // 1000
+            lines.append(f'{frames} {value}')
+        return '\n'.join(lines)
+
+
+class ProfiledApi:
+    '''
+    Stands in for the raw API object, timing every function called through
+    it and handing the timings to a ``XelibProfiler``.
+    '''
+    def __init__(self, raw_api, profiler):
+        self._raw_api = raw_api
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        function = getattr(self._raw_api, name)
+        record = self._profiler.record
+        perf_counter_ns = time.perf_counter_ns
+
+        def profiled(*args):
+            start = perf_counter_ns()
+            try:
+                return function(*args)
+            finally:
+                record(name, perf_counter_ns() - start, args)
+
+        # cache the profiled function, so that __getattr__ only runs once per
+        # DLL function
+        setattr(self, name, profiled)
+        return profiled
@@ -0,0 +1,687 @@
+'''
+A long-lived session server: a process keeping a loaded ``Xelib`` session
+resident, serving ``Xelib`` calls to clients over a local socket (a named pipe
+on Windows), so that short scripts do not each pay for loading the plugins.
+
+Start a server with:
+
+    python -m pyxedit.xelib.server --plugin Skyrim.esm --plugin GOT.esp
+                                   [--game-mode SSE] [--game-path PATH]
+                                   [--address ADDRESS] [--key-file PATH]
+                                   [--build-references]
+
+and use it from scripts through a ``SessionClient``, which mimics the
+``Xelib`` API:
+
+    with SessionClient() as xelib:
+        npc = xelib.get_element(0, 'GOT.esp\\NPC_\\JonSnow')
+        print(xelib.full_name(npc))
+
+Messages are exchanged with ``multiprocessing.connection``, which pickles
+them, and authenticates both ends with a shared key; anyone who can connect
+with the key can run any code in the server. Unless given a key, a server
+generates a random one, and writes it to a key file only the user can read
+(see ``default_key_path``), for clients of the same address to read it from.
+
+A request is a batch of calls, run one after the other; a call can take the
+result of an earlier call of the same batch as an argument (see
+``SessionClient.batch``), so that a chain of dependent calls costs a single
+round trip. Each call is answered separately, with its result or its error.
+
+Handles live on the server, and belong to the client whose calls opened them:
+they are released when the client closes the ``manage_handles`` context they
+were opened in, or otherwise when the client disconnects.
+'''
+from collections import namedtuple
+from contextlib import contextmanager
+from inspect import getattr_static, signature
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import (Client,
+                                        Listener,
+                                        Pipe,
+                                        address_type,
+                                        wait)
+from pathlib import Path
+import argparse
+import hashlib
+import os
+import queue
+import secrets
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from pyxedit.xelib.wrapper_methods.helpers import XelibError
+from pyxedit.xelib.xelib import Xelib
+
+# a reference to the result of an earlier call in the same batch, by index
+ResultRef = namedtuple('ResultRef', ['index'])
+
+# a call in a batch: the name of the Xelib method, and its arguments
+Call = namedtuple('Call', ['method', 'args', 'kwargs'])
+
+
+def default_address():
+    '''
+    Returns the address a server listens on unless told otherwise.
+    '''
+    if sys.platform == 'win32':
+        return r'\\.\pipe\pyxedit-session'
+    return os.path.join(tempfile.gettempdir(), 'pyxedit-session.sock')
+
+
+def default_key_path(address):
+    '''
+    Returns the path of the key file of the server listening on the given
+    address: a file in a directory of the user's home that only the user
+    can access.
+    '''
+    name = hashlib.sha256(address.encode()).hexdigest()[:16]
+    return Path.home() / '.pyxedit' / f'session-{name}.key'
+
+
+def write_key(path, key):
+    '''
+    Writes a key file, readable by the user alone; the file is written under
+    a temporary name and then moved into place.
+    '''
+    path = Path(path)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with open(fd, 'wb') as f:
+        f.write(key.hex().encode('ascii'))
+    os.replace(temp_path, path)
+
+
+def read_key(path):
+    try:
+        return bytes.fromhex(Path(path).read_text('ascii').strip())
+    except (OSError, ValueError) as e:
+        raise XelibError(f'Failed to read the session server key from '
+                         f'{path}: {e}')
+
+
+class ClientState:
+    '''
+    What the server keeps for each connected client: the handles opened by
+    the client, in a stack of scopes, one per ``manage_handles`` context the
+    client is in.
+    '''
+    def __init__(self, connection):
+        self.connection = connection
+        self.scopes = [set()]
+
+    def owns(self, handle):
+        '''
+        Returns whether the given handle was opened by the client, and is
+        still open.
+        '''
+        return any(handle in scope for scope in self.scopes)
+
+    def forget(self, handles):
+        '''
+        Drops the given handles from the client's scopes, once released.
+        '''
+        for scope in self.scopes:
+            scope.difference_update(handles)
+
+
+class SessionServer:
+    '''
+    Serves a loaded ``Xelib`` session to ``SessionClient`` objects; see the
+    module docstring.
+
+    All calls into the session are made from the thread running
+    ``serve_forever``; clients are served one request at a time, in the
+    order their requests come in.
+    '''
+    # Xelib methods that are not served: the session belongs to the server,
+    # and handle management contexts are replaced by client scopes; releasing
+    # every handle (or those of the server's current scope) would release
+    # the handles of other clients
+    NOT_SERVED = {'session', 'start_session', 'end_session', 'manage_handles',
+                  'capture_handles', 'profile', 'trace', 'load_lib',
+                  'release_all_handles', 'release_current_handles'}
+
+    # Xelib methods releasing handles, by the name of their argument giving
+    # the handles (or handle) to release; clients may only release the
+    # handles they opened
+    RELEASES = {'release': 'id_',
+                'release_handle': 'handle',
+                'release_handles': 'handles',
+                'defer_release_handle': 'handle'}
+
+    def __init__(self,
+                 xelib,
+                 address=None,
+                 authkey=None,
+                 key_path=None,
+                 build_references=False):
+        '''
+        Args:
+            xelib (``Xelib``):
+                the session to serve; it is started by the server (plugins
+                included) unless already started
+            address (``str``):
+                the socket path (or named pipe) to listen on; see
+                ``default_address``
+            authkey (``bytes``):
+                the key clients must authenticate with; if not given, a
+                random key is generated and written to the key file
+            key_path (``str``):
+                the key file to write a generated key to; see
+                ``default_key_path``
+            build_references (``bool``):
+                whether to build references for all plugins once loaded
+        '''
+        self.xelib = xelib
+        self.address = address or default_address()
+        if authkey is None:
+            self.authkey = secrets.token_bytes(32)
+            self.key_path = Path(key_path or default_key_path(self.address))
+        else:
+            self.authkey = authkey
+            self.key_path = None
+        self._key_written = False
+        self.build_references = build_references
+        self.load_seconds = None
+        self.requests = 0
+        self.calls = 0
+
+        self.clients = {}
+        self._listener = None
+        self._accepted = queue.SimpleQueue()
+        self._wakeup_reader, self._wakeup_writer = Pipe(duplex=False)
+        self._running = False
+        self._ready = threading.Event()
+
+    def listen(self):
+        '''
+        Starts listening on the server's address, replacing a stale socket
+        left behind by a server that is gone, and writes the key file of a
+        generated key.
+        '''
+        if os.path.exists(self.address) and sys.platform != 'win32':
+            if self._is_listening():
+                raise XelibError(f'A session server is already listening on '
+                                 f'{self.address}')
+            os.unlink(self.address)
+        if self.key_path:
+            write_key(self.key_path, self.authkey)
+            self._key_written = True
+        self._listener = Listener(self.address, authkey=self.authkey)
+
+    def _is_listening(self):
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except AuthenticationError:
+            # a server is listening, with another key
+            return True
+        except (ConnectionError, OSError):
+            return False
+        return True
+
+    def start_session(self):
+        if self.xelib.loaded:
+            return
+        started = time.perf_counter()
+        self.xelib.start_session()
+        if self.build_references:
+            self.xelib.build_references(0)
+        self.load_seconds = time.perf_counter() - started
+
+    def serve_forever(self):
+        '''
+        Starts the session and listens, then serves clients until stopped
+        (by ``stop``, or by a client asking for a shutdown). The session is
+        ended on the way out.
+        '''
+        self.start_session()
+        if self._listener is None:
+            self.listen()
+        self._running = True
+        acceptor = threading.Thread(target=self._accept,
+                                    name='pyxedit-server-accept',
+                                    daemon=True)
+        acceptor.start()
+        self._ready.set()
+        try:
+            while self._running:
+                connections = [self._wakeup_reader] + list(self.clients)
+                for connection in wait(connections):
+                    if connection is self._wakeup_reader:
+                        self._wake_up()
+                    else:
+                        self._serve(self.clients[connection])
+        finally:
+            self._running = False
+
+            # wake the accepting thread up, so that it sees it has to stop
+            if acceptor.is_alive():
+                self._wake_acceptor()
+            for client in list(self.clients.values()):
+                self.disconnect(client)
+            self._listener.close()
+            if self._key_written:
+                self.key_path.unlink(missing_ok=True)
+            if self.xelib.loaded:
+                self.xelib.end_session()
+
+    def serve_in_thread(self):
+        '''
+        Runs ``serve_forever`` in a thread of its own (which then owns the
+        session), and waits until it is listening.
+
+        Returns:
+            (``threading.Thread``) the serving thread
+        '''
+        thread = threading.Thread(target=self.serve_forever,
+                                  name='pyxedit-server',
+                                  daemon=True)
+        thread.start()
+        while not self._ready.wait(0.01):
+            if not thread.is_alive():
+                raise XelibError('The session server failed to start')
+        return thread
+
+    def stop(self):
+        '''
+        Stops serving; can be called from any thread.
+        '''
+        self._running = False
+        self._wakeup_writer.send(None)
+
+    def _accept(self):
+        while self._running:
+            try:
+                connection = self._listener.accept()
+            except (AuthenticationError, ConnectionError, EOFError):
+                # a client failed to connect, or this is the wake-up call
+                # from _wake_acceptor
+                continue
+            except OSError:
+                # the listener was closed
+                return
+            if not self._running:
+                connection.close()
+                return
+            self._accepted.put(connection)
+            self._wakeup_writer.send(None)
+
+    def _wake_acceptor(self):
+        # the accepting thread is blocked accepting connections, so it is
+        # woken up with one; a bare socket connection is enough, and unlike
+        # a client connection, never waits on the accepting thread
+        try:
+            if address_type(self.address) == 'AF_UNIX':
+                with socket.socket(socket.AF_UNIX) as sock:
+                    sock.connect(self.address)
+            else:
+                threading.Thread(target=Client,
+                                 args=(self.address,),
+                                 kwargs={'authkey': self.authkey},
+                                 daemon=True).start()
+        except OSError:
+            pass
+
+    def _wake_up(self):
+        while self._wakeup_reader.poll():
+            self._wakeup_reader.recv()
+        while True:
+            try:
+                connection = self._accepted.get_nowait()
+            except queue.Empty:
+                break
+            self.clients[connection] = ClientState(connection)
+
+    def _serve(self, client):
+        try:
+            request = client.connection.recv()
+        except (EOFError, OSError):
+            self.disconnect(client)
+            return
+        self.requests += 1
+        try:
+            reply = ('ok', self.handle(client, request))
+        except Exception as e:
+            reply = ('error', type(e).__name__, str(e))
+        try:
+            client.connection.send(reply)
+        except OSError:
+            self.disconnect(client)
+
+    def handle(self, client, request):
+        '''
+        Handles a request from a client, returning the reply.
+        '''
+        kind = request[0]
+        if kind == 'batch':
+            return self.run_batch(client, request[1])
+        if kind == 'push_scope':
+            client.scopes.append(set())
+            return None
+        if kind == 'pop_scope':
+            if len(client.scopes) == 1:
+                raise XelibError('No handle scope to pop')
+            self.release(client.scopes.pop())
+            return None
+        if kind == 'info':
+            return {'address': self.address,
+                    'pid': os.getpid(),
+                    'plugins': self.xelib.get_loaded_file_names(),
+                    'load_seconds': self.load_seconds,
+                    'clients': len(self.clients),
+                    'requests': self.requests,
+                    'calls': self.calls}
+        if kind == 'shutdown':
+            self._running = False
+            return None
+        raise XelibError(f'Unknown request {kind!r}')
+
+    def run_batch(self, client, calls):
+        '''
+        Runs a batch of calls for a client.
+
+        Returns:
+            (``List[tuple]``) per call, ``('ok', result)`` or ``('error',
+            type, message)``
+        '''
+        results = []
+        for call in calls:
+            try:
+                value = self.run_call(client, call, results)
+            except Exception as e:
+                results.append(('error', type(e).__name__, str(e)))
+            else:
+                results.append(('ok', value))
+        return results
+
+    def run_call(self, client, call, results):
+        method = self.method(call.method)
+        args = [self.resolve(arg, results) for arg in call.args]
+        kwargs = {key: self.resolve(value, results)
+                  for key, value in call.kwargs.items()}
+        self.calls += 1
+        if call.method in self.RELEASES:
+            return self.run_release(client, method, call.method, args, kwargs)
+        opened = []
+        try:
+            with self.xelib.capture_handles() as opened:
+                return method(*args, **kwargs)
+        finally:
+            # handles opened by a call that failed belong to the client too
+            client.scopes[-1].update(opened)
+
+    def run_release(self, client, method, name, args, kwargs):
+        '''
+        Runs a call releasing handles, after checking that the client opened
+        them all.
+        '''
+        handles = signature(method).bind(*args, **kwargs).arguments[
+            self.RELEASES[name]]
+        if name != 'release_handles':
+            handles = [handles]
+        for handle in handles:
+            if not client.owns(handle):
+                raise XelibError(f'Handle {handle} was not opened by this '
+                                 f'client')
+        try:
+            return method(*args, **kwargs)
+        finally:
+            client.forget(handles)
+
+    def method(self, name):
+        if (name.startswith('_') or name in self.NOT_SERVED or
+                not callable(getattr_static(Xelib, name, None))):
+            raise XelibError(f'{name} is not a Xelib method served by the '
+                             f'session server')
+        return getattr(self.xelib, name)
+
+    @staticmethod
+    def resolve(arg, results):
+        if not isinstance(arg, ResultRef):
+            return arg
+        outcome = results[arg.index]
+        if outcome[0] != 'ok':
+            raise XelibError(f'Depends on call {arg.index} of the batch, '
+                             f'which failed')
+        return outcome[1]
+
+    def release(self, handles):
+        xelib = self.xelib
+        xelib.release_handles([handle for handle in handles
+                               if xelib.is_handle_tracked(handle)])
+
+    def disconnect(self, client):
+        '''
+        Drops a client, releasing all of the handles it opened.
+        '''
+        self.clients.pop(client.connection, None)
+        client.connection.close()
+        if self.xelib.loaded:
+            for scope in client.scopes:
+                self.release(scope)
+
+
+class PendingResult:
+    '''
+    The result of a call in a ``ClientBatch``, available once the batch has
+    been sent. Pending results can be passed as arguments to later calls in
+    the same batch.
+    '''
+    def __init__(self, index):
+        self.index = index
+        self._outcome = None
+
+    @property
+    def ready(self):
+        return self._outcome is not None
+
+    @property
+    def value(self):
+        '''
+        The result of the call; raises the error of the call if it failed.
+        '''
+        if self._outcome is None:
+            raise XelibError('The batch has not been sent yet')
+        return unpack(self._outcome)
+
+
+class ClientBatch:
+    '''
+    Collects ``Xelib`` calls to send to the server as a single request; see
+    ``SessionClient.batch``.
+    '''
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+        self.results = []
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            self.calls.append(Call(name,
+                                   tuple(as_ref(arg) for arg in args),
+                                   {key: as_ref(value)
+                                    for key, value in kwargs.items()}))
+            result = PendingResult(len(self.results))
+            self.results.append(result)
+            return result
+
+        return call
+
+    def send(self):
+        '''
+        Sends the calls collected so far, and fills in their results.
+        '''
+        calls, self.calls = self.calls, []
+        results, self.results = self.results, []
+        if not calls:
+            return
+        for result, outcome in zip(results,
+                                   self.client.request('batch', calls)):
+            result._outcome = outcome
+
+
+def as_ref(arg):
+    return ResultRef(arg.index) if isinstance(arg, PendingResult) else arg
+
+
+def unpack(outcome):
+    '''
+    Returns the value of an ``('ok', value)`` outcome, or raises the error
+    of an ``('error', type, message)`` one as a ``XelibError``.
+    '''
+    if outcome[0] == 'ok':
+        return outcome[1]
+    _, type_, message = outcome
+    if type_ == 'XelibError':
+        raise XelibError(message)
+    raise XelibError(f'{type_}: {message}')
+
+
+class SessionClient:
+    '''
+    A client of a ``SessionServer``, offering the ``Xelib`` methods of the
+    served session; each call is a round trip to the server. See the module
+    docstring.
+    '''
+    def __init__(self, address=None, authkey=None, key_path=None):
+        '''
+        Args:
+            address (``str``):
+                the address of the server; see ``default_address``
+            authkey (``bytes``):
+                the key to authenticate with; read from the key file if not
+                given
+            key_path (``str``):
+                the key file of the server; see ``default_key_path``
+        '''
+        self.address = address or default_address()
+        if authkey is None:
+            authkey = read_key(key_path or default_key_path(self.address))
+        self._connection = Client(self.address, authkey=authkey)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            outcome, = self.request('batch', [Call(name, args, kwargs)])
+            return unpack(outcome)
+
+        call.__name__ = name
+        return call
+
+    def close(self):
+        '''
+        Disconnects, which has the server release the client's handles.
+        '''
+        self._connection.close()
+
+    def request(self, *request):
+        self._connection.send(request)
+        return unpack(self._connection.recv())
+
+    @contextmanager
+    def batch(self):
+        '''
+        A context manager collecting calls, which are sent to the server as a
+        single request on context exit. Calls return ``PendingResult``
+        objects, which can be passed to later calls of the batch, and hold
+        the results once the batch has been sent. See example:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            with xelib.batch() as batch:
+                npc = batch.get_element(0, 'GOT.esp\\\\NPC_\\\\JonSnow')
+                name = batch.full_name(npc)
+                race = batch.get_value(npc, 'RNAM')
+            print(name.value, race.value)
+        '''
+        batch = ClientBatch(self)
+        yield batch
+        batch.send()
+
+    @contextmanager
+    def manage_handles(self):
+        '''
+        Like ``Xelib.manage_handles``: the handles opened by calls made within
+        the context are released on the server on context exit.
+        '''
+        self.request('push_scope')
+        try:
+            yield
+        finally:
+            self.request('pop_scope')
+
+    def info(self):
+        '''
+        Returns a dict describing the server and its session.
+        '''
+        return self.request('info')
+
+    def shutdown(self):
+        '''
+        Asks the server to stop serving and end its session.
+        '''
+        self.request('shutdown')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+                 description='Serves a loaded xedit session over a local '
+                             'socket.')
+    parser.add_argument('--plugin', action='append', default=[],
+                        help='plugin to load (masters are added)')
+    parser.add_argument('--game-mode', default='SSE',
+                        choices=Xelib.GameModes.__members__,
+                        help='the game to load plugins of')
+    parser.add_argument('--game-path', help='the path to the game folder')
+    parser.add_argument('--xeditlib-path', help='the XEditLib.dll to use')
+    parser.add_argument('--index-cache', help='a directory to cache the '
+                                              'record index of plugins in')
+    parser.add_argument('--address', help='the socket path or pipe name to '
+                                          'listen on')
+    parser.add_argument('--key-file', help='the file to write the key '
+                                           'clients authenticate with to')
+    parser.add_argument('--build-references', action='store_true',
+                        help='build references once the plugins are loaded')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    xelib = Xelib(game_mode=Xelib.GameModes[args.game_mode],
+                  game_path=args.game_path,
+                  plugins=args.plugin,
+                  xeditlib_path=args.xeditlib_path,
+                  index_cache=args.index_cache)
+    server = SessionServer(xelib,
+                           address=args.address,
+                           key_path=args.key_file,
+                           build_references=args.build_references)
+    server.start_session()
+    server.listen()
+    print(f'Loaded {len(args.plugin)} plugins in {server.load_seconds:.1f}s; '
+          f'serving on {server.address} (key file: {server.key_path})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
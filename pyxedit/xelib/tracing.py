@@ -0,0 +1,385 @@
+from collections import deque, namedtuple
+import ctypes
+import struct
+import time
+
+from pyxedit.xelib.definitions import DelphiTypes, XEditLibSignatures
+
+
+# A call trace is a sequence of binary records, one per call made to
+# XEditLib.dll. Each record holds the id of the DLL function called (its
+# position in XEditLibSignatures), the duration of the call, its result, and
+# its arguments. Arguments are stored by value; for out-parameters and result
+# buffers, the value stored is what the DLL wrote into them.
+#
+# A trace file starts with the TRACE_MAGIC bytes and the table of function
+# names the ids refer to, followed by the records, each prefixed with its
+# length. Storing the name table keeps a trace readable regardless of later
+# changes to XEditLibSignatures.
+TRACE_MAGIC = b'PXTRACE1'
+
+# (functions with identical signatures are aliases of each other in the enum,
+# so they have to be listed through __members__)
+FUNCTION_NAMES = list(XEditLibSignatures.__members__)
+FUNCTION_IDS = {name: id_ for id_, name in enumerate(FUNCTION_NAMES)}
+
+# value tags, each followed by its payload
+NONE = b'n'          # no payload
+INT = b'i'           # int64
+FLOAT = b'f'         # double
+STR = b's'           # uint32 length + utf-8 bytes
+OUT_INT = b'O'       # int64 written into an out-parameter
+OUT_FLOAT = b'D'     # double written into an out-parameter
+OUT_ARRAY = b'A'     # uint32 count + uint32 items written into a buffer
+OUT_STR = b'S'       # uint32 length + utf-8 bytes written into a buffer
+OUT_BYTES = b'B'     # uint32 length + bytes written into a buffer
+
+RECORD_HEADER = struct.Struct('<HBQ')  # function id, argument count, ns
+RECORD_LENGTH = struct.Struct('<I')
+INT64 = struct.Struct('<q')
+DOUBLE = struct.Struct('<d')
+UINT32 = struct.Struct('<I')
+UINT16 = struct.Struct('<H')
+
+TraceRecord = namedtuple('TraceRecord',
+                         ['function', 'args', 'result', 'duration_ns'])
+TraceRecord.__doc__ = '''
+A decoded call trace record. `args` is a list of (tag, value) tuples, and
+`result` a single (tag, value) tuple; see the value tags in this module.
+'''
+
+
+def encode_value(value, limit=None):
+    '''
+    Encodes a single argument or result value into bytes. This is done after
+    the call has been made, so that values passed by reference and buffers
+    are read back as outputs.
+
+    @param value: the value passed to or returned from a DLL function
+    @param limit: for buffers, how many items of the buffer were filled
+    '''
+    if value is None:
+        return NONE
+    if isinstance(value, bool) or isinstance(value, int):
+        return INT + INT64.pack(int(value))
+    if isinstance(value, float):
+        return FLOAT + DOUBLE.pack(value)
+    if isinstance(value, str):
+        data = value.encode('utf-8', 'surrogatepass')
+        return STR + UINT32.pack(len(data)) + data
+
+    # arrays are result buffers, filled in by the call
+    if isinstance(value, ctypes.Array):
+        if value._type_ is ctypes.c_wchar:
+            data = value.value.encode('utf-8', 'surrogatepass')
+            return OUT_STR + UINT32.pack(len(data)) + data
+        count = len(value) if limit is None else min(limit, len(value))
+        data = bytes(memoryview(value).cast('B')[
+            :count * ctypes.sizeof(value._type_)])
+        if value._type_ is ctypes.c_ubyte:
+            return OUT_BYTES + UINT32.pack(count) + data
+        return OUT_ARRAY + UINT32.pack(count) + data
+
+    # values passed by reference (ctypes.byref) are out-parameters
+    referenced = getattr(value, '_obj', None)
+    if referenced is not None:
+        if isinstance(referenced.value, float):
+            return OUT_FLOAT + DOUBLE.pack(referenced.value)
+        return OUT_INT + INT64.pack(int(referenced.value))
+
+    # plain ctypes values (e.g. the length passed to GetResultString)
+    if isinstance(value, ctypes._SimpleCData):
+        return encode_value(value.value)
+
+    raise TypeError(f'cannot encode call trace value {value!r}')
+
+
+def decode_value(data, offset):
+    '''
+    Decodes a single value from the given bytes at the given offset. Returns
+    a tuple of the (tag, value) decoded and the offset after it.
+    '''
+    tag = data[offset:offset + 1]
+    offset += 1
+    if tag == NONE:
+        return (tag, None), offset
+    if tag in (INT, OUT_INT):
+        return (tag, INT64.unpack_from(data, offset)[0]), offset + 8
+    if tag in (FLOAT, OUT_FLOAT):
+        return (tag, DOUBLE.unpack_from(data, offset)[0]), offset + 8
+    length = UINT32.unpack_from(data, offset)[0]
+    offset += 4
+    if tag in (STR, OUT_STR):
+        end = offset + length
+        return (tag, bytes(data[offset:end]).decode('utf-8',
+                                                    'surrogatepass')), end
+    if tag == OUT_BYTES:
+        return (tag, bytes(data[offset:offset + length])), offset + length
+    if tag == OUT_ARRAY:
+        end = offset + length * 4
+        return (tag, list(struct.unpack_from(f'<{length}I', data, offset))), end
+    raise ValueError(f'unknown call trace value tag {tag!r}')
+
+
+def encode_record(function_id, args, result, duration_ns):
+    '''
+    Encodes a single call into a record (without its length prefix).
+    '''
+    # the result getters take a buffer followed by the length filled in
+    limit = None
+    if len(args) == 2 and isinstance(args[0], ctypes.Array):
+        limit = getattr(args[1], 'value', args[1])
+    return b''.join([RECORD_HEADER.pack(function_id, len(args), duration_ns),
+                     encode_value(result),
+                     encode_value(args[0], limit) if args else b'',
+                     *(encode_value(arg) for arg in args[1:])])
+
+
+def decode_record(data, function_names=FUNCTION_NAMES):
+    '''
+    Decodes a single record into a ``TraceRecord``.
+    '''
+    function_id, argc, duration_ns = RECORD_HEADER.unpack_from(data, 0)
+    result, offset = decode_value(data, RECORD_HEADER.size)
+    args = []
+    for _ in range(argc):
+        arg, offset = decode_value(data, offset)
+        args.append(arg)
+    return TraceRecord(function_names[function_id], args, result, duration_ns)
+
+
+def write_header(stream):
+    '''
+    Writes the trace file header into the given binary stream.
+    '''
+    stream.write(TRACE_MAGIC)
+    stream.write(UINT32.pack(len(FUNCTION_NAMES)))
+    for name in FUNCTION_NAMES:
+        data = name.encode('ascii')
+        stream.write(UINT16.pack(len(data)) + data)
+
+
+def read_trace(path):
+    '''
+    Reads a trace file, and yields a ``TraceRecord`` for each call in it.
+
+    @param path: the path of the trace file
+    '''
+    with open(path, 'rb') as stream:
+        if stream.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f'{path} is not a call trace file')
+        function_names = []
+        for _ in range(UINT32.unpack(stream.read(4))[0]):
+            length = UINT16.unpack(stream.read(2))[0]
+            function_names.append(stream.read(length).decode('ascii'))
+        while True:
+            prefix = stream.read(RECORD_LENGTH.size)
+            if not prefix:
+                break
+            length = RECORD_LENGTH.unpack(prefix)[0]
+            yield decode_record(stream.read(length), function_names)
+
+
+class CallTracer:
+    '''
+    Records every call made to ``XEditLib.dll`` as a compact binary record;
+    see ``Xelib.trace``.
+
+    Records are kept in memory in a ring buffer bounded to `max_bytes`, the
+    oldest records being dropped to make room for new ones; ``dump`` writes
+    the buffer out as a trace file. Alternatively, if a `path` is given, all
+    records are streamed into a trace file at that path as they are made.
+    '''
+    DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        '''
+        @param path: if given, the trace file to stream the records into
+        @param max_bytes: the size of the in-memory ring buffer, when not
+                          streaming into a file
+        '''
+        self.path = path
+        self.max_bytes = max_bytes
+        self.records = deque()
+        self.size = 0
+        self.dropped = 0
+        self._stream = None
+        if path:
+            self._stream = open(path, 'wb')
+            write_header(self._stream)
+        self._api = None
+        self._traced_api = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def wrap(self, raw_api):
+        '''
+        Returns a stand-in for the given raw API object, whose functions
+        record their calls into this tracer.
+        '''
+        if raw_api is not self._api:
+            self._api = raw_api
+            self._traced_api = TracedApi(raw_api, self)
+        return self._traced_api
+
+    def record(self, function_id, args, result, duration_ns):
+        '''
+        Records a call to the DLL function of the given id.
+        '''
+        record = encode_record(function_id, args, result, duration_ns)
+        if self._stream:
+            self._stream.write(RECORD_LENGTH.pack(len(record)) + record)
+            return
+
+        self.records.append(record)
+        self.size += len(record)
+        while self.size > self.max_bytes:
+            self.size -= len(self.records.popleft())
+            self.dropped += 1
+
+    def close(self):
+        '''
+        Closes the trace file being streamed into, if any.
+        '''
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+
+    def dump(self, path):
+        '''
+        Writes the records in the ring buffer into a trace file.
+
+        @param path: the path of the trace file to write
+        '''
+        with open(path, 'wb') as stream:
+            write_header(stream)
+            for record in self.records:
+                stream.write(RECORD_LENGTH.pack(len(record)) + record)
+
+    def __iter__(self):
+        '''
+        Yields a ``TraceRecord`` for each call in the ring buffer.
+        '''
+        for record in self.records:
+            yield decode_record(record)
+
+
+class TracedApi:
+    '''
+    Stands in for the raw API object, handing every call made through it to
+    a ``CallTracer``.
+    '''
+    def __init__(self, raw_api, tracer):
+        self._raw_api = raw_api
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        function = getattr(self._raw_api, name)
+        function_id = FUNCTION_IDS[name]
+        record = self._tracer.record
+        perf_counter_ns = time.perf_counter_ns
+
+        def traced(*args):
+            start = perf_counter_ns()
+            result = function(*args)
+            record(function_id, args, result, perf_counter_ns() - start)
+            return result
+
+        # cache the traced function, so that __getattr__ only runs once per
+        # DLL function
+        setattr(self, name, traced)
+        return traced
+
+
+ReplayMismatch = namedtuple('ReplayMismatch',
+                            ['index', 'function', 'recorded', 'replayed'])
+
+
+class TraceReplayer:
+    '''
+    Re-issues the calls of a call trace against an API object, which can be
+    anything implementing the functions of ``XEditLibSignatures``: the
+    ``XEditLib.dll`` library as loaded by ``Xelib.load_lib``, or a stand-in.
+
+    Handles are session-specific, so the replayer keeps a mapping of the
+    handles seen in the trace to the handles the API hands out during the
+    replay, and translates handle arguments (`_id`, `_id2`) accordingly.
+    Calls whose result differs from the recorded one are collected in
+    `mismatches`.
+    '''
+    HANDLE_PARAMS = ('_id', '_id2')
+
+    def __init__(self, api):
+        '''
+        @param api: the API object to replay calls against
+        '''
+        self.api = api
+        self.handles = {}
+        self.mismatches = []
+        self.calls = 0
+        self.duration_ns = 0
+
+    def replay(self, records):
+        '''
+        Replays the given records (e.g. from ``read_trace``, or a
+        ``CallTracer``). Returns the replayer itself, for inspecting the
+        outcome.
+        '''
+        for index, record in enumerate(records):
+            self.replay_record(index, record)
+        return self
+
+    def replay_record(self, index, record):
+        '''
+        Replays a single ``TraceRecord``.
+        '''
+        params = list(XEditLibSignatures[record.function].value[0].items())
+        args = [self.make_arg(param, arg)
+                for (param, arg) in zip(params, record.args)]
+
+        start = time.perf_counter_ns()
+        result = getattr(self.api, record.function)(*args)
+        self.duration_ns += time.perf_counter_ns() - start
+        self.calls += 1
+
+        recorded = record.result[1]
+        if (None if result is None else int(result)) != recorded:
+            self.mismatches.append(
+                ReplayMismatch(index, record.function, recorded, result))
+
+        for (param, arg), replayed in zip(zip(params, record.args), args):
+            self.map_outputs(param[0], arg, replayed)
+
+    def make_arg(self, param, arg):
+        '''
+        Builds the argument to pass for the given (name, delphi type)
+        parameter, from its recorded (tag, value).
+        '''
+        (name, type_), (tag, value) = param, arg
+        if tag == INT:
+            if name in self.HANDLE_PARAMS:
+                return self.handles.get(value, value)
+            return value
+        if tag in (NONE, FLOAT, STR):
+            return value
+        if tag in (OUT_INT, OUT_FLOAT):
+            return ctypes.byref(DelphiTypes[type_].value._type_())
+        if tag == OUT_STR:
+            return ctypes.create_unicode_buffer(len(value) + 1)
+        if tag == OUT_BYTES:
+            return (ctypes.c_ubyte * max(len(value), 1))()
+        if tag == OUT_ARRAY:
+            return (ctypes.c_uint * max(len(value), 1))()
+        raise ValueError(f'unknown call trace value tag {tag!r}')
+
+    def map_outputs(self, name, arg, replayed):
+        '''
+        Learns the handle mapping from the outputs of a replayed call.
+        '''
+        tag, value = arg
+        if tag == OUT_INT and name == '_res':
+            self.handles[value] = replayed._obj.value
+        elif tag == OUT_ARRAY:
+            for recorded, handle in zip(value, replayed):
+                self.handles[recorded] = handle
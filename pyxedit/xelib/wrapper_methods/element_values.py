@@ -1,7 +1,47 @@
+from collections.abc import Mapping
+from enum import Enum, unique
+import ctypes
+
 from pyxedit.xelib.wrapper_methods.base import WrapperMethodsBase
+from pyxedit.xelib.wrapper_methods.helpers import XelibError
+
+
+@unique
+class Extractors(Enum):
+    '''
+    How ``xelib.get_values`` reads each of the values it is asked for.
+
+    .. list-table::
+        :widths: 20 80
+        :header-rows: 0
+        :align: left
+
+        * - ``Extractors.String``
+          - the editor value, as with ``xelib.get_value``
+        * - ``Extractors.Int``
+          - the integer value, as with ``xelib.get_int_value``
+        * - ``Extractors.UInt``
+          - the unsigned integer value, as with ``xelib.get_uint_value``
+        * - ``Extractors.Float``
+          - the float value, as with ``xelib.get_float_value``
+        * - ``Extractors.FormID``
+          - the FormID of the record referenced by the element, or ``None``
+            for a null reference
+        * - ``Extractors.Flags``
+          - the names of the enabled flags, as with
+            ``xelib.get_enabled_flags``
+    '''
+    String = 'string'
+    Int = 'int'
+    UInt = 'uint'
+    Float = 'float'
+    FormID = 'form_id'
+    Flags = 'flags'
 
 
 class ElementValuesMethods(WrapperMethodsBase):
+    Extractors = Extractors
+
     def name(self, id_, ex=True):
         '''
         Returns the name of an element.
@@ -20,7 +60,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.Name(id_, len_),
-            error_msg=f'Name failed on {id_}',
+            error_msg=lambda: f'Name failed on {id_}',
             ex=ex)
 
     def long_name(self, id_, ex=True):
@@ -37,7 +77,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.LongName(id_, len_),
-            error_msg=f'LongName failed on {id_}',
+            error_msg=lambda: f'LongName failed on {id_}',
             ex=ex)
 
     def display_name(self, id_, ex=True):
@@ -54,7 +94,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.DisplayName(id_, len_),
-            error_msg=f'DisplayName failed on {id_}',
+            error_msg=lambda: f'DisplayName failed on {id_}',
             ex=ex)
 
     def placement_name(self, id_, ex=True):
@@ -78,7 +118,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.Path(id_, True, False, False, len_),
-            error_msg=f'Path failed on {id_}',
+            error_msg=lambda: f'Path failed on {id_}',
             ex=ex)
 
     def long_path(self, id_, ex=True):
@@ -95,7 +135,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.Path(id_, False, False, False, len_),
-            error_msg=f'Path failed on {id_}',
+            error_msg=lambda: f'Path failed on {id_}',
             ex=ex)
 
     def local_path(self, id_, ex=True):
@@ -112,7 +152,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.Path(id_, False, True, False, len_),
-            error_msg=f'Path failed on {id_}',
+            error_msg=lambda: f'Path failed on {id_}',
             ex=ex)
 
     def sort_path(self, id_, ex=True):
@@ -121,7 +161,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.Path(id_, False, True, True, len_),
-            error_msg=f'Path failed on {id_}',
+            error_msg=lambda: f'Path failed on {id_}',
             ex=ex)
 
     def path_name(self, id_, sort=False, ex=True):
@@ -130,7 +170,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.PathName(id_, sort, len_),
-            error_msg=f'PathName failed on {id_}',
+            error_msg=lambda: f'PathName failed on {id_}',
             ex=ex)
 
     def signature(self, id_, ex=True):
@@ -147,7 +187,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.Signature(id_, len_),
-            error_msg=f'Signature failed on {id_}',
+            error_msg=lambda: f'Signature failed on {id_}',
             ex=ex)
 
     def sort_key(self, id_, ex=True):
@@ -164,7 +204,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.SortKey(id_, len_),
-            error_msg=f'SortKey failed on {id_}',
+            error_msg=lambda: f'SortKey failed on {id_}',
             ex=ex)
 
     def get_value(self, id_, path='', ex=False):
@@ -183,8 +223,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.GetValue(id_, path, len_),
-            error_msg=f'Failed to get element value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to get element value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def get_ref_value(self, id_, path='', ex=False):
@@ -193,8 +233,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.GetRefValue(id_, path, len_),
-            error_msg=f'Failed to get element ref value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to get element ref value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def set_value(self, id_, value, path='', ex=True):
@@ -210,11 +250,14 @@ class ElementValuesMethods(WrapperMethodsBase):
             value (``str``)
                 string value to set on the element
         '''
-        return self.verify_execution(
+        result = self.verify_execution(
             self.raw_api.SetValue(id_, path, value),
-            error_msg=f'Failed to set element value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to set element value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
+        if result:
+            self.index_value(id_, path)
+        return result
 
     def get_int_value(self, id_, path='', ex=False):
         '''
@@ -232,8 +275,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_integer(
             lambda res: self.raw_api.GetIntValue(id_, path, res),
-            error_msg=f'Failed to get int value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to get int value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def set_int_value(self, id_, value, path='', ex=True):
@@ -251,8 +294,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SetIntValue(id_, path, value),
-            error_msg=f'Failed to set int value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to set int value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def get_uint_value(self, id_, path='', ex=False):
@@ -271,8 +314,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_unsigned_integer(
             lambda res: self.raw_api.GetUIntValue(id_, path, res),
-            error_msg=f'Failed to get uint value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to get uint value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def set_uint_value(self, id_, value, path='', ex=True):
@@ -290,8 +333,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SetUIntValue(id_, path, value),
-            error_msg=f'Failed to set uint value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to set uint value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def get_float_value(self, id_, path='', ex=False):
@@ -310,8 +353,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_double(
             lambda res: self.raw_api.GetFloatValue(id_, path, res),
-            error_msg=f'Failed to get float value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to get float value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def set_float_value(self, id_, value, path='', ex=True):
@@ -329,8 +372,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SetFloatValue(id_, path, value),
-            error_msg=f'Failed to set uint value at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to set uint value at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def set_flag(self, id_, name, state, path='', ex=True):
@@ -349,8 +392,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SetFlag(id_, path, name, state),
-            error_msg=f'Failed to set flag value at '
-                      f'{self.flag_context(id_, path, name)} to {state}',
+            error_msg=lambda: f'Failed to set flag value at '
+                              f'{self.flag_context(id_, path, name)} to {state}',
             ex=ex)
 
     def get_flag(self, id_, name, path='', ex=True):
@@ -370,8 +413,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_bool(
             lambda res: self.raw_api.GetFlag(id_, path, name, res),
-            error_msg=f'Failed to get flag value at: '
-                      f'{self.flag_context(id_, path, name)}',
+            error_msg=lambda: f'Failed to get flag value at: '
+                              f'{self.flag_context(id_, path, name)}',
             ex=ex)
 
     def get_enabled_flags(self, id_, path='', ex=True):
@@ -389,8 +432,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         comma_separated_flags = self.get_string(
             lambda len_: self.raw_api.GetEnabledFlags(id_, path, len_),
-            error_msg=f'Failed to get enabled flags at: '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to get enabled flags at: '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
         return comma_separated_flags.split(',') if comma_separated_flags else []
 
@@ -410,8 +453,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SetEnabledFlags(id_, path, ','.join(flags)),
-            error_msg=f'Failed to set enabled flags at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to set enabled flags at '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def get_all_flags(self, id_, path='', ex=True):
@@ -429,8 +472,8 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         comma_separated_flags = self.get_string(
             lambda len_: self.raw_api.GetAllFlags(id_, path, len_),
-            error_msg=f'Failed to get all flags at: '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to get all flags at: '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
         return comma_separated_flags.split(',') if comma_separated_flags else []
 
@@ -449,10 +492,57 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.GetEnumOptions(id_, path, len_),
-            error_msg=f'Failed to get all enum options at '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to get all enum options at '
+                              f'{self.element_context(id_, path)}',
             ex=ex).split(',')
 
+    def get_values(self, id_, fields, as_tuple=False, ex=False):
+        '''
+        Reads several values from under an element in one go. This is the
+        same as calling ``get_value``, ``get_int_value`` etc. for each of the
+        fields, but with much less overhead per field: no handles are left
+        behind (the records referenced by ``FormID`` fields are released
+        right away), and the context for error messages is only worked out
+        for fields that fail. See example:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            name, rating, keyword = xelib.get_values(armor, [
+                'FULL',
+                ('DNAM', xelib.Extractors.Float),
+                ('KWDA\\[0]', xelib.Extractors.FormID)], as_tuple=True)
+
+        Args:
+            id\\_ (``int``)
+                id handle of element to start from
+            fields (``Dict[str, FieldSpec]`` or ``Iterable[FieldSpec]``)
+                the values to read; each is either a subpath, which is read
+                as a string, or a ``(subpath, Extractors)`` pair. If given as
+                a dict, the results are keyed by the dict's keys, otherwise
+                by subpath
+            as_tuple (``bool``)
+                whether to return the values as a tuple, in the order of
+                ``fields``, instead of a dict
+            ex (``bool``)
+                whether to raise on a field that cannot be read; otherwise
+                such fields are read as ``None``
+
+        Returns:
+            (``Dict[str, Any]`` or ``Tuple``) the values read
+        '''
+        if isinstance(fields, Mapping):
+            fields = fields.items()
+        else:
+            fields = ((field if isinstance(field, str) else field[0], field)
+                      for field in fields)
+
+        reader = ValueReader(self, id_)
+        values = [(key, reader.read(field, ex)) for key, field in fields]
+        if as_tuple:
+            return tuple(value for _, value in values)
+        return dict(values)
+
     def signature_from_name(self, name, ex=True):
         '''
         Translates a 'name' string (e.g. ``Armor``) to its signature
@@ -467,7 +557,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.SignatureFromName(name, len_),
-            error_msg=f'Failed to get signature from name: {name}',
+            error_msg=lambda: f'Failed to get signature from name: {name}',
             ex=ex)
 
     def name_from_signature(self, sig, ex=True):
@@ -484,7 +574,7 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.NameFromSignature(sig, len_),
-            error_msg=f'Failed to get name from signature: {sig}',
+            error_msg=lambda: f'Failed to get name from signature: {sig}',
             ex=ex)
 
     def get_signature_name_map(self, ex=True):
@@ -498,5 +588,106 @@ class ElementValuesMethods(WrapperMethodsBase):
         '''
         return self.get_dictionary(
             lambda len_: self.raw_api.GetSignatureNameMap(len_),
-            error_msg=f'Failed to get signature name map',
+            error_msg=lambda: f'Failed to get signature name map',
             ex=ex)
+
+
+class FieldFailed(Exception):
+    '''
+    Raised within ``ValueReader`` when a field cannot be read; turned into a
+    ``XelibError``, with the element's context, only if the caller wants one.
+    '''
+    def __init__(self, kind):
+        self.kind = kind
+
+
+class ValueReader:
+    '''
+    Reads values from under an element for ``xelib.get_values``, calling
+    straight into the raw API with a single set of ctypes out-parameters
+    for all of the fields.
+    '''
+    def __init__(self, xelib, id_):
+        self.xelib = xelib
+        self.id_ = id_
+        self.api = xelib.raw_api
+        self.len_ = ctypes.c_int()
+        self.int_ = ctypes.c_int()
+        self.uint = ctypes.c_uint()
+        self.double = ctypes.c_double()
+
+    def read(self, field, ex):
+        if isinstance(field, str):
+            path, extractor = field, Extractors.String
+        else:
+            path, extractor = field
+        try:
+            return self.READERS[extractor](self, path)
+        except FieldFailed as failed:
+            if not ex:
+                return None
+            xelib = self.xelib
+            # read before the context, whose Path call may replace it
+            error = xelib.get_xelib_error_str()
+            raise XelibError(f'Failed to get {failed.kind} at '
+                             f'{xelib.element_context(self.id_, path)}: '
+                             f'{error}') from None
+
+    def result_string(self, kind):
+        len_ = self.len_
+        if len_.value < 1:
+            return ''
+        buffer = self.xelib._result_buffers.string_buffer(len_.value)
+        buffer[len_.value] = '\0'
+        if not self.api.GetResultString(buffer, len_):
+            raise FieldFailed(kind)
+        return buffer.value
+
+    def string(self, path):
+        if not self.api.GetValue(self.id_, path, ctypes.byref(self.len_)):
+            raise FieldFailed('element value')
+        return self.result_string('element value')
+
+    def int_value(self, path):
+        if not self.api.GetIntValue(self.id_, path, ctypes.byref(self.int_)):
+            raise FieldFailed('int value')
+        return self.int_.value
+
+    def uint_value(self, path):
+        if not self.api.GetUIntValue(self.id_, path, ctypes.byref(self.uint)):
+            raise FieldFailed('uint value')
+        return self.uint.value
+
+    def float_value(self, path):
+        if not self.api.GetFloatValue(self.id_, path,
+                                      ctypes.byref(self.double)):
+            raise FieldFailed('float value')
+        return self.double.value
+
+    def form_id(self, path):
+        api = self.api
+        if not api.GetLinksTo(self.id_, path, ctypes.byref(self.uint)):
+            raise FieldFailed('reference')
+        record = self.uint.value
+        if not record:
+            return None
+        try:
+            if not api.GetFormID(record, ctypes.byref(self.uint), False):
+                raise FieldFailed('referenced FormID')
+            return self.uint.value
+        finally:
+            api.Release(record)
+
+    def flags(self, path):
+        if not self.api.GetEnabledFlags(self.id_, path,
+                                        ctypes.byref(self.len_)):
+            raise FieldFailed('enabled flags')
+        flags = self.result_string('enabled flags')
+        return flags.split(',') if flags else []
+
+    READERS = {Extractors.String: string,
+               Extractors.Int: int_value,
+               Extractors.UInt: uint_value,
+               Extractors.Float: float_value,
+               Extractors.FormID: form_id,
+               Extractors.Flags: flags}
@@ -14,7 +14,8 @@ class ErrorsMethods(WrapperMethodsBase):
         '''
         self.verify_execution(
             self.raw_api.CheckForErrors(id_),
-            error_msg=f'Failed to check {self.element_context(id_)} for errors',
+            error_msg=lambda: f'Failed to check '
+                              f'{self.element_context(id_)} for errors',
             ex=ex)
 
     def get_error_thread_done(self):
@@ -31,7 +32,7 @@ class ErrorsMethods(WrapperMethodsBase):
         return json.loads(
             self.get_string(
                 lambda len_: self.raw_api.GetErrors(len_),
-                error_msg=f'Failed to get errors',
+                error_msg=lambda: f'Failed to get errors',
                 ex=ex))['errors']
 
     def remove_identical_records(self,
@@ -44,6 +45,6 @@ class ErrorsMethods(WrapperMethodsBase):
         '''
         self.verify_execution(
             self.raw_api.RemoveIdenticalRecords(id_, remove_itms, remove_itpos),
-            error_msg=f'Failed to remove identical errors from '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to remove identical errors from '
+                              f'{self.element_context(id_)}',
             ex=ex)
@@ -110,8 +110,8 @@ class FileValuesMethods(WrapperMethodsBase):
             (``bool``) whether file is esm
         '''
         return self.get_flag(id_,
-                             'File Header\\Record Header\\Record Flags',
                              'ESM',
+                             path='File Header\\Record Header\\Record Flags',
                              ex=ex)
 
     def set_is_esm(self, id_, state, ex=True):
@@ -125,7 +125,7 @@ class FileValuesMethods(WrapperMethodsBase):
                 whether to enable or disable the esm flag for the file
         '''
         return self.set_flag(id_,
-                             'File Header\\Record Header\\Record Flags',
                              'ESM',
                              state,
+                             path='File Header\\Record Header\\Record Flags',
                              ex=ex)
@@ -15,7 +15,7 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.AddFile(file_name, ignore_exists, res),
-            error_msg=f'Failed to add new file {file_name}',
+            error_msg=lambda: f'Failed to add new file {file_name}',
             ex=ex)
 
     def file_by_index(self, index, ex=True):
@@ -90,7 +90,7 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.NukeFile(id_),
-            error_msg=f'Failed to nuke file: {id_}',
+            error_msg=lambda: f'Failed to nuke file: {id_}',
             ex=ex)
 
     def rename_file(self, id_, new_file_name, ex=True):
@@ -105,8 +105,9 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.RenameFile(id_, new_file_name),
-            error_msg=f'Failed to rename file {self.element_context(id_)} to '
-                      f'{new_file_name}',
+            error_msg=lambda: f'Failed to rename file '
+                              f'{self.element_context(id_)} to '
+                              f'{new_file_name}',
             ex=ex)
 
     def save_file(self, id_, file_path='', ex=True):
@@ -124,7 +125,8 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SaveFile(id_, file_path),
-            error_msg=f'Failed to save file {self.element_context(id_)}',
+            error_msg=lambda: f'Failed to save file '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_record_count(self, id_, ex=True):
@@ -140,8 +142,8 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.get_integer(
             lambda res: self.raw_api.GetRecordCount(id_, res),
-            error_msg=f'Failed to get record count for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get record count for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_override_record_count(self, id_, ex=True):
@@ -157,8 +159,8 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.get_integer(
             lambda res: self.raw_api.GetOverrideRecordCount(id_, res),
-            error_msg=f'Failed to get override record count for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get override record count for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def md5_hash(self, id_, ex=True):
@@ -174,7 +176,8 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.MD5Hash(id_, len_),
-            error_msg=f'Failed to get MD5 Hash for {self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get MD5 Hash for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def crc_hash(self, id_, ex=True):
@@ -190,7 +193,8 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.CRCHash(id_, len_),
-            error_msg=f'Failed to get CRC Hash for {self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get CRC Hash for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_file_load_order(self, id_, ex=True):
@@ -206,7 +210,8 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.get_integer(
             lambda res: self.raw_api.GetFileLoadOrder(id_, res),
-            error_msg=f'Failed to load order for ${self.element_context(id_)}',
+            error_msg=lambda: f'Failed to load order for $'
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_file_header(self, id_, ex=True):
@@ -228,8 +233,8 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SortEditorIDs(id_, sig),
-            error_msg=f'Failed to sort {sig} EditorIDs for: '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to sort {sig} EditorIDs for: '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def sort_names(self, id_, sig, ex=True):
@@ -238,6 +243,6 @@ class FilesMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SortNames(id_, sig),
-            error_msg=f'Failed to sort {sig} Names for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to sort {sig} Names for '
+                              f'{self.element_context(id_)}',
             ex=ex)
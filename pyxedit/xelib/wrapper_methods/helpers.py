@@ -1,3 +1,4 @@
+from array import array
 import ctypes
 
 from pyxedit.xelib.wrapper_methods.base import WrapperMethodsBase
@@ -10,13 +11,90 @@ class XelibError(Exception):
     pass
 
 
+class ResultBuffers:
+    '''
+    A pool of reusable ctypes buffers for receiving string and array results
+    from ``XEditLib.dll``.
+
+    Rather than allocating a fresh buffer for every string or array fetched,
+    we keep one buffer of each kind around and hand it out for every call. When
+    a call needs more room than the buffer has, the buffer is replaced with one
+    at least double its size, so that after a short warm up period the pool
+    stops allocating altogether.
+    '''
+    INITIAL_SIZE = 256
+
+    def __init__(self):
+        self._string_buffer = None
+        self._array_buffer = None
+
+    @classmethod
+    def grown_size(cls, current_size, required_size):
+        '''
+        Returns the size a buffer of ``current_size`` should be grown to in
+        order to fit ``required_size`` items.
+        '''
+        size = max(current_size, cls.INITIAL_SIZE)
+        while size < required_size:
+            size *= 2
+        return size
+
+    def string_buffer(self, length):
+        '''
+        Returns a unicode buffer that can hold a string of ``length``
+        characters, plus a null terminator.
+        '''
+        buffer = self._string_buffer
+        if buffer is None or len(buffer) <= length:
+            buffer = ctypes.create_unicode_buffer(
+                self.grown_size(len(buffer) if buffer else 0, length + 1))
+            self._string_buffer = buffer
+        return buffer
+
+    def array_buffer(self, length):
+        '''
+        Returns a c_uint (Cardinal) buffer that can hold ``length`` items.
+        '''
+        buffer = self._array_buffer
+        if buffer is None or len(buffer) < length:
+            buffer = (ctypes.c_uint * self.grown_size(
+                len(buffer) if buffer else 0, length))()
+            self._array_buffer = buffer
+        return buffer
+
+    def clear(self):
+        '''
+        Drops the pooled buffers, freeing their memory.
+        '''
+        self._string_buffer = None
+        self._array_buffer = None
+
+
 class HelpersMethods(WrapperMethodsBase):
+    def error_prefix(self, error_msg):
+        '''
+        Resolves the given ``error_msg`` into a prefix for an exception message.
+
+        Error messages may be given as a plain string, or as a callable that
+        takes no arguments and returns the string. The callable form lets the
+        wrapper methods defer building expensive context (such as the element
+        path, which is itself a DLL call) until a call has actually failed,
+        so that successful calls do not pay for it. Since resolving it may
+        itself make DLL calls (and fail), callers must read the DLL's error
+        with ``get_xelib_error_str`` before resolving the prefix.
+        '''
+        if callable(error_msg):
+            error_msg = error_msg()
+        return f'{error_msg}: ' if error_msg else ''
+
     def verify_execution(self, result, error_msg='', ex=True):
         '''
         If result is false, raise XelibError with given message
         '''
         if not result and ex:
-            raise XelibError(f'{error_msg}: {self.get_xelib_error_str()}')
+            error = self.get_xelib_error_str()
+            raise XelibError(f'{self.error_prefix(error_msg)}'
+                             f'{error}')
         return bool(result)
 
     def get_string(self, callback, method=None, error_msg='', ex=True):
@@ -36,7 +114,6 @@ class HelpersMethods(WrapperMethodsBase):
         whole process for you.
         '''
         method = method or self.raw_api.GetResultString
-        error_prefix = f'{error_msg}: ' if error_msg else ''
 
         # need a c_int to pass by reference to the given callback
         len_ = ctypes.c_int()
@@ -44,9 +121,11 @@ class HelpersMethods(WrapperMethodsBase):
         # run the callback, pass len_ into it by reference
         result = callback(ctypes.byref(len_))
         if not result and ex:
-            raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+            error = self.get_xelib_error_str()
+            raise XelibError(f'{self.error_prefix(error_msg)}'
+                             f'Call to {repr(callback)} with '
                              f'parameter {repr(len_)} failed: '
-                             f'{self.get_xelib_error_str()}')
+                             f'{error}')
 
         # len_ should now contain the string length; if it does not look like
         # the length of a nonempty string, just return an empty string
@@ -55,18 +134,23 @@ class HelpersMethods(WrapperMethodsBase):
 
         # otherwise, we will need a string buffer to copy the string onto;
         # xedit-lib strings are utf-16, so make sure to use a unicode buffer so
-        # that length will exactly match
-        buffer = ctypes.create_unicode_buffer(len_.value)
+        # that length will exactly match. The buffer comes from the session's
+        # pool and may be larger than needed and hold a previous result, so
+        # terminate it at the expected length before handing it over
+        buffer = self._result_buffers.string_buffer(len_.value)
+        buffer[len_.value] = '\0'
 
         # run the string getter method to copy string of the given length to the
         # given buffer, and return or error depending on boolean return value
         if method(buffer, len_):
             return buffer.value
         else:
-            raise XelibError(f'{error_prefix}Failed to retrieve string via '
+            error = self.get_xelib_error_str()
+            raise XelibError(f'{self.error_prefix(error_msg)}'
+                             f'Failed to retrieve string via '
                              f'method {repr(method)}, buffer `{repr(buffer)}`, '
                              f'and length `{repr(len_)}`: '
-                             f'{self.get_xelib_error_str()}')
+                             f'{error}')
 
     def get_handle(self, callback, error_msg='', ex=True):
         '''
@@ -74,63 +158,63 @@ class HelpersMethods(WrapperMethodsBase):
         'gets a handle' tend to want us to pass a c_uint by reference for it to
         put the handle there. This helper function takes care of this pattern.
         '''
-        error_prefix = f'{error_msg}: ' if error_msg else ''
-
         res = ctypes.c_uint()
         if not callback(ctypes.byref(res)):
             if ex:
-                raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+                error = self.get_xelib_error_str()
+                raise XelibError(f'{self.error_prefix(error_msg)}'
+                                 f'Call to {repr(callback)} with '
                                  f'parameter {repr(res)} failed: '
-                                 f'{self.get_xelib_error_str()}')
+                                 f'{error}')
         if res.value:
             self.track_handle(res.value)
         return res.value
 
     def get_integer(self, callback, error_msg='', ex=True):
-        error_prefix = f'{error_msg}: ' if error_msg else ''
-
         res = ctypes.c_int()
         if not callback(ctypes.byref(res)):
             if ex:
-                raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+                error = self.get_xelib_error_str()
+                raise XelibError(f'{self.error_prefix(error_msg)}'
+                                 f'Call to {repr(callback)} with '
                                  f'parameter {repr(res)} failed: '
-                                 f'{self.get_xelib_error_str()}')
+                                 f'{error}')
             return None
         return res.value
 
     def get_unsigned_integer(self, callback, error_msg='', ex=True):
-        error_prefix = f'{error_msg}: ' if error_msg else ''
-
         res = ctypes.c_uint()
         if not callback(ctypes.byref(res)):
             if ex:
-                raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+                error = self.get_xelib_error_str()
+                raise XelibError(f'{self.error_prefix(error_msg)}'
+                                 f'Call to {repr(callback)} with '
                                  f'parameter {repr(res)} failed: '
-                                 f'{self.get_xelib_error_str()}')
+                                 f'{error}')
             return None
         return res.value
 
     def get_bool(self, callback, error_msg='', ex=True):
-        error_prefix = f'{error_msg}: ' if error_msg else ''
-
         res = ctypes.c_ushort()
         if not callback(ctypes.byref(res)):
             if ex:
-                raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+                error = self.get_xelib_error_str()
+                raise XelibError(f'{self.error_prefix(error_msg)}'
+                                 f'Call to {repr(callback)} with '
                                  f'parameter {repr(res)} failed: '
-                                 f'{self.get_xelib_error_str()}')
+                                 f'{error}')
             return None
         return bool(res.value)
 
     def get_double(self, callback, error_msg='', ex=True):
-        error_prefix = f'{error_msg}: ' if error_msg else ''
-
         res = ctypes.c_double()
         if not callback(ctypes.byref(res)):
             if ex:
-                raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+                error = self.get_xelib_error_str()
+                raise XelibError(f'{self.error_prefix(error_msg)}'
+                                 f'Call to {repr(callback)} with '
                                  f'parameter {repr(res)} failed: '
-                                 f'{self.get_xelib_error_str()}')
+                                 f'{error}')
             return None
         return res.value
 
@@ -140,36 +224,39 @@ class HelpersMethods(WrapperMethodsBase):
         pass a c_ubyte by reference for it to put the byte data there. This
         helper function takes care of this pattern.
         '''
-        error_prefix = f'{error_msg}: ' if error_msg else ''
-
         res = ctypes.c_ubyte()
         if not callback(ctypes.byref(res)):
             if ex:
-                raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+                error = self.get_xelib_error_str()
+                raise XelibError(f'{self.error_prefix(error_msg)}'
+                                 f'Call to {repr(callback)} with '
                                  f'parameter {repr(res)} failed: '
-                                 f'{self.get_xelib_error_str()}')
+                                 f'{error}')
             return None
         return res.value
 
     def get_two_bytes(self, callback, error_msg='', ex=True):
-        error_prefix = f'{error_msg}: ' if error_msg else ''
-
         res1 = ctypes.c_ubyte()
         res2 = ctypes.c_ubyte()
         if not callback(ctypes.byref(res1), ctypes.byref(res2)):
             if ex:
-                raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+                error = self.get_xelib_error_str()
+                raise XelibError(f'{self.error_prefix(error_msg)}'
+                                 f'Call to {repr(callback)} with '
                                  f'parameters {repr(res1)}, {repr(res2)} failed: '
-                                 f'{self.get_xelib_error_str()}')
+                                 f'{error}')
             return None, None
         return res1.value, res2.value
 
-    def get_array(self, callback, method=None, error_msg='', ex=True):
+    def get_array(self, callback, method=None, error_msg='', ex=True,
+                  as_array=False):
         '''
-        Gets an array, similar pattern to how strings are gotten
+        Gets an array, similar pattern to how strings are gotten. By default
+        the array is returned as a list of ints; if ``as_array`` is set to
+        True, it is returned as an ``array.array('I')`` instead, which is
+        copied from the result buffer in one go and is much more compact.
         '''
         method = method or self.raw_api.GetResultArray
-        error_prefix = f'{error_msg}: ' if error_msg else ''
 
         # need a c_int to pass by reference to the given callback
         len_ = ctypes.c_int()
@@ -177,33 +264,41 @@ class HelpersMethods(WrapperMethodsBase):
         # run the callback, pass len_ into it by reference
         result = callback(ctypes.byref(len_))
         if not result and ex:
-            raise XelibError(f'{error_prefix}Call to {repr(callback)} with '
+            error = self.get_xelib_error_str()
+            raise XelibError(f'{self.error_prefix(error_msg)}'
+                             f'Call to {repr(callback)} with '
                              f'parameter {repr(len_)} failed: '
-                             f'{self.get_xelib_error_str()}')
+                             f'{error}')
 
         # len_ should now contain the array length; if it does not look like the
         # length of a nonempty array, just return an empty array
         if len_.value < 1:
-            return []
+            return array('I') if as_array else []
 
         # otherwise, we will need a c_uint (Cardinal) buffer for the array to be
-        # copied into, this buffer needs to be exactly the size of the expected
-        # array
-        buffer = (ctypes.c_uint * len_.value)()
+        # copied into; the session's pool gives us one that is at least the
+        # size of the expected array
+        buffer = self._result_buffers.array_buffer(len_.value)
 
         # run the array getter method to copy array of the given length to the
-        # given buffer, return with a converted list of python ints; or error
+        # given buffer, return with a copy of the first `len_` items; or error
         # if resulting boolean value indicates failure
         if method(buffer, len_):
-            items = [int(value) for value in buffer]
-            for item in items:
-                self.track_handle(item)
+            if as_array:
+                items = array('I')
+                items.frombytes(memoryview(buffer).cast('B')[
+                    :len_.value * ctypes.sizeof(ctypes.c_uint)])
+            else:
+                items = buffer[:len_.value]
+            self.track_handles(items)
             return items
         else:
-            raise XelibError(f'{error_prefix}Failed to retrieve array via '
+            error = self.get_xelib_error_str()
+            raise XelibError(f'{self.error_prefix(error_msg)}'
+                             f'Failed to retrieve array via '
                              f'method {repr(method)}, buffer `{repr(buffer)}`, '
                              f'and length `{repr(len_)}`: '
-                             f'{self.get_xelib_error_str()}')
+                             f'{error}')
 
     def get_string_array(self, callback, method=None, error_msg='', ex=True):
         method = method or self.raw_api.GetResultString
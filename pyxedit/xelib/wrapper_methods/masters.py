@@ -12,8 +12,8 @@ class MastersMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.CleanMasters(id_),
-            error_msg=f'Failed to clean masters in: '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to clean masters in: '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def sort_masters(self, id_, ex=True):
@@ -27,8 +27,8 @@ class MastersMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SortMasters(id_),
-            error_msg=f'Failed to sort masters in: '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to sort masters in: '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def add_master(self, id_, file_name, ex=True):
@@ -43,8 +43,8 @@ class MastersMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.AddMaster(id_, file_name),
-            error_msg=f'Failed to add master {file_name} to file: '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to add master {file_name} to file: '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def add_required_masters(self, id_, id2, as_new=False, ex=True):
@@ -63,9 +63,9 @@ class MastersMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.AddRequiredMasters(id_, id2, as_new),
-            error_msg=f'Failed to add required masters for '
-                      f'{self.element_context(id_)} to file: '
-                      f'{self.element_context(id2)}',
+            error_msg=lambda: f'Failed to add required masters for '
+                              f'{self.element_context(id_)} to file: '
+                              f'{self.element_context(id2)}',
             ex=ex)
 
     def get_masters(self, id_, ex=True):
@@ -81,7 +81,8 @@ class MastersMethods(WrapperMethodsBase):
         '''
         return self.get_array(
             lambda len_: self.raw_api.GetMasters(id_, len_),
-            error_msg=f'Failed to get masters for {self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get masters for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_required_by(self, id_, ex=True):
@@ -98,8 +99,8 @@ class MastersMethods(WrapperMethodsBase):
         '''
         return self.get_array(
             lambda len_: self.raw_api.GetRequiredBy(id_, len_),
-            error_msg=f'Failed to get required by for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get required by for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_master_names(self, id_, ex=True):
@@ -115,8 +116,8 @@ class MastersMethods(WrapperMethodsBase):
         '''
         return self.get_string_array(
             lambda len_: self.raw_api.GetMasterNames(id_, len_),
-            error_msg=f'Failed to get master names for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get master names for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def add_all_masters(self, id_, ex=True):
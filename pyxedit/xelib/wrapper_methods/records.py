@@ -132,7 +132,8 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         form_id = self.get_unsigned_integer(
             lambda res: self.raw_api.GetFormID(id_, res, native),
-            error_msg=f'Failed to get FormID for {self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get FormID for '
+                              f'{self.element_context(id_)}',
             ex=ex)
         if form_id and local:
             return form_id & 0xFFFFFF
@@ -178,8 +179,9 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SetFormId(id_, new_form_id, native, fix_references),
-            error_msg=f'Failed to set FormID on {self.element_context(id_)} to '
-                      f'{new_form_id}',
+            error_msg=lambda: f'Failed to set FormID on '
+                              f'{self.element_context(id_)} to '
+                              f'{new_form_id}',
             ex=ex)
 
     def get_record(self, id_, form_id, search_masters=True, ex=True):
@@ -198,8 +200,9 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.GetRecord(id_, form_id, search_masters, res),
-            error_msg=f'Failed to get record at {self.element_context(id_)}, '
-                      f'{form_id}',
+            error_msg=lambda: f'Failed to get record at '
+                              f'{self.element_context(id_)}, '
+                              f'{form_id}',
             ex=ex)
 
     def get_records(self, id_, search='', include_overrides=False, ex=True):
@@ -226,8 +229,8 @@ class RecordsMethods(WrapperMethodsBase):
         return self.get_array(
             lambda len_:
                 self.raw_api.GetRecords(id_, search, include_overrides, len_),
-            error_msg=f'Failed to get {search} records from '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get {search} records from '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_refrs(self, id_, search, opts=None, ex=True):
@@ -250,8 +253,8 @@ class RecordsMethods(WrapperMethodsBase):
         return self.get_array(
             lambda len_:
                 self.raw_api.GetREFRs(id_, search, self.build_flags(opts), len_),
-            error_msg=f'Failed to get {search} REFRs from '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get {search} REFRs from '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_overrides(self, id_, ex=True):
@@ -268,8 +271,8 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_array(
             lambda len_: self.raw_api.GetOverrides(id_, len_),
-            error_msg=f'Failed to get overrides for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get overrides for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_master_record(self, id_, ex=True):
@@ -286,8 +289,8 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.GetMasterRecord(id_, res),
-            error_msg=f'Failed to get master record for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get master record for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_previous_override(self, id_, id2, ex=True):
@@ -307,9 +310,9 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.GetPreviousOverride(id_, id2, res),
-            error_msg=f'Failed to get previous override record for '
-                      f'{self.element_context(id_)}, targetting file '
-                      f'{self.element_context(id2)}',
+            error_msg=lambda: f'Failed to get previous override record for '
+                              f'{self.element_context(id_)}, targetting file '
+                              f'{self.element_context(id2)}',
             ex=ex)
 
     def get_winning_override(self, id_, ex=True):
@@ -325,8 +328,8 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.GetWinningOverride(id_, res),
-            error_msg=f'Failed to get winning override record for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get winning override record for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_injection_target(self, id_, ex=True):
@@ -342,8 +345,8 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.GetInjectionTarget(id_, res),
-            error_msg=f'Failed to get injection target for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get injection target for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def find_next_record(self, id_, search, by_edid, by_name, ex=True):
@@ -366,8 +369,8 @@ class RecordsMethods(WrapperMethodsBase):
         return self.get_handle(
             lambda res:
                 self.raw_api.FindNextRecord(id_, search, by_edid, by_name, res),
-            error_msg=f'Failed to find next record for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to find next record for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def find_previous_record(self, id_, search, by_edid, by_name, ex=True):
@@ -394,8 +397,8 @@ class RecordsMethods(WrapperMethodsBase):
                                                         by_edid,
                                                         by_name,
                                                         res),
-            error_msg=f'Failed to find previous record for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to find previous record for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def find_valid_references(self, id_, signature, search, limit_to, ex=True):
@@ -425,8 +428,8 @@ class RecordsMethods(WrapperMethodsBase):
                                                           search,
                                                           limit_to,
                                                           len_),
-            error_msg=f'Failed to find valid {signature} references on '
-                      f'{self.element_context(id_)} searching for {search}',
+            error_msg=lambda: f'Failed to find valid {signature} references on '
+                              f'{self.element_context(id_)} searching for {search}',
             ex=ex)
 
     def get_referenced_by(self, id_, ex=True):
@@ -443,8 +446,8 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_array(
             lambda len_: self.raw_api.GetReferencedBy(id_, len_),
-            error_msg=f'Failed to get referenced by for: '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get referenced by for: '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def exchange_references(self, id_, old_form_id, new_form_id, ex=True):
@@ -462,9 +465,9 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.ExchangeReferences(id_, old_form_id, new_form_id),
-            error_msg=f'Failed to exchange references on '
-                      f'{self.element_context(id_)} from {old_form_id} to '
-                      f'{new_form_id}',
+            error_msg=lambda: f'Failed to exchange references on '
+                              f'{self.element_context(id_)} from {old_form_id} to '
+                              f'{new_form_id}',
             ex=ex)
 
     def is_master(self, id_, ex=True):
@@ -533,7 +536,7 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.GetRecordDef(sig, res),
-            error_msg=f'Failed to get record def for {sig}',
+            error_msg=lambda: f'Failed to get record def for {sig}',
             ex=ex)
 
     def get_nodes(self, id_, ex=True):
@@ -551,7 +554,8 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.GetNodes(id_, res),
-            error_msg=f'Failed to get nodes for {self.element_context(id_)}',
+            error_msg=lambda: f'Failed to get nodes for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_conflict_data(self, nodes, handle, as_string=False, ex=False):
@@ -575,7 +579,7 @@ class RecordsMethods(WrapperMethodsBase):
         conflict_all, conflict_this = self.get_two_bytes(
             lambda res1, res2:
                 self.raw_api.GetConflictData(nodes, handle, res1, res2),
-            error_msg=f'GetConflictData failed on {nodes}, {handle}',
+            error_msg=lambda: f'GetConflictData failed on {nodes}, {handle}',
             ex=ex)
 
         conflict_all = ConflictAll(conflict_all or 0)
@@ -610,6 +614,7 @@ class RecordsMethods(WrapperMethodsBase):
         '''
         return self.get_array(
             lambda len_: self.raw_api.GetNodeElements(nodes, element, len_),
-            error_msg=f'GetNodeElements failed on {self.element_context(nodes)}, '
-                      f'{self.element_context(element)}',
+            error_msg=lambda: f'GetNodeElements failed on '
+                              f'{self.element_context(nodes)}, '
+                              f'{self.element_context(element)}',
             ex=ex)
@@ -89,7 +89,7 @@ class ResourcesMethods(WrapperMethodsBase):
         '''
         return self.get_string_array(
             lambda len_: self.raw_api.GetContainerFiles(name, folder, len_),
-            error_msg=f'Failed to get files in container {name}',
+            error_msg=lambda: f'Failed to get files in container {name}',
             ex=ex)
 
     def get_file_container(self, file_path, ex=True):
@@ -106,7 +106,7 @@ class ResourcesMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.GetFileContainer(file_path, len_),
-            error_msg=f'Failed to get file container for {file_path}',
+            error_msg=lambda: f'Failed to get file container for {file_path}',
             ex=ex)
 
     def get_loaded_containers(self, ex=True):
@@ -118,7 +118,7 @@ class ResourcesMethods(WrapperMethodsBase):
         '''
         return self.get_string_array(
             lambda len_: self.raw_api.GetLoadedContainers(len_),
-            error_msg=f'Failed to get loaded containers',
+            error_msg=lambda: f'Failed to get loaded containers',
             ex=ex)
 
     def load_container(self, file_path):
@@ -179,7 +179,7 @@ class ResourcesMethods(WrapperMethodsBase):
                                       share,
                                       af,
                                       ff),
-            error_msg=f'Failed to build archive {name}',
+            error_msg=lambda: f'Failed to build archive {name}',
             ex=ex)
 
     def get_texture_data(self, resource_name, ex=True):
@@ -193,5 +193,5 @@ class ResourcesMethods(WrapperMethodsBase):
         return self.get_image_data(
             lambda width, height:
                 self.raw_api.GetTextureData(resource_name, width, height),
-            error_msg=f'Failed to get texture data for {resource_name}',
+            error_msg=lambda: f'Failed to get texture data for {resource_name}',
             ex=ex)
@@ -17,8 +17,8 @@ class SerializationMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.ElementToJson(id_, len_),
-            error_msg=f'Failed to serialize element to JSON: '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to serialize element to JSON: '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def element_to_dict(self, id_, ex=True):
@@ -49,8 +49,8 @@ class SerializationMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.ElementFromJson(id_, path, json),
-            error_msg=f'Failed to deserialize element from JSON: '
-                      f'{self.element_context(id_, path)}',
+            error_msg=lambda: f'Failed to deserialize element from JSON: '
+                              f'{self.element_context(id_, path)}',
             ex=ex)
 
     def element_from_dict(self, id_, path, dict_, ex=True):
@@ -75,6 +75,6 @@ class SerializationMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.DefToJson(id_, len_),
-            error_msg=f'Failed to serialize def to JSON: '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to serialize def to JSON: '
+                              f'{self.element_context(id_)}',
             ex=ex)
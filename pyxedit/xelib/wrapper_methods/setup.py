@@ -83,8 +83,8 @@ class SetupMethods(WrapperMethodsBase):
         game = game or self.GameModes.SSE
         return self.get_string(
             lambda len_: self.raw_api.GetGamePath(game.value, len_),
-            error_msg=f'GetGamePath failed for game {game}; mode '
-                      f'{game.value}',
+            error_msg=lambda: f'GetGamePath failed for game {game}; mode '
+                              f'{game.value}',
             ex=ex)
 
     def set_game_path(self, path, ex=True):
@@ -106,7 +106,7 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SetGamePath(path),
-            error_msg=f'Failed to SetGamePath to {path}',
+            error_msg=lambda: f'Failed to SetGamePath to {path}',
             ex=ex)
 
     def get_game_language(self, game=None, ex=True):
@@ -125,8 +125,8 @@ class SetupMethods(WrapperMethodsBase):
         game = game or self.GameModes.SSE
         return self.get_string(
             lambda len_: self.raw_api.GetGameLanguage(game.value, len_),
-            error_msg=f'GetGameLanguage failed for game {game}; mode '
-                      f'{game.value}',
+            error_msg=lambda: f'GetGameLanguage failed for game {game}; mode '
+                              f'{game.value}',
             ex=ex) or 'English'
 
     def set_language(self, language, ex=True):
@@ -140,7 +140,7 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.SetLanguage(language),
-            error_msg=f'Failed to SetLanguage to {language}',
+            error_msg=lambda: f'Failed to SetLanguage to {language}',
             ex=ex)
 
     def set_game_mode(self, game=None, ex=True):
@@ -160,8 +160,8 @@ class SetupMethods(WrapperMethodsBase):
         game = game or self.GameModes.SSE
         return self.verify_execution(
             self.raw_api.SetGameMode(game.value),
-            error_msg=f'Failed to SetGameMode to game {game}; mode '
-                      f'{game.value}',
+            error_msg=lambda: f'Failed to SetGameMode to game {game}; mode '
+                              f'{game.value}',
             ex=ex)
 
     def get_load_order(self, ex=True):
@@ -176,7 +176,7 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.GetLoadOrder(len_),
-            error_msg=f'GetLoadOrder failed',
+            error_msg=lambda: f'GetLoadOrder failed',
             ex=ex)
 
     def get_active_plugins(self, ex=True):
@@ -190,7 +190,7 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.get_string(
             lambda len_: self.raw_api.GetActivePlugins(len_),
-            error_msg=f'GetActivePlugins failed',
+            error_msg=lambda: f'GetActivePlugins failed',
             ex=ex)
 
     def load_plugins(self, load_order, smart_load=True, use_dummies=False, ex=True):
@@ -217,9 +217,9 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.LoadPlugins(load_order, smart_load, use_dummies),
-            error_msg=f'Failed to LoadPlugins given load_order '
-                      f'{repr(load_order)}; smart_load={smart_load}; '
-                      f'use_dummies={use_dummies}',
+            error_msg=lambda: f'Failed to LoadPlugins given load_order '
+                              f'{repr(load_order)}; smart_load={smart_load}; '
+                              f'use_dummies={use_dummies}',
             ex=ex)
 
     def load_plugin(self, file_name, ex=True):
@@ -235,7 +235,7 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.LoadPlugin(file_name),
-            error_msg=f'Failed to load {file_name}',
+            error_msg=lambda: f'Failed to load {file_name}',
             ex=ex)
 
     def load_plugin_header(self, file_name, ex=True):
@@ -255,7 +255,7 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.get_handle(
             lambda res: self.raw_api.LoadPluginHeader(file_name, res),
-            error_msg=f'Failed to load plugin header for {file_name}',
+            error_msg=lambda: f'Failed to load plugin header for {file_name}',
             ex=ex)
 
     def build_references(self, id_, sync=True, ex=True):
@@ -273,8 +273,8 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.BuildReferences(id_, sync),
-            error_msg=f'Failed to build references for '
-                      f'{self.element_context(id_)}',
+            error_msg=lambda: f'Failed to build references for '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def unload_plugin(self, id_, ex=True):
@@ -289,7 +289,8 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return self.verify_execution(
             self.raw_api.UnloadPlugin(id_),
-            error_msg=f'Failed to unload plugin {self.element_context(id_)}',
+            error_msg=lambda: f'Failed to unload plugin '
+                              f'{self.element_context(id_)}',
             ex=ex)
 
     def get_loader_status(self, ex=True):
@@ -311,7 +312,7 @@ class SetupMethods(WrapperMethodsBase):
         '''
         return LoaderStates(self.get_byte(
             lambda res: self.raw_api.GetLoaderStatus(res),
-            error_msg=f'Failed to get loader status',
+            error_msg=lambda: f'Failed to get loader status',
             ex=ex))
 
     def get_loaded_file_names(self, exclude_hardcoded=True, ex=True):
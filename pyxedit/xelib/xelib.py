@@ -1,12 +1,16 @@
-import ctypes
 from contextlib import contextmanager
-from ctypes import wintypes
-from itertools import tee
 from pathlib import Path
 import os
-import time
 
-from pyxedit.xelib.definitions import DelphiTypes, XEditLibSignatures
+from pyxedit.xelib.backends.dll import DllBackend
+from pyxedit.xelib.handles import (HandleFinalizers,
+                                   HandleRegistry,
+                                   ReleaseQueue)
+from pyxedit.xelib.index import RecordIndex
+from pyxedit.xelib.index_cache import RecordIndexCache
+from pyxedit.xelib.loader import PluginLoad
+from pyxedit.xelib.profiler import XelibProfiler
+from pyxedit.xelib.tracing import CallTracer
 from pyxedit.xelib.wrapper_methods.element_values import ElementValuesMethods
 from pyxedit.xelib.wrapper_methods.elements import ElementsMethods
 from pyxedit.xelib.wrapper_methods.errors import ErrorsMethods
@@ -14,7 +18,9 @@ from pyxedit.xelib.wrapper_methods.file_values import FileValuesMethods
 from pyxedit.xelib.wrapper_methods.files import FilesMethods
 from pyxedit.xelib.wrapper_methods.filter import FilterMethods
 from pyxedit.xelib.wrapper_methods.groups import GroupsMethods
-from pyxedit.xelib.wrapper_methods.helpers import HelpersMethods, XelibError
+from pyxedit.xelib.wrapper_methods.helpers import (HelpersMethods,
+                                                   ResultBuffers,
+                                                   XelibError)
 from pyxedit.xelib.wrapper_methods.masters import MastersMethods
 from pyxedit.xelib.wrapper_methods.messages import MessagesMethods
 from pyxedit.xelib.wrapper_methods.meta import MetaMethods
@@ -29,90 +35,6 @@ __all__ = ['DLL_PATH', 'Xelib', 'XelibError']
 DLL_PATH = Path(__file__).parent / '../xedit-lib/XEditLib.dll'
 
 
-def pairwise(iterable):
-    '''
-    A pairwise iterator, copied from:
-        https://docs.python.org/3/library/itertools.html
-    '''
-    a, b = tee(iterable)
-    next(b, None)
-    return zip(a, b)
-
-
-def with_debug_log(method=False):
-    '''
-    A decorator for debugging purposes. It can be used to wrap around a
-    function or a method, such that whenever the method is called, the wrapper
-    will log the call signature and the return value to a `log.txt` file in
-    your current working directory.
-
-    @param method:
-        if True, the first argument to the call (which in an object method
-        will typically be `self`) will be ommitted from the call signature.
-    '''
-    def _with_debug_log(callable):
-        def wrapper(*args, **kwargs):
-            # determine what args to display based on whether method=True
-            displayed_args = args[1:] if method else args
-
-            # collect the parameters and format the values into a call signature
-            # string
-            params = []
-            if displayed_args:
-                params.append(', '.join([f'{repr(a)}' for a in displayed_args]))
-            if kwargs:
-                params.append(', '.join([f'{k}={repr(v)}' for k, v in kwargs.items()]))
-            params_text = ', '.join(params)
-
-            # we will write/append to this file
-            with open('log.txt', 'a') as f:
-                # write the call signature
-                f.write(f'{callable.__name__}({params_text})\n')
-
-                # execute the wrapped function
-                return_value = callable(*args, **kwargs)
-
-                if return_value is not None:
-                    # format the returned value; if it is a multi-line string,
-                    # only display the first line
-                    displayed_return_value = return_value
-                    if (isinstance(displayed_return_value, str) and
-                            '\n' in displayed_return_value):
-                        displayed_return_value = (
-                            displayed_return_value.split('\n')[0] + ' ...')
-
-                    # write the return value
-                    f.write(f'    --> {displayed_return_value}\n')
-            return return_value
-        return wrapper
-    return _with_debug_log
-
-
-class XelibWrapperAPI:
-    '''
-    A class that wraps around the CDLL object for XEditLib.dll. Each call to
-    something on the CDLL object will be interjected and given a `with_log_debug`
-    wrapper around that same call. This way, all calls to XEditLib.dll can have
-    its calling signature and return values logged for inspection.
-    '''
-    def __init__(self, raw_api):
-        # keeps a reference to CDLL object
-        self.raw_api = raw_api
-
-    def __getattr__(self, attr):
-        try:
-            # make sure methods on XelibWrapperAPI itself is not affected
-            return super(XelibWrapperAPI, self).__getattr__(attr)
-        except AttributeError:
-            # otherwise, run __get_method to generate a wrapped callable
-            # around the requested raw_api call
-            return self.__get_method(attr)
-
-    def __get_method(self, name):
-        # return a `with_debug_log` wrapped callable around the raw_api call
-        return with_debug_log()(getattr(self.raw_api, name))
-
-
 class Xelib(ElementValuesMethods,
             ElementsMethods,
             ErrorsMethods,
@@ -133,7 +55,9 @@ class Xelib(ElementValuesMethods,
                  game_mode=SetupMethods.GameModes.SSE,
                  game_path=None,
                  plugins=None,
-                 xeditlib_path=None):
+                 xeditlib_path=None,
+                 backend=None,
+                 index_cache=None):
         '''
         ``Xelib`` class initializer.
 
@@ -161,6 +85,19 @@ class Xelib(ElementValuesMethods,
                 functions exist in ``XEditLib.dll`` and what their signatures
                 are. If your provided ``XEditLib.dll`` does not have a perfectly
                 matching API, there will likely be all kinds of errors.
+
+            backend (``XEditLibBackend``):
+                The backend to run sessions on. Defaults to a ``DllBackend``
+                loading ``XEditLib.dll`` (from ``xeditlib_path`` if given).
+                Pass a ``SimulatedBackend`` to run on a synthetic load order
+                without the DLL, e.g. for testing and benchmarking.
+
+            index_cache (``str`` or ``RecordIndexCache``):
+                A directory (or a ``RecordIndexCache``) to cache the record
+                index of each plugin in, so that ``record_index`` only has to
+                read the records of plugins that changed since it was last
+                built. By default, the index is built from scratch in every
+                session.
         '''
         # Initialization attributes
         self._game_mode = game_mode
@@ -169,12 +106,29 @@ class Xelib(ElementValuesMethods,
 
         # XEditLib.dll entry points
         self.dll_path = xeditlib_path or DLL_PATH
+        self.backend = backend or DllBackend(self.dll_path)
         self._raw_api = None
-        self._wrapper_api = None  # point `raw_api` to this to log debug calls
+
+        # Profiler and tracer recording calls to XEditLib.dll, when profiling
+        # and tracing respectively
+        self._profiler = None
+        self._tracer = None
+
+        # Reusable buffers for receiving string and array results
+        self._result_buffers = ResultBuffers()
+
+        # Index of the records of the session, built on first use, and the
+        # cache it is built from
+        self._record_index = None
+        if index_cache is not None and \
+                not isinstance(index_cache, RecordIndexCache):
+            index_cache = RecordIndexCache(index_cache)
+        self.index_cache = index_cache
 
         # Attribute for handle management
-        self._handles_stack = []
-        self._current_handles = set()
+        self._handles = HandleRegistry()
+        self._release_queue = ReleaseQueue(self._release_untracked)
+        self._finalizers = HandleFinalizers(self.defer_release_handle)
 
     @property
     def game_path(self):
@@ -186,14 +140,13 @@ class Xelib(ElementValuesMethods,
         if self.loaded:
             return self.set_game_path(value)
 
-    def start_session(self, load_plugins=True):
+    def start_session(self, load_plugins=True, progress=None, timeout=None):
         # sanity check that API has not yet been loaded
         if self.loaded:
             raise XelibError('Api already loaded')
 
-        # load XEditLib.dll
-        self._raw_api = self.load_lib(self.dll_path)
-        self._wrapper_api = XelibWrapperAPI(self._raw_api)
+        # load XEditLib.dll (or whatever stands in for it)
+        self._raw_api = self.backend.load()
 
         # initialize the xEdit context
         self.initialize()
@@ -208,10 +161,37 @@ class Xelib(ElementValuesMethods,
 
         # load plugins if specified
         if load_plugins:
-            self.load_plugins(os.linesep.join(self._plugins))
-            while (self.get_loader_status() ==
-                        SetupMethods.LoaderStates.Active):
-                time.sleep(0.1)
+            self.load_plugins_async(progress=progress, timeout=timeout).wait()
+
+    def load_plugins_async(self, plugins=None, progress=None, timeout=None):
+        '''
+        Starts loading plugins without waiting for the load to finish. See
+        ``PluginLoad`` for the ways to wait on the returned load. See example:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            xelib = Xelib(plugins=['GOT.esp'])
+            with xelib.session(load_plugins=False):
+                load = xelib.load_plugins_async(progress=print)
+                ...  # do something else while the plugins load
+                await load
+
+        Args:
+            plugins (``List[str]``):
+                the plugins to load; defaults to ``Xelib``'s list of plugins.
+                Any required masters are loaded as well
+            progress (``Callable[[LoaderEvent], None]``):
+                called with each message logged by the loader
+            timeout (``float``):
+                seconds after which waiting on the load fails
+
+        Returns:
+            (``PluginLoad``) the load in progress
+        '''
+        plugins = self._plugins if plugins is None else plugins
+        self.load_plugins(os.linesep.join(plugins))
+        return PluginLoad(self, progress=progress, timeout=timeout)
 
     def end_session(self):
         # sanity check that API is loaded
@@ -219,16 +199,16 @@ class Xelib(ElementValuesMethods,
             raise XelibError('Api is not loaded; something is wrong')
 
         # unload the API
+        self.flush_handle_releases()
         self.release_all_handles()
         self.finalize()
-        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-        kernel32.FreeLibrary.argtypes = [wintypes.HMODULE]
-        kernel32.FreeLibrary(self._raw_api._handle)
+        self.backend.unload(self._raw_api)
         self._raw_api = None
-        self._wrapper_api = None
+        self._result_buffers.clear()
+        self._record_index = None
 
     @contextmanager
-    def session(self, load_plugins=True):
+    def session(self, load_plugins=True, progress=None, timeout=None):
         '''
         Creates a context manager for your ``Xelib`` session. This is the
         primary way in which you are expected to use the ``Xelib`` API.
@@ -253,9 +233,17 @@ class Xelib(ElementValuesMethods,
             load_plugins (``bool``):
                 Whether to load ``Xelib``'s list of plugins after initializing
                 ``XEditLib.dll``
+            progress (``Callable[[LoaderEvent], None]``):
+                Called with each message logged while loading plugins, e.g.
+                to report progress
+            timeout (``float``):
+                Seconds after which to give up on loading plugins, raising a
+                ``XelibError``
         '''
         try:
-            self.start_session()
+            self.start_session(load_plugins=load_plugins,
+                               progress=progress,
+                               timeout=timeout)
             yield self
         finally:
             self.end_session()
@@ -268,16 +256,32 @@ class Xelib(ElementValuesMethods,
         '''
         return bool(self._raw_api)
 
+    @property
+    def current_handles(self):
+        '''
+        (``Set[int]``) The set of handles tracked by the current handle
+        management context
+        '''
+        return self._handles.current
+
     @property
     def full_handles_stack(self):
-        return self._handles_stack + [self._current_handles]
+        return list(self._handles.layers)
 
     @property
     def all_opened_handles(self):
-        opened_handles = set()
-        for handles in self.full_handles_stack:
-            opened_handles.update(handles)
-        return opened_handles
+        return set(self._handles)
+
+    def is_handle_tracked(self, handle):
+        '''
+        Returns whether the given handle is tracked by any handle management
+        context, i.e. whether it is opened and not yet released.
+
+        Args:
+            handle (``int``)
+                The handle to check
+        '''
+        return handle in self._handles
 
     def track_handle(self, handle):
         '''
@@ -288,7 +292,18 @@ class Xelib(ElementValuesMethods,
             handle (``int``)
                 The handle to track
         '''
-        self._current_handles.add(handle)
+        self._handles.track(handle)
+
+    def track_handles(self, handles):
+        '''
+        Add the given handles to the current handle management stack layer
+        for tracking purposes.
+
+        Args:
+            handles (``Iterable[int]``)
+                The handles to track
+        '''
+        self._handles.track_many(handles)
 
     def release_handle(self, handle):
         '''
@@ -298,14 +313,8 @@ class Xelib(ElementValuesMethods,
             handle (``int``)
                 The handle to release
         '''
-        try:
-            self.release(handle)
-        except XelibError:
-            pass
-        finally:
-            for layer in self.full_handles_stack:
-                if handle in layer:
-                    layer.remove(handle)
+        self._handles.untrack(handle)
+        self._release_untracked(handle)
 
     def release_handles(self, handles):
         '''
@@ -318,11 +327,86 @@ class Xelib(ElementValuesMethods,
         for handle in handles:
             self.release_handle(handle)
 
+    def defer_release_handle(self, handle):
+        '''
+        Removes a handle from the handle management stack right away, but
+        queues up the actual release of the handle, to be done together with
+        other queued handles. The queue is flushed whenever it grows to
+        ``release_batch_size`` handles, whenever a ``manage_handles`` context
+        exits, at the end of the session, or whenever
+        ``flush_handle_releases`` is called.
+
+        Since the handle is no longer tracked, it counts as released as far
+        as the handle management stack is concerned, even while it is still
+        waiting in the queue. Handles that are not tracked (e.g. because they
+        have already been released) are ignored.
+
+        Args:
+            handle (``int``)
+                The handle to release
+        '''
+        if self._handles.untrack(handle) and self.loaded:
+            self._release_queue.push(handle)
+
+    def watch_handle(self, obj, handle):
+        '''
+        Arranges for the given handle to be released through
+        ``defer_release_handle`` once the given object (typically the object
+        wrapping the handle) gets garbage collected.
+
+        Args:
+            obj (``object``)
+                The object to watch; must support weak references
+            handle (``int``)
+                The handle to release once the object is collected
+
+        Returns:
+            (``HandleFinalizer``) the finalizer, which can be detached to
+            cancel the release
+        '''
+        return self._finalizers.watch(obj, handle)
+
+    def is_handle_watched(self, handle):
+        '''
+        Returns whether the given handle will be released once the object
+        wrapping it is garbage collected (see ``watch_handle``).
+        '''
+        return handle in self._finalizers
+
+    def flush_handle_releases(self):
+        '''
+        Releases all handles queued up by ``defer_release_handle``.
+
+        Returns:
+            (``int``) the number of handles released
+        '''
+        return self._release_queue.flush()
+
+    @property
+    def release_batch_size(self):
+        '''
+        (``int``) The number of handles queued up by ``defer_release_handle``
+        at which they get released automatically
+        '''
+        return self._release_queue.batch_size
+
+    @release_batch_size.setter
+    def release_batch_size(self, value):
+        self._release_queue.batch_size = value
+
     def release_current_handles(self):
-        self.release_handles(list(self._current_handles))
+        for handle in self._handles.drain_current():
+            self._release_untracked(handle)
 
     def release_all_handles(self):
-        self.release_handles(list(self.all_opened_handles))
+        for handle in self._handles.drain_all():
+            self._release_untracked(handle)
+
+    def _release_untracked(self, handle):
+        try:
+            self.release(handle)
+        except XelibError:
+            pass
 
     @contextmanager
     def manage_handles(self):
@@ -352,21 +436,47 @@ class Xelib(ElementValuesMethods,
             # at the end of session, handle 1 gets released
         '''
         try:
-            self._handles_stack.append(self._current_handles)
-            self._current_handles = set()
+            self._handles.push()
             yield
         finally:
-            self.release_current_handles()
-            self._current_handles = self._handles_stack.pop()
+            for handle in self._handles.pop():
+                self._release_untracked(handle)
+            self.flush_handle_releases()
+
+    @contextmanager
+    def capture_handles(self):
+        '''
+        A context manager collecting the handles opened within the context.
+        Unlike with ``manage_handles``, the handles are not released on
+        context exit; they are kept open in the enclosing handle management
+        context, and the list they are collected into is filled in on exit.
+        See example:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            with xelib.capture_handles() as opened:
+                armors = xelib.get_records(0, 'ARMO')
+            # `opened` now lists the handles in `armors`
+
+        Returns:
+            (``List[int]``) the list the opened handles are collected into
+        '''
+        opened = []
+        self._handles.push()
+        try:
+            yield opened
+        finally:
+            opened.extend(self._handles.pop())
+            self._handles.track_many(opened)
 
     def print_handle_management_stack(self):
         '''
         Prints the entire handle management stack to stdout. Useful for
         debugging.
         '''
-        for i, handles in enumerate(self._handles_stack):
+        for i, handles in enumerate(self._handles.layers):
             print(f'{i}: {handles}')
-        print(f'{len(self._handles_stack)}: {self._current_handles}')
 
     def promote_handle(self, handle):
         '''
@@ -378,13 +488,62 @@ class Xelib(ElementValuesMethods,
             handle (``int``)
                 The handle to promote to parent handle management context
         '''
-        for (current_layer,
-             parent_layer) in pairwise(reversed(self.full_handles_stack)):
-            if handle in current_layer:
-                current_layer.remove(handle)
-                parent_layer.add(handle)
-                return parent_layer
-        print(f'failed to promote handle {handle}')
+        parent_layer = self._handles.promote(handle)
+        if parent_layer is None:
+            print(f'failed to promote handle {handle}')
+        return parent_layer
+
+    @property
+    def record_index(self):
+        '''
+        (``RecordIndex``) The index of the records of the session, for
+        looking records up by EditorID or FormID without a scan. The index
+        is built on first use, which reads every record of the load order
+        once (or, with an ``index_cache``, only the records of plugins not
+        cached yet), and is then kept up to date as records are added, until
+        the session ends.
+        '''
+        if not self.loaded:
+            raise XelibError('The record index is only available within '
+                             'a session')
+        if self._record_index is None:
+            self._record_index = RecordIndex(self, self.index_cache).build()
+        return self._record_index
+
+    def index_element(self, handle):
+        '''
+        Brings the record index up to date with an element that has just
+        been added. Does nothing until the index has been built.
+
+        Args:
+            handle (``int``)
+                The handle of the element
+        '''
+        if self._record_index is not None and handle:
+            self._record_index.element_added(handle)
+
+    def index_value(self, id_, path):
+        '''
+        Brings the record index up to date with a value that has just been
+        set, if it is an EditorID: set by the ``EDID`` path of a record, or
+        on an ``EDID`` element itself. Does nothing until the index has been
+        built.
+
+        Args:
+            id\\_ (``int``)
+                The handle of the element the value was set from
+            path (``str``)
+                The path of the value, relative to that element
+        '''
+        if self._record_index is None or not id_:
+            return
+        if path == 'EDID':
+            self._record_index.record_changed(id_)
+        elif not path and self.signature(id_, ex=False) == 'EDID':
+            with self.manage_handles():
+                record = self.get_element_record(id_, ex=False)
+                if record:
+                    self._record_index.record_changed(record)
 
     @property
     def raw_api(self):
@@ -413,80 +572,164 @@ class Xelib(ElementValuesMethods,
         actual value itself, or raise Exceptions, like what you'd expect from
         a higher-level programming language API. Thus, most users should use
         ``Xelib`` methods instead.
+
+        While profiling or tracing (see ``profile`` and ``trace``), this
+        gives a stand-in for the raw API object that records every call into
+        the profiler and/or tracer.
         '''
         if not self._raw_api:
             raise XelibError(f'Must use Xelib within its own context; the '
                              f'code should look something like: `with xelib '
                              f'as xelib: xelib.do_something`')
 
-        # uncomment the `self._wrapper_api` below to log debug calls; will
-        # affect performance, so only enable when necessary
-        # return self._wrapper_api
-        return self._raw_api
+        api = self._raw_api
+        if self._tracer is not None:
+            api = self._tracer.wrap(api)
+        if self._profiler is not None:
+            api = self._profiler.wrap(api)
+        return api
 
-    @staticmethod
-    def load_lib(dll_path):
+    @property
+    def profiler(self):
         '''
-        Loads ``XEditLib.dll`` into python and wrap it with ctypes definitions
-        based on known calling signatures of the DLL functions.
+        (``XelibProfiler``) The active profiler, or None when not profiling
+        '''
+        return self._profiler
+
+    def start_profiling(self, attribute=True):
+        '''
+        Starts recording statistics on all calls made to ``XEditLib.dll``
+        through this ``Xelib`` object. This can be switched on and off at any
+        point, in or out of a session.
 
         Args:
-            dll_path (``str``):
-                Path to the ``XEditLib.dll`` file
+            attribute (``bool``):
+                whether to attribute each call to the ``Xelib`` method and the
+                XEdit-layer caller that made it; this costs a walk up the call
+                stack per call
+
         Returns:
-            ``ctypes.CDLL``: handle to the loaded library
-        '''
-        # load XEditLib.dll
-        lib = ctypes.CDLL(str(dll_path))
-
-        # define type signatures for XEditLib.dll methods
-        for signature in XEditLibSignatures:
-            method_name = signature.name
-            params, return_type = signature.value
-            try:
-                method = getattr(lib, method_name)
-                method.argtypes = [DelphiTypes[type_].value
-                                   for _, type_ in params.items()]
-                if return_type:
-                    method.restype = DelphiTypes[return_type].value
-            except AttributeError:
-                print(f'WARNING: missing function {method_name}')
-
-        # return a handle to the loaded library
-        return lib
-
-
-'''
-If the below switch is turned on, the associated logic will add to the `Xelib`
-class `with_debug_log` wrappers for all of the Xelib API calls. This will log
-all Xelib API calls to a `log.txt` file in your current working directory. It
-can be immensely helpful when optimizing the high-level XEdit API's usage of
-the Xelib API, but logging every call will affect performance, so this should
-be only enabled when debugging.
-'''
-apply_log_wrappers = False
-if apply_log_wrappers:
-    import inspect  # NOQA
-    for methods in (
-            ElementValuesMethods,
-            ElementsMethods,
-            ErrorsMethods,
-            FileValuesMethods,
-            FilesMethods,
-            FilterMethods,
-            GroupsMethods,
-            # for now, we ignore HelpersMethods stuff since they are too
-            # low-leveled and tend to add a lot of noise to the log. In due time
-            # we should at least support the stuff like `element_context`
-            # HelpersMethods
-            MastersMethods,
-            MessagesMethods,
-            MetaMethods,
-            RecordValuesMethods,
-            RecordsMethods,
-            ResourcesMethods,
-            SerializationMethods,
-            SetupMethods):
-        for name, method in inspect.getmembers(methods, inspect.isfunction):
-            if not name.startswith('_'):
-                setattr(Xelib, name, with_debug_log(method=True)(method))
+            (``XelibProfiler``) the profiler recording the calls
+        '''
+        self._profiler = XelibProfiler(attribute=attribute)
+        return self._profiler
+
+    def stop_profiling(self):
+        '''
+        Stops recording calls made to ``XEditLib.dll``.
+
+        Returns:
+            (``XelibProfiler``) the profiler that was recording the calls, or
+            None if not profiling
+        '''
+        profiler, self._profiler = self._profiler, None
+        return profiler
+
+    @contextmanager
+    def profile(self, attribute=True):
+        '''
+        Context manager that profiles the calls made to ``XEditLib.dll``
+        within the context. See example:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            with xelib.profile() as profiler:
+                # do stuff with xelib
+                ...
+            print(profiler.as_dict()['functions'])
+            Path('xelib.folded').write_text(profiler.folded_stacks())
+
+        Args:
+            attribute (``bool``):
+                whether to attribute each call to the ``Xelib`` method and the
+                XEdit-layer caller that made it
+
+        Returns:
+            (``XelibProfiler``) the profiler recording the calls
+        '''
+        profiler = self.start_profiling(attribute=attribute)
+        try:
+            yield profiler
+        finally:
+            self.stop_profiling()
+
+    @property
+    def tracer(self):
+        '''
+        (``CallTracer``) The active call tracer, or None when not tracing
+        '''
+        return self._tracer
+
+    def start_tracing(self, path=None, max_bytes=CallTracer.DEFAULT_MAX_BYTES):
+        '''
+        Starts recording every call made to ``XEditLib.dll`` through this
+        ``Xelib`` object into a binary call trace, which can later be read
+        with ``pyxedit.xelib.tracing.read_trace`` and replayed with a
+        ``TraceReplayer``. This can be switched on and off at any point, in or
+        out of a session.
+
+        Args:
+            path (``str``):
+                if given, the trace file to stream calls into; otherwise the
+                calls are kept in an in-memory ring buffer
+            max_bytes (``int``):
+                the size of the in-memory ring buffer; once full, the oldest
+                calls are dropped
+
+        Returns:
+            (``CallTracer``) the tracer recording the calls
+        '''
+        self.stop_tracing()
+        self._tracer = CallTracer(path=path, max_bytes=max_bytes)
+        return self._tracer
+
+    def stop_tracing(self):
+        '''
+        Stops recording calls made to ``XEditLib.dll``, closing the trace file
+        if streaming into one.
+
+        Returns:
+            (``CallTracer``) the tracer that was recording the calls, or None
+            if not tracing
+        '''
+        tracer, self._tracer = self._tracer, None
+        if tracer is not None:
+            tracer.close()
+        return tracer
+
+    @contextmanager
+    def trace(self, path=None, max_bytes=CallTracer.DEFAULT_MAX_BYTES):
+        '''
+        Context manager that records a binary trace of the calls made to
+        ``XEditLib.dll`` within the context; see ``start_tracing``. See
+        example:
+
+        .. highlight:: python
+        .. code-block:: python
+
+            with xelib.trace() as tracer:
+                # do stuff with xelib
+                ...
+            tracer.dump('session.trace')
+
+            # later, possibly elsewhere
+            replayer = TraceReplayer(api).replay(read_trace('session.trace'))
+
+        Returns:
+            (``CallTracer``) the tracer recording the calls
+        '''
+        tracer = self.start_tracing(path=path, max_bytes=max_bytes)
+        try:
+            yield tracer
+        finally:
+            self.stop_tracing()
+
+    @staticmethod
+    def load_lib(dll_path):
+        '''
+        Loads ``XEditLib.dll`` into python and wrap it with ctypes definitions
+        based on known calling signatures of the DLL functions; see
+        ``DllBackend.load_lib``.
+        '''
+        return DllBackend.load_lib(dll_path)
@@ -6,7 +6,7 @@ setup(name='pyxedit',
       version='0.1.1',
       description='python wrapper around xedit-lib',
       author='leontristain',
-      install_requires=['cached-property>=1.5.1'],
+      install_requires=[],
       include_package_data=True,
       url='https://github.com/leontristain/pyxedit',
       python_requires='>=3.7')
@@ -0,0 +1,314 @@
+'''
+Benchmarks the hot paths of the Xelib and XEdit layers, reporting DLL calls
+per operation, wall time per operation and peak memory (see
+``benchmarking.py``), and compares them to the stored baseline.
+
+By default this runs against the simulated backend, on a synthetic load order
+of the configured size, so it runs anywhere:
+
+    python test/benchmarks/bench_suite.py [--size ci|default|large]
+                                          [--records N] [--plugins N]
+                                          [--layer xelib|xedit] [-k NAME]
+                                          [--check] [--check-time]
+                                          [--update-baseline]
+
+With `--dll`, it runs against ``XEditLib.dll`` instead, on the plugins given
+with `--plugin` (benchmarks then work on the records of the last plugin).
+Baselines are only stored for, and compared against, simulated runs, since
+those are the only runs reproducible from a size alone.
+'''
+from tempfile import TemporaryDirectory
+import argparse
+import sys
+
+from pyxedit import XEdit
+from pyxedit.xelib.backends import (DllBackend,
+                                    SimulatedBackend,
+                                    SyntheticLoadOrder)
+from pyxedit.xelib.index import RecordIndex
+from pyxedit.xelib.index_cache import RecordIndexCache
+
+from benchmarking import (BASELINE_PATH,
+                          BENCHMARKS,
+                          BenchmarkContext,
+                          Workload,
+                          benchmark,
+                          load_baseline,
+                          measure,
+                          regressions,
+                          report,
+                          save_baseline)
+
+# synthetic load orders of each size: (plugins, records per signature)
+SIZES = {'ci': (2, 40),
+         'default': (3, 500),
+         'large': (5, 5000)}
+
+
+def records_of(context, signature):
+    '''
+    Returns handles to (up to) the configured number of records of the given
+    signature defined in the last plugin, releasing the others.
+    '''
+    xelib = context.xelib
+    plugin = xelib.file_by_index(int(xelib.get_global('FileCount')) - 1)
+    handles = xelib.get_records(plugin, signature)
+    xelib.release_handles([plugin] + handles[context.records:])
+    return handles[:context.records]
+
+
+def objects_of(context, signature):
+    return [context.xedit.objectify(handle)
+            for handle in records_of(context, signature)]
+
+
+# the Xelib layer
+@benchmark('xelib', 'get_element')
+def bench_get_element(context):
+    xelib = context.xelib
+    handles = records_of(context, 'ARMO')
+
+    def run():
+        with xelib.manage_handles():
+            for handle in handles:
+                xelib.get_element(handle, 'DATA\\Weight')
+
+    return Workload(run, len(handles))
+
+
+@benchmark('xelib', 'get_value')
+def bench_get_value(context):
+    xelib = context.xelib
+    handles = records_of(context, 'ARMO')
+
+    def run():
+        for handle in handles:
+            xelib.get_value(handle, 'EDID')
+            xelib.get_value(handle, 'DATA\\Weight')
+
+    return Workload(run, len(handles) * 2)
+
+
+@benchmark('xelib', 'get_values')
+def bench_get_values(context):
+    xelib = context.xelib
+    extractors = xelib.Extractors
+    handles = records_of(context, 'ARMO')
+    fields = ['EDID',
+              'FULL',
+              ('DATA\\Value', extractors.Int),
+              ('DATA\\Weight', extractors.Float),
+              ('DNAM', extractors.Float),
+              ('KWDA\\[0]', extractors.FormID)]
+
+    def run():
+        for handle in handles:
+            xelib.get_values(handle, fields, as_tuple=True)
+
+    return Workload(run, len(handles) * len(fields))
+
+
+@benchmark('xelib', 'record_index_cached')
+def bench_record_index_cached(context):
+    xelib = context.xelib
+    cache_dir = TemporaryDirectory()
+    cache = RecordIndexCache(cache_dir.name)
+
+    # the first build fills the cache; the measured ones read from it
+    try:
+        records = len(RecordIndex(xelib, cache).build())
+    except Exception:
+        cache_dir.cleanup()
+        raise
+
+    def run():
+        RecordIndex(xelib, cache).build()
+
+    return Workload(run, records, cleanup=cache_dir.cleanup)
+
+
+# the XEdit layer
+@benchmark('xedit', 'objectify')
+def bench_objectify(context):
+    xelib, xedit = context.xelib, context.xedit
+    handles = []
+
+    def prepare():
+        handles[:] = records_of(context, 'ARMO')
+
+    def run():
+        # the objects are dropped right away, so this includes queueing up
+        # their handles for release
+        for handle in handles:
+            xedit.objectify(handle)
+        xelib.flush_handle_releases()
+
+    prepare()
+    return Workload(run, len(handles), prepare=prepare)
+
+
+@benchmark('xedit', 'descendants')
+def bench_descendants(context):
+    records = objects_of(context, 'NPC_') + objects_of(context, 'REFR')
+
+    def run():
+        for record in records:
+            for _ in record.descendants():
+                pass
+
+    return Workload(run, len(records))
+
+
+@benchmark('xedit', 'array_iteration')
+def bench_array_iteration(context):
+    arrays = [armor['KWDA'] for armor in objects_of(context, 'ARMO')]
+
+    def run():
+        for array_ in arrays:
+            for _ in array_:
+                pass
+
+    return Workload(run, len(arrays))
+
+
+@benchmark('xedit', 'attribute_get')
+def bench_attribute_get(context):
+    armors = objects_of(context, 'ARMO')
+
+    def run():
+        for armor in armors:
+            armor.armor_rating
+
+    return Workload(run, len(armors))
+
+
+@benchmark('xedit', 'attribute_set')
+def bench_attribute_set(context):
+    armors = objects_of(context, 'ARMO')
+
+    def run():
+        for armor in armors:
+            armor.armor_rating = 10.0
+
+    return Workload(run, len(armors))
+
+
+@benchmark('xedit', 'find_related_objects')
+def bench_find_related_objects(context):
+    armors = objects_of(context, 'ARMO')
+
+    def run():
+        for armor in armors:
+            for _ in armor.find_related_objects():
+                pass
+
+    return Workload(run, len(armors))
+
+
+# teardown, which releases every handle still open; it goes last, since it
+# also releases the handles other benchmarks set up with
+@benchmark('xelib', 'release_all_handles')
+def bench_release_all_handles(context):
+    xelib = context.xelib
+
+    def prepare():
+        return records_of(context, 'ARMO')
+
+    def run():
+        xelib.release_all_handles()
+
+    return Workload(run, len(prepare()), prepare=prepare)
+
+
+def synthetic_backend(size='ci', records=None, plugins=None):
+    '''
+    Returns a simulated backend serving a synthetic load order of the given
+    size, and the names of its plugins.
+    '''
+    default_plugins, default_records = SIZES[size]
+    load_order = SyntheticLoadOrder(
+                     plugin_count=plugins or default_plugins,
+                     records_per_signature=records or default_records)
+    return SimulatedBackend(load_order), load_order.plugin_names
+
+
+def run_suite(backend, plugin_names, records, names=None, repeat=3):
+    '''
+    Runs the named benchmarks (by default, all of them) in a session on the
+    given backend, and returns their results.
+    '''
+    names = [name for name in BENCHMARKS if names is None or name in names]
+    with XEdit(plugins=plugin_names, backend=backend).session() as xedit:
+        context = BenchmarkContext(xedit, records)
+        return [measure(name, context, repeat=repeat) for name in names]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+                 description='Benchmarks the Xelib and XEdit layers.')
+    parser.add_argument('--size', choices=SIZES, default='ci',
+                        help='the size of the synthetic load order')
+    parser.add_argument('--records', type=int,
+                        help='records per signature, overriding the size')
+    parser.add_argument('--plugins', type=int,
+                        help='number of plugins, overriding the size')
+    parser.add_argument('--layer', choices=('xelib', 'xedit'),
+                        help='only run the benchmarks of this layer')
+    parser.add_argument('-k', dest='keyword',
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of timed rounds per benchmark')
+    parser.add_argument('--dll', metavar='PATH',
+                        help='run against XEditLib.dll at this path')
+    parser.add_argument('--plugin', action='append', default=[],
+                        help='plugin to load when running against the DLL')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH),
+                        help='path of the baseline file')
+    parser.add_argument('--check', action='store_true',
+                        help='exit with an error on regressions')
+    parser.add_argument('--check-time', action='store_true',
+                        help='also count wall time regressions')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='store the results as the new baseline')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    names = [name for name in BENCHMARKS
+             if (not args.layer or name.startswith(f'{args.layer}.')) and
+             (not args.keyword or args.keyword in name)]
+
+    simulated = not args.dll
+    if simulated:
+        backend, plugin_names = synthetic_backend(args.size,
+                                                  records=args.records,
+                                                  plugins=args.plugins)
+        records = args.records or SIZES[args.size][1]
+    else:
+        backend, plugin_names = DllBackend(args.dll), args.plugin
+        records = args.records or SIZES[args.size][1]
+
+    results = run_suite(backend, plugin_names, records, names=names,
+                        repeat=args.repeat)
+    print(report(results))
+
+    # baselines only make sense for the preset sizes of simulated runs
+    comparable = simulated and not (args.records or args.plugins)
+    if args.update_baseline:
+        if not comparable:
+            sys.exit('Baselines can only be stored for simulated runs of a '
+                     'preset size')
+        save_baseline(results, args.size, path=args.baseline)
+        print(f'Stored baseline for size {args.size} in {args.baseline}')
+    elif comparable:
+        baseline = load_baseline(args.baseline).get(args.size, {})
+        found = regressions(results, baseline, check_time=args.check_time)
+        for message in found:
+            print(f'REGRESSION {message}')
+        if found and args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+'''
+Measures the memory cost of xedit wrapper objects, in bytes per wrapper.
+
+Wrappers are created against a stand-in for ``Xelib`` that answers every
+query without going through ``XEditLib.dll``, so this runs anywhere:
+
+    python test/benchmarks/bench_wrapper_memory.py [count]
+'''
+import sys
+import tracemalloc
+
+from pyxedit import XEdit
+from pyxedit.xedit.generic import XEditGenericObject
+from pyxedit.xelib.handles import HandleFinalizers
+
+
+class StubXelib:
+    '''
+    Answers any xelib call with a dummy value, and owns a real finalizer
+    registry so that auto-released wrappers cost what they would in a session.
+    '''
+    def __init__(self, count):
+        self.current_handles = set(range(1, count + 1))
+        self.finalizers = HandleFinalizers(lambda handle: None)
+
+    def watch_handle(self, obj, handle):
+        return self.finalizers.watch(obj, handle)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: 1
+
+
+METADATA = {'element_type': XEdit.ElementTypes.MainRecord,
+            'def_type': XEdit.DefTypes.Record,
+            'value_type': None,
+            'signature': 'ARMO'}
+
+
+def bytes_per_wrapper(count, auto_release, metadata):
+    xedit = XEdit()
+    xedit._xelib = StubXelib(count)
+
+    tracemalloc.start()
+    objs = [XEditGenericObject.from_xedit_object(handle,
+                                                 xedit,
+                                                 auto_release=auto_release,
+                                                 metadata=metadata)
+            for handle in range(1, count + 1)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    for obj in objs:
+        obj.auto_release = False
+    return current / count
+
+
+def main(count=20000):
+    print(f'{"auto_release":>12} {"metadata":>8} {"bytes/wrapper":>14}')
+    for auto_release in (False, True):
+        for metadata in (None, METADATA):
+            size = bytes_per_wrapper(count, auto_release, metadata)
+            print(f'{auto_release!s:>12} {bool(metadata)!s:>8} {size:>14.1f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
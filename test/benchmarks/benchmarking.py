@@ -0,0 +1,220 @@
+'''
+The machinery behind the benchmark suite (see ``bench_suite.py``): a registry
+of benchmarks, the measurement of each of them, and the comparison of the
+results to a stored baseline.
+
+A benchmark is a function that is given a ``BenchmarkContext`` (the session
+to run in, and the configured data size), and returns a ``Workload``: a
+round of operations to run, and how many operations the round amounts to.
+Every benchmark is measured for:
+    - DLL calls per operation, counted with the ``Xelib`` profiler; these
+      are deterministic, so any increase is a regression
+    - wall time per operation, the best of a number of timed rounds
+    - peak memory allocated while running a round, traced with tracemalloc
+'''
+from pathlib import Path
+import gc
+import json
+import platform
+import time
+import tracemalloc
+
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+
+# how much worse than the baseline a measurement may get before it counts as
+# a regression; wall times vary a lot between machines, so they are only
+# compared when asked to
+TOLERANCES = {'calls_per_op': 1.0,
+              'peak_kib': 1.5,
+              'seconds_per_op': 3.0}
+
+# peak memory differences below this are noise (allocator and interpreter
+# internals), whatever the ratio
+PEAK_KIB_SLACK = 64
+
+BENCHMARKS = {}
+
+
+def benchmark(layer, name):
+    '''
+    Decorator registering a benchmark function under `layer.name`.
+    '''
+    def register(function):
+        BENCHMARKS[f'{layer}.{name}'] = function
+        return function
+    return register
+
+
+class Workload:
+    '''
+    What a benchmark function returns: a round of operations to measure.
+    '''
+    def __init__(self, run, ops, prepare=None, cleanup=None):
+        '''
+        @param run: callable running one round of operations
+        @param ops: the number of operations in a round
+        @param prepare: callable run (untimed, untraced) before each round,
+                        for workloads that use up their inputs
+        @param cleanup: callable run once the workload has been measured (or
+                        has failed), for disposing of what it set up
+        '''
+        self.run = run
+        self.ops = ops
+        self.prepare = prepare or (lambda: None)
+        self.cleanup = cleanup or (lambda: None)
+
+
+class BenchmarkContext:
+    '''
+    What benchmark functions are given to set up their workloads with.
+    '''
+    def __init__(self, xedit, records):
+        '''
+        @param xedit: the ``XEdit`` session to run in
+        @param records: the configured number of records to operate on
+        '''
+        self.xedit = xedit
+        self.xelib = xedit.xelib
+        self.records = records
+
+
+class BenchmarkResult:
+    '''
+    The measurements of a single benchmark.
+    '''
+    def __init__(self, name, ops, calls_per_op, seconds_per_op, peak_kib,
+                 calls=None):
+        self.name = name
+        self.ops = ops
+        self.calls_per_op = calls_per_op
+        self.seconds_per_op = seconds_per_op
+        self.peak_kib = peak_kib
+        self.calls = calls or {}
+
+    def as_dict(self):
+        return {'ops': self.ops,
+                'calls_per_op': self.calls_per_op,
+                'seconds_per_op': round(self.seconds_per_op, 9),
+                'peak_kib': round(self.peak_kib, 1),
+                'calls': self.calls}
+
+
+def measure(name, context, repeat=3):
+    '''
+    Sets up the workload of the named benchmark, and measures it.
+    '''
+    workload = BENCHMARKS[name](context)
+    try:
+        return measure_workload(name, context.xelib, workload, repeat)
+    finally:
+        workload.cleanup()
+
+
+def measure_workload(name, xelib, workload, repeat):
+    '''
+    Measures the given workload of the named benchmark.
+    '''
+    # warm up (filling caches, growing result buffers), then count DLL calls
+    workload.prepare()
+    workload.run()
+    workload.prepare()
+    with xelib.profile(attribute=False) as profiler:
+        workload.run()
+    calls = {function: stats.calls
+             for function, stats in sorted(profiler.functions.items())}
+
+    # time the best of a few rounds
+    best = None
+    for _ in range(repeat):
+        workload.prepare()
+        gc.collect()
+        start = time.perf_counter()
+        workload.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # trace the memory allocated at peak, over what was allocated before
+    workload.prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        workload.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ops = workload.ops
+    return BenchmarkResult(name,
+                           ops,
+                           calls_per_op=sum(calls.values()) / ops,
+                           seconds_per_op=best / ops,
+                           peak_kib=(peak - before) / 1024,
+                           calls=calls)
+
+
+def environment():
+    return {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine()}
+
+
+def load_baseline(path=BASELINE_PATH):
+    path = Path(path)
+    if not path.is_file():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(results, size, path=BASELINE_PATH):
+    '''
+    Stores the given results as the baseline for the given size, keeping the
+    baselines of other sizes.
+    '''
+    baseline = load_baseline(path)
+    baseline[size] = {'environment': environment(),
+                      'results': {result.name: result.as_dict()
+                                  for result in results}}
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) +
+                          '\n')
+
+
+def regressions(results, baseline, check_time=False, tolerances=TOLERANCES):
+    '''
+    Compares results to the baseline results of the same size, and returns a
+    list of messages describing each regression found. Benchmarks missing
+    from the baseline are not compared.
+    '''
+    fields = ['calls_per_op', 'peak_kib']
+    if check_time:
+        fields.append('seconds_per_op')
+
+    messages = []
+    for result in results:
+        expected = baseline.get('results', {}).get(result.name)
+        if expected is None:
+            continue
+        for field in fields:
+            actual, limit = getattr(result, field), expected[field]
+            allowed = limit * tolerances[field]
+            if field == 'peak_kib':
+                allowed = max(allowed, limit + PEAK_KIB_SLACK)
+            if actual > allowed + 1e-9:
+                messages.append(f'{result.name}: {field} regressed from '
+                                f'{limit:.6g} to {actual:.6g} (allowed up to '
+                                f'{allowed:.6g})')
+    return messages
+
+
+def report(results):
+    '''
+    Formats results as a table.
+    '''
+    lines = [f'{"benchmark":<36} {"ops":>7} {"calls/op":>9} '
+             f'{"usec/op":>10} {"peak KiB":>10}']
+    for result in results:
+        lines.append(f'{result.name:<36} {result.ops:>7} '
+                     f'{result.calls_per_op:>9.2f} '
+                     f'{result.seconds_per_op * 1e6:>10.2f} '
+                     f'{result.peak_kib:>10.1f}')
+    return '\n'.join(lines)
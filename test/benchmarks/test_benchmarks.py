@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from pyxedit import XEdit
+
+from benchmarking import (BENCHMARKS,
+                          BenchmarkContext,
+                          BenchmarkResult,
+                          Workload,
+                          load_baseline,
+                          measure,
+                          regressions)
+from bench_suite import SIZES, run_suite, synthetic_backend
+
+
+@pytest.fixture(scope='module')
+def results():
+    backend, plugin_names = synthetic_backend('ci')
+    return run_suite(backend, plugin_names, SIZES['ci'][1], repeat=1)
+
+
+class TestBenchmarks:
+    def test_all_benchmarks_run(self, results):
+        assert [result.name for result in results] == list(BENCHMARKS)
+        for result in results:
+            assert result.ops > 0
+            assert result.calls_per_op > 0
+            assert result.seconds_per_op > 0
+
+    def test_no_regressions(self, results):
+        # wall times are only compared when asked to, since they depend on
+        # the machine running the suite
+        baseline = load_baseline().get('ci')
+        assert baseline, 'no stored baseline for the ci size'
+        check_time = bool(os.environ.get('PYXEDIT_BENCHMARK_CHECK_TIME'))
+        assert regressions(results, baseline, check_time=check_time) == []
+
+    def test_regressions(self):
+        baseline = {'results': {'a': {'calls_per_op': 2.0,
+                                      'seconds_per_op': 1e-6,
+                                      'peak_kib': 1000.0}}}
+        same = BenchmarkResult('a', 10, 2.0, 1e-6, 1000.0)
+        assert regressions([same], baseline, check_time=True) == []
+
+        worse = BenchmarkResult('a', 10, 2.1, 1e-5, 2000.0)
+        messages = regressions([worse], baseline)
+        assert len(messages) == 2
+        assert messages[0].startswith('a: calls_per_op regressed')
+        assert len(regressions([worse], baseline, check_time=True)) == 3
+
+        # benchmarks without a baseline are not compared
+        assert regressions([BenchmarkResult('b', 1, 9, 9, 9)], baseline) == []
+
+    def test_workloads_are_cleaned_up(self, monkeypatch):
+        cleaned_up = []
+
+        def failing_run():
+            raise RuntimeError('failed round')
+
+        def bench_failing(context):
+            return Workload(failing_run, 1,
+                            cleanup=lambda: cleaned_up.append(True))
+
+        monkeypatch.setitem(BENCHMARKS, 'test.failing', bench_failing)
+        backend, plugin_names = synthetic_backend('ci')
+        context = BenchmarkContext(XEdit(plugins=plugin_names,
+                                         backend=backend), 1)
+        with pytest.raises(RuntimeError, match='failed round'):
+            measure('test.failing', context)
+        assert cleaned_up == [True]
@@ -0,0 +1,68 @@
+'''
+Builds plugin files byte by byte, for the reader to be tested against.
+'''
+import struct
+import zlib
+
+from pyxedit.tes4.format import (GROUP_HEADER,
+                                 GroupTypes,
+                                 HEDR,
+                                 RECORD_HEADER,
+                                 RecordFlags,
+                                 SUBRECORD_HEADER,
+                                 XXXX_SIZE)
+
+
+def zstring(text):
+    return text.encode('cp1252') + b'\0'
+
+
+def subrecord(signature, data):
+    if isinstance(data, str):
+        data = zstring(data)
+    if len(data) > 0xFFFF:
+        return (SUBRECORD_HEADER.pack(b'XXXX', XXXX_SIZE.size) +
+                XXXX_SIZE.pack(len(data)) +
+                SUBRECORD_HEADER.pack(signature.encode(), 0) +
+                data)
+    return SUBRECORD_HEADER.pack(signature.encode(), len(data)) + data
+
+
+def record(signature, form_id, *subrecords, flags=0, compressed=False):
+    data = b''.join(subrecords)
+    if compressed:
+        flags |= RecordFlags.Compressed.value
+        data = struct.pack('<I', len(data)) + zlib.compress(data)
+    return RECORD_HEADER.pack(signature.encode(), len(data), flags, form_id,
+                              0, 44, 0) + data
+
+
+def group(label, group_type, *entries):
+    if isinstance(label, str):
+        label = label.encode()
+    elif isinstance(label, int):
+        label = struct.pack('<I', label)
+    data = b''.join(entries)
+    return GROUP_HEADER.pack(b'GRUP', GROUP_HEADER.size + len(data), label,
+                             group_type.value, 0, 0) + data
+
+
+def top_group(signature, *records):
+    return group(signature, GroupTypes.Top, *records)
+
+
+def header(masters=(), flags=0, author='', description='', next_object=0x800):
+    subrecords = [subrecord('HEDR', HEDR.pack(1.71, 0, next_object))]
+    if author:
+        subrecords.append(subrecord('CNAM', author))
+    if description:
+        subrecords.append(subrecord('SNAM', description))
+    for master in masters:
+        subrecords.append(subrecord('MAST', master))
+        subrecords.append(subrecord('DATA', struct.pack('<Q', 0)))
+    return record('TES4', 0, *subrecords, flags=flags)
+
+
+def write_plugin(path, *groups, **header_fields):
+    path.write_bytes(header(**header_fields) + b''.join(groups))
+    return path
@@ -0,0 +1,111 @@
+import zlib
+
+import pytest
+
+from pyxedit.tes4 import TES4Error, TES4Plugin
+from pyxedit.tes4.compression import DecompressionCache, StreamDecompressor
+
+from .builder import record, subrecord, top_group, write_plugin
+
+
+def npc(form_id, editor_id, padding=1000, **kwargs):
+    return record('NPC_', form_id,
+                  subrecord('EDID', editor_id),
+                  subrecord('FULL', f'NPC {form_id:X}'),
+                  subrecord('DATA', bytes(padding)),
+                  compressed=True,
+                  **kwargs)
+
+
+@pytest.fixture
+def plugin_path(tmp_path):
+    return write_plugin(tmp_path / 'Compressed.esm',
+                        top_group('NPC_', *[npc(0x800 + index, f'Npc{index}')
+                                            for index in range(10)]))
+
+
+class TestDecompressionCache:
+    def test_lru(self):
+        cache = DecompressionCache(max_size=250)
+        payloads = {key: bytes([key]) * 100 for key in range(4)}
+
+        def compressed(key):
+            payload = payloads[key]
+            return len(payload).to_bytes(4, 'little') + zlib.compress(payload)
+
+        for key in (0, 1):
+            assert cache.get(key) is None
+            assert cache.add(key, compressed(key)) == payloads[key]
+        assert cache.get(0) == payloads[0]
+
+        # 1 is now the least recently used, and makes room for 2
+        cache.add(2, compressed(2))
+        assert 1 not in cache and 0 in cache and 2 in cache
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 2, 1)
+        assert cache.size == 200 and len(cache) == 2
+
+        # data larger than the whole cache is not cached
+        payloads[3] = bytes(300)
+        assert cache.add(3, compressed(3)) == payloads[3]
+        assert 3 not in cache and cache.size == 200
+
+    def test_stream_decompressor(self):
+        payload = bytes(range(256)) * 64
+        stream = StreamDecompressor(len(payload).to_bytes(4, 'little') +
+                                    zlib.compress(payload))
+        assert stream.size == len(payload)
+        stream.fill(10)
+        assert 10 <= len(stream.data) < len(payload)
+        assert stream.data == payload[:len(stream.data)]
+        stream.fill(len(payload) + 100)
+        assert stream.data == payload
+
+
+class TestLazyDecompression:
+    def test_header_scans(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            records = list(plugin.records())
+            assert len(records) == 10
+            assert all(record.is_compressed for record in records)
+            cache = plugin.decompression_cache
+            assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+            # EditorIDs are read off the start of the records, leaving the
+            # cache be
+            assert [record.editor_id for record in records] == [
+                f'Npc{index}' for index in range(10)]
+            assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+    def test_subrecord_access(self, plugin_path):
+        with TES4Plugin(plugin_path, cache_size=3000) as plugin:
+            cache = plugin.decompression_cache
+            first, second, third = list(plugin.records())[:3]
+            assert first.subrecord('FULL') == b'NPC 800\0'
+            assert (cache.hits, cache.misses) == (0, 1)
+            assert first.subrecord('DATA') == bytes(1000)
+            assert [signature for signature, _ in first.subrecords()] == [
+                'EDID', 'FULL', 'DATA']
+            assert (cache.hits, cache.misses) == (2, 1)
+
+            # cached records are read from the cache
+            assert first.editor_id == 'Npc0'
+            assert cache.hits == 3
+
+            # each record takes about 1KiB, so the third evicts the first
+            second.data
+            third.data
+            assert cache.evictions == 1
+            assert first.offset not in cache
+            assert cache.size <= 3000
+
+    def test_corrupt_data(self, tmp_path):
+        broken = bytearray(npc(0x800, 'Broken'))
+        broken[-20:] = bytes(20)
+        path = write_plugin(tmp_path / 'Broken.esp',
+                            top_group('NPC_', bytes(broken)))
+        with TES4Plugin(path) as plugin:
+            npc_record, = plugin.records()
+            with pytest.raises(TES4Error, match='Failed to decompress'):
+                npc_record.data
+            with pytest.raises(TES4Error, match='Failed to decompress'):
+                npc_record.subrecord('DATA')
@@ -0,0 +1,205 @@
+import gc
+import weakref
+
+import pytest
+
+from pyxedit.tes4 import GroupTypes, TES4Error, TES4Plugin
+
+from .builder import (group,
+                      record,
+                      subrecord,
+                      top_group,
+                      write_plugin)
+
+
+def keyword(form_id, editor_id, **kwargs):
+    return record('KYWD', form_id, subrecord('EDID', editor_id), **kwargs)
+
+
+@pytest.fixture
+def plugin_path(tmp_path):
+    return write_plugin(
+        tmp_path / 'Test.esp',
+        top_group('KYWD',
+                  keyword(0x01000800, 'TestKeyword'),
+                  keyword(0x00012E49, 'OverriddenKeyword'),
+                  keyword(0x01000801, 'CompressedKeyword', compressed=True)),
+        top_group('ARMO',
+                  record('ARMO', 0x01000802,
+                         subrecord('EDID', 'TestArmor'),
+                         subrecord('FULL', 'Test Armor'),
+                         subrecord('DNAM', b'\x00\x00\x20\x41'))),
+        top_group('CELL',
+                  group(0, GroupTypes.InteriorCellBlock,
+                        group(0, GroupTypes.InteriorCellSubBlock,
+                              record('CELL', 0x01000803,
+                                     subrecord('EDID', 'TestCell')),
+                              group(0x01000803, GroupTypes.CellChildren,
+                                    group(0x01000803,
+                                          GroupTypes.CellTemporaryChildren,
+                                          record('REFR', 0x01000804,
+                                                 subrecord('NAME', b'\0' * 4)),
+                                          record('REFR', 0x01000805)))))),
+        masters=['Skyrim.esm'],
+        author='Tester',
+        description='A test plugin',
+        flags=0x80)
+
+
+class TestTES4Plugin:
+    def test_header(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            assert plugin.name == 'Test.esp'
+            assert plugin.masters == plugin.master_names == ['Skyrim.esm']
+            assert plugin.author == 'Tester'
+            assert plugin.description == 'A test plugin'
+            assert plugin.version == pytest.approx(1.71)
+            assert plugin.next_object_id == 0x800
+            assert plugin.is_localized
+            assert not plugin.is_esm and not plugin.is_esl
+            assert plugin.header.signature == 'TES4'
+
+    def test_groups(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            assert [group.label_signature for group in plugin.groups] == [
+                'KYWD', 'ARMO', 'CELL']
+            cells = plugin.get_group('CELL')
+            block, = cells.children()
+            assert block.group_type == GroupTypes.InteriorCellBlock
+            assert block.label_signature is None
+            sub_block, = block.children()
+            cell, children = sub_block.children()
+            assert cell.child_group.offset == children.offset
+            assert children.label_form_id == cell.form_id == 0x01000803
+            assert plugin.get_group('NPC_') is None
+            assert plugin.get_group('KYWD').records('ARMO') is not None
+
+    def test_records(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            records = list(plugin.records())
+            assert [record.signature for record in records] == [
+                'KYWD', 'KYWD', 'ARMO', 'CELL', 'REFR', 'REFR']
+            assert [record.editor_id for record in records[:4]] == [
+                'TestKeyword', 'CompressedKeyword', 'TestArmor', 'TestCell']
+            assert records[-1].editor_id is None
+
+            every = list(plugin.records(include_overrides=True))
+            override = every[1]
+            assert len(every) == 7
+            assert override.is_override and not override.is_master
+            assert override.owner_name == 'Skyrim.esm'
+            assert override.local_form_id_str == '00012E49'
+            assert records[0].owner_name == 'Test.esp'
+            assert records[0].form_id_str == '01000800'
+
+    def test_signatures(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            def form_ids(records):
+                return [record.form_id for record in records]
+
+            assert form_ids(plugin.records('REFR')) == [0x01000804,
+                                                        0x01000805]
+            assert form_ids(plugin.records('ARMO,KYWD')) == form_ids(
+                plugin.records(['KYWD', 'ARMO']))
+            assert len(list(plugin.records('ARMO,KYWD'))) == 3
+
+    def test_searched_groups(self, plugin_path, monkeypatch):
+        searched = []
+        read_entries = TES4Plugin.read_entries
+
+        def recording_read_entries(plugin, start, end, parent):
+            if parent is not None:
+                searched.append(parent.label_signature or
+                                parent.group_type.name)
+            return read_entries(plugin, start, end, parent)
+
+        monkeypatch.setattr(TES4Plugin, 'read_entries',
+                            recording_read_entries)
+        with TES4Plugin(plugin_path) as plugin:
+            # only the groups that may hold the records are searched
+            assert len(list(plugin.records('ARMO'))) == 1
+            assert searched == ['ARMO']
+
+            del searched[:]
+            assert len(list(plugin.records('CELL'))) == 1
+            assert searched == ['CELL', 'InteriorCellBlock',
+                                'InteriorCellSubBlock']
+
+            del searched[:]
+            assert len(list(plugin.records('REFR'))) == 2
+            assert searched[-2:] == ['CellChildren',
+                                     'CellTemporaryChildren']
+
+    def test_subrecords(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            armor, = plugin.records('ARMO')
+            assert [subrecord.signature
+                    for subrecord in armor.subrecords()] == ['EDID', 'FULL',
+                                                              'DNAM']
+            assert armor.subrecord('DNAM') == b'\x00\x00\x20\x41'
+            assert armor.subrecord('KWDA') is None
+
+            compressed = plugin.get_group('KYWD').children()
+            compressed = [record for record in compressed
+                          if record.is_compressed]
+            assert len(compressed) == 1
+            assert compressed[0].data == b'EDID\x12\x00CompressedKeyword\x00'
+
+    def test_close(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            armor, = plugin.records('ARMO')
+            dnam = armor.subrecord('DNAM')
+            mapped = weakref.ref(plugin.data)
+        assert plugin.closed
+        for read in (lambda: plugin.data,
+                     lambda: plugin.groups,
+                     lambda: armor.stored_data,
+                     lambda: armor.subrecord('DNAM')):
+            with pytest.raises(TES4Error, match='Test.esp is closed'):
+                read()
+        plugin.close()
+
+        # data handed out before the plugin was closed keeps the file mapped
+        # until it is dropped
+        assert dnam == b'\x00\x00\x20\x41'
+        assert mapped() is not None
+        del dnam
+        gc.collect()
+        assert mapped() is None
+
+    def test_large_subrecords(self, tmp_path):
+        data = bytes(range(256)) * 300
+        path = write_plugin(tmp_path / 'Large.esm',
+                            top_group('NAVM',
+                                      record('NAVM', 0x800,
+                                             subrecord('NVNM', data),
+                                             subrecord('EDID', 'AfterLarge'))),
+                            flags=0x201)
+        with TES4Plugin(path) as plugin:
+            assert plugin.is_esm and plugin.is_esl
+            navmesh, = plugin.records()
+            assert navmesh.subrecord('NVNM') == data
+            assert navmesh.editor_id == 'AfterLarge'
+
+    def test_invalid_files(self, tmp_path):
+        empty = tmp_path / 'Empty.esp'
+        empty.write_bytes(b'')
+        with pytest.raises(TES4Error, match='empty'):
+            TES4Plugin(empty)
+
+        text = tmp_path / 'Text.esp'
+        text.write_bytes(b'not a plugin at all, just some text')
+        with pytest.raises(TES4Error, match='not a plugin'):
+            TES4Plugin(text)
+
+        oblivion = tmp_path / 'Oblivion.esm'
+        oblivion.write_bytes(b'TES4' + bytes(16) + b'HEDR' + bytes(14))
+        with pytest.raises(TES4Error, match='Oblivion'):
+            TES4Plugin(oblivion)
+
+        truncated = tmp_path / 'Truncated.esp'
+        write_plugin(truncated, top_group('KYWD', keyword(0x800, 'A')))
+        truncated.write_bytes(truncated.read_bytes()[:-10])
+        with TES4Plugin(truncated) as plugin:
+            with pytest.raises(TES4Error, match='truncated'):
+                list(plugin.records())
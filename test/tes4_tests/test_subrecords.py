@@ -0,0 +1,152 @@
+import struct
+import subprocess
+import sys
+
+import pytest
+
+from pyxedit.tes4 import TES4Plugin
+from pyxedit.tes4.subrecords import (LAYOUTS,
+                                     OBND,
+                                     SubrecordLayout,
+                                     object_classes,
+                                     resolve)
+from pyxedit.xedit.attribute import XEditAttribute
+
+from .builder import record, subrecord, top_group, write_plugin
+
+
+ACBS = struct.pack('<IhhHHHHhHhH', 0x1, 50, -10, 12, 1, 81, 100, 35, 0x2,
+                   25, 0)
+
+
+@pytest.fixture
+def plugin_path(tmp_path):
+    return write_plugin(
+        tmp_path / 'Test.esp',
+        top_group('ARMO',
+                  record('ARMO', 0x01000800,
+                         subrecord('EDID', 'TestArmor'),
+                         subrecord('OBND', struct.pack('<6h', -12, -8, 0,
+                                                       12, 8, 24)),
+                         subrecord('DATA', struct.pack('<if', 250, 6.5)),
+                         subrecord('DNAM', struct.pack('<i', 2650)))),
+        top_group('GLOB',
+                  record('GLOB', 0x01000801,
+                         subrecord('EDID', 'TestGlobal'),
+                         subrecord('FNAM', b'f'),
+                         subrecord('FLTV', struct.pack('<f', 0.25)),
+                         compressed=True)),
+        top_group('NPC_',
+                  record('NPC_', 0x01000802,
+                         subrecord('EDID', 'TestNPC'),
+                         subrecord('ACBS', ACBS),
+                         subrecord('NAM6', struct.pack('<f', 1.5)))),
+        top_group('REFR',
+                  record('REFR', 0x01000803,
+                         subrecord('NAME', struct.pack('<I', 0x01000800)),
+                         subrecord('DATA', struct.pack('<6f', 1, 2, 3,
+                                                       0, 0.5, 1)))),
+        masters=['Skyrim.esm'])
+
+
+class TestSubrecordLayout:
+    def test_decode(self):
+        layout = SubrecordLayout(('Value', 'i'), ('Weight', 'f'),
+                                 ('Rating', 'H', 10))
+        data = memoryview(struct.pack('<ifH', -3, 0.5, 25))
+        assert layout.size == 10
+        assert layout.decode(data) == {'Value': -3, 'Weight': 0.5,
+                                       'Rating': 2.5}
+        assert layout.decode_field(data, 'Weight') == 0.5
+        assert layout.decode_field(data, 'Rating') == 2.5
+
+        # fields past the end of shorter data are left out
+        assert layout.decode(data[:8]) == {'Value': -3, 'Weight': 0.5}
+        assert layout.decode_field(data[:8], 'Rating') is None
+        with pytest.raises(ValueError):
+            layout.decode_field(data, 'Health')
+
+    def test_single_value(self):
+        layout = SubrecordLayout(('', 'f'))
+        assert layout.decode(struct.pack('<f', 2.0)) == 2.0
+        assert layout.decode(b'') is None
+
+    def test_layouts_follow_object_classes(self):
+        for record_signature, layouts in LAYOUTS.items():
+            assert record_signature in object_classes()
+
+        # the attributes of the OBND object class are the fields of OBND
+        object_class = object_classes()['OBND']
+        paths = {attribute.path for attribute in vars(object_class).values()
+                 if isinstance(attribute, XEditAttribute)}
+        assert paths == set(OBND.fields)
+
+    def test_resolve(self):
+        assert resolve('ARMO', 'armor_rating') == (
+            'DNAM', LAYOUTS['ARMO']['DNAM'], None)
+        assert resolve('ARMO', 'DNAM') == resolve('ARMO', 'armor_rating')
+        assert resolve('REFR', 'position_y') == (
+            'DATA', LAYOUTS['REFR']['DATA'], 'Position\\Y')
+        assert resolve('NPC_', 'ACBS\\Level')[2] == 'Level'
+        with pytest.raises(ValueError):
+            resolve('ARMO', 'keywords')
+        with pytest.raises(ValueError):
+            resolve('ARMO', 'OBND\\W1')
+        with pytest.raises(ValueError):
+            resolve('KYWD', 'OBND')
+
+    def test_object_classes_are_imported_lazily(self):
+        # reading plugins does not import the xedit object classes; looking
+        # a value up by attribute name does
+        script = ('import sys\n'
+                  'from pyxedit.tes4.subrecords import resolve\n'
+                  'module = "pyxedit.xedit.object_classes.ARMO"\n'
+                  'assert module not in sys.modules\n'
+                  'resolve("ARMO", "armor_rating")\n'
+                  'assert module in sys.modules\n')
+        subprocess.run([sys.executable, '-c', script], check=True)
+
+
+class TestRecordValues:
+    def test_subrecord_views(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            armor, = plugin.records('ARMO')
+            global_, = plugin.records('GLOB')
+            for data in (armor.subrecord('DNAM'),
+                         armor.stored_data,
+                         armor.data,
+                         global_.data,
+                         global_.subrecord('FLTV'),
+                         *(data for _, data in armor.subrecords())):
+                assert isinstance(data, memoryview)
+
+            # uncompressed subrecords point into the file itself
+            dnam = armor.subrecord('DNAM')
+            assert dnam.obj is plugin.data
+            assert bytes(dnam) == struct.pack('<i', 2650)
+            del dnam
+
+    def test_get_value(self, plugin_path):
+        with TES4Plugin(plugin_path) as plugin:
+            armor, = plugin.records('ARMO')
+            assert armor.get_value('armor_rating') == 26.5
+            assert armor.get_value('DATA\\Weight') == 6.5
+            assert armor.get_value('obnd') == {'X1': -12, 'Y1': -8, 'Z1': 0,
+                                               'X2': 12, 'Y2': 8, 'Z2': 24}
+            assert armor.get_value('OBND\\Z2') == 24
+            assert armor.get_value('template') is None
+
+            global_, = plugin.records('GLOB')
+            assert global_.get_value('value') == 0.25
+
+            npc, = plugin.records('NPC_')
+            assert npc.get_value('ACBS\\Level') == 12
+            assert npc.get_value('base_stats')['Calc max level'] == 81
+            assert npc.get_value('height') == 1.5
+            assert npc.get_value('weight') is None
+
+            reference, = plugin.records('REFR')
+            assert reference.get_values(['position_x', 'position_y',
+                                         'position_z', 'rotation_z'],
+                                        as_tuple=True) == (1, 2, 3, 1)
+            assert reference.get_values(['NAME']) == {'NAME': 0x01000800}
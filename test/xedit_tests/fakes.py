@@ -0,0 +1,144 @@
+from collections import Counter
+
+from pyxedit import XEdit, Xelib
+
+
+class FakeElement:
+    '''
+    An element of the in-memory tree served by ``TreeRawApi``.
+    '''
+    def __init__(self,
+                 element_type,
+                 signature='',
+                 name='',
+                 children=(),
+                 child_group=None,
+                 def_type=Xelib.DefTypes.Struct,
+                 value_type=Xelib.ValueTypes.Unknown,
+                 value='',
+                 links_to=0,
+                 path=''):
+        self.element_type = element_type
+        self.signature = signature
+        self.name = name or signature
+        self.children = list(children)
+        self.child_group = child_group
+        self.def_type = def_type
+        self.value_type = value_type
+        self.value = value
+        self.links_to = links_to
+        self.path = path
+
+
+class TreeRawApi:
+    '''
+    A minimal stand-in for ``XEditLib.dll`` serving a fixed tree of elements,
+    where each element's handle is its key in the `elements` dictionary. It
+    counts every call made to it and records every handle released.
+    '''
+    def __init__(self, elements):
+        self.elements = elements
+        self.calls = Counter()
+        self.released = []
+        self.result = ''
+
+    def __getattr__(self, name):
+        raise AttributeError(f'{name} is not supported by {self!r}')
+
+    def _string_result(self, value, len_):
+        self.result = value
+        len_._obj.value = len(value)
+        return True
+
+    def _byte_result(self, value, res):
+        res._obj.value = int(value.value)
+        return True
+
+    def GetElements(self, id_, path, sort, filter, sparse, len_):
+        self.calls['GetElements'] += 1
+        self.result = self.elements[id_].children
+        len_._obj.value = len(self.result)
+        return True
+
+    def GetElement(self, id_, path, res):
+        self.calls['GetElement'] += 1
+        handle = (self.elements[id_].child_group
+                  if path == 'Child Group' else 0)
+        res._obj.value = handle or 0
+        return bool(handle)
+
+    def GetResultArray(self, buffer, len_):
+        self.calls['GetResultArray'] += 1
+        buffer[:len(self.result)] = self.result
+        return True
+
+    def GetResultString(self, buffer, len_):
+        self.calls['GetResultString'] += 1
+        buffer.value = self.result
+        return True
+
+    def ElementType(self, id_, res):
+        self.calls['ElementType'] += 1
+        return self._byte_result(self.elements[id_].element_type, res)
+
+    def DefType(self, id_, res):
+        self.calls['DefType'] += 1
+        return self._byte_result(self.elements[id_].def_type, res)
+
+    def ValueType(self, id_, res):
+        self.calls['ValueType'] += 1
+        return self._byte_result(self.elements[id_].value_type, res)
+
+    def Signature(self, id_, len_):
+        self.calls['Signature'] += 1
+        return self._string_result(self.elements[id_].signature, len_)
+
+    def Name(self, id_, len_):
+        self.calls['Name'] += 1
+        return self._string_result(self.elements[id_].name, len_)
+
+    def Path(self, id_, short, local, sort, len_):
+        self.calls['Path'] += 1
+        element = self.elements[id_]
+        return self._string_result(element.path or f'{element.name}-{id_}',
+                                   len_)
+
+    def GetValue(self, id_, path, len_):
+        self.calls['GetValue'] += 1
+        return self._string_result(self.elements[id_].value, len_)
+
+    def GetIntValue(self, id_, path, res):
+        self.calls['GetIntValue'] += 1
+        res._obj.value = self.elements[id_].value
+        return True
+
+    def ElementCount(self, id_, res):
+        self.calls['ElementCount'] += 1
+        res._obj.value = len(self.elements[id_].children)
+        return True
+
+    def GetLinksTo(self, id_, path, res):
+        self.calls['GetLinksTo'] += 1
+        res._obj.value = self.elements[id_].links_to
+        return bool(self.elements[id_].links_to)
+
+    def ElementEquals(self, id_, id2, res):
+        self.calls['ElementEquals'] += 1
+        res._obj.value = id_ == id2
+        return True
+
+    def Release(self, id_):
+        self.released.append(id_)
+        return True
+
+
+def fake_xedit(elements, root=1):
+    '''
+    Creates an XEdit object running against a ``TreeRawApi`` serving the
+    given elements, and returns it together with an object for the element
+    at the `root` handle. All of the element handles start out as opened.
+    '''
+    xedit = XEdit()
+    xedit.xelib._raw_api = TreeRawApi(elements)
+    xedit.xelib.track_handles(list(elements))
+    return xedit, xedit.objectify(root)
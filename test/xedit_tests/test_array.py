@@ -1,7 +1,14 @@
 import pytest
 
+from pyxedit import Xelib
+
+from . fakes import FakeElement, fake_xedit
 from . fixtures import xedit, assert_no_opened_handles_after  # NOQA: pytest
 
+ElementTypes = Xelib.ElementTypes
+DefTypes = Xelib.DefTypes
+ValueTypes = Xelib.ValueTypes
+
 
 class TestXEditArray:
     @assert_no_opened_handles_after
@@ -324,3 +331,86 @@ class TestXEditArray:
         assert a2[0].display_name == 'Wolf'
         assert a2[1].display_name == 'Deathhound'
         assert a2[2].display_name == 'Dog'
+
+
+def array_tree():
+    '''
+    An armor record with a keywords array, and a record with an array of
+    plain integers.
+    '''
+    keywords = list(range(20, 30))
+    numbers = list(range(40, 45))
+    elements = {
+        1: FakeElement(ElementTypes.MainRecord, 'ARMO', children=[2]),
+        2: FakeElement(ElementTypes.SubRecord, 'KWDA', children=keywords,
+                       def_type=DefTypes.Array, value_type=ValueTypes.Array),
+        3: FakeElement(ElementTypes.MainRecord, 'XXXX', children=[4]),
+        4: FakeElement(ElementTypes.SubRecordArray, 'NUMS', children=numbers,
+                       def_type=DefTypes.Array, value_type=ValueTypes.Array),
+    }
+    for handle in keywords:
+        elements[handle] = FakeElement(ElementTypes.Value,
+                                       def_type=DefTypes.Integer,
+                                       value_type=ValueTypes.Reference,
+                                       links_to=handle + 100)
+        elements[handle + 100] = FakeElement(ElementTypes.MainRecord, 'KYWD')
+    for handle in numbers:
+        elements[handle] = FakeElement(ElementTypes.Value,
+                                       def_type=DefTypes.Integer,
+                                       value_type=ValueTypes.Number,
+                                       value=handle * 2)
+    return elements
+
+
+class TestXEditArrayIteration:
+    def test_iteration_is_bulk(self):
+        xedit, armor = fake_xedit(array_tree())
+        raw_api = xedit.xelib.raw_api
+        keywords = armor.objectify(2)
+        assert keywords.__class__.__name__ == 'XEditArray'
+        assert len(keywords) == 10
+
+        raw_api.calls.clear()
+        values = [value for value in keywords]
+        assert [value.handle for value in values] == list(range(120, 130))
+        assert all(value.signature == 'KYWD' for value in values)
+
+        # one fetch for all items; only the first item gets its metadata
+        # looked up, the rest are read straight off their handles
+        assert raw_api.calls['GetElements'] == 1
+        assert raw_api.calls['GetElement'] == 0
+        assert raw_api.calls['ElementCount'] == 0
+        assert raw_api.calls['DefType'] == 1
+        assert raw_api.calls['GetLinksTo'] == 10
+
+        # the item handles are released as soon as they have been read (the
+        # first one once its object is gone)
+        xedit.xelib.flush_handle_releases()
+        assert sorted(raw_api.released) == list(range(20, 30))
+
+    def test_values(self):
+        xedit, record = fake_xedit(array_tree(), root=3)
+        numbers = record.objectify(4)
+        assert list(numbers) == [80, 82, 84, 86, 88]
+        assert numbers[1:3] == [82, 84]
+        assert numbers[::-2] == [88, 84, 80]
+        assert numbers[10:] == []
+
+    def test_slice_releases_unselected(self):
+        xedit, record = fake_xedit(array_tree(), root=3)
+        raw_api = xedit.xelib.raw_api
+        numbers = record.objectify(4)
+        assert numbers[3:] == [86, 88]
+        xedit.xelib.flush_handle_releases()
+        assert set(raw_api.released) >= {40, 41, 42, 43, 44}
+
+    def test_abandoned_iteration_releases(self):
+        xedit, record = fake_xedit(array_tree(), root=3)
+        raw_api = xedit.xelib.raw_api
+        numbers = record.objectify(4)
+        items = iter(numbers)
+        assert next(items) == 80
+        assert next(items) == 82
+        items.close()
+        xedit.xelib.flush_handle_releases()
+        assert set(raw_api.released) == {40, 41, 42, 43, 44}
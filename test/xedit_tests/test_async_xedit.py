@@ -0,0 +1,76 @@
+import asyncio
+import gc
+
+import pytest
+
+from pyxedit import AsyncXEdit
+from pyxedit.xedit.async_xedit import AsyncProxy
+
+from xelib_tests.fixtures import simulated_session
+
+
+def async_xedit():
+    return simulated_session(AsyncXEdit)
+
+
+class TestAsyncXEdit:
+    def test_objects_are_proxied(self):
+        async def armor_details():
+            async with async_xedit().session() as xedit:
+                plugins = await xedit.plugins
+                assert all(isinstance(plugin, AsyncProxy)
+                           for plugin in plugins)
+                armor = await plugins[0]['ARMO\\[0]']
+                keywords = await (await armor.keywords).collect()
+                return (await plugins[0].name,
+                        await armor.signature,
+                        [await keyword.signature for keyword in keywords])
+
+        assert asyncio.run(armor_details()) == ('Synthetic.esm', 'ARMO',
+                                                ['KYWD'] * 3)
+
+    def test_no_iteration(self):
+        proxy = AsyncProxy(None, None)
+        with pytest.raises(TypeError, match='collect'):
+            iter(proxy)
+
+    def test_methods_and_set(self):
+        async def edit():
+            async with async_xedit().session() as xedit:
+                plugin = (await xedit.plugins)[1]
+                armor = await plugin.get('ARMO\\[0]')
+                await armor.set('armor_rating', 42.0)
+                return await armor.armor_rating
+
+        assert asyncio.run(edit()) == 42.0
+
+    def test_generators_are_collected(self):
+        async def descendants():
+            async with async_xedit().session() as xedit:
+                armor = await (await xedit.plugins)[0]['ARMO\\[0]']
+                elements = await armor.descendants()
+                return elements, await armor.run(
+                    lambda armor: sum(1 for _ in armor.descendants()))
+
+        elements, count = asyncio.run(descendants())
+        assert isinstance(elements, list)
+        assert len(elements) == count
+
+    def test_collected_objects_release_on_dll_thread(self):
+        xedit = async_xedit()
+        xelib = xedit.xelib.xelib
+
+        async def drop_objects():
+            async with xedit.session() as session:
+                plugin = (await session.plugins)[0]
+                armors = [await plugin[f'ARMO\\[{i}]'] for i in range(5)]
+                handles = [armor._target.handle for armor in armors]
+                del armors
+                gc.collect()
+
+                # the releases are queued up behind this call
+                await session.xelib.run(lambda xelib: None)
+                return [xelib.is_handle_tracked(handle)
+                        for handle in handles]
+
+        assert asyncio.run(drop_objects()) == [False] * 5
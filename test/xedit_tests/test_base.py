@@ -1,9 +1,15 @@
 import pytest
 
-from pyxedit import XelibError, XEditError
+from pyxedit import Xelib, XelibError, XEdit, XEditError
+from pyxedit.xelib.handles import HandleFinalizers
 
+from . fakes import FakeElement, fake_xedit
 from . fixtures import xedit, assert_no_opened_handles_after  # NOQA: pytest
 
+ElementTypes = Xelib.ElementTypes
+DefTypes = Xelib.DefTypes
+ValueTypes = Xelib.ValueTypes
+
 
 class TestXEditBase:
     @assert_no_opened_handles_after
@@ -216,3 +222,183 @@ class TestXEditBase:
 
         parts = xedit['Dawnguard.esm\\Head Part\\MaleEyesSnowElf\\Parts']
         assert parts.__class__.__name__ == 'XEditArray'
+
+    @assert_no_opened_handles_after
+    def test_auto_release(self, xedit):
+        obj = xedit.get('Dawnguard.esm\\Head Part\\MaleEyesSnowElf')
+        handle = obj.handle
+        assert handle in xedit.xelib.all_opened_handles
+
+        # once the object is gone its handle no longer counts as opened, even
+        # though the actual release is queued up until the next flush
+        del obj
+        assert handle not in xedit.xelib.all_opened_handles
+        assert xedit.xelib.flush_handle_releases() >= 1
+
+
+class StubXelib:
+    '''
+    Answers the metadata queries used for choosing an object class, and
+    records which of them were asked.
+    '''
+    def __init__(self, element_type, value_type=None, signature=None):
+        self.answers = {'element_type': element_type,
+                        'value_type': value_type,
+                        'signature': signature}
+        self.asked = []
+        self.finalizers = HandleFinalizers(self.asked.append)
+
+    def watch_handle(self, obj, handle):
+        return self.finalizers.watch(obj, handle)
+
+    def __getattr__(self, name):
+        def query(handle, ex=True):
+            self.asked.append(name)
+            return self.answers[name]
+        return query
+
+
+class TestObjectClassFor:
+    def resolve(self, *args, **kwargs):
+        XEdit.import_all_object_classes()
+        xelib = StubXelib(*args, **kwargs)
+        object_class, metadata = XEdit.object_class_for(xelib, 1)
+        return object_class.__name__, xelib.asked
+
+    def test_plugins_and_groups(self):
+        assert self.resolve(XEdit.ElementTypes.File) == (
+            'XEditPlugin', ['element_type'])
+        assert self.resolve(XEdit.ElementTypes.GroupRecord) == (
+            'XEditGenericObject', ['element_type'])
+
+    def test_records(self):
+        assert self.resolve(XEdit.ElementTypes.MainRecord,
+                            signature='ARMO') == (
+            'XEditArmor', ['element_type', 'signature'])
+        assert self.resolve(XEdit.ElementTypes.MainRecord,
+                            signature='XXXX') == (
+            'XEditGenericObject', ['element_type', 'signature'])
+
+    def test_subrecords(self):
+        assert self.resolve(XEdit.ElementTypes.SubRecord,
+                            value_type=XEdit.ValueTypes.Flags) == (
+            'XEditFlags', ['element_type', 'value_type'])
+        assert self.resolve(XEdit.ElementTypes.SubRecordArray) == (
+            'XEditArray', ['element_type', 'value_type'])
+        assert self.resolve(XEdit.ElementTypes.SubRecord,
+                            value_type=XEdit.ValueTypes.Array) == (
+            'XEditArray', ['element_type', 'value_type'])
+        assert self.resolve(XEdit.ElementTypes.SubRecordStruct,
+                            value_type=XEdit.ValueTypes.Struct,
+                            signature='OBND') == (
+            'XEditObjectBounds', ['element_type', 'value_type', 'signature'])
+        assert self.resolve(XEdit.ElementTypes.Value,
+                            value_type=XEdit.ValueTypes.Number) == (
+            'XEditGenericObject', ['element_type', 'value_type'])
+
+    def test_registry(self):
+        XEdit.import_all_object_classes()
+        assert XEdit.object_classes['NPC_'].__name__ == 'XEditNPC'
+        assert all(object_class.SIGNATURE == signature
+                   for signature, object_class in XEdit.object_classes.items())
+
+    def test_metadata_is_carried_over(self):
+        xedit = XEdit()
+        xedit._xelib = StubXelib(XEdit.ElementTypes.MainRecord,
+                                 signature='ARMO')
+        xedit._xelib.current_handles = {1}
+
+        armor = xedit.objectify(1)
+        assert armor.__class__.__name__ == 'XEditArmor'
+        assert xedit._xelib.asked == ['element_type', 'signature']
+
+        # the metadata fetched to choose the class is not fetched again
+        assert armor.element_type == XEdit.ElementTypes.MainRecord
+        assert armor.value_type is None
+        assert armor.signature == 'ARMO'
+        assert xedit._xelib.asked == ['element_type', 'signature']
+        assert armor.metadata == {'element_type': XEdit.ElementTypes.MainRecord,
+                                  'value_type': None,
+                                  'signature': 'ARMO'}
+        armor.auto_release = False
+
+    def test_wrappers_are_slotted(self):
+        xedit = XEdit()
+        xedit._xelib = StubXelib(XEdit.ElementTypes.MainRecord,
+                                 signature='ARMO')
+        xedit._xelib.current_handles = {1}
+
+        # wrappers keep their state in slots rather than an instance dict
+        armor = xedit.objectify(1)
+        assert not hasattr(armor, '__dict__')
+        with pytest.raises(AttributeError):
+            armor.something_else = 1
+
+        # dropping the wrapper hands its handle over for release
+        assert armor.auto_release
+        del armor
+        assert xedit._xelib.asked[-1] == 1
+
+
+def records_tree():
+    '''
+    Three records that reference each other in a cycle, plus a second handle
+    to the first record.
+    '''
+    elements = {}
+    for handle, target in ((1, 2), (2, 3), (3, 1)):
+        elements[handle] = FakeElement(ElementTypes.MainRecord, 'ARMO',
+                                       children=[handle * 10],
+                                       path=f'xtest.esp\\{handle:08X}')
+        elements[handle * 10] = FakeElement(ElementTypes.Value,
+                                            name='Keyword',
+                                            def_type=DefTypes.Integer,
+                                            value_type=ValueTypes.Reference,
+                                            links_to=target)
+    elements[4] = FakeElement(ElementTypes.MainRecord, 'ARMO',
+                              path='xtest.esp\\00000001')
+    return elements
+
+
+class TestIdentity:
+    def test_identity_is_cached(self):
+        xedit, record = fake_xedit(records_tree())
+        raw_api = xedit.xelib.raw_api
+        raw_api.calls.clear()
+        assert record.identity == 'xtest.esp\\00000001'
+        assert len({record, record, record}) == 1
+        assert raw_api.calls['Path'] == 1
+
+    def test_equality(self):
+        xedit, record = fake_xedit(records_tree())
+        raw_api = xedit.xelib.raw_api
+        same_record = record.objectify(4)
+        other_record = record.objectify(2)
+        assert record == same_record
+        assert record != other_record
+        assert record != 1
+        assert len({record, same_record, other_record}) == 2
+        assert raw_api.calls['ElementEquals'] == 0
+
+    def test_identity_is_carried_over(self):
+        xedit, record = fake_xedit(records_tree())
+        raw_api = xedit.xelib.raw_api
+        record.identity
+        rewrapped = record.from_xedit_object(record.handle,
+                                             record,
+                                             metadata=record.metadata)
+        record.auto_release = False
+        assert rewrapped.identity == 'xtest.esp\\00000001'
+        assert raw_api.calls['Path'] == 1
+
+    def test_find_related_objects(self):
+        xedit, record = fake_xedit(records_tree())
+        raw_api = xedit.xelib.raw_api
+        raw_api.calls.clear()
+        related = list(record.find_related_objects(recurse=True))
+        assert [obj.handle for obj in related] == [2, 3]
+
+        # the path is looked up once for the starting record and once per
+        # reference target, and no element is compared through the DLL
+        assert raw_api.calls['ElementEquals'] == 0
+        assert raw_api.calls['Path'] == 4
@@ -0,0 +1,190 @@
+import pytest
+
+from pyxedit import XEdit
+from pyxedit.xelib.backends import SyntheticLoadOrder
+
+from xelib_tests.fixtures import simulated_session
+
+
+@pytest.fixture(scope='module')
+def xedit():
+    load_order = SyntheticLoadOrder(records_per_signature=10,
+                                    references_per_cell=2)
+    with simulated_session(XEdit, load_order).session() as xedit:
+        yield xedit
+
+
+@pytest.fixture(scope='module')
+def world_xedit():
+    '''
+    A session whose plugins have worldspaces and dialog topics too.
+    '''
+    load_order = SyntheticLoadOrder(
+        signatures=(SyntheticLoadOrder.SIGNATURES +
+                    SyntheticLoadOrder.EXTRA_SIGNATURES),
+        records_per_signature=4,
+        references_per_cell=2)
+    with simulated_session(XEdit, load_order).session() as xedit:
+        yield xedit
+
+
+def form_ids(records):
+    return [record.form_id for record in records]
+
+
+def most_opened(xelib, records):
+    '''
+    Consumes the given records, returning the most handles opened at once.
+    '''
+    return max(len(xelib.all_opened_handles) for _ in records)
+
+
+class TestRecordStream:
+    def test_plugin_records(self, xedit):
+        xelib = xedit.xelib
+        plugin = xedit.plugins[0]
+        with xelib.manage_handles():
+            expected = [xelib.get_form_id(handle)
+                        for handle in xelib.get_records(plugin.handle)]
+        assert form_ids(plugin.records()) == expected
+
+        # records nested in the child groups of cells are streamed too
+        with xelib.manage_handles():
+            expected = [xelib.get_form_id(handle) for handle in
+                        xelib.get_records(plugin.handle, 'REFR')]
+        assert len(expected) == 20
+        assert form_ids(plugin.records('REFR')) == expected
+
+    def test_signatures(self, xedit):
+        plugin = xedit.plugins[0]
+        records = list(plugin.records(['ARMO', 'KYWD']))
+        assert {record.signature for record in records} == {'ARMO', 'KYWD'}
+        assert len(records) == 20
+        assert records[0].__class__.__name__ == 'XEditKeyword'
+        assert form_ids(plugin.records('ARMO,KYWD')) == form_ids(records)
+
+    def test_overrides(self, xedit):
+        plugin = xedit.plugins[1]
+        new_records = list(plugin.records())
+        records = list(plugin.records(include_overrides=True))
+        assert len(records) > len(new_records)
+        assert not any(record.is_override for record in new_records)
+        assert any(record.is_override for record in records)
+
+    def test_load_order_records(self, xedit):
+        xelib = xedit.xelib
+        for include_overrides in (False, True):
+            with xelib.manage_handles():
+                expected = sorted(
+                    xelib.get_form_id(handle) for handle in
+                    xelib.get_records(0, '', include_overrides))
+            assert sorted(record.form_id for record in xedit.records(
+                include_overrides=include_overrides)) == expected
+
+    def test_handles_are_released(self, xedit):
+        xelib = xedit.xelib
+        plugin = xedit.plugins[0]
+        opened = len(xelib.all_opened_handles)
+        held = most_opened(xelib, plugin.records()) - opened
+        xelib.flush_handle_releases()
+        assert len(xelib.all_opened_handles) == opened
+
+        # no more than a chunk of record handles (plus a few group handles)
+        # is held at a time; the largest chunks here are of 10 records
+        assert 0 < held < 20
+
+        # records kept by the caller keep their handles; the rest of the
+        # chunk is released when the stream is abandoned
+        for armor in plugin.records('ARMO'):
+            break
+        xelib.flush_handle_releases()
+        assert len(xelib.all_opened_handles) == opened + 1
+        assert armor.editor_id == 'SynthArmor00x00000'
+
+    def test_parent_groups(self, world_xedit):
+        xelib = world_xedit.xelib
+        plugin = world_xedit.plugins[0]
+        for signatures in ('', 'WRLD', 'CELL', 'REFR', 'DIAL', 'INFO',
+                           'CELL,DIAL,REFR'):
+            with xelib.manage_handles():
+                expected = sorted(xelib.get_form_id(handle) for handle in
+                                  xelib.get_records(plugin.handle,
+                                                    signatures))
+            assert expected
+            assert sorted(form_ids(plugin.records(signatures))) == expected
+
+        # the records of worldspaces and topics come before their children
+        signatures = [record.signature
+                      for record in plugin.records('WRLD,CELL,DIAL,INFO')]
+        first_world = signatures.index('WRLD')
+        assert signatures[first_world + 1] == 'CELL'
+        assert signatures.index('DIAL') < signatures.index('INFO')
+
+        # worldspaces are split down to their sub-blocks
+        opened = len(xelib.all_opened_handles)
+        held = most_opened(xelib, plugin.records('REFR')) - opened
+        xelib.flush_handle_releases()
+        assert len(xelib.all_opened_handles) == opened
+        assert 0 < held < 12
+
+    def test_unsearched_parent_groups(self, world_xedit, monkeypatch):
+        xelib = world_xedit.xelib
+        plugin = world_xedit.plugins[0]
+        searched = []
+        get_elements = xelib.get_elements
+
+        def recording_get_elements(id_, *args, **kwargs):
+            searched.append(xelib.signature(id_, ex=False))
+            return get_elements(id_, *args, **kwargs)
+
+        monkeypatch.setattr(xelib, 'get_elements', recording_get_elements)
+
+        # only the plugin itself is searched for records not in child groups
+        assert len(list(plugin.records('ARMO'))) == 4
+        assert searched == ['']
+
+        # the groups of the parents of INFOs are searched, but not those of
+        # worldspaces and cells
+        del searched[:]
+        assert len(list(plugin.records('INFO'))) == 12
+        assert 'DIAL' in searched
+        assert not {'CELL', 'WRLD'} & set(searched)
+
+        # worldspaces themselves are streamed without searching their
+        # children
+        del searched[:]
+        assert len(list(plugin.records('WRLD'))) == 4
+        assert searched == ['', 'WRLD']
+
+
+class TestRecordLookups:
+    def test_by_editor_id(self, xedit):
+        armor = xedit.by_editor_id('synthARMOR00x00000')
+        assert armor.editor_id == 'SynthArmor00x00000'
+        assert armor.__class__.__name__ == 'XEditArmor'
+        assert xedit.by_editor_id('Missing') is None
+        assert xedit.by_editor_id('Missing', default=False) is False
+
+    def test_by_form_id(self, xedit):
+        index = xedit.xelib.record_index
+        form_id, (master, override) = next(
+            (form_id, plugins)
+            for form_id, plugins in index.plugins_by_form_id.items()
+            if len(plugins) == 2)
+
+        for key in (form_id, f'{form_id:08X}'):
+            winning = xedit.by_form_id(key)
+            assert winning.form_id == form_id
+            assert winning.plugin.name == override
+        assert xedit.by_form_id(form_id, plugin=master).plugin.name == master
+        assert xedit.by_form_id(form_id, plugin='Missing.esp') is None
+
+    def test_new_records_are_found(self, xedit):
+        armor = xedit.by_editor_id('SynthArmor00x00001')
+        plugin = xedit.plugins[-1]
+        new_armor = armor.copy_into(plugin, mode='new')
+        new_armor.editor_id = 'MyNewArmor'
+        assert xedit.by_editor_id('MyNewArmor').form_id == new_armor.form_id
+        assert xedit.by_editor_id('SynthArmor00x00001').form_id == \
+            armor.form_id
+        assert xedit.by_form_id(new_armor.form_id).plugin.name == plugin.name
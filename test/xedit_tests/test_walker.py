@@ -0,0 +1,152 @@
+from pyxedit import Xelib
+
+from . fakes import FakeElement, fake_xedit
+
+ElementTypes = Xelib.ElementTypes
+DefTypes = Xelib.DefTypes
+ValueTypes = Xelib.ValueTypes
+
+
+def plugin_tree():
+    '''
+    A plugin with a cell (holding a persistent reference in its child group)
+    and an armor record that references a keyword.
+    '''
+    return {
+        1: FakeElement(ElementTypes.File, 'TES4', children=[2, 8]),
+        2: FakeElement(ElementTypes.GroupRecord, 'CELL', children=[3]),
+        3: FakeElement(ElementTypes.MainRecord, 'CELL', children=[4],
+                       child_group=5),
+        4: FakeElement(ElementTypes.SubRecord, 'EDID',
+                       def_type=DefTypes.String, value='SomeCell'),
+        5: FakeElement(ElementTypes.GroupRecord, 'GRUP', children=[6]),
+        6: FakeElement(ElementTypes.MainRecord, 'REFR', children=[7]),
+        7: FakeElement(ElementTypes.SubRecord, 'NAME',
+                       def_type=DefTypes.Integer,
+                       value_type=ValueTypes.Reference,
+                       links_to=11),
+        8: FakeElement(ElementTypes.GroupRecord, 'ARMO', children=[9]),
+        9: FakeElement(ElementTypes.MainRecord, 'ARMO', children=[10, 12]),
+        10: FakeElement(ElementTypes.SubRecord, 'EDID',
+                        def_type=DefTypes.String, value='SomeArmor'),
+        11: FakeElement(ElementTypes.MainRecord, 'KYWD'),
+        12: FakeElement(ElementTypes.Value, name='Keyword',
+                        def_type=DefTypes.Integer,
+                        value_type=ValueTypes.Reference,
+                        links_to=11),
+    }
+
+
+class TestXEditWalker:
+    def test_order(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        assert list(plugin.walk(raw=True)) == [2, 3, 4, 8, 9, 10, 12]
+        assert list(plugin.walk(raw=True, iter_groups=True)) == [
+            2, 3, 4, 5, 6, 7, 8, 9, 10, 12]
+
+    def test_descendants(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        calls = xedit.xelib.raw_api.calls
+        calls.clear()
+        descendants = list(plugin.descendants(iter_groups=True))
+        assert [obj.handle for obj in descendants] == [
+            2, 3, 4, 5, 6, 7, 8, 9, 10, 12]
+        assert descendants[7].__class__.__name__ == 'XEditArmor'
+
+        # the element type fetched while walking is not fetched again
+        assert calls['ElementType'] == len(descendants)
+
+    def test_max_depth(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        assert list(plugin.walk(raw=True, max_depth=1)) == [2, 8]
+        assert list(plugin.walk(raw=True, max_depth=2)) == [2, 3, 8, 9]
+
+    def test_prune(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        raw_api = xedit.xelib.raw_api
+        assert list(plugin.walk(raw=True,
+                                iter_groups=True,
+                                prune_signatures=['CELL'])) == [8, 9, 10, 12]
+
+        # the pruned cell group is never expanded
+        assert raw_api.calls['GetElements'] == 5
+        assert list(plugin.walk(
+            raw=True,
+            prune_element_types=[ElementTypes.SubRecord])) == [2, 3, 8, 9, 12]
+        assert list(plugin.walk(
+            raw=True,
+            iter_groups=True,
+            prune=lambda handle, metadata: metadata.get('signature') == 'REFR'
+        )) == [2, 3, 4, 5, 8, 9, 10, 12]
+
+    def test_prune_before_objectify(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        raw_api = xedit.xelib.raw_api
+        objs = list(plugin.walk(prune_signatures=['GRUP', 'CELL', 'ARMO']))
+        assert objs == []
+        assert raw_api.calls['GetElements'] == 1
+
+    def test_releases(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        xelib = xedit.xelib
+        walk = iter(plugin.walk(raw=True, prune_signatures=['CELL']))
+
+        # a handle stays valid until its subtree has been walked
+        assert next(walk) == 8
+        assert next(walk) == 9
+        assert next(walk) == 10
+        xelib.flush_handle_releases()
+        assert sorted(xelib.raw_api.released) == [2]
+        assert next(walk) == 12
+        xelib.flush_handle_releases()
+        assert sorted(xelib.raw_api.released) == [2, 10]
+
+        # abandoning the walk releases whatever is still on the stack
+        walk.close()
+        xelib.flush_handle_releases()
+        assert sorted(xelib.raw_api.released) == [2, 8, 9, 10, 12]
+
+    def test_objectified_raw_handles_are_kept(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        xelib = xedit.xelib
+        kept = [plugin.objectify(handle)
+                for handle in plugin.walk(raw=True)
+                if handle == 9]
+        xelib.flush_handle_releases()
+        assert 9 not in xelib.raw_api.released
+        assert kept[0].signature == 'ARMO'
+
+    def test_references(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        refs = list(plugin.references)
+        assert [ref.handle for ref in refs] == [12]
+        assert [ref.value.signature for ref in refs] == ['KYWD']
+
+        # the element types fetched by the walk are not fetched again
+        raw_api = xedit.xelib.raw_api
+        raw_api.calls.clear()
+        walked = list(plugin.walk(raw=True, with_metadata=True))
+        assert [handle for handle, _ in walked] == [2, 3, 4, 8, 9, 10, 12]
+        assert walked[0][1] == {'element_type': ElementTypes.GroupRecord}
+        raw_api.calls.clear()
+        assert [handle for handle, _ in plugin.reference_elements()] == [12]
+        assert raw_api.calls['ElementType'] == 7
+
+    def test_find_text_values(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        raw_api = xedit.xelib.raw_api
+        raw_api.calls.clear()
+        record = plugin.objectify(9)
+        assert list(record.find_text_values()) == ['SomeArmor']
+        group = plugin.objectify(2)
+        assert list(group.find_text_values(iter_groups=True)) == ['SomeCell']
+
+        # only text elements get objectified, so only they have their value
+        # type looked up
+        assert raw_api.calls['ValueType'] == 2
+
+    def test_find_related_objects(self):
+        xedit, plugin = fake_xedit(plugin_tree())
+        record = plugin.objectify(9)
+        related = list(record.find_related_objects())
+        assert [obj.signature for obj in related] == ['KYWD']
@@ -1,6 +1,7 @@
 import pytest
 
 from pyxedit import Xelib
+from pyxedit.xelib.backends import SimulatedBackend, SyntheticLoadOrder
 
 
 @pytest.fixture(scope='class')
@@ -20,3 +21,23 @@ def xelib():
             game_mode=Xelib.GameModes.TES5,
             plugins=plugins).session() as xelib:
         yield xelib
+
+
+def simulated_session(session_class=Xelib, load_order=None, load_delay=0.0,
+                      **kwargs):
+    '''
+    Creates a session object of the given class (``Xelib``, ``XEdit``,
+    ``AsyncXelib``, ...) running against a ``SimulatedBackend``, with all
+    of the plugins of the given synthetic load order to load.
+
+    @param session_class: the class of the session object
+    @param load_order: the ``SyntheticLoadOrder`` to serve; defaults to one
+                       with 10 records of each signature per plugin
+    @param load_delay: the simulated loading time of each plugin
+    @param kwargs: any other arguments for the session class
+    '''
+    load_order = load_order or SyntheticLoadOrder(records_per_signature=10)
+    return session_class(plugins=load_order.plugin_names,
+                         backend=SimulatedBackend(load_order,
+                                                  load_delay=load_delay),
+                         **kwargs)
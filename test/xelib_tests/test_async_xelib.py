@@ -0,0 +1,224 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pyxedit import AsyncXelib, Xelib, XelibError
+from pyxedit.xelib.async_xelib import DllThread
+
+from . fixtures import simulated_session
+
+LoaderStates = Xelib.LoaderStates
+
+
+def async_xelib(**kwargs):
+    return simulated_session(AsyncXelib, **kwargs)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestDllThread:
+    def test_calls_run_on_one_thread(self):
+        thread = DllThread()
+
+        async def threads():
+            thread.start()
+            try:
+                return await asyncio.gather(
+                    *[thread.submit(threading.current_thread)
+                      for _ in range(20)])
+            finally:
+                thread.stop().join()
+
+        owners = run(threads())
+        assert len(set(owners)) == 1
+        assert owners[0] is not threading.current_thread()
+        assert owners[0].name == 'pyxedit-dll'
+
+    def test_queued_calls_are_batched(self):
+        thread = DllThread(batch_size=64)
+
+        async def flood():
+            thread.start()
+            try:
+                # while the thread is blocked, the other calls queue up
+                blocker = thread.submit(time.sleep, 0.05)
+                results = await asyncio.gather(
+                    *[thread.submit(pow, i, 2) for i in range(100)])
+                await blocker
+                return results
+            finally:
+                thread.stop().join()
+
+        assert run(flood()) == [i ** 2 for i in range(100)]
+        assert thread.calls == 101
+        assert thread.batches <= 4
+
+    def test_errors_are_handed_back(self):
+        thread = DllThread()
+
+        async def fail():
+            thread.start()
+            try:
+                with pytest.raises(ZeroDivisionError):
+                    await thread.submit(lambda: 1 / 0)
+                return await thread.submit(lambda: 'still running')
+            finally:
+                thread.stop().join()
+
+        assert run(fail()) == 'still running'
+
+    def test_base_exceptions_stop_the_thread(self, monkeypatch):
+        class Interrupt(BaseException):
+            pass
+
+        def interrupt():
+            raise Interrupt()
+
+        # the exception the thread dies with is reported to the excepthook
+        died_with = []
+        monkeypatch.setattr(threading, 'excepthook',
+                            lambda args: died_with.append(args.exc_type))
+        thread = DllThread(batch_size=64)
+
+        async def stop():
+            thread.start()
+            blocker = thread.submit(time.sleep, 0.05)
+            interrupted = thread.submit(interrupt)
+            queued = [thread.submit(int) for _ in range(3)]
+            await blocker
+            with pytest.raises(Interrupt):
+                await interrupted
+            for future in queued:
+                with pytest.raises(XelibError, match='DLL thread stopped'):
+                    await future
+            with pytest.raises(XelibError, match='not running'):
+                thread.submit(int)
+
+        run(stop())
+        assert died_with == [Interrupt]
+
+    def test_not_running(self):
+        thread = DllThread()
+
+        async def submit():
+            return await thread.submit(int)
+
+        with pytest.raises(XelibError, match='not running'):
+            run(submit())
+        assert not thread.submit_nowait(int)
+
+
+class TestAsyncXelib:
+    def test_session(self):
+        xelib = async_xelib()
+
+        async def session():
+            async with xelib.session() as session:
+                assert session.loaded
+                file_count = await session.get_global('FileCount')
+                armor = await session.get_element(0, 'Synthetic.esm\\ARMO\\[0]')
+                return file_count, await session.name(armor)
+
+        assert run(session()) == ('3', 'Synthetic Armor 0')
+        assert not xelib.loaded
+        assert not xelib.dll_thread.running
+
+    def test_concurrent_requests(self):
+        xelib = async_xelib()
+
+        async def request(session, index):
+            armor = await session.get_element(
+                         0, f'Synthetic.esm\\ARMO\\[{index}]')
+            return await session.get_value(armor, 'EDID')
+
+        async def serve():
+            async with xelib.session() as session:
+                return await asyncio.gather(*[request(session, i)
+                                              for i in range(10)])
+
+        edids = run(serve())
+        assert edids == [f'SynthArmor00x{i:05d}' for i in range(10)]
+        assert xelib.dll_thread.batches < xelib.dll_thread.calls
+
+    def test_event_loop_stays_responsive(self):
+        xelib = async_xelib()
+
+        async def ticker(done):
+            ticks = 0
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.001)
+            return ticks
+
+        async def serve():
+            async with xelib.session() as session:
+                done = asyncio.Event()
+                ticks = asyncio.ensure_future(ticker(done))
+                await session.run(lambda _: time.sleep(0.05))
+                await session.build_references(0)
+                done.set()
+                return await ticks
+
+        assert run(serve()) > 5
+
+    def test_load_progress_on_event_loop(self):
+        xelib = async_xelib(load_delay=0.01)
+        event_threads = set()
+
+        def progress(event):
+            event_threads.add(threading.current_thread())
+
+        async def load():
+            async with xelib.session(load_plugins=False) as session:
+                status = await session.load_plugins_async(progress=progress)
+                return status, await session.get_global('FileCount')
+
+        assert run(load()) == (LoaderStates.Done, '3')
+        assert event_threads == {threading.current_thread()}
+
+    def test_run(self):
+        xelib = async_xelib()
+
+        def keyword_count(xelib, path):
+            with xelib.manage_handles():
+                return len(xelib.get_elements(0, f'{path}\\KWDA'))
+
+        async def count():
+            async with xelib.session() as session:
+                return await session.run(keyword_count,
+                                         'Synthetic.esm\\ARMO\\[0]')
+
+        assert run(count()) == 3
+
+    def test_check_for_errors_and_wait(self):
+        xelib = async_xelib()
+
+        async def check():
+            async with xelib.session() as session:
+                plugin = await session.file_by_name('Synthetic.esm')
+                return await session.check_for_errors_and_wait(plugin)
+
+        assert run(check()) == []
+
+    def test_not_forwarded(self):
+        xelib = async_xelib()
+        with pytest.raises(AttributeError):
+            xelib.manage_handles
+        with pytest.raises(AttributeError):
+            xelib.not_a_method
+
+    def test_errors(self):
+        xelib = async_xelib()
+
+        async def fail():
+            async with xelib.session() as session:
+                with pytest.raises(XelibError):
+                    await session.get_element(0, 'Synthetic.esm\\NOPE',
+                                              ex=True)
+                return await session.get_global('FileCount')
+
+        assert run(fail()) == '3'
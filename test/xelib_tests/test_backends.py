@@ -0,0 +1,276 @@
+import pytest
+
+from pyxedit import XEdit, Xelib, XelibError
+from pyxedit.xelib.backends import (DllBackend,
+                                    SimulatedBackend,
+                                    SyntheticLoadOrder)
+from pyxedit.xelib.tracing import TraceReplayer, read_trace
+
+
+def load_order():
+    return SyntheticLoadOrder(records_per_signature=20,
+                              references_per_cell=2)
+
+
+@pytest.fixture(scope='class')
+def xelib():
+    synthetic = load_order()
+    with Xelib(plugins=synthetic.plugin_names,
+               backend=SimulatedBackend(synthetic)).session() as xelib:
+        yield xelib
+
+
+class TestBackends:
+    def test_dll_backend_by_default(self):
+        xelib = Xelib(xeditlib_path='XEditLib.dll')
+        assert isinstance(xelib.backend, DllBackend)
+        assert xelib.backend.dll_path == 'XEditLib.dll'
+
+    def test_session(self):
+        synthetic = load_order()
+        xelib = Xelib(plugins=synthetic.plugin_names[:2],
+                      backend=SimulatedBackend(synthetic))
+        with xelib.session():
+            assert xelib.loaded
+            assert xelib.get_global('FileCount') == '2'
+            assert 'Loading Synthetic1.esp' in xelib.get_messages()
+        assert not xelib.loaded
+
+    def test_smart_load_adds_masters(self):
+        synthetic = load_order()
+        with Xelib(plugins=['Synthetic2.esp'],
+                   backend=SimulatedBackend(synthetic)).session() as xelib:
+            assert [xelib.name(file_) for file_ in xelib.get_elements()] == [
+                'Synthetic.esm', 'Synthetic1.esp', 'Synthetic2.esp']
+
+    def test_unsupported_function(self, xelib):
+        with pytest.raises(XelibError, match='not supported'):
+            xelib.get_def_names(xelib.file_by_index(0))
+
+
+class TestSimulatedFiles:
+    def test_files(self, xelib):
+        esm = xelib.file_by_name('Synthetic.esm')
+        esp = xelib.file_by_load_order(2)
+        assert xelib.display_name(esp) == '[02] Synthetic2.esp'
+        assert xelib.get_master_names(esp) == ['Synthetic.esm',
+                                               'Synthetic1.esp']
+        assert xelib.element_equals(xelib.get_masters(esp)[0], esm)
+        assert xelib.get_file_author(esm) == 'pyxedit'
+        assert xelib.get_is_esm(esm)
+        assert not xelib.get_is_esm(esp)
+
+        # 20 records of each of 5 signatures, plus 2 references per cell
+        assert xelib.get_record_count(esm) == 140
+        assert xelib.get_next_object_id(esm) == 0x800 + 140
+        assert xelib.get_override_record_count(esm) == 0
+        assert xelib.get_override_record_count(esp) > 0
+
+    def test_groups(self, xelib):
+        esm = xelib.file_by_name('Synthetic.esm')
+        groups = xelib.get_elements(esm)[1:]
+        assert [xelib.signature(group) for group in groups] == [
+            'KYWD', 'GLOB', 'ARMO', 'NPC_', 'CELL']
+        assert xelib.name(groups[2]) == 'Armor'
+        block = xelib.get_element(esm, 'CELL\\Block 0\\Sub-Block 0')
+        assert xelib.signature(block) == 'GRUP'
+        assert xelib.long_path(block) == (
+            'Synthetic.esm\\CELL\\Block 0\\Sub-Block 0')
+
+
+class TestSimulatedElements:
+    def test_paths_and_names(self, xelib):
+        armor = xelib.get_element(0, 'Synthetic.esm\\ARMO\\[0]')
+        assert xelib.path(armor) == 'Synthetic.esm\\00000828'
+        assert xelib.name(armor) == 'Synthetic Armor 0'
+        assert xelib.editor_id(armor) == 'SynthArmor00x00000'
+        assert xelib.long_name(armor) == (
+            'SynthArmor00x00000 "Synthetic Armor 0" [ARMO:00000828]')
+        dnam = xelib.get_element(armor, 'DNAM')
+        assert xelib.name(dnam) == 'DNAM - Armor Rating'
+        assert xelib.local_path(dnam) == 'DNAM'
+        assert xelib.path(xelib.get_element(armor, 'KWDA\\[1]')) == (
+            'Synthetic.esm\\00000828\\KWDA\\[1]')
+        assert xelib.has_element(armor, 'Armor Rating')
+        assert not xelib.has_element(armor, 'NAME')
+
+    def test_values(self, xelib):
+        armor = xelib.get_element(0, 'Synthetic.esm\\00000828')
+        assert xelib.get_value(armor, 'DNAM').endswith('.000000')
+        assert xelib.get_value(armor, 'KWDA\\[0]').startswith('SynthKeyword')
+        assert xelib.get_value(armor, 'KWDA\\[0]').endswith(']')
+        keyword = xelib.get_links_to(armor, 'KWDA\\[0]')
+        assert xelib.signature(keyword) == 'KYWD'
+        assert xelib.get_value(armor, 'KWDA\\[0]') == (
+            f'{xelib.editor_id(keyword)} '
+            f'[KYWD:{xelib.get_hex_form_id(keyword)}]')
+        assert xelib.element_type(armor) == Xelib.ElementTypes.MainRecord
+        assert xelib.value_type(xelib.get_element(armor, 'KWDA')) == (
+            Xelib.ValueTypes.Array)
+
+    def test_get_values(self, xelib):
+        extractors = Xelib.Extractors
+        npc = xelib.get_element(0, 'Synthetic.esm\\NPC_\\[0]')
+        keyword = xelib.get_links_to(npc, 'KWDA\\[0]')
+        opened = len(xelib.all_opened_handles)
+        values = xelib.get_values(npc, {
+            'editor_id': 'EDID',
+            'level': ('ACBS\\Level', extractors.Int),
+            'x1': ('OBND\\X1', extractors.Int),
+            'keyword': ('KWDA\\[0]', extractors.FormID),
+            'flags': ('ACBS\\Flags', extractors.Flags),
+            'missing': ('DNAM', extractors.Float)})
+        assert values == {
+            'editor_id': xelib.editor_id(npc),
+            'level': xelib.get_int_value(npc, 'ACBS\\Level'),
+            'x1': xelib.get_int_value(npc, 'OBND\\X1'),
+            'keyword': xelib.get_form_id(keyword),
+            'flags': xelib.get_enabled_flags(npc, 'ACBS\\Flags'),
+            'missing': None}
+
+        # referenced records are released within the batch
+        assert len(xelib.all_opened_handles) == opened
+
+        armor = xelib.get_element(0, 'Synthetic.esm\\ARMO\\[0]')
+        assert xelib.get_values(armor, [
+            'FULL',
+            ('DNAM', extractors.Float),
+            ('DATA\\Weight', extractors.Float),
+            'FULL'], as_tuple=True) == (
+                'Synthetic Armor 0',
+                xelib.get_float_value(armor, 'DNAM'),
+                xelib.get_float_value(armor, 'DATA\\Weight'),
+                'Synthetic Armor 0')
+
+        with pytest.raises(XelibError, match='"NOPE"'):
+            xelib.get_values(armor, ['EDID', 'NOPE'], ex=True)
+
+    def test_edits(self, xelib):
+        armor = xelib.get_element(0, 'Synthetic1.esp\\01000828')
+        xelib.set_float_value(armor, 12.5, 'DNAM')
+        assert xelib.get_value(armor, 'DNAM') == '12.500000'
+        xelib.set_value(armor, 'Edited', 'FULL')
+        assert xelib.full_name(armor) == 'Edited'
+        assert xelib.get_is_modified(armor)
+
+        keyword = xelib.get_element(0, 'Synthetic.esm\\KYWD\\[0]')
+        keyword_id = xelib.get_hex_form_id(keyword)
+        xelib.add_array_item(armor, 'KWDA', '', keyword_id)
+        assert xelib.has_array_item(armor, 'KWDA', '', keyword_id)
+        xelib.remove_array_item(armor, 'KWDA', '', keyword_id)
+        assert not xelib.has_array_item(armor, 'KWDA', '', keyword_id)
+
+        npc = xelib.get_element(0, 'Synthetic1.esp\\NPC_\\[0]')
+        xelib.set_enabled_flags(npc, ['Essential', 'Unique'], 'ACBS\\Flags')
+        assert xelib.get_enabled_flags(npc, 'ACBS\\Flags') == [
+            'Essential', 'Unique']
+        assert xelib.get_flag(npc, 'Unique', 'ACBS\\Flags')
+
+    def test_add_record(self, xelib):
+        esp = xelib.file_by_name('Synthetic2.esp')
+        next_id = xelib.get_next_object_id(esp)
+        record = xelib.add_element(esp, 'KYWD\\KYWD')
+        assert xelib.get_form_id(record) == (2 << 24) | next_id
+        xelib.add_element_value(record, 'EDID', 'AddedKeyword')
+        assert xelib.get_element(esp, 'KYWD\\AddedKeyword')
+        assert xelib.get_next_object_id(esp) == next_id + 1
+
+
+class TestSimulatedRecords:
+    def test_overrides(self, xelib):
+        esp = xelib.file_by_name('Synthetic1.esp')
+        override = next(record
+                        for record in xelib.get_records(esp, 'ARMO', True)
+                        if xelib.is_override(record))
+        master = xelib.get_master_record(override)
+        assert xelib.is_master(master)
+        assert xelib.get_element_file(master) != esp
+        assert xelib.name(xelib.get_element_file(master)) == 'Synthetic.esm'
+        assert xelib.full_name(override) == (
+            f'{xelib.full_name(master)} (Synthetic1.esp)')
+        overrides = xelib.get_overrides(master)
+        assert any(xelib.element_equals(other, override)
+                   for other in overrides)
+        assert xelib.element_equals(xelib.get_winning_override(master),
+                                    overrides[-1])
+
+    def test_get_records(self, xelib):
+        esp = xelib.file_by_name('Synthetic1.esp')
+        new_records = xelib.get_records(esp, 'ARMO,Keyword')
+        assert len(new_records) == 40
+        assert {xelib.signature(record) for record in new_records} == {
+            'ARMO', 'KYWD'}
+        assert len(xelib.get_records(esp, 'ARMO', True)) > 20
+        assert len(xelib.get_records(0, 'REFR')) == 3 * 20 * 2
+
+    def test_get_record(self, xelib):
+        esp = xelib.file_by_name('Synthetic1.esp')
+
+        # with a file, the FormID is local to the file: 01 is the esp itself
+        record = xelib.get_record(esp, 0x01000828)
+        assert xelib.get_form_id(record) == 0x01000828
+        assert xelib.get_form_id(record, native=True) == 0x01000828
+        assert xelib.element_equals(xelib.get_record(0, 0x01000828), record)
+        with pytest.raises(XelibError):
+            xelib.get_record(0, 0x01FFFFFF, ex=True)
+
+    def test_child_groups(self, xelib):
+        cell = xelib.get_element(0, 'Synthetic.esm\\CELL\\Block 0\\'
+                                    'Sub-Block 0\\[0]')
+        child_group = xelib.get_element(cell, 'Child Group')
+        assert xelib.name(child_group) == (
+            f'Children of {xelib.get_hex_form_id(cell)}')
+        reference = xelib.get_element(child_group, 'Temporary\\[0]')
+        assert xelib.signature(reference) == 'REFR'
+        base = xelib.get_links_to(reference, 'NAME')
+        assert xelib.signature(base) in ('ARMO', 'NPC_')
+
+
+class TestSimulatedXEdit:
+    def test_xedit_session(self):
+        synthetic = load_order()
+        with XEdit(plugins=synthetic.plugin_names,
+                   backend=SimulatedBackend(synthetic)).session() as xedit:
+            plugin = xedit.plugins[0]
+            assert plugin.name == 'Synthetic.esm'
+            armor = plugin['ARMO\\[0]']
+            assert armor.__class__.__name__ == 'XEditArmor'
+            assert armor.armor_rating == float(
+                xedit.xelib.get_value(armor.handle, 'DNAM'))
+            assert [keyword.signature
+                    for keyword in armor.keywords] == ['KYWD'] * 3
+
+    def test_get_values(self):
+        synthetic = load_order()
+        with XEdit(plugins=synthetic.plugin_names,
+                   backend=SimulatedBackend(synthetic)).session() as xedit:
+            armor = xedit.plugins[0]['ARMO\\[0]']
+            keyword = armor.keywords[0]
+            assert armor.get_values({
+                'name': 'full_name',
+                'rating': ('armor_rating', armor.Extractors.Float),
+                'keyword': ('KWDA\\[0]', armor.Extractors.FormID),
+            }) == {'name': armor.full_name,
+                   'rating': armor.armor_rating,
+                   'keyword': keyword.form_id}
+            assert armor.get_values(['editor_id', 'NOPE'], as_tuple=True) == (
+                armor.editor_id, None)
+
+    def test_trace_replays_on_simulated_backend(self, tmp_path):
+        synthetic = load_order()
+        path = tmp_path / 'session.trace'
+        xelib = Xelib(plugins=synthetic.plugin_names,
+                      backend=SimulatedBackend(synthetic))
+        with xelib.session():
+            with xelib.trace(path):
+                armor = xelib.get_element(0, 'Synthetic.esm\\ARMO\\[3]')
+                xelib.get_value(armor, 'KWDA\\[0]')
+                xelib.path(xelib.get_links_to(armor, 'KWDA\\[0]'))
+
+        # a fresh session hands out different handles, which the replayer
+        # maps onto the recorded ones
+        with xelib.session():
+            xelib.get_elements(0)
+            replayer = TraceReplayer(xelib.raw_api).replay(read_trace(path))
+            assert replayer.calls > 0
+            assert replayer.mismatches == []
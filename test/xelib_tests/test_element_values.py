@@ -600,6 +600,31 @@ class TestElementValues:
         with pytest.raises(XelibError):
             xelib.get_all_flags(data.refr, path='Record Header')
 
+    def test_get_values(self, xelib):
+        data = self.get_data(xelib)
+        extractors = xelib.Extractors
+
+        # should read the same values as the single value getters
+        values = xelib.get_values(data.rec, [
+            'EDID',
+            ('DNAM', extractors.Float),
+            ('KWDA\\[1]', extractors.FormID),
+            ('BODT\\First Person Flags', extractors.Flags)])
+        assert values == {
+            'EDID': xelib.get_value(data.rec, 'EDID'),
+            'DNAM': xelib.get_float_value(data.rec, 'DNAM'),
+            'KWDA\\[1]': xelib.get_form_id(
+                               xelib.get_links_to(data.keyword)),
+            'BODT\\First Person Flags': xelib.get_enabled_flags(
+                                             data.rec,
+                                             'BODT\\First Person Flags')}
+
+        # should read missing values as None, or fail if asked to
+        assert xelib.get_values(data.rec, ['Non\\Existent'],
+                                as_tuple=True) == (None,)
+        with pytest.raises(XelibError):
+            xelib.get_values(data.rec, ['Non\\Existent'], ex=True)
+
     def test_signature_from_name(self, xelib):
         # should succeed for top-level record names
         assert xelib.signature_from_name('Armor') == 'ARMO'
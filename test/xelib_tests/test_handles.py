@@ -0,0 +1,185 @@
+import pytest
+
+from pyxedit import Xelib
+from pyxedit.xelib.handles import (HandleFinalizers,
+                                   HandleRegistry,
+                                   ReleaseQueue)
+
+
+class TestHandleRegistry:
+    def test_track_and_untrack(self):
+        registry = HandleRegistry()
+        registry.track(1)
+        registry.track_many([2, 3])
+        assert set(registry) == {1, 2, 3}
+        assert registry.current == {1, 2, 3}
+        assert registry.untrack(2)
+        assert not registry.untrack(2)
+        assert 2 not in registry
+        assert registry.current == {1, 3}
+
+    def test_layers(self):
+        registry = HandleRegistry()
+        registry.track(1)
+        outer = registry.current
+        registry.push()
+        registry.track(2)
+        inner = registry.current
+        assert registry.layer_of(1) is outer
+        assert registry.layer_of(2) is inner
+        assert registry.layer_of(3) is None
+
+        # popping a layer drains it in place, so that anyone holding on to
+        # the layer sees its handles as released
+        assert registry.pop() == [2]
+        assert inner == set()
+        assert registry.current is outer
+        assert set(registry) == {1}
+
+        # the outermost layer is never popped
+        with pytest.raises(IndexError):
+            registry.pop()
+
+    def test_promote(self):
+        registry = HandleRegistry()
+        outer = registry.current
+        registry.push()
+        registry.push()
+        registry.track(1)
+        middle = registry.layers[1]
+        assert registry.promote(1) is middle
+        assert registry.promote(1) is outer
+        assert registry.promote(1) is None
+        assert registry.promote(2) is None
+        assert registry.layer_of(1) is outer
+        registry.pop()
+        registry.pop()
+        assert 1 in registry
+
+    def test_drain(self):
+        registry = HandleRegistry()
+        registry.track(1)
+        registry.push()
+        registry.track_many([2, 3])
+        assert sorted(registry.drain_current()) == [2, 3]
+        assert set(registry) == {1}
+        registry.track(4)
+        assert sorted(registry.drain_all()) == [1, 4]
+        assert len(registry) == 0
+        assert all(not layer for layer in registry.layers)
+
+
+class ReleaseRecordingRawApi:
+    def __init__(self):
+        self.released = []
+
+    def Release(self, id_):
+        self.released.append(id_)
+        return True
+
+
+@pytest.fixture
+def release_xelib():
+    xelib = Xelib()
+    xelib._raw_api = ReleaseRecordingRawApi()
+    yield xelib
+    xelib._raw_api = None
+
+
+class TestReleaseQueue:
+    def test_batches(self):
+        released = []
+        queue = ReleaseQueue(released.append, batch_size=3)
+        queue.push(1)
+        queue.push(2)
+        assert released == []
+        assert len(queue) == 2
+        queue.push(3)
+        assert released == [1, 2, 3]
+        queue.push(4)
+        assert queue.flush() == 1
+        assert released == [1, 2, 3, 4]
+        queue.push(5)
+        queue.discard()
+        assert queue.flush() == 0
+        assert released == [1, 2, 3, 4]
+
+    def test_deferred_release(self, release_xelib):
+        release_xelib.track_handles([1, 2, 3])
+        release_xelib.defer_release_handle(1)
+        release_xelib.defer_release_handle(2)
+
+        # queued handles count as released right away, but are only actually
+        # released on flush
+        assert release_xelib.all_opened_handles == {3}
+        assert release_xelib.raw_api.released == []
+        assert release_xelib.flush_handle_releases() == 2
+        assert release_xelib.raw_api.released == [1, 2]
+
+        # handles that are not tracked are not queued again
+        release_xelib.defer_release_handle(1)
+        assert release_xelib.flush_handle_releases() == 0
+
+    def test_flush_on_manage_handles_exit(self, release_xelib):
+        release_xelib.track_handle(1)
+        with release_xelib.manage_handles():
+            release_xelib.track_handle(2)
+            release_xelib.defer_release_handle(1)
+        assert sorted(release_xelib.raw_api.released) == [1, 2]
+
+    def test_flush_on_batch_size(self, release_xelib):
+        release_xelib.release_batch_size = 2
+        release_xelib.track_handles([1, 2, 3])
+        for handle in (1, 2, 3):
+            release_xelib.defer_release_handle(handle)
+        assert release_xelib.raw_api.released == [1, 2]
+
+
+class Wrapper:
+    pass
+
+
+class TestHandleFinalizers:
+    def test_release_on_collect(self):
+        released = []
+        finalizers = HandleFinalizers(released.append)
+        obj = Wrapper()
+        finalizer = finalizers.watch(obj, 1)
+        assert finalizer.alive
+        assert len(finalizers) == 1
+        del obj
+        assert released == [1]
+        assert not finalizer.alive
+        assert len(finalizers) == 0
+
+    def test_detach(self):
+        released = []
+        finalizers = HandleFinalizers(released.append)
+        obj = Wrapper()
+        finalizer = finalizers.watch(obj, 1)
+        finalizer.detach()
+        assert not finalizer.alive
+        del obj
+        assert released == []
+
+    def test_handle_taken_over(self):
+        # a stale wrapper must not release a handle now owned by another one
+        released = []
+        finalizers = HandleFinalizers(released.append)
+        stale, current = Wrapper(), Wrapper()
+        finalizers.watch(stale, 1)
+        finalizer = finalizers.watch(current, 1)
+        del stale
+        assert released == []
+        assert finalizer.alive
+        del current
+        assert released == [1]
+
+    def test_watch_handle(self, release_xelib):
+        release_xelib.track_handle(1)
+        obj = Wrapper()
+        release_xelib.watch_handle(obj, 1)
+        del obj
+        assert release_xelib.all_opened_handles == set()
+        assert release_xelib.flush_handle_releases() == 1
+        assert release_xelib.raw_api.released == [1]
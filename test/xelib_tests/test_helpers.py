@@ -0,0 +1,160 @@
+from array import array
+from collections import Counter
+import pytest
+
+from pyxedit import Xelib, XelibError
+from pyxedit.xelib.wrapper_methods.helpers import ResultBuffers
+
+
+class CountingRawApi:
+    '''
+    A minimal stand-in for the ``XEditLib.dll`` entry points exercised by the
+    helper methods. It counts every call made to it, so that tests can assert
+    on how much traffic crosses the DLL boundary for a given operation.
+
+    Like the DLL, it only keeps the exception message of the last failing
+    call; ``Path`` fails for the handles in ``stale``.
+    '''
+    def __init__(self, elements, stale=()):
+        self.elements = elements
+        self.stale = set(stale)
+        self.calls = Counter()
+        self.result = ''
+        self.exception_message = ''
+
+    def _string_result(self, value, len_):
+        self.result = value
+        len_._obj.value = len(value)
+        return True
+
+    def GetElement(self, id_, path, res):
+        self.calls['GetElement'] += 1
+        handle = self.elements.get(path, 0)
+        res._obj.value = handle
+        if not handle:
+            self.exception_message = 'not found'
+        return bool(handle)
+
+    def Path(self, id_, short, local, sort, len_):
+        self.calls['Path'] += 1
+        if id_ in self.stale:
+            self.exception_message = 'invalid handle'
+            return False
+        return self._string_result(f'path-of-{id_}', len_)
+
+    def GetValue(self, id_, path, len_):
+        self.calls['GetValue'] += 1
+        self.exception_message = 'no value'
+        return False
+
+    def GetElements(self, id_, path, sort, filter, sparse, len_):
+        self.calls['GetElements'] += 1
+        self.result = list(range(id_ + 1, id_ + 1 + len(path)))
+        len_._obj.value = len(self.result)
+        return True
+
+    def GetResultArray(self, buffer, len_):
+        self.calls['GetResultArray'] += 1
+        buffer[:len(self.result)] = self.result
+        return True
+
+    def GetResultString(self, buffer, len_):
+        self.calls['GetResultString'] += 1
+        buffer.value = self.result
+        return True
+
+    def GetExceptionMessageLength(self, len_):
+        self.calls['GetExceptionMessageLength'] += 1
+        return self._string_result(self.exception_message, len_)
+
+    def GetExceptionMessage(self, buffer, len_):
+        self.calls['GetExceptionMessage'] += 1
+        buffer.value = self.result
+        return True
+
+    def GetExceptionStackLength(self, len_):
+        self.calls['GetExceptionStackLength'] += 1
+        len_._obj.value = 0
+        return True
+
+    def GetExceptionStack(self, buffer, len_):
+        self.calls['GetExceptionStack'] += 1
+        return True
+
+
+@pytest.fixture
+def counting_xelib():
+    xelib = Xelib()
+    xelib._raw_api = CountingRawApi({'EDID': 7}, stale={13})
+    yield xelib
+    xelib._raw_api = None
+
+
+class TestHelpers:
+    def test_error_prefix(self, counting_xelib):
+        assert counting_xelib.error_prefix('') == ''
+        assert counting_xelib.error_prefix('oops') == 'oops: '
+        assert counting_xelib.error_prefix(lambda: 'oops') == 'oops: '
+
+    def test_error_context_is_lazy_on_success(self, counting_xelib):
+        assert counting_xelib.get_element(5, 'EDID') == 7
+        assert counting_xelib.raw_api.calls['Path'] == 0
+        assert counting_xelib.raw_api.calls['GetResultString'] == 0
+        assert counting_xelib.raw_api.calls['GetElement'] == 1
+
+    def test_error_context_is_resolved_on_failure(self, counting_xelib):
+        with pytest.raises(XelibError) as excinfo:
+            counting_xelib.get_element(5, 'FULL', ex=True)
+        assert 'path-of-5, "FULL"' in str(excinfo.value)
+        assert 'not found' in str(excinfo.value)
+        assert counting_xelib.raw_api.calls['Path'] == 1
+
+    def test_error_is_read_before_context(self, counting_xelib):
+        # resolving the context of a stale handle fails too, and must not
+        # replace the error of the failed call
+        with pytest.raises(XelibError) as excinfo:
+            counting_xelib.get_element(13, 'FULL', ex=True)
+        assert "xedit-lib message: 'not found'" in str(excinfo.value)
+        assert 'invalid handle' not in str(excinfo.value)
+        assert 'at 13, "FULL": ' in str(excinfo.value)
+
+    def test_get_values_error_is_read_before_context(self, counting_xelib):
+        with pytest.raises(XelibError) as excinfo:
+            counting_xelib.get_values(13, ['FULL'], ex=True)
+        assert "xedit-lib message: 'no value'" in str(excinfo.value)
+        assert 'invalid handle' not in str(excinfo.value)
+
+    def test_error_context_is_skipped_without_ex(self, counting_xelib):
+        assert counting_xelib.get_element(5, 'FULL', ex=False) == 0
+        assert counting_xelib.raw_api.calls['Path'] == 0
+
+    def test_string_buffers_are_reused(self, counting_xelib):
+        assert counting_xelib.path(123456) == 'path-of-123456'
+        buffer = counting_xelib._result_buffers.string_buffer(0)
+        # a shorter result in the same buffer must not leak the previous one
+        assert counting_xelib.path(1) == 'path-of-1'
+        assert counting_xelib._result_buffers.string_buffer(0) is buffer
+
+    def test_array_buffers_are_reused(self, counting_xelib):
+        assert counting_xelib.get_elements(10, 'abc') == [11, 12, 13]
+        buffer = counting_xelib._result_buffers.array_buffer(0)
+        assert counting_xelib.get_elements(20, 'a') == [21]
+        assert counting_xelib._result_buffers.array_buffer(0) is buffer
+        assert {11, 12, 13, 21} <= counting_xelib.current_handles
+
+    def test_array_results_as_array(self, counting_xelib):
+        items = counting_xelib.get_array(
+            lambda len_: counting_xelib.raw_api.GetElements(
+                30, 'ab', False, False, False, len_),
+            as_array=True)
+        assert items == array('I', [31, 32])
+
+    def test_result_buffers_grow_geometrically(self):
+        buffers = ResultBuffers()
+        small = buffers.array_buffer(10)
+        assert len(small) == ResultBuffers.INITIAL_SIZE
+        assert buffers.array_buffer(ResultBuffers.INITIAL_SIZE) is small
+        large = buffers.array_buffer(ResultBuffers.INITIAL_SIZE * 3)
+        assert len(large) == ResultBuffers.INITIAL_SIZE * 4
+        assert len(buffers.string_buffer(ResultBuffers.INITIAL_SIZE)) == (
+            ResultBuffers.INITIAL_SIZE * 2)
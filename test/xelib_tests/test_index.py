@@ -0,0 +1,254 @@
+from contextlib import nullcontext
+
+import pytest
+
+from pyxedit import Xelib, XelibError
+from pyxedit.xelib.backends import SimulatedBackend, SyntheticLoadOrder
+from pyxedit.xelib.index import IndexEntry, RecordLocation
+from pyxedit.xelib.index_cache import RecordIndexCache
+
+from . fixtures import simulated_session
+
+
+def synthetic_xelib(load_order=None, **kwargs):
+    load_order = load_order or SyntheticLoadOrder(records_per_signature=10,
+                                                  references_per_cell=2)
+    return simulated_session(Xelib, load_order, **kwargs)
+
+
+class LightPluginXelib:
+    '''
+    Stands in for a session where the plugin of the index file has a full
+    master at load order byte ``02``, and is itself a light plugin in light
+    slot ``003``.
+    '''
+    def manage_handles(self):
+        return nullcontext()
+
+    def get_record(self, plugin, form_id, search_masters, ex):
+        # the records of the plugin are their native FormIDs, as handles
+        return form_id
+
+    def get_form_id(self, record, ex):
+        if record >> 24 == 0:
+            return 0x02000000 | record & 0xFFFFFF
+        return 0xFE003000 | record & 0xFFF
+
+
+def index_tables(index):
+    return (dict(index.editor_ids),
+            {form_id: list(plugins)
+             for form_id, plugins in index.plugins_by_form_id.items()},
+            dict(index.signatures))
+
+
+@pytest.fixture
+def xelib():
+    with synthetic_xelib().session() as xelib:
+        yield xelib
+
+
+@pytest.fixture
+def game_path(tmp_path):
+    '''
+    A game folder with stand-ins for the plugin files of the synthetic load
+    order, for the index cache to fingerprint.
+    '''
+    # the simulated data path is the game path followed by 'Data\\'
+    data_path = tmp_path / 'Data\\'
+    data_path.mkdir()
+    for name in SyntheticLoadOrder().plugin_names:
+        (data_path / name).write_bytes(name.encode())
+    return f'{tmp_path}/'
+
+
+class TestRecordIndex:
+    def test_build(self, xelib):
+        index = xelib.record_index
+        assert xelib.record_index is index
+        assert len(index) == len(xelib.get_records(0))
+        assert index.locate_editor_id('SynthArmor00x00000') == (
+            RecordLocation('Synthetic.esm',
+                           xelib.get_form_id(xelib.get_element(
+                               0, 'Synthetic.esm\\ARMO\\[0]', ex=True))))
+
+        # every version of a record is indexed, master first
+        for record in xelib.get_records(0, '', True):
+            plugins = index.locate_form_id(xelib.get_form_id(record))
+            plugin_name = xelib.name(xelib.get_element_file(record))
+            assert plugin_name in plugins
+            assert (plugins[0] == plugin_name) == xelib.is_master(record)
+
+    def test_lookups(self, xelib):
+        index = xelib.record_index
+        overridden = [form_id
+                      for form_id, plugins in index.plugins_by_form_id.items()
+                      if len(plugins) > 1]
+        assert overridden
+        form_id = overridden[0]
+        master, override = index.locate_form_id(form_id)
+
+        winning = index.get_record(form_id)
+        assert xelib.get_form_id(winning) == form_id
+        assert xelib.name(xelib.get_element_file(winning)) == override
+        assert xelib.is_winning_override(winning)
+
+        first = index.get_record(form_id, master)
+        assert xelib.name(xelib.get_element_file(first)) == master
+        assert xelib.is_master(first)
+
+        assert index.get_record(form_id, 'Missing.esp') == 0
+        assert index.get_record(0xDEADBEEF) == 0
+        assert index.locate_editor_id('synthARMOR00x00000') is not None
+        assert index.locate_editor_id('Missing') is None
+        assert index.signature_of(form_id) == xelib.signature(winning)
+        assert index.signature_of(0xDEADBEEF) is None
+
+    def test_incremental_updates(self, xelib):
+        index = xelib.record_index
+        plugin = xelib.file_by_name('Synthetic2.esp')
+        armor = xelib.add_element(plugin, 'ARMO\\.')
+        xelib.add_element_value(armor, 'EDID', 'NewArmor')
+        form_id = xelib.get_form_id(armor)
+        assert index.locate_form_id(form_id) == ['Synthetic2.esp']
+        assert index.locate_editor_id('newarmor') == (
+            RecordLocation('Synthetic2.esp', form_id))
+
+        xelib.set_value(armor, 'RenamedArmor', 'EDID')
+        assert index.locate_editor_id('RenamedArmor').form_id == form_id
+        assert index.locate_editor_id('NewArmor') is None
+
+        # as are EditorIDs set on the EDID element itself
+        xelib.set_value(xelib.get_element(armor, 'EDID'), 'MyArmor')
+        assert index.locate_editor_id('MyArmor').form_id == form_id
+        assert index.locate_editor_id('RenamedArmor') is None
+
+        # overrides are slotted in by load order
+        keyword = xelib.get_element(0, 'Synthetic.esm\\KYWD\\[0]', ex=True)
+        keyword_id = xelib.get_form_id(keyword)
+        before = list(index.locate_form_id(keyword_id))
+        xelib.copy_element(keyword, plugin)
+        assert index.locate_form_id(keyword_id) == before + ['Synthetic2.esp']
+
+    def test_renamed_copies(self, xelib):
+        index = xelib.record_index
+        armor = xelib.get_element(0, 'Synthetic.esm\\ARMO\\[0]', ex=True)
+        form_id = xelib.get_form_id(armor)
+        editor_id = xelib.editor_id(armor)
+        plugin = xelib.file_by_name('Synthetic2.esp')
+
+        # a new record copied from another takes over its EditorID, until
+        # renamed
+        copy = xelib.copy_element(armor, plugin, as_new=True)
+        copy_id = xelib.get_form_id(copy)
+        assert index.locate_editor_id(editor_id).form_id == copy_id
+        xelib.set_value(copy, 'CopiedArmor', 'EDID')
+        assert index.locate_editor_id('CopiedArmor').form_id == copy_id
+        assert index.locate_editor_id(editor_id).form_id == form_id
+
+        # the EditorID of the latest version of a record is the one it goes
+        # by
+        override = xelib.copy_element(armor, plugin)
+        xelib.set_value(override, 'OverriddenArmor', 'EDID')
+        assert index.locate_editor_id('OverriddenArmor') == (
+            RecordLocation('Synthetic2.esp', form_id))
+        assert index.locate_editor_id(editor_id) is None
+        xelib.set_value(armor, 'RenamedMaster', 'EDID')
+        assert index.locate_editor_id('RenamedMaster') is None
+        assert index.locate_editor_id('OverriddenArmor').form_id == form_id
+
+    def test_not_in_session(self):
+        with pytest.raises(XelibError, match='within a session'):
+            Xelib(backend=SimulatedBackend(SyntheticLoadOrder())).record_index
+
+    def test_reset_with_session(self, xelib):
+        assert xelib.record_index is not None
+        xelib.end_session()
+        assert xelib._record_index is None
+        xelib.start_session()
+
+
+class TestRecordIndexCache:
+    def test_reuse(self, tmp_path):
+        cache = RecordIndexCache(tmp_path / 'cache')
+        with synthetic_xelib(index_cache=cache).session() as xelib:
+            expected = index_tables(xelib.record_index)
+        assert (cache.hits, cache.misses) == (0, 3)
+        assert len(list((tmp_path / 'cache').glob('*.idx'))) == 3
+
+        cache_dir = tmp_path / 'cache'
+        with synthetic_xelib(index_cache=cache_dir).session() as xelib:
+            assert index_tables(xelib.record_index) == expected
+            assert (xelib.index_cache.hits, xelib.index_cache.misses) == (3, 0)
+
+    def test_fingerprint(self, tmp_path, game_path):
+        cache = RecordIndexCache(tmp_path / 'cache', digest='md5')
+        with synthetic_xelib(game_path=game_path,
+                             index_cache=cache).session() as xelib:
+            expected = index_tables(xelib.record_index)
+
+        # plugins whose size and modification time are unchanged are not
+        # even hashed
+        hashed = []
+        cache.hash = lambda xelib, plugin: hashed.append(plugin)
+        with synthetic_xelib(game_path=game_path,
+                             index_cache=cache).session() as xelib:
+            assert index_tables(xelib.record_index) == expected
+        assert hashed == []
+        assert cache.hits == 3
+        del cache.hash
+
+        # a plugin that was touched, but not changed, is hashed and reused
+        touched = tmp_path / 'Data\\' / 'Synthetic1.esp'
+        touched.write_bytes(b'touched')
+        with synthetic_xelib(game_path=game_path,
+                             index_cache=cache).session() as xelib:
+            assert index_tables(xelib.record_index) == expected
+        assert (cache.hits, cache.misses) == (6, 3)
+
+        # plugins that changed are rebuilt
+        for plugin_file in (tmp_path / 'Data\\').iterdir():
+            plugin_file.write_bytes(b'changed')
+        load_order = SyntheticLoadOrder(records_per_signature=11,
+                                        references_per_cell=2)
+        with synthetic_xelib(load_order,
+                             game_path=game_path,
+                             index_cache=cache).session() as xelib:
+            index = xelib.record_index
+            assert len(index) == len(xelib.get_records(0))
+        assert cache.misses == 6
+
+    def test_modified_plugins_are_not_cached(self, tmp_path):
+        cache = RecordIndexCache(tmp_path)
+        with synthetic_xelib(index_cache=cache).session() as xelib:
+            plugin = xelib.file_by_name('Synthetic2.esp')
+            xelib.add_element_value(xelib.add_element(plugin, 'ARMO\\.'),
+                                    'EDID',
+                                    'UnsavedArmor')
+            assert xelib.record_index.locate_editor_id('UnsavedArmor')
+        assert not cache.path_of('Synthetic2.esp').exists()
+        assert cache.path_of('Synthetic.esm').exists()
+
+    def test_damaged_index_files(self, tmp_path):
+        cache = RecordIndexCache(tmp_path)
+        with synthetic_xelib(index_cache=cache).session() as xelib:
+            expected = index_tables(xelib.record_index)
+
+        # truncated index files, and ones cut short of their table, are
+        # rebuilt
+        path = cache.path_of('Synthetic1.esp')
+        data = path.read_bytes()
+        for damaged in (data[:-1], data[:cache.HEADER.size + 3]):
+            path.write_bytes(damaged)
+            with synthetic_xelib(index_cache=cache).session() as xelib:
+                assert index_tables(xelib.record_index) == expected
+            assert path.read_bytes() == data
+        assert (cache.hits, cache.misses) == (4, 5)
+
+    def test_light_plugins(self, tmp_path):
+        cache = RecordIndexCache(tmp_path)
+        entries = [IndexEntry(0x00000800, 'ARMO', 'MasterArmor'),
+                   IndexEntry(0x01000801, 'ARMO', 'LightArmor')]
+        assert cache.to_load_order(LightPluginXelib(), 1, entries) == [
+            IndexEntry(0x02000800, 'ARMO', 'MasterArmor'),
+            IndexEntry(0xFE003801, 'ARMO', 'LightArmor')]
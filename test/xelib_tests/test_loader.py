@@ -0,0 +1,110 @@
+from concurrent.futures import CancelledError
+import asyncio
+import time
+
+import pytest
+
+from pyxedit import XEdit, Xelib, XelibError
+from pyxedit.xelib.backends import SyntheticLoadOrder
+from pyxedit.xelib.loader import PluginLoad
+
+from . fixtures import simulated_session
+
+LoaderStates = Xelib.LoaderStates
+
+
+class TestPluginLoad:
+    def test_session_progress(self):
+        events = []
+        xelib = simulated_session(load_delay=0.01)
+        with xelib.session(progress=events.append):
+            assert xelib.get_global('FileCount') == '3'
+        messages = [event.message for event in events]
+        assert [message for message in messages if 'Loading' in message] == [
+            '[00:00] Loading Synthetic.esm',
+            '[00:00] Loading Synthetic1.esp',
+            '[00:00] Loading Synthetic2.esp']
+        assert messages[-1].endswith('Background Loader: finished')
+        assert events == sorted(events, key=lambda event: event.elapsed)
+
+    def test_messages_kept_without_progress(self):
+        xelib = simulated_session()
+        with xelib.session():
+            assert 'Loading Synthetic2.esp' in xelib.get_messages()
+
+    def test_no_load(self):
+        xelib = simulated_session()
+        with xelib.session(load_plugins=False):
+            assert xelib.get_global('FileCount') == '0'
+
+    def test_adaptive_polling(self):
+        xelib = simulated_session(load_delay=0.02)
+        with xelib.session(load_plugins=False):
+            load = xelib.load_plugins_async()
+            assert load.wait() == LoaderStates.Done
+            assert load.done()
+
+            # a fixed 1ms poll would take around 60 polls; backing off takes
+            # a handful
+            assert load.polls < 15
+
+    def test_backoff(self):
+        load = PluginLoad(None, initial_interval=0.001, max_interval=0.004)
+        assert [load.next_interval() for _ in range(5)] == [
+            0.001, 0.002, 0.004, 0.004, 0.004]
+
+    def test_timeout(self):
+        xelib = simulated_session(load_delay=10)
+        start = time.perf_counter()
+        with pytest.raises(XelibError, match='Timed out'):
+            with xelib.session(timeout=0.05):
+                pass
+        assert time.perf_counter() - start < 1
+        assert not xelib.loaded
+
+    def test_await(self):
+        xelib = simulated_session(load_delay=0.01)
+        events = []
+
+        async def load_and_count():
+            load = xelib.load_plugins_async(progress=events.append)
+            ticks = 0
+            task = asyncio.ensure_future(load.wait_async())
+            while not task.done():
+                ticks += 1
+                await asyncio.sleep(0.001)
+            assert await task == LoaderStates.Done
+            return ticks
+
+        with xelib.session(load_plugins=False):
+            # the event loop keeps running while the plugins load
+            assert asyncio.run(load_and_count()) > 1
+            assert xelib.get_global('FileCount') == '3'
+        assert events
+
+    def test_future(self):
+        xelib = simulated_session(load_delay=0.01)
+        with xelib.session(load_plugins=False):
+            future = xelib.load_plugins_async().future()
+            assert future.result(timeout=5) == LoaderStates.Done
+
+    def test_cancel(self):
+        xelib = simulated_session(load_delay=10)
+        with xelib.session(load_plugins=False):
+            load = xelib.load_plugins_async()
+            future = load.future()
+            time.sleep(0.01)
+            assert future.cancel()
+            assert load.cancelled()
+            with pytest.raises(CancelledError):
+                future.result(timeout=5)
+
+    def test_xedit_session_progress(self):
+        load_order = SyntheticLoadOrder(plugin_count=2,
+                                        records_per_signature=5)
+        events = []
+        with simulated_session(XEdit, load_order).session(
+                progress=events.append) as xedit:
+            assert xedit.plugin_count == 2
+        assert any('Loading Synthetic1.esp' in event.message
+                   for event in events)
@@ -0,0 +1,116 @@
+import pytest
+
+from pyxedit import XelibError
+from pyxedit.xelib.backends import SimulatedBackend, SyntheticLoadOrder
+from pyxedit.xelib.pool import (FormIDShard,
+                                GroupShard,
+                                PluginShard,
+                                SessionPool,
+                                SessionPoolError)
+
+from . fixtures import simulated_session
+
+
+# jobs have to be defined at module level to be sent over to the workers
+def editor_ids(xelib, shard):
+    return sorted(xelib.editor_id(record) for record in shard.records(xelib))
+
+
+def record_count(xelib, shard):
+    return len(shard.records(xelib))
+
+
+def master_record_count(xelib):
+    return len(xelib.get_records(0))
+
+
+def fail_on_npcs(xelib, shard):
+    if shard.signature == 'NPC_':
+        raise ValueError(f'no NPCs in {shard.plugin}')
+    return record_count(xelib, shard)
+
+
+def open_handles(xelib, shard):
+    shard.records(xelib)
+    return len(xelib.all_opened_handles)
+
+
+def session_pool(processes=2):
+    load_order = SyntheticLoadOrder(records_per_signature=10,
+                                    references_per_cell=1)
+    return simulated_session(SessionPool, load_order, processes=processes)
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with session_pool() as pool:
+        yield pool
+
+
+class TestSessionPool:
+    def test_warm_up(self, pool):
+        assert len(pool.workers) == 2
+        for info in pool.workers.values():
+            assert info.plugins == ['Synthetic.esm', 'Synthetic1.esp',
+                                    'Synthetic2.esp']
+            assert info.load_seconds >= 0
+
+    def test_plugin_shards(self, pool):
+        shards = pool.plugin_shards()
+        assert shards == [PluginShard('Synthetic.esm'),
+                          PluginShard('Synthetic1.esp'),
+                          PluginShard('Synthetic2.esp')]
+        counts = pool.map(record_count, shards)
+        assert counts[0] == 5 * 10 + 10
+        assert all(count > 0 for count in counts)
+
+    def test_group_shards(self, pool):
+        shards = pool.group_shards(signatures={'ARMO', 'KYWD'},
+                                   plugins=['Synthetic.esm'])
+        assert shards == [GroupShard('Synthetic.esm', 'KYWD'),
+                          GroupShard('Synthetic.esm', 'ARMO')]
+        keywords, armors = pool.map(editor_ids, shards)
+        assert len(keywords) == len(armors) == 10
+        assert armors[0] == 'SynthArmor00x00000'
+
+    def test_form_id_shards(self, pool):
+        shards = pool.form_id_shards(count=4)
+        assert len(shards) == 4
+        assert all(isinstance(shard, FormIDShard) for shard in shards)
+        assert all(shard.stop == next_shard.start
+                   for shard, next_shard in zip(shards, shards[1:]))
+
+        # together, the shards cover every master record exactly once
+        everything = pool.call(master_record_count)
+        assert sum(pool.map(record_count, shards)) == everything
+
+    def test_sessions_are_reused(self, pool):
+        pool.map(record_count, pool.plugin_shards() * 4)
+        assert set(pool.jobs_by_worker) <= set(pool.workers)
+        assert sum(pool.jobs_by_worker.values()) >= 12
+
+    def test_handles_are_released_between_jobs(self, pool):
+        shards = [PluginShard('Synthetic.esm')] * 6
+        assert len(set(pool.map(open_handles, shards))) == 1
+
+    def test_errors_are_aggregated(self, pool):
+        shards = pool.group_shards(signatures={'ARMO', 'NPC_'})
+        with pytest.raises(SessionPoolError) as info:
+            pool.map(fail_on_npcs, shards)
+        error = info.value
+        assert len(error.errors) == 3
+        assert {failure.shard.signature for failure in error.errors} == {
+            'NPC_'}
+        assert all('ValueError' in failure.traceback
+                   for failure in error.errors)
+        assert set(error.results) == {shard for shard in shards
+                                      if shard.signature == 'ARMO'}
+        assert '3 of 6 shards failed' in str(error)
+
+    def test_failed_warm_up(self):
+        pool = SessionPool(plugins=['Missing.esp'],
+                           backend=SimulatedBackend(SyntheticLoadOrder()),
+                           processes=1)
+        with pytest.raises(XelibError, match='Failed to start'):
+            pool.start()
+        assert not pool.started
@@ -0,0 +1,123 @@
+import ctypes
+import random
+
+import pytest
+
+from pyxedit import Xelib
+from pyxedit.xelib.profiler import (BUCKET_COUNT,
+                                    FunctionStats,
+                                    bucket_of,
+                                    bucket_value)
+
+from xedit_tests.fakes import FakeElement, fake_xedit
+from . test_helpers import CountingRawApi
+
+ElementTypes = Xelib.ElementTypes
+
+
+def profiled_xelib():
+    xelib = Xelib()
+    xelib._raw_api = CountingRawApi({'EDID': 7})
+    return xelib
+
+
+class TestXelibProfiler:
+    def test_switched_off_by_default(self):
+        xelib = profiled_xelib()
+        assert xelib.profiler is None
+        assert isinstance(xelib.raw_api, CountingRawApi)
+
+    def test_function_stats(self):
+        xelib = profiled_xelib()
+        with xelib.profile() as profiler:
+            assert xelib.profiler is profiler
+            xelib.get_element(5, 'EDID')
+            xelib.path(5)
+            xelib.path(6)
+            xelib.get_elements(10, 'abc')
+        assert xelib.profiler is None
+
+        # calls made after profiling stopped are not recorded
+        xelib.path(7)
+
+        functions = profiler.as_dict()['functions']
+        assert functions['GetElement']['calls'] == 1
+        assert functions['Path']['calls'] == 2
+        assert functions['GetResultString']['calls'] == 2
+        assert functions['GetResultArray']['calls'] == 1
+        for stats in functions.values():
+            assert (0 <= stats['p50_seconds'] <= stats['p99_seconds'] <=
+                    stats['max_seconds'] <= stats['total_seconds'])
+
+        # bytes copied out of the result buffers are counted
+        assert functions['GetResultString']['bytes'] == (
+            len('path-of-5') + len('path-of-6')) * ctypes.sizeof(ctypes.c_wchar)
+        assert functions['GetResultArray']['bytes'] == 3 * 4
+        assert functions['GetElement']['bytes'] == 0
+
+    def test_percentiles(self):
+        rng = random.Random(0)
+        durations = [int(rng.lognormvariate(10, 2)) for _ in range(5000)]
+        stats = FunctionStats()
+        for duration in durations:
+            stats.add(duration)
+        assert len(stats.buckets) == BUCKET_COUNT
+        assert stats.calls == len(durations)
+        assert stats.total_ns == sum(durations)
+        assert stats.max_ns == max(durations)
+
+        # percentiles are within the width of their bucket of the exact ones
+        durations.sort()
+        for percent in (50, 90, 99):
+            exact = durations[round(percent / 100 * (len(durations) - 1))]
+            assert stats.percentile(percent) * 1e9 == pytest.approx(
+                exact, rel=0.07, abs=1)
+        assert stats.percentile(100) * 1e9 == max(durations)
+        assert FunctionStats().percentile(50) == 0.0
+
+        # every duration lands in a bucket standing for about that duration
+        for duration in (0, 1, 7, 8, 9, 15, 16, 1000, 123456789, 2 ** 62):
+            assert bucket_value(bucket_of(duration)) == pytest.approx(
+                duration, rel=0.07, abs=1)
+
+    def test_attribution(self):
+        xelib = profiled_xelib()
+        with xelib.profile() as profiler:
+            xelib.path(5)
+            xelib.get_element(5, 'EDID')
+
+        callers = {(caller['xelib_method'], caller['function']): caller
+                   for caller in profiler.as_dict()['callers']}
+        assert set(callers) == {('Xelib.path', 'Path'),
+                                ('Xelib.path', 'GetResultString'),
+                                ('Xelib.get_element', 'GetElement')}
+        assert all(caller['xedit_caller'] is None
+                   for caller in callers.values())
+
+        folded = profiler.folded_stacks(weight='calls').splitlines()
+        assert 'Xelib.path;Path 1' in folded
+        assert 'Xelib.get_element;GetElement 1' in folded
+
+    def test_without_attribution(self):
+        xelib = profiled_xelib()
+        with xelib.profile(attribute=False) as profiler:
+            xelib.path(5)
+        assert profiler.as_dict()['callers'] == []
+        assert profiler.as_dict()['functions']['Path']['calls'] == 1
+
+    def test_xedit_attribution(self):
+        xedit, plugin = fake_xedit({
+            1: FakeElement(ElementTypes.File, 'TES4', children=[2]),
+            2: FakeElement(ElementTypes.GroupRecord, 'ARMO', children=[3]),
+            3: FakeElement(ElementTypes.MainRecord, 'ARMO'),
+        })
+        with xedit.xelib.profile() as profiler:
+            list(plugin.walk(raw=True))
+
+        callers = {(caller['xedit_caller'], caller['xelib_method'],
+                    caller['function'])
+                   for caller in profiler.as_dict()['callers']}
+        assert ('XEditWalker.child_handles', 'Xelib.get_elements',
+                'GetElements') in callers
+        assert ('XEditWalker.metadata_for', 'Xelib.element_type',
+                'ElementType') in callers
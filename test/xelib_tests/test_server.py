@@ -0,0 +1,202 @@
+from multiprocessing import AuthenticationError
+import os
+import stat
+
+import pytest
+
+from pyxedit import Xelib, XelibError
+from pyxedit.xelib.server import (Call,
+                                  SessionClient,
+                                  SessionServer,
+                                  default_key_path)
+
+from . fixtures import simulated_session
+
+
+def session_server(tmp_path, address=None, **kwargs):
+    return SessionServer(simulated_session(),
+                         address=str(address or tmp_path / 'session.sock'),
+                         key_path=tmp_path / 'session.key',
+                         **kwargs)
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = session_server(tmp_path, build_references=True)
+    thread = server.serve_in_thread()
+    yield server
+    server.stop()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def connect(server):
+    return SessionClient(server.address, key_path=server.key_path)
+
+
+class TestSessionServer:
+    def test_calls(self, server):
+        with connect(server) as xelib:
+            assert xelib.get_global('FileCount') == '3'
+            armor = xelib.get_element(0, 'Synthetic.esm\\ARMO\\[0]')
+            assert xelib.name(armor) == 'Synthetic Armor 0'
+            assert xelib.get_loader_status() == Xelib.LoaderStates.Done
+        assert server.load_seconds is not None
+
+    def test_session_outlives_clients(self, server):
+        for _ in range(3):
+            with connect(server) as xelib:
+                assert xelib.get_global('FileCount') == '3'
+        assert connect(server).info()['calls'] == 3
+
+    def test_batch(self, server):
+        with connect(server) as xelib:
+            with xelib.batch() as batch:
+                armor = batch.get_element(0, 'Synthetic.esm\\ARMO\\[1]')
+                name = batch.name(armor)
+                keywords = batch.get_elements(armor, 'KWDA')
+                missing = batch.get_element(0, 'Synthetic.esm\\NOPE', ex=True)
+                missing_name = batch.name(missing)
+            assert name.value == 'Synthetic Armor 1'
+            assert len(keywords.value) == 3
+            with pytest.raises(XelibError):
+                missing.value
+            with pytest.raises(XelibError, match='Depends on call 3'):
+                missing_name.value
+        assert server.requests == 1
+
+    def test_errors(self, server):
+        with connect(server) as xelib:
+            with pytest.raises(XelibError, match='Failed to get element'):
+                xelib.get_element(0, 'Synthetic.esm\\NOPE', ex=True)
+            with pytest.raises(XelibError, match='not a Xelib method'):
+                xelib.end_session()
+            outcome, = xelib.request('batch',
+                                     [Call('_release_untracked', (1,), {})])
+            assert outcome[0] == 'error'
+            assert 'not a Xelib method' in outcome[2]
+            assert xelib.get_global('FileCount') == '3'
+
+    def test_handle_scopes(self, server):
+        session = server.xelib
+        with connect(server) as xelib:
+            kept = xelib.get_element(0, 'Synthetic.esm\\ARMO\\[0]')
+            with xelib.manage_handles():
+                scoped = xelib.get_records(0, 'KYWD')
+                assert all(session.is_handle_tracked(handle)
+                           for handle in scoped)
+            assert not any(session.is_handle_tracked(handle)
+                           for handle in scoped)
+            assert session.is_handle_tracked(kept)
+
+        # disconnecting releases whatever the client left opened; the release
+        # happens once the server notices the disconnect
+        connect(server).info()
+        assert not session.is_handle_tracked(kept)
+
+    def test_failed_call_handles(self, server, monkeypatch):
+        session = server.xelib
+        get_records = session.get_records
+        opened = []
+
+        def get_records_and_fail(*args, **kwargs):
+            opened.extend(get_records(*args, **kwargs))
+            raise XelibError('Failed after opening handles')
+
+        monkeypatch.setattr(session, 'get_records', get_records_and_fail)
+        with connect(server) as xelib:
+            with pytest.raises(XelibError, match='after opening handles'):
+                xelib.get_records(0, 'ARMO')
+            assert opened
+            assert all(session.is_handle_tracked(handle)
+                       for handle in opened)
+
+        # the handles were the client's, and went with it
+        connect(server).info()
+        assert not any(session.is_handle_tracked(handle)
+                       for handle in opened)
+
+    def test_releases_are_per_client(self, server):
+        session = server.xelib
+        with connect(server) as first, connect(server) as second:
+            armor = second.get_element(0, 'Synthetic.esm\\ARMO\\[0]')
+            with pytest.raises(XelibError, match='not a Xelib method'):
+                first.release_all_handles()
+            for release in (lambda: first.release_handle(armor),
+                            lambda: first.release_handles([armor]),
+                            lambda: first.release(armor)):
+                with pytest.raises(XelibError,
+                                   match=f'Handle {armor} was not opened'):
+                    release()
+            assert second.name(armor) == 'Synthetic Armor 0'
+
+            # clients release their own handles
+            second.release_handles([armor])
+            assert not session.is_handle_tracked(armor)
+            with pytest.raises(XelibError, match='not opened'):
+                second.release_handle(armor)
+
+    def test_shutdown(self, tmp_path):
+        server = session_server(tmp_path)
+        thread = server.serve_in_thread()
+        with connect(server) as xelib:
+            assert server.xelib.loaded
+            xelib.shutdown()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert not server.xelib.loaded
+
+    def test_already_serving(self, server, tmp_path):
+        other = session_server(tmp_path, address=server.address)
+        with pytest.raises(XelibError, match='already listening'):
+            other.listen()
+
+    def test_stale_socket(self, tmp_path):
+        address = tmp_path / 'session.sock'
+        address.touch()
+        server = session_server(tmp_path, address=address)
+        thread = server.serve_in_thread()
+        with connect(server) as xelib:
+            assert xelib.get_global('FileCount') == '3'
+        server.stop()
+        thread.join(timeout=5)
+
+    def test_generated_key(self, tmp_path):
+        server = session_server(tmp_path)
+        assert len(server.authkey) == 32
+        assert server.authkey != session_server(tmp_path).authkey
+        thread = server.serve_in_thread()
+        try:
+            # the key file is private to the user
+            mode = stat.S_IMODE(os.stat(server.key_path).st_mode)
+            assert mode == 0o600
+            with SessionClient(server.address,
+                               authkey=server.authkey) as xelib:
+                assert xelib.get_global('FileCount') == '3'
+            with pytest.raises(AuthenticationError):
+                SessionClient(server.address, authkey=b'pyxedit-session')
+        finally:
+            server.stop()
+            thread.join(timeout=5)
+        assert not server.key_path.exists()
+
+        with pytest.raises(XelibError, match='key'):
+            SessionClient(server.address, key_path=server.key_path)
+
+    def test_given_key(self, tmp_path):
+        server = session_server(tmp_path, authkey=b'secret')
+        assert server.key_path is None
+        thread = server.serve_in_thread()
+        try:
+            with SessionClient(server.address, authkey=b'secret') as xelib:
+                assert xelib.get_global('FileCount') == '3'
+        finally:
+            server.stop()
+            thread.join(timeout=5)
+        assert not (tmp_path / 'session.key').exists()
+
+    def test_default_key_path(self):
+        path = default_key_path('/tmp/some.sock')
+        assert path == default_key_path('/tmp/some.sock')
+        assert path != default_key_path('/tmp/other.sock')
+        assert path.parent.parent == path.home()
@@ -0,0 +1,138 @@
+from pyxedit import Xelib
+from pyxedit.xelib.tracing import (INT,
+                                   OUT_ARRAY,
+                                   OUT_INT,
+                                   OUT_STR,
+                                   STR,
+                                   TraceReplayer,
+                                   read_trace)
+
+
+class SessionRawApi:
+    '''
+    A stand-in for ``XEditLib.dll`` that hands out a fresh handle for every
+    element resolved, starting from `first_handle`, like a real session would.
+    '''
+    def __init__(self, first_handle):
+        self.next_handle = first_handle
+        self.paths = {0: ''}
+        self.result = ''
+
+    def open(self, path):
+        handle = self.next_handle
+        self.next_handle += 1
+        self.paths[handle] = path
+        return handle
+
+    def GetElement(self, id_, path, res):
+        res._obj.value = self.open(f'{self.paths[id_]}\\{path}'.lstrip('\\'))
+        return True
+
+    def GetElements(self, id_, path, sort, filter, sparse, len_):
+        self.result = [self.open(f'{self.paths[id_]}\\[{index}]')
+                       for index in range(3)]
+        len_._obj.value = len(self.result)
+        return True
+
+    def Name(self, id_, len_):
+        self.result = self.paths[id_]
+        len_._obj.value = len(self.result)
+        return True
+
+    def GetResultString(self, buffer, len_):
+        buffer.value = self.result
+        return True
+
+    def GetResultArray(self, buffer, len_):
+        buffer[:len(self.result)] = self.result
+        return True
+
+
+def session_xelib(first_handle):
+    xelib = Xelib()
+    xelib._raw_api = SessionRawApi(first_handle)
+    return xelib
+
+
+def do_stuff(xelib):
+    handle = xelib.get_element(0, 'Skyrim.esm')
+    items = xelib.get_elements(handle)
+    return [xelib.name(item) for item in items]
+
+
+class TestCallTracer:
+    def test_records(self):
+        xelib = session_xelib(100)
+        with xelib.trace() as tracer:
+            do_stuff(xelib)
+        assert xelib.tracer is None
+
+        records = list(tracer)
+        assert [record.function for record in records] == [
+            'GetElement', 'GetElements', 'GetResultArray'] + [
+            'Name', 'GetResultString'] * 3
+        assert records[0].args == [(INT, 0), (STR, 'Skyrim.esm'),
+                                   (OUT_INT, 100)]
+        assert records[0].result == (INT, 1)
+        assert records[2].args[0] == (OUT_ARRAY, [101, 102, 103])
+        assert records[4].args[0] == (OUT_STR, 'Skyrim.esm\\[0]')
+        assert all(record.duration_ns >= 0 for record in records)
+
+    def test_ring_buffer(self):
+        xelib = session_xelib(100)
+        with xelib.trace(max_bytes=100) as tracer:
+            do_stuff(xelib)
+        assert tracer.size <= 100
+        assert tracer.dropped > 0
+        assert len(tracer) + tracer.dropped == 9
+        assert list(tracer)[-1].function == 'GetResultString'
+
+    def test_dump_and_stream(self, tmp_path):
+        xelib = session_xelib(100)
+        with xelib.trace() as tracer:
+            do_stuff(xelib)
+        tracer.dump(tmp_path / 'dumped.trace')
+
+        xelib = session_xelib(100)
+        with xelib.trace(path=tmp_path / 'streamed.trace'):
+            do_stuff(xelib)
+
+        dumped = list(read_trace(tmp_path / 'dumped.trace'))
+        streamed = list(read_trace(tmp_path / 'streamed.trace'))
+        assert [(record.function, record.args, record.result)
+                for record in dumped] == [
+            (record.function, record.args, record.result)
+            for record in streamed]
+        assert len(dumped) == 9
+
+
+class TestTraceReplayer:
+    def test_replay_maps_handles(self):
+        xelib = session_xelib(100)
+        with xelib.trace() as tracer:
+            names = do_stuff(xelib)
+        assert names == ['Skyrim.esm\\[0]', 'Skyrim.esm\\[1]',
+                         'Skyrim.esm\\[2]']
+
+        # the replay session hands out different handles, which get mapped
+        api = SessionRawApi(500)
+        replayer = TraceReplayer(api).replay(tracer)
+        assert replayer.calls == 9
+        assert replayer.mismatches == []
+        assert replayer.handles == {100: 500, 101: 501, 102: 502, 103: 503}
+        assert api.result == 'Skyrim.esm\\[2]'
+
+    def test_replay_mismatches(self):
+        xelib = session_xelib(100)
+        with xelib.trace() as tracer:
+            do_stuff(xelib)
+
+        class FailingRawApi(SessionRawApi):
+            def Name(self, id_, len_):
+                self.result = ''
+                len_._obj.value = 0
+                return False
+
+        replayer = TraceReplayer(FailingRawApi(500)).replay(tracer)
+        assert [mismatch.function for mismatch in replayer.mismatches] == [
+            'Name'] * 3